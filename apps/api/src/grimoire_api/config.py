@@ -22,10 +22,22 @@ class Settings(BaseSettings):
     LLM_API_KEY: str = "dummy"
     LLM_CONTEXT_WINDOW: int = 32768
     LLM_MAX_OUTPUT_TOKENS: int = 1024
+    # LLM への同時リクエスト数の初期値. 応答に応じて 1〜上限の範囲で自動調整する
     LLM_SUMMARY_CONCURRENCY: int = 3
+    LLM_MAX_CONCURRENCY: int = 16
+    # モデル別の同時リクエスト数上限 (例: {"openai/qwen3-35b": 8})
+    LLM_MODEL_MAX_CONCURRENCY: dict[str, int] = {}
+    # 平滑化した応答時間が基準の何倍を超えたら過負荷とみなすか
+    LLM_LATENCY_TOLERANCE: float = 2.0
+    # 応答をストリーミングで受け取り、JSON が閉じた時点・壊れた時点で打ち切る
+    LLM_STREAMING: bool = False
+    # LLM 応答キャッシュ (空文字で無効) とその合計サイズ上限 (バイト)
+    LLM_CACHE_PATH: str = "./data/llm-cache.db"
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
 
     # Database
     DATABASE_PATH: str = "./grimoire.db"
+    DATABASE_POOL_SIZE: int = 4
 
     # Weaviate
     WEAVIATE_HOST: str = "localhost"
@@ -38,10 +50,66 @@ class Settings(BaseSettings):
     WEAVIATE_CONNECT_TIMEOUT: float = 5.0
     WEAVIATE_MONITOR_INTERVAL: float = 5.0
     WEAVIATE_WORKER_STOP_TIMEOUT: float = 10.0
+    # 再索引で変わったオブジェクトだけを書き込む. false なら全件を削除・再登録し
+    # 本文チャンクの埋め込みも作り直す (埋め込みモデルを変えた場合など)
+    VECTORIZER_INCREMENTAL: bool = True
+    # 削除後に検索へ反映されるまで待つ旧来の確認 (0.1 秒間隔で最大10回). 通常は不要
+    VECTORIZER_POLL_DELETIONS: bool = False
+    # 本文チャンクの一括登録で1リクエストに送るオブジェクト数と同時リクエスト数
+    VECTORIZER_BATCH_SIZE: int = 100
+    VECTORIZER_BATCH_CONCURRENCY: int = 2
+    # 1回の一括索引化にまとめるページ数の上限 (再索引・worker 共通)
+    VECTORIZER_BULK_MAX_PAGES: int = 32
+
+    # Search
+    # 本文チャンク検索で、条件に合うページのチャンクをこの件数まで Weaviate の
+    # 絞り込みに渡す. 超える場合は絞り込まずに取得した候補を SQLite で判定する
+    SEARCH_PUSHDOWN_MAX_CHUNKS: int = 2000
+    # 検索クエリの埋め込みを API 側で作りキャッシュするモデル. Weaviate の
+    # text2vec-openai と同じモデルにする. 空文字なら Weaviate の near_text に任せる
+    SEARCH_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # プロセス内に保持するクエリ埋め込みの件数. 0 で無効
+    SEARCH_EMBEDDING_CACHE_SIZE: int = 1024
+    # クエリ埋め込みの永続キャッシュ (空文字で無効) とその件数上限
+    SEARCH_EMBEDDING_CACHE_PATH: str = "./data/query-embedding-cache.db"
+    SEARCH_EMBEDDING_CACHE_MAX_ENTRIES: int = 100_000
+    # 同じ条件の検索結果を保持する件数と秒数. 索引の世代が進むと破棄する. 0 で無効
+    SEARCH_RESULT_CACHE_SIZE: int = 256
+    SEARCH_RESULT_CACHE_TTL: float = 60.0
+
+    # Job Worker
+    JOB_WORKER_CONCURRENCY: int = 1
+    # 未設定のステージは JOB_WORKER_CONCURRENCY を使う
+    JOB_DOWNLOAD_CONCURRENCY: int | None = None
+    JOB_LLM_CONCURRENCY: int | None = None
+    JOB_VECTORIZE_CONCURRENCY: int | None = None
+    # vectorize ステージでこの秒数内に届いたページをまとめて一括登録する. 0 で無効
+    JOB_VECTORIZE_BATCH_WINDOW: float = 0.0
+    # API から worker へジョブ投入を通知する Unix ソケット (空文字で無効)
+    JOB_WAKEUP_SOCKET_PATH: str = "./data/job-wakeup.sock"
+    # 通知を取りこぼした場合のフォールバックポーリング間隔 (秒)
+    JOB_WORKER_POLL_INTERVAL: float = 30.0
+    # claim したジョブのリース期間 (秒). 1/3 ごとに延長し、切れたら他 worker が再取得
+    JOB_LEASE_SECONDS: float = 60.0
+    # 本文チャンクへ複製した検索用のページ属性を書き直す間隔 (秒). ジョブの完了・失敗
+    # 時にも書き直す. 0 で無効
+    JOB_CHUNK_ATTRIBUTE_SYNC_INTERVAL: float = 5.0
+    # 同一ホストへの download の同時実行数・開始レート (件/秒)・バースト. None で無制限
+    JOB_HOST_CONCURRENCY: int | None = 2
+    JOB_HOST_RATE: float | None = 1.0
+    JOB_HOST_BURST: int = 5
 
     # File Storage
     JSON_STORAGE_PATH: str = "./data/json"
+    # 保存済み Jina 応答の保存形式 ("json.gz": 圧縮した compact JSON, "json": 従来形式).
+    # 読み込みは形式を問わない. 既存ファイルは scripts/migrate_json_storage.py で移行
+    JSON_STORAGE_FORMAT: str = "json.gz"
+    # 本文がこのバイト数以上なら内容ハッシュの共有 blob に保存し、同じ本文を共有する.
+    # 0 で無効
+    JSON_STORAGE_DEDUP_MIN_BYTES: int = 4096
     REPAIR_REPORT_PATH: str = "./data/migration/repair-pending.json"
+    # worker 内で保持する保存済み Jina 応答の合計サイズ上限 (バイト). 0 で無効
+    DOCUMENT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
 
     # Build Info
     GIT_COMMIT: str = "unknown"
@@ -9,15 +9,22 @@ from .config import settings
 from .repositories.database import DatabaseConnection
 from .repositories.file_repository import FileRepository
 from .repositories.job_repository import JobRepository
+from .repositories.llm_cache_repository import LLMCacheRepository
 from .repositories.log_repository import LogRepository
 from .repositories.page_repository import PageRepository
+from .repositories.query_embedding_cache_repository import (
+    QueryEmbeddingCacheRepository,
+)
 from .repositories.repair_repository import RepairRepository
+from .repositories.summary_checkpoint_repository import SummaryCheckpointRepository
 from .services.chunking_service import ChunkingService
 from .services.jina_client import JinaClient
 from .services.llm_service import LLMService
 from .services.page_service import PageService
+from .services.query_embedder import QueryEmbedder
 from .services.repair_service import RepairService
 from .services.retry_service import RetryService
+from .services.search_result_cache import SearchResultCache
 from .services.search_service import SearchService
 from .services.url_processor import UrlProcessorService
 from .services.vectorizer import VectorizerService
@@ -33,6 +40,37 @@ def get_db_connection() -> DatabaseConnection:
     return DatabaseConnection()
 
 
+@lru_cache
+def get_llm_cache_repository() -> LLMCacheRepository | None:
+    """LLM 応答キャッシュシングルトン. LLM_CACHE_PATH が空なら無効."""
+    if not settings.LLM_CACHE_PATH:
+        return None
+    return LLMCacheRepository(DatabaseConnection(settings.LLM_CACHE_PATH))
+
+
+@lru_cache
+def get_query_embedder() -> QueryEmbedder | None:
+    """検索クエリ埋め込みシングルトン. SEARCH_EMBEDDING_MODEL が空なら無効."""
+    if not settings.SEARCH_EMBEDDING_MODEL:
+        return None
+    store = None
+    if settings.SEARCH_EMBEDDING_CACHE_PATH:
+        store = QueryEmbeddingCacheRepository(
+            DatabaseConnection(settings.SEARCH_EMBEDDING_CACHE_PATH)
+        )
+    return QueryEmbedder(settings.SEARCH_EMBEDDING_MODEL, store=store)
+
+
+@lru_cache
+def get_search_result_cache() -> SearchResultCache | None:
+    """検索結果キャッシュシングルトン. SEARCH_RESULT_CACHE_SIZE か TTL が 0 なら無効."""
+    if settings.SEARCH_RESULT_CACHE_SIZE <= 0 or settings.SEARCH_RESULT_CACHE_TTL <= 0:
+        return None
+    return SearchResultCache(
+        settings.SEARCH_RESULT_CACHE_SIZE, settings.SEARCH_RESULT_CACHE_TTL
+    )
+
+
 @lru_cache
 def get_file_repository() -> FileRepository:
     """ファイルリポジトリシングルトン."""
@@ -84,6 +122,13 @@ def get_job_repository(
     return JobRepository(db)
 
 
+def get_summary_checkpoint_repository(
+    db: DatabaseConnection = Depends(get_db_connection),
+) -> SummaryCheckpointRepository:
+    """分割要約チェックポイントリポジトリ依存性注入."""
+    return SummaryCheckpointRepository(db)
+
+
 def get_repair_repository(
     db: DatabaseConnection = Depends(get_db_connection),
 ) -> RepairRepository:
@@ -112,9 +157,18 @@ def get_page_service(
 def get_llm_service(
     file_repo: FileRepository = Depends(get_file_repository),
     chunking_service: ChunkingService = Depends(get_summary_chunking_service),
+    cache: LLMCacheRepository | None = Depends(get_llm_cache_repository),
+    checkpoints: SummaryCheckpointRepository = Depends(
+        get_summary_checkpoint_repository
+    ),
 ) -> LLMService:
     """LLM サービス依存性注入."""
-    return LLMService(file_repo, chunking_service=chunking_service)
+    return LLMService(
+        file_repo,
+        chunking_service=chunking_service,
+        cache=cache,
+        checkpoints=checkpoints,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -163,9 +217,16 @@ def get_repair_deletion_service(
 def get_search_service(
     page_repo: PageRepository = Depends(get_page_repository),
     weaviate_client: weaviate.WeaviateClient = Depends(get_weaviate_client),
+    query_embedder: QueryEmbedder | None = Depends(get_query_embedder),
+    result_cache: SearchResultCache | None = Depends(get_search_result_cache),
 ) -> SearchService:
     """検索サービス依存性注入."""
-    return SearchService(weaviate_client=weaviate_client, page_repo=page_repo)
+    return SearchService(
+        weaviate_client=weaviate_client,
+        page_repo=page_repo,
+        query_embedder=query_embedder,
+        result_cache=result_cache,
+    )
 
 
 def get_url_processor_service(
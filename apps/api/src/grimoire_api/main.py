@@ -17,6 +17,7 @@ from opentelemetry.instrumentation.sqlite3 import SQLite3Instrumentor
 
 from .config import settings
 from .dependencies import (
+    get_db_connection,
     get_jina_client,
 )
 from .routers import health, pages, process, retry, search, system_info
@@ -59,6 +60,8 @@ async def lifespan(app: FastAPI) -> Any:
     # 起動時処理 - データベース初期化
     await ensure_database_initialized()
     logger.info("Database initialized successfully")
+    db = get_db_connection()
+    await db.open()
 
     weaviate_manager = WeaviateConnectionManager(
         host=settings.WEAVIATE_HOST,
@@ -79,6 +82,8 @@ async def lifespan(app: FastAPI) -> Any:
         await weaviate_manager.stop()
         await get_jina_client().close()
         logger.info("Jina client closed")
+        await db.close()
+        logger.info("Database connections closed")
         logger.info("Application shutting down")
 
 
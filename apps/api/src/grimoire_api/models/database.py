@@ -4,7 +4,7 @@
 import warnings
 from dataclasses import dataclass
 from datetime import datetime
-from enum import Enum
+from enum import Enum, IntEnum
 
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="pydantic.*")
 
@@ -52,6 +52,14 @@ class JobKind(str, Enum):
     REPROCESS = "reprocess"
 
 
+class JobPriority(IntEnum):
+    """ジョブ優先度. 大きいほど先に claim される."""
+
+    BATCH = 0
+    NORMAL = 50
+    INTERACTIVE = 100
+
+
 class JobStatus(str, Enum):
     """ジョブ状態."""
 
@@ -100,6 +108,17 @@ class Job:
     created_at: datetime
     started_at: datetime | None
     finished_at: datetime | None
+    stage: PipelineStartStep | None = None
+    log_id: int | None = None
+    lease_owner: str | None = None
+    lease_expires_at: datetime | None = None
+    priority: int = JobPriority.NORMAL
+    host: str | None = None
+
+    @property
+    def next_stage(self) -> PipelineStartStep:
+        """次に実行するパイプラインステージ."""
+        return self.stage or self.start_step
 
 
 @dataclass
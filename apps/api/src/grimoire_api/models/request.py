@@ -2,7 +2,7 @@
 
 import re
 from datetime import UTC, datetime
-from typing import Annotated, Literal
+from typing import Annotated, Literal, get_args
 
 from pydantic import (
     BaseModel,
@@ -107,8 +107,11 @@ class SearchFilters(BaseModel):
         return value.astimezone(UTC)
 
 
-class SearchRequest(BaseModel):
-    """検索リクエスト."""
+SearchVectorName = Literal["content_vector", "title_vector", "memo_vector"]
+
+
+class _SearchQuery(BaseModel):
+    """検索リクエストに共通の条件."""
 
     model_config = ConfigDict(extra="forbid")
 
@@ -117,9 +120,37 @@ class SearchRequest(BaseModel):
     ]
     limit: int = Field(default=5, ge=1, le=100)
     filters: SearchFilters | None = None
-    vector_name: Literal["content_vector", "title_vector", "memo_vector"] = (
-        "content_vector"
-    )
     exclude_keywords: list[SearchKeyword] | None = Field(
         default=None, min_length=1, max_length=20
     )
+
+
+class SearchRequest(_SearchQuery):
+    """検索リクエスト."""
+
+    vector_name: SearchVectorName = "content_vector"
+
+
+class HybridSearchRequest(_SearchQuery):
+    """複数ベクトルを並行して検索し統合するリクエスト."""
+
+    vector_names: list[SearchVectorName] = Field(
+        default=["title_vector", "memo_vector", "content_vector"],
+        min_length=1,
+        max_length=3,
+    )
+    # rrf: 順位の逆数の和 / weighted: certainty の重み付き和
+    fusion: Literal["rrf", "weighted"] = "rrf"
+    # ベクトルごとの重み. 指定のないベクトルは 1.0
+    weights: dict[str, Annotated[float, Field(ge=0)]] | None = None
+
+    @field_validator("weights")
+    @classmethod
+    def reject_unknown_vector_weights(
+        cls, value: dict[str, float] | None
+    ) -> dict[str, float] | None:
+        """検索できないベクトルへの重みを拒否する."""
+        unknown = set(value or {}) - set(get_args(SearchVectorName))
+        if unknown:
+            raise ValueError(f"Unknown vector names in weights: {sorted(unknown)}")
+        return value
@@ -1,5 +1,7 @@
 """Database connection management."""
 
+import asyncio
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -10,19 +12,107 @@ from ..config import settings
 from ..utils.exceptions import DatabaseError
 from .migrations import migrate_database
 
+logger = logging.getLogger(__name__)
+
 
 class DatabaseConnection:
-    """データベース接続管理クラス."""
+    """データベース接続管理クラス.
+
+    ``open()`` を呼ぶまでは従来どおりクエリごとに接続を開く。``open()`` 後は
+    読み取り用接続 (最大 ``pool_size`` 本) と書き込み用接続 1 本を使い回し、
+    ``close()`` で全接続を閉じる。
+    """
 
-    def __init__(self, db_path: str | None = None, *, read_only: bool = False):
+    def __init__(
+        self,
+        db_path: str | None = None,
+        *,
+        read_only: bool = False,
+        pool_size: int | None = None,
+    ):
         """初期化.
 
         Args:
             db_path: データベースファイルパス
             read_only: SQLiteを読み取り専用モードで開くか
+            pool_size: プール時の読み取り用接続の上限数
         """
         self.db_path = db_path or settings.DATABASE_PATH
         self.read_only = read_only
+        self.pool_size = pool_size or settings.DATABASE_POOL_SIZE
+        if self.pool_size <= 0:
+            raise DatabaseError("DATABASE_POOL_SIZE must be greater than zero")
+        self._pooled = False
+        self._idle_readers: list[aiosqlite.Connection] = []
+        self._open_readers: set[aiosqlite.Connection] = set()
+        self._reader_slots: asyncio.Semaphore | None = None
+        self._writer: aiosqlite.Connection | None = None
+        self._writer_lock: asyncio.Lock | None = None
+
+    @property
+    def is_pooled(self) -> bool:
+        """長寿命の接続プールが有効か."""
+        return self._pooled
+
+    async def open(self) -> None:
+        """接続プールを有効化する. 接続は初回利用時に作成される."""
+        if self._pooled:
+            return
+        self._reader_slots = asyncio.Semaphore(self.pool_size)
+        self._writer_lock = asyncio.Lock()
+        self._pooled = True
+
+    async def close(self) -> None:
+        """接続プールを無効化し、開いている全接続を閉じる."""
+        if not self._pooled:
+            return
+        self._pooled = False
+        writer_lock = self._writer_lock
+        if writer_lock is not None:
+            # 実行中の書き込みトランザクションを途中で閉じない。
+            async with writer_lock:
+                writer, self._writer = self._writer, None
+                if writer is not None:
+                    await self._close_quietly(writer)
+        # 貸出中の読み取り用接続は返却時に閉じられる。
+        idle_readers, self._idle_readers = self._idle_readers, []
+        self._open_readers.clear()
+        for reader in idle_readers:
+            await self._close_quietly(reader)
+        self._reader_slots = None
+        self._writer_lock = None
+
+    async def health_check(self) -> bool:
+        """プール内の待機中接続を検査し、応答しない接続を破棄する."""
+        if not self._pooled:
+            try:
+                return await self.fetch_one("SELECT 1") is not None
+            except DatabaseError:
+                return False
+
+        reader_slots = self._reader_slots
+        if reader_slots is not None:
+            for _ in range(len(self._idle_readers)):
+                # 検査中の接続を他の読み取りに貸し出さないよう slot を取って取り出す
+                async with reader_slots:
+                    if not self._idle_readers:
+                        break
+                    reader = self._idle_readers.pop(0)
+                    healthy = await self._is_healthy(reader)
+                    if healthy and self._pooled and reader in self._open_readers:
+                        self._idle_readers.append(reader)
+                    else:
+                        await self._discard_reader(reader)
+        if self._writer_lock is not None and not self._writer_lock.locked():
+            async with self._writer_lock:
+                writer = self._writer
+                if writer is not None and not await self._is_healthy(writer):
+                    self._writer = None
+                    await self._close_quietly(writer)
+        try:
+            return await self.fetch_one("SELECT 1") is not None
+        except DatabaseError:
+            return False
 
     def _connect(self) -> aiosqlite.Connection:
         """設定されたモードでSQLite接続を作成する."""
@@ -31,13 +121,109 @@ class DatabaseConnection:
             return aiosqlite.connect(database_uri, uri=True)
         return aiosqlite.connect(self.db_path)
 
+    @staticmethod
+    async def _configure(conn: aiosqlite.Connection) -> None:
+        """接続ごとに一度だけ必要なPRAGMAを適用する."""
+        await conn.execute("PRAGMA foreign_keys=ON")
+        await conn.execute("PRAGMA busy_timeout=30000")
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        conn = await self._connect()
+        try:
+            await self._configure(conn)
+        except BaseException:
+            await self._close_quietly(conn)
+            raise
+        return conn
+
+    @staticmethod
+    async def _is_healthy(conn: aiosqlite.Connection) -> bool:
+        try:
+            async with conn.execute("SELECT 1") as cursor:
+                await cursor.fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _close_quietly(conn: aiosqlite.Connection) -> None:
+        try:
+            await conn.close()
+        except Exception:
+            logger.warning("Failed to close SQLite connection", exc_info=True)
+
+    async def _discard_reader(self, conn: aiosqlite.Connection) -> None:
+        self._open_readers.discard(conn)
+        await self._close_quietly(conn)
+
     @asynccontextmanager
     async def connect(self) -> AsyncIterator[aiosqlite.Connection]:
-        """外部キー制約を有効化したSQLite接続を提供する."""
-        async with self._connect() as conn:
-            await conn.execute("PRAGMA foreign_keys=ON")
-            await conn.execute("PRAGMA busy_timeout=30000")
-            yield conn
+        """外部キー制約を有効化したSQLite接続を提供する.
+
+        プール有効時はプロセス内で唯一の書き込み用接続を排他的に貸し出す。
+        """
+        if not self._pooled or self._writer_lock is None:
+            async with self._connect() as conn:
+                await self._configure(conn)
+                yield conn
+            return
+
+        async with self._writer_lock:
+            if self._writer is None:
+                self._writer = await self._open_connection()
+            conn = self._writer
+            conn.row_factory = None
+            failed = False
+            try:
+                yield conn
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                await self._release_writer(conn, failed)
+
+    async def _release_writer(self, conn: aiosqlite.Connection, failed: bool) -> None:
+        """書き込み用接続を未完了トランザクションなしの状態で戻す."""
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+            if failed and not await self._is_healthy(conn):
+                raise DatabaseError("SQLite writer connection is unhealthy")
+        except Exception:
+            logger.warning("Discarding pooled SQLite writer connection")
+            if self._writer is conn:
+                self._writer = None
+            await self._close_quietly(conn)
+
+    @asynccontextmanager
+    async def _read_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """読み取り用接続を提供する (プール有効時は再利用する)."""
+        reader_slots = self._reader_slots
+        if not self._pooled or reader_slots is None:
+            async with self._connect() as conn:
+                await self._configure(conn)
+                conn.row_factory = aiosqlite.Row
+                yield conn
+            return
+
+        async with reader_slots:
+            if self._idle_readers:
+                conn = self._idle_readers.pop()
+            else:
+                conn = await self._open_connection()
+                conn.row_factory = aiosqlite.Row
+                self._open_readers.add(conn)
+            healthy = True
+            try:
+                yield conn
+            except BaseException:
+                healthy = await self._is_healthy(conn)
+                raise
+            finally:
+                if healthy and self._pooled and conn in self._open_readers:
+                    self._idle_readers.append(conn)
+                else:
+                    await self._discard_reader(conn)
 
     async def execute_transaction(self, queries: list[tuple[str, tuple]]) -> None:
         """複数クエリをひとつのトランザクションでアトミックに実行.
@@ -85,8 +271,7 @@ class DatabaseConnection:
             取得した行
         """
         try:
-            async with self.connect() as conn:
-                conn.row_factory = aiosqlite.Row
+            async with self._read_connection() as conn:
                 async with conn.execute(query, params) as cursor:
                     return await cursor.fetchone()
         except Exception as e:
@@ -103,8 +288,7 @@ class DatabaseConnection:
             取得した行のリスト
         """
         try:
-            async with self.connect() as conn:
-                conn.row_factory = aiosqlite.Row
+            async with self._read_connection() as conn:
                 async with conn.execute(query, params) as cursor:
                     return list(await cursor.fetchall())
         except Exception as e:
@@ -0,0 +1,111 @@
+"""In-process cache of parsed Jina responses."""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..models.external import FetchedDocument
+from ..utils.metrics import document_cache_requests
+
+
+@dataclass
+class _Entry:
+    version: tuple[int, int]
+    size: int
+    source: dict[str, Any]
+    document: FetchedDocument | None = field(default=None)
+
+
+class DocumentCache:
+    """保存済み Jina 応答の JSON と検証済み FetchedDocument を保持する LRU.
+
+    キーはページ ID で、ファイルの (mtime_ns, サイズ) が変わったエントリは
+    使わない。合計サイズは展開・blob 解決後の JSON のバイト数で数え、
+    max_bytes を超えたら最終利用が古いものから捨てる。
+    返す dict は共有されるため変更しないこと。
+    """
+
+    def __init__(self, max_bytes: int):
+        """初期化.
+
+        Args:
+            max_bytes: 保持する JSON の合計バイト数の上限
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than zero")
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, page_id: int, version: tuple[int, int]) -> dict[str, Any] | None:
+        """ファイル版が一致する JSON を返す."""
+        with self._lock:
+            entry = self._entries.get(page_id)
+            if entry is not None and entry.version != version:
+                self._remove(page_id)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(page_id)
+        document_cache_requests.add(
+            1, {"kind": "source", "result": "miss" if entry is None else "hit"}
+        )
+        return None if entry is None else entry.source
+
+    def put(
+        self,
+        page_id: int,
+        version: tuple[int, int],
+        size: int,
+        source: dict[str, Any],
+    ) -> None:
+        """読み込んだ JSON を保存する. 上限より大きいものは保存しない.
+
+        Args:
+            size: 展開・blob 解決後の JSON のバイト数
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(page_id)
+            self._entries[page_id] = _Entry(version, size, source)
+            self._total += size
+            while self._total > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def get_document(
+        self, page_id: int, source: dict[str, Any], source_url: str
+    ) -> FetchedDocument | None:
+        """source から検証済みの FetchedDocument があれば返す."""
+        with self._lock:
+            entry = self._entries.get(page_id)
+            document = (
+                entry.document if entry is not None and entry.source is source else None
+            )
+        document_cache_requests.add(
+            1, {"kind": "document", "result": "miss" if document is None else "hit"}
+        )
+        if document is None or document.source_url == source_url:
+            return document
+        return document.model_copy(update={"source_url": source_url})
+
+    def put_document(
+        self, page_id: int, source: dict[str, Any], document: FetchedDocument
+    ) -> None:
+        """source に対応する検証済み FetchedDocument を保存する."""
+        with self._lock:
+            entry = self._entries.get(page_id)
+            if entry is not None and entry.source is source:
+                entry.document = document
+
+    def invalidate(self, page_id: int) -> None:
+        """ページのエントリを捨てる."""
+        with self._lock:
+            self._remove(page_id)
+
+    def _remove(self, page_id: int) -> None:
+        entry = self._entries.pop(page_id, None)
+        if entry is not None:
+            self._total -= entry.size
@@ -1,26 +1,92 @@
 """File operations repository."""
 
 import asyncio
+import hashlib
 import json
+import logging
+import sqlite3
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
 from ..config import settings
+from ..models.external import FetchedDocument
 from ..utils.exceptions import FileOperationError
+from .document_cache import DocumentCache
+from .json_manifest import MANIFEST_FILENAME, JsonStoreManifest, ManifestEntry
+from .storage_format import (
+    BLOB_DIRNAME,
+    StorageFormat,
+    blob_path,
+    blob_reference,
+    candidate_paths,
+    encode_blob,
+    format_for_path,
+    get_storage_format,
+    iter_stored_files,
+    resolve_blob_reference,
+    shard_name,
+    with_blob_reference,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _materialized_size(source: dict[str, Any]) -> int:
+    """展開・blob 解決後の JSON の UTF-8 バイト数.
+
+    圧縮形式や blob への参照だけのファイルはディスク上のサイズがメモリ上の
+    大きさよりずっと小さいため、キャッシュの容量はこちらで数える。
+    """
+    text = json.dumps(source, ensure_ascii=False, separators=(",", ":"))
+    return len(text.encode("utf-8"))
 
 
 class FileRepository:
-    """ファイル操作リポジトリ."""
+    """ファイル操作リポジトリ.
 
-    def __init__(self, storage_path: str | None = None):
+    保存は storage_format の形式でページ ID ごとのシャード
+    (``{storage_path}/000012/12345.json.gz``) に行い、読み込みはすべての形式と
+    従来のフラット配置 (``{storage_path}/12345.json``) を受け付ける。保存・削除の
+    たびに索引 (manifest.db) を更新し、ページ ID の一覧はディレクトリを走査せず
+    索引から返す。
+
+    本文 (data.content) が dedup_min_bytes 以上なら内容の SHA-256 をキーにした
+    共有 blob (``{storage_path}/blobs/ab/<sha256>.txt.gz``) へ移し、ページの
+    ファイルには参照だけを残す。同じ本文のページは1つの blob を共有し、どの
+    ページからも参照されなくなった blob は保存・削除時に消す。
+    """
+
+    def __init__(
+        self,
+        storage_path: str | None = None,
+        document_cache: DocumentCache | None = None,
+        storage_format: str | None = None,
+        dedup_min_bytes: int | None = None,
+    ):
         """初期化.
 
         Args:
             storage_path: ファイル保存パス
+            document_cache: 読み込んだ JSON と FetchedDocument のキャッシュ.
+                None の場合は毎回ファイルを読む
+            storage_format: 保存形式名. None の場合は JSON_STORAGE_FORMAT
+            dedup_min_bytes: 共有 blob へ移す本文の最小バイト数. 0 で無効.
+                None の場合は JSON_STORAGE_DEDUP_MIN_BYTES
         """
         self.storage_path = Path(storage_path or settings.JSON_STORAGE_PATH)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.document_cache = document_cache
+        self.storage_format = get_storage_format(
+            storage_format or settings.JSON_STORAGE_FORMAT
+        )
+        self.manifest = JsonStoreManifest(self.storage_path / MANIFEST_FILENAME)
+        self.dedup_min_bytes = (
+            settings.JSON_STORAGE_DEDUP_MIN_BYTES
+            if dedup_min_bytes is None
+            else dedup_min_bytes
+        )
 
     def save_json_file_sync(self, page_id: int, data: dict[str, Any]) -> None:
         """JSONファイル保存（同期版）.
@@ -30,20 +96,92 @@ class FileRepository:
             data: 保存するデータ
         """
         try:
-            file_path = self.storage_path / f"{page_id}.json"
-            # アトミック書き込み: 一時ファイルに書いてからリネーム
-            with tempfile.NamedTemporaryFile(
-                "w",
-                encoding="utf-8",
-                dir=self.storage_path,
-                suffix=".tmp",
-                delete=False,
-            ) as tmp:
-                json.dump(data, tmp, ensure_ascii=True, indent=2)
-                tmp_path = Path(tmp.name)
-            tmp_path.replace(file_path)
+            content = self._shareable_content(data)
+            if content is None:
+                self._write_sync(page_id, self.storage_format.encode(data))
+            else:
+                self._write_with_blob_sync(page_id, data, content)
         except Exception as e:
             raise FileOperationError(f"Failed to save JSON file: {str(e)}")
+        finally:
+            if self.document_cache is not None:
+                self.document_cache.invalidate(page_id)
+
+    def _shareable_content(self, data: dict[str, Any]) -> str | None:
+        """共有 blob へ移す本文を返す. 対象外なら None."""
+        if self.dedup_min_bytes <= 0:
+            return None
+        payload = data.get("data")
+        content = payload.get("content") if isinstance(payload, dict) else None
+        if not isinstance(content, str):
+            return None
+        if len(content.encode("utf-8")) < self.dedup_min_bytes:
+            return None
+        return content
+
+    def _write_with_blob_sync(
+        self, page_id: int, data: dict[str, Any], content: str
+    ) -> None:
+        """本文を共有 blob へ書き、参照だけを持つファイルを保存する."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        raw = self.storage_format.encode(with_blob_reference(data, digest))
+        try:
+            # blob の確認・書き込みと参照の記録を1つのロック内で行い、
+            # 他ページの削除が同じ blob を消すのと競合しないようにする
+            with self.manifest.transaction() as conn:
+                self._write_blob(digest, content)
+                entry = self._write_file(page_id, raw, digest)
+                self._remove_blob(self.manifest.record(entry, conn))
+        except sqlite3.Error as e:
+            # 参照を記録できない blob は消されうるため本文を埋め込んで保存する
+            logger.warning(
+                "JSON manifest unavailable, storing content inline for page %s: %s",
+                page_id,
+                e,
+            )
+            self._write_sync(page_id, self.storage_format.encode(data))
+
+    def _write_blob(self, digest: str, content: str) -> None:
+        path = blob_path(self.storage_path, digest)
+        if path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=path.parent, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(encode_blob(content))
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(path)
+
+    def _remove_blob(self, digest: str | None) -> None:
+        if digest is not None:
+            blob_path(self.storage_path, digest).unlink(missing_ok=True)
+
+    def _write_sync(self, page_id: int, raw: bytes, blob: str | None = None) -> None:
+        """シャードに保存形式のファイルを書き込み、他の配置・形式を削除する."""
+        self._update_manifest(page_id, self._write_file(page_id, raw, blob))
+
+    def _write_file(self, page_id: int, raw: bytes, blob: str | None) -> ManifestEntry:
+        """ファイルを書き込み、記録する索引を返す."""
+        file_path = self.target_path(page_id)
+        file_path.parent.mkdir(exist_ok=True)
+        # アトミック書き込み: 一時ファイルに書いてからリネーム
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=file_path.parent, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(raw)
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(file_path)
+        self._remove_other_files(page_id, file_path)
+        stat = file_path.stat()
+        return ManifestEntry(
+            page_id,
+            self._relative(file_path),
+            stat.st_size,
+            stat.st_mtime_ns,
+            hashlib.sha256(raw).hexdigest(),
+            blob,
+        )
 
     async def save_json_file(self, page_id: int, data: dict[str, Any]) -> None:
         """JSONファイル保存.
@@ -65,15 +203,49 @@ class FileRepository:
         """
         return await asyncio.to_thread(self._load_json_file_sync, page_id)
 
+    async def load_document(self, page_id: int, source_url: str) -> FetchedDocument:
+        """保存済み Jina 応答を FetchedDocument として読み込む.
+
+        Args:
+            page_id: ページID
+            source_url: 文書の取得元として記録する URL
+
+        Raises:
+            FileOperationError: ファイルを読めない場合
+            ValidationError, ValueError, TypeError: 応答が不正な場合
+        """
+        source = await self.load_json_file(page_id)
+        cache = self.document_cache
+        if cache is not None:
+            document = cache.get_document(page_id, source, source_url)
+            if document is not None:
+                return document
+        document = FetchedDocument.from_jina_response(source, source_url=source_url)
+        if cache is not None:
+            cache.put_document(page_id, source, document)
+        return document
+
     def _load_json_file_sync(self, page_id: int) -> dict[str, Any]:
         """JSONファイル読み込み（同期版）."""
+        file_path = self._find(page_id)
         try:
-            file_path = self.storage_path / f"{page_id}.json"
-            if not file_path.exists():
-                raise FileOperationError(f"JSON file not found: {file_path}")
+            if file_path is None:
+                raise FileOperationError(
+                    f"JSON file not found: {self.target_path(page_id)}"
+                )
+            fmt = format_for_path(file_path) or self.storage_format
 
-            with open(file_path, encoding="utf-8") as f:
-                return json.load(f)  # type: ignore[no-any-return]
+            cache = self.document_cache
+            if cache is None:
+                return self._decode(fmt, file_path)
+            stat = file_path.stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+            cached = cache.get(page_id, version)
+            if cached is not None:
+                return cached
+            source = self._decode(fmt, file_path)
+            cache.put(page_id, version, _materialized_size(source), source)
+            return source
         except json.JSONDecodeError as e:
             raise FileOperationError(f"Invalid JSON format: {str(e)}")
         except UnicodeDecodeError as e:
@@ -81,11 +253,63 @@ class FileRepository:
                 f"JSON file is corrupted (encoding error): {file_path} — {str(e)}. "
                 "Delete the file and retry processing."
             )
+        except ValueError as e:
+            raise FileOperationError(f"Invalid stored file: {file_path} — {str(e)}")
         except FileOperationError:
             raise
+        except FileNotFoundError as e:
+            raise FileOperationError(
+                f"Content blob not found for page {page_id}: {e.filename}"
+            )
         except Exception as e:
             raise FileOperationError(f"Failed to load JSON file: {str(e)}")
 
+    def _decode(self, fmt: StorageFormat, file_path: Path) -> dict[str, Any]:
+        """ファイルを読み込み、共有 blob への参照を本文に戻す."""
+        return resolve_blob_reference(
+            self.storage_path, fmt.decode(file_path.read_bytes())
+        )
+
+    def convert_file_sync(self, page_id: int) -> tuple[int, int] | None:
+        """保存済みファイルを現在の保存形式・シャード配置へ書き換える.
+
+        書き換え中も従来の形式・配置のファイルは読めるため、API・worker の稼働中に
+        実行できる。既に書き換え先のファイルがあれば残りのファイルを削除する。
+
+        Args:
+            page_id: ページID
+
+        Returns:
+            書き換えた場合は (変換前のバイト数, 変換後のバイト数). 対象外なら None
+        """
+        try:
+            target = self.target_path(page_id)
+            if target.is_file():
+                # 変換途中で止まった、または保存後に残ったファイルを片付ける
+                self._remove_other_files(page_id, target)
+                return None
+            file_path = self._find(page_id)
+            if file_path is None:
+                return None
+            fmt = format_for_path(file_path)
+            if fmt is None:
+                return None
+            raw = file_path.read_bytes()
+            source = fmt.decode(raw)
+            converted = self.storage_format.encode(source)
+            self._write_sync(page_id, converted, blob_reference(source))
+            return len(raw), len(converted)
+        except Exception as e:
+            raise FileOperationError(f"Failed to convert JSON file: {str(e)}")
+        finally:
+            if self.document_cache is not None:
+                self.document_cache.invalidate(page_id)
+
+    def _remove_other_files(self, page_id: int, keep: Path) -> None:
+        for path in candidate_paths(self.storage_path, page_id):
+            if path != keep:
+                path.unlink(missing_ok=True)
+
     async def delete_json_file(self, page_id: int) -> None:
         """JSONファイル削除.
 
@@ -97,14 +321,25 @@ class FileRepository:
     def _delete_json_file_sync(self, page_id: int) -> None:
         """JSONファイル削除（同期版）."""
         try:
-            file_path = self.storage_path / f"{page_id}.json"
-            if file_path.exists():
-                file_path.unlink()
+            for path in candidate_paths(self.storage_path, page_id):
+                path.unlink(missing_ok=True)
+            self._update_manifest(page_id, None)
         except Exception as e:
             raise FileOperationError(f"Failed to delete JSON file: {str(e)}")
+        finally:
+            if self.document_cache is not None:
+                self.document_cache.invalidate(page_id)
 
     def _get_existing_page_ids_sync(self) -> set[int]:
-        return {int(p.stem) for p in self.storage_path.glob("*.json")}
+        try:
+            if self.manifest.is_complete():
+                return self.manifest.page_ids()
+            # 索引がまだ無ければ一度だけ走査して作る (ハッシュは rebuild で付ける)
+            self.manifest.rebuild(self._scan_entries(with_hash=False), replace=False)
+            return self.manifest.page_ids()
+        except sqlite3.Error as e:
+            logger.warning("JSON manifest unavailable, scanning files: %s", e)
+            return {page_id for page_id, _ in iter_stored_files(self.storage_path)}
 
     async def get_existing_page_ids(self) -> set[int]:
         """ストレージ内の全JSONファイルのページIDを取得.
@@ -123,5 +358,115 @@ class FileRepository:
         Returns:
             ファイルが存在するかどうか
         """
-        file_path = self.storage_path / f"{page_id}.json"
-        return file_path.exists()
+        return self._find(page_id) is not None
+
+    def rebuild_manifest_sync(self) -> int:
+        """全ファイルを走査してハッシュ付きの索引を作り直す.
+
+        Returns:
+            登録したファイル数
+        """
+        try:
+            return self.manifest.rebuild(
+                self._scan_entries(with_hash=True), replace=True
+            )
+        except (OSError, sqlite3.Error) as e:
+            raise FileOperationError(f"Failed to rebuild JSON manifest: {str(e)}")
+
+    def verify_manifest_sync(
+        self, check_hash: bool = False
+    ) -> Iterator[tuple[int, str]]:
+        """索引と実ファイルを1件ずつ突き合わせ、不一致を (ページID, 理由) で返す.
+
+        理由は ``missing`` (ファイルが無い)、``modified`` (サイズ・更新時刻が違う)、
+        ``hash_mismatch`` (check_hash 指定時に内容のハッシュが違う)、
+        ``missing_blob`` (参照先の共有 blob が無い)。
+        """
+        for entry in self.manifest.entries():
+            if (
+                entry.blob is not None
+                and not blob_path(self.storage_path, entry.blob).is_file()
+            ):
+                yield entry.page_id, "missing_blob"
+            path = self.storage_path / entry.path
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                yield entry.page_id, "missing"
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (entry.size, entry.mtime_ns):
+                yield entry.page_id, "modified"
+            elif check_hash and entry.sha256 is not None:
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                if digest != entry.sha256:
+                    yield entry.page_id, "hash_mismatch"
+
+    def _scan_entries(self, with_hash: bool) -> Iterator[ManifestEntry]:
+        """保存済みファイルを走査して索引を順に作る. 重複はシャード側を優先する.
+
+        共有 blob があればファイルを読んで参照先も記録する。
+        """
+        has_blobs = (self.storage_path / BLOB_DIRNAME).is_dir()
+        for page_id, path in iter_stored_files(self.storage_path):
+            if path != self._find(page_id):
+                continue
+            try:
+                stat = path.stat()
+                raw = path.read_bytes() if with_hash or has_blobs else None
+            except FileNotFoundError:
+                continue
+            yield ManifestEntry(
+                page_id,
+                self._relative(path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                hashlib.sha256(raw).hexdigest()
+                if with_hash and raw is not None
+                else None,
+                self._scan_blob_reference(path, raw) if has_blobs else None,
+            )
+
+    @staticmethod
+    def _scan_blob_reference(path: Path, raw: bytes | None) -> str | None:
+        fmt = format_for_path(path)
+        if fmt is None or raw is None:
+            return None
+        try:
+            return blob_reference(fmt.decode(raw))
+        except ValueError:
+            return None
+
+    def _update_manifest(self, page_id: int, entry: ManifestEntry | None) -> None:
+        """索引を更新し、参照されなくなった blob を消す.
+
+        索引の更新に失敗してもファイル操作は成功として扱う (blob は残る)。
+        """
+        try:
+            with self.manifest.transaction() as conn:
+                if entry is None:
+                    released = self.manifest.remove(page_id, conn)
+                else:
+                    released = self.manifest.record(entry, conn)
+                self._remove_blob(released)
+        except sqlite3.Error as e:
+            logger.warning("Failed to update JSON manifest for page %s: %s", page_id, e)
+
+    def target_path(self, page_id: int) -> Path:
+        """現在の保存形式・配置での保存先パスを返す."""
+        return (
+            self.storage_path
+            / shard_name(page_id)
+            / f"{page_id}{self.storage_format.suffix}"
+        )
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.storage_path).as_posix()
+
+    def _find(self, page_id: int) -> Path | None:
+        """保存先を優先して、いずれかの配置・形式のファイルを探す."""
+        for path in candidate_paths(
+            self.storage_path, page_id, preferred=self.storage_format
+        ):
+            if path.is_file():
+                return path
+        return None
@@ -1,14 +1,40 @@
 """Persistent processing job repository."""
 
-from datetime import datetime
+from collections.abc import Collection, Mapping
+from datetime import datetime, timedelta
 
 import aiosqlite
 
-from ..models.database import Job, JobKind, JobStatus, PipelineStartStep, ProcessingStep
+from ..models.database import (
+    Job,
+    JobKind,
+    JobPriority,
+    JobStatus,
+    PipelineStartStep,
+    ProcessingStep,
+)
 from ..utils.datetime import as_utc, utc_isoformat, utc_now, utc_now_isoformat
 from ..utils.exceptions import DatabaseError
+from ..utils.job_wakeup import notify_job_queued
+from ..utils.metrics import job_leases_reclaimed
+from ..utils.url import url_host
 from .database import DatabaseConnection
 
+DEFAULT_LEASE_SECONDS = 60.0
+
+# 対話的な URL 投入を、一括リトライや修復の再処理より先に処理する
+DEFAULT_PRIORITIES = {
+    JobKind.INITIAL: JobPriority.INTERACTIVE,
+    JobKind.RETRY: JobPriority.NORMAL,
+    JobKind.REPROCESS: JobPriority.BATCH,
+}
+
+# ホスト単位の流量制御は対象サイトへアクセスする download ステージだけに適用する
+HOST_LIMITED_STAGE = PipelineStartStep.DOWNLOAD
+
+# リースなしの running はリース導入前に中断されたジョブとして扱う
+_LEASE_EXPIRED = "(lease_expires_at IS NULL OR lease_expires_at < ?)"
+
 
 class JobRepository:
     """永続ジョブの登録と状態遷移を管理する."""
@@ -17,116 +43,412 @@ class JobRepository:
         self.db = db or DatabaseConnection()
 
     async def enqueue(
-        self, page_id: int, kind: JobKind, start_step: PipelineStartStep
+        self,
+        page_id: int,
+        kind: JobKind,
+        start_step: PipelineStartStep,
+        priority: JobPriority | None = None,
     ) -> int:
-        """ジョブ登録とページ状態更新を同一トランザクションで行う."""
+        """ジョブ登録とページ状態更新を同一トランザクションで行う.
+
+        Args:
+            priority: 優先度. None の場合はジョブ種別から決める
+        """
+        if priority is None:
+            priority = DEFAULT_PRIORITIES[kind]
         try:
             async with self.db.connect() as conn:
                 await conn.execute("BEGIN IMMEDIATE")
+                page = await (
+                    await conn.execute("SELECT url FROM pages WHERE id=?", (page_id,))
+                ).fetchone()
                 cursor = await conn.execute(
                     """INSERT INTO jobs
-                    (page_id, kind, status, start_step, created_at)
-                    VALUES (?, ?, 'queued', ?, ?)""",
-                    (page_id, kind.value, start_step.value, utc_now_isoformat()),
+                    (page_id, kind, status, start_step, stage, priority, host,
+                    created_at)
+                    VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)""",
+                    (
+                        page_id,
+                        kind.value,
+                        start_step.value,
+                        start_step.value,
+                        int(priority),
+                        url_host(page[0]) if page else None,
+                        utc_now_isoformat(),
+                    ),
                 )
                 await conn.execute(
                     "UPDATE pages SET status='queued', updated_at=? WHERE id=?",
                     (utc_now_isoformat(), page_id),
                 )
                 await conn.commit()
-                return int(cursor.lastrowid or 0)
         except Exception as e:
             raise DatabaseError(f"Failed to enqueue job: {e}")
+        notify_job_queued()
+        return int(cursor.lastrowid or 0)
+
+    async def claim_next(
+        self,
+        stages: Collection[PipelineStartStep] | None = None,
+        *,
+        owner: str = "",
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> Job | None:
+        """最古の queued ジョブを1件 claim する.
 
-    async def claim_next(self) -> Job | None:
-        """最古の queued ジョブを原子的に取得して running にする."""
+        Args:
+            stages: 取得対象のステージ. None の場合は全ステージが対象
+        """
+        limits = None if stages is None else dict.fromkeys(stages, 1)
+        jobs = await self.claim_batch(
+            1, limits, owner=owner, lease_seconds=lease_seconds
+        )
+        return jobs[0] if jobs else None
+
+    async def claim_batch(
+        self,
+        n: int,
+        stages: Mapping[PipelineStartStep, int] | None = None,
+        *,
+        owner: str = "",
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        host_limit: int | None = None,
+        excluded_hosts: Collection[str] = (),
+        host_tokens: Mapping[str, int] | None = None,
+        default_host_tokens: int | None = None,
+    ) -> list[Job]:
+        """queued ジョブを最大 n 件、1トランザクションで claim する.
+
+        優先度の高い順に、同じ優先度の中ではホストごとの古い順を round-robin で
+        並べて選ぶため、1サイトの大量投入が他サイトのジョブを塞がない。
+        claim したジョブには owner のリースを付け、期限切れのリースを持つ running
+        ジョブは同じトランザクションで queued へ戻してから選ぶ。
+
+        Args:
+            n: 取得する最大件数
+            stages: ステージごとの最大件数. None の場合は全ステージが対象
+            owner: リースを保持する worker の識別子
+            lease_seconds: リースの有効期間
+            host_limit: download ステージでホストごとに同時実行できる件数
+            excluded_hosts: download ステージで今回 claim しないホスト
+            host_tokens: download ステージで今回ホストごとに claim できる件数
+            default_host_tokens: host_tokens にないホストの件数. None で無制限
+
+        ステージ間で再キューされたジョブは started_at を保持しているため、
+        attempt はリース切れなどで最初から実行し直す場合にだけ増える。
+        """
+        if stages is None:
+            stages = dict.fromkeys(PipelineStartStep, n)
+        limits = {
+            PipelineStartStep(stage): limit
+            for stage, limit in stages.items()
+            if limit > 0
+        }
+        if n <= 0 or not limits:
+            return []
+        placeholders = ", ".join("?" for _ in limits)
+        stage_values = tuple(stage.value for stage in limits)
+        excluded = tuple(excluded_hosts)
+        host_filter = ""
+        if excluded:
+            host_filter = (
+                f" AND NOT (stage = '{HOST_LIMITED_STAGE.value}' AND host IN "
+                f"({', '.join('?' for _ in excluded)}))"
+            )
+        now = utc_now()
+        stored_now = utc_isoformat(now)
         try:
+            # 空キューでは書き込みロックを取らず、読み取りだけで終える
+            pending = await self.db.fetch_one(
+                f"""SELECT 1 FROM jobs
+                WHERE (status='queued' AND stage IN ({placeholders}){host_filter})
+                OR (status='running' AND {_LEASE_EXPIRED})
+                LIMIT 1""",
+                (*stage_values, *excluded, stored_now),
+            )
+            if pending is None:
+                return []
             async with self.db.connect() as conn:
                 conn.row_factory = aiosqlite.Row
                 await conn.execute("BEGIN IMMEDIATE")
-                row = await (
+                await self._requeue_expired(conn, stored_now)
+                host_stage = HOST_LIMITED_STAGE.value
+                host_caps = []
+                if host_limit is not None:
+                    host_caps.append(
+                        "eligible.host_rank + COALESCE(running_hosts.running, 0) "
+                        f"<= {int(host_limit)}"
+                    )
+                token_values: tuple[str | int, ...] = ()
+                if host_tokens or default_host_tokens is not None:
+                    default_cap = (
+                        "eligible.host_rank"
+                        if default_host_tokens is None
+                        else str(int(default_host_tokens))
+                    )
+                    if host_tokens:
+                        token_cases = " ".join("WHEN ? THEN ?" for _ in host_tokens)
+                        default_cap = (
+                            f"CASE eligible.host {token_cases} ELSE {default_cap} END"
+                        )
+                        token_values = tuple(
+                            value
+                            for host, tokens in host_tokens.items()
+                            for value in (host, int(tokens))
+                        )
+                    host_caps.append(f"eligible.host_rank <= {default_cap}")
+                host_cap = "1"
+                if host_caps:
+                    host_cap = (
+                        f"eligible.stage != '{host_stage}' OR eligible.host IS NULL "
+                        f"OR ({' AND '.join(host_caps)})"
+                    )
+                rank_limit = " ".join(
+                    f"WHEN '{stage.value}' THEN {int(limit)}"
+                    for stage, limit in limits.items()
+                )
+                rows = await (
                     await conn.execute(
-                        """SELECT * FROM jobs WHERE status='queued'
-                        ORDER BY created_at, id LIMIT 1"""
+                        f"""WITH eligible AS (
+                            SELECT *, ROW_NUMBER() OVER (
+                                PARTITION BY stage, host
+                                ORDER BY priority DESC, created_at, id
+                            ) AS host_rank
+                            FROM jobs
+                            WHERE status='queued' AND stage IN ({placeholders})
+                            {host_filter}
+                        ),
+                        running_hosts AS (
+                            SELECT host, COUNT(*) AS running FROM jobs
+                            WHERE status='running' AND stage = '{host_stage}'
+                            GROUP BY host
+                        ),
+                        capped AS (
+                            SELECT eligible.* FROM eligible
+                            LEFT JOIN running_hosts
+                            ON eligible.stage = '{host_stage}'
+                            AND running_hosts.host = eligible.host
+                            WHERE {host_cap}
+                        ),
+                        ranked AS (
+                            SELECT *, ROW_NUMBER() OVER (
+                                PARTITION BY stage
+                                ORDER BY priority DESC, host_rank, created_at, id
+                            ) AS stage_rank
+                            FROM capped
+                        )
+                        SELECT * FROM ranked
+                        WHERE stage_rank <= CASE stage {rank_limit} END
+                        ORDER BY priority DESC, host_rank, created_at, id
+                        LIMIT ?""",
+                        (*stage_values, *excluded, *token_values, n),
                     )
-                ).fetchone()
-                if row is None:
+                ).fetchall()
+                if not rows:
                     await conn.commit()
-                    return None
-                now = utc_now()
-                stored_now = utc_isoformat(now)
+                    return []
+                lease_expires_at = now + timedelta(seconds=lease_seconds)
+                stored_expiry = utc_isoformat(lease_expires_at)
+                ids = [row["id"] for row in rows]
+                id_placeholders = ", ".join("?" for _ in ids)
                 await conn.execute(
-                    """UPDATE jobs SET status='running', attempt=attempt+1,
-                    started_at=?, finished_at=NULL, error_message=NULL WHERE id=?""",
-                    (stored_now, row["id"]),
+                    f"""UPDATE jobs SET status='running',
+                    attempt=attempt + (started_at IS NULL),
+                    started_at=COALESCE(started_at, ?), finished_at=NULL,
+                    error_message=NULL, lease_owner=?, lease_expires_at=?
+                    WHERE id IN ({id_placeholders})""",
+                    (stored_now, owner, stored_expiry, *ids),
                 )
                 await conn.execute(
-                    "UPDATE pages SET status='processing', updated_at=? WHERE id=?",
-                    (stored_now, row["page_id"]),
+                    f"""UPDATE pages SET status='processing', updated_at=?
+                    WHERE id IN (SELECT page_id FROM jobs
+                    WHERE id IN ({id_placeholders}))""",
+                    (stored_now, *ids),
                 )
                 await conn.commit()
-                values = dict(row)
-                values.update(
-                    status="running", attempt=row["attempt"] + 1, started_at=now
-                )
-                return self._row_to_job(values)
+                jobs = []
+                for row in rows:
+                    new_attempt = row["started_at"] is None
+                    values = dict(row)
+                    values.update(
+                        status="running",
+                        attempt=row["attempt"] + int(new_attempt),
+                        started_at=now if new_attempt else row["started_at"],
+                        lease_owner=owner,
+                        lease_expires_at=lease_expires_at,
+                    )
+                    jobs.append(self._row_to_job(values))
+                return jobs
         except Exception as e:
             raise DatabaseError(f"Failed to claim job: {e}")
 
+    async def renew_leases(
+        self,
+        job_ids: Collection[int],
+        owner: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> set[int]:
+        """owner が保持する running ジョブのリースを延長する.
+
+        Returns:
+            延長できたジョブID. 含まれないジョブはリースを失っている
+        """
+        if not job_ids:
+            return set()
+        ids = tuple(job_ids)
+        placeholders = ", ".join("?" for _ in ids)
+        now = utc_now()
+        try:
+            async with self.db.connect() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                await conn.execute(
+                    f"""UPDATE jobs SET lease_expires_at=?
+                    WHERE id IN ({placeholders}) AND status='running'
+                    AND lease_owner=?""",
+                    (
+                        utc_isoformat(now + timedelta(seconds=lease_seconds)),
+                        *ids,
+                        owner,
+                    ),
+                )
+                rows = await (
+                    await conn.execute(
+                        f"""SELECT id FROM jobs WHERE id IN ({placeholders})
+                        AND status='running' AND lease_owner=?""",
+                        (*ids, owner),
+                    )
+                ).fetchall()
+                await conn.commit()
+                return {int(row[0]) for row in rows}
+        except Exception as e:
+            raise DatabaseError(f"Failed to renew job leases: {e}")
+
+    async def advance(
+        self,
+        job_id: int,
+        stage: PipelineStartStep,
+        log_id: int | None,
+        owner: str = "",
+    ) -> bool:
+        """完了したステージの次ステージとしてジョブを再キューする.
+
+        Returns:
+            owner がリースを失っていて更新しなかった場合は False
+        """
+        return await self._release(
+            job_id, owner, "status='queued', stage=?, log_id=?", (stage.value, log_id)
+        )
+
     async def update_step(self, job_id: int, step: ProcessingStep) -> None:
         await self.db.execute(
             "UPDATE jobs SET current_step=? WHERE id=?", (step.value, job_id)
         )
 
-    async def succeed(self, job_id: int, page_id: int) -> None:
+    async def succeed(self, job_id: int, page_id: int, owner: str = "") -> bool:
+        """ジョブとページを成功にする. リースを失っていれば False."""
         now = utc_now_isoformat()
-        await self.db.execute_transaction(
-            [
-                (
-                    "UPDATE jobs SET status='succeeded', finished_at=? WHERE id=?",
-                    (now, job_id),
-                ),
-                (
-                    "UPDATE pages SET status='succeeded', updated_at=? WHERE id=?",
-                    (now, page_id),
-                ),
-            ]
+        return await self._release(
+            job_id,
+            owner,
+            "status='succeeded', finished_at=?",
+            (now,),
+            (
+                "UPDATE pages SET status='succeeded', updated_at=? WHERE id=?",
+                (now, page_id),
+            ),
         )
 
-    async def fail(self, job_id: int, page_id: int, message: str) -> None:
+    async def fail(
+        self, job_id: int, page_id: int, message: str, owner: str = ""
+    ) -> bool:
+        """ジョブとページを失敗にする. リースを失っていれば False."""
         now = utc_now_isoformat()
-        await self.db.execute_transaction(
-            [
-                (
-                    """UPDATE jobs SET status='failed', error_message=?,
-                    finished_at=? WHERE id=?""",
-                    (message, now, job_id),
-                ),
-                (
-                    "UPDATE pages SET status='failed', updated_at=? WHERE id=?",
-                    (now, page_id),
-                ),
-            ]
+        return await self._release(
+            job_id,
+            owner,
+            "status='failed', error_message=?, finished_at=?",
+            (message, now),
+            (
+                "UPDATE pages SET status='failed', updated_at=? WHERE id=?",
+                (now, page_id),
+            ),
         )
 
-    async def recover_running(self) -> int:
-        """プロセス中断で残った running ジョブを再実行可能にする."""
+    async def _release(
+        self,
+        job_id: int,
+        owner: str,
+        assignments: str,
+        params: tuple,
+        page_update: tuple[str, tuple] | None = None,
+    ) -> bool:
+        """owner がリースを保持している場合だけジョブを更新してリースを手放す.
+
+        リース切れで別 worker に回収されたジョブは上書きしない。
+        """
         try:
             async with self.db.connect() as conn:
                 await conn.execute("BEGIN IMMEDIATE")
                 cursor = await conn.execute(
-                    """UPDATE jobs SET status='queued', started_at=NULL
-                    WHERE status='running'"""
-                )
-                await conn.execute(
-                    """UPDATE pages SET status='queued' WHERE id IN
-                    (SELECT page_id FROM jobs WHERE status='queued')"""
+                    f"""UPDATE jobs SET {assignments},
+                    lease_owner=NULL, lease_expires_at=NULL
+                    WHERE id=? AND status='running' AND lease_owner=?""",
+                    (*params, job_id, owner),
                 )
+                if cursor.rowcount == 0:
+                    await conn.rollback()
+                    return False
+                if page_update is not None:
+                    await conn.execute(*page_update)
+                await conn.commit()
+                return True
+        except Exception as e:
+            raise DatabaseError(f"Failed to update job: {e}")
+
+    async def recover_running(self) -> int:
+        """リースが切れた running ジョブを再実行可能にする.
+
+        リースを持たない running ジョブ (リース導入前の中断ジョブ) も対象にする。
+        稼働中の他 worker が保持するジョブには触れない。
+        """
+        try:
+            async with self.db.connect() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                recovered = await self._requeue_expired(conn, utc_now_isoformat())
                 await conn.commit()
-                return cursor.rowcount
+                return recovered
         except Exception as e:
             raise DatabaseError(f"Failed to recover jobs: {e}")
 
+    @staticmethod
+    async def _requeue_expired(conn: aiosqlite.Connection, now: str) -> int:
+        cursor = await conn.execute(
+            f"""UPDATE jobs SET status='queued', started_at=NULL,
+            lease_owner=NULL, lease_expires_at=NULL
+            WHERE status='running' AND {_LEASE_EXPIRED}
+            RETURNING page_id""",
+            (now,),
+        )
+        rows = list(await cursor.fetchall())
+        if rows:
+            # 回収したジョブのページだけを戻す (他ステージのキュー待ちには触れない)
+            page_ids = sorted({row[0] for row in rows})
+            placeholders = ", ".join("?" for _ in page_ids)
+            await conn.execute(
+                f"""UPDATE pages SET status='queued', updated_at=?
+                WHERE id IN ({placeholders})""",
+                (now, *page_ids),
+            )
+            job_leases_reclaimed.add(len(rows))
+        return len(rows)
+
+    async def count_queued(self) -> int:
+        """claim 待ちのジョブ数を返す."""
+        row = await self.db.fetch_one(
+            "SELECT COUNT(*) AS total FROM jobs WHERE status='queued'"
+        )
+        return int(row["total"]) if row else 0
+
     async def get_latest_for_page(self, page_id: int) -> Job | None:
         row = await self.db.fetch_one(
             "SELECT * FROM jobs WHERE page_id=? "
@@ -167,4 +489,10 @@ class JobRepository:
             created_at=created_at,
             started_at=cls._parse_datetime(row["started_at"]),
             finished_at=cls._parse_datetime(row["finished_at"]),
+            stage=PipelineStartStep(row["stage"]) if row["stage"] else None,
+            log_id=int(row["log_id"]) if row["log_id"] is not None else None,
+            lease_owner=row["lease_owner"],
+            lease_expires_at=cls._parse_datetime(row["lease_expires_at"]),
+            priority=int(row["priority"]),
+            host=row["host"],
         )
@@ -0,0 +1,224 @@
+"""Index of saved Jina response files."""
+
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+MANIFEST_FILENAME = "manifest.db"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """保存済みファイル1件の索引."""
+
+    page_id: int
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str | None
+    blob: str | None = None
+
+
+class JsonStoreManifest:
+    """保存済み Jina 応答のページ ID・相対パス・サイズ・更新時刻・ハッシュの索引.
+
+    FileRepository が保存・削除のたびに更新し、ページ ID の一覧や整合性確認を
+    ディレクトリ全体の一覧なしで行えるようにする。索引は再構築できるデータなので
+    保存ディレクトリ内の専用 SQLite ファイルに置き、本体 DB のマイグレーション
+    管理からは切り離す。全ファイルを登録し終えるまでは is_complete() が False を返す。
+
+    本文を共有 blob へ移したファイルは参照先の SHA-256 も記録し、どの行からも
+    参照されなくなった blob を record()・remove() が返す。blob の書き込み・削除は
+    transaction() の書き込みロック内で行い、削除中の blob を他のページが
+    参照し始めないようにする。
+    """
+
+    def __init__(self, path: Path):
+        """初期化.
+
+        Args:
+            path: 索引の SQLite ファイル
+        """
+        self.path = path
+        self._initialized = False
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """書き込みロックを取った接続を返し、抜けるときにコミットする."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    def record(
+        self, entry: ManifestEntry, conn: sqlite3.Connection | None = None
+    ) -> str | None:
+        """ファイルの索引を追加・更新する.
+
+        Args:
+            entry: 登録する索引
+            conn: transaction() の接続. None なら単独で更新する
+
+        Returns:
+            更新によってどの行からも参照されなくなった blob
+        """
+        if conn is None:
+            with self.transaction() as own:
+                return self.record(entry, own)
+        previous = self._blob_of(conn, entry.page_id)
+        conn.execute(
+            """INSERT INTO files (page_id, path, size, mtime_ns, sha256, blob)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(page_id) DO UPDATE SET
+                path = excluded.path, size = excluded.size,
+                mtime_ns = excluded.mtime_ns, sha256 = excluded.sha256,
+                blob = excluded.blob""",
+            (
+                entry.page_id,
+                entry.path,
+                entry.size,
+                entry.mtime_ns,
+                entry.sha256,
+                entry.blob,
+            ),
+        )
+        return self._unreferenced(conn, previous)
+
+    def remove(
+        self, page_id: int, conn: sqlite3.Connection | None = None
+    ) -> str | None:
+        """ファイルの索引を削除し、参照されなくなった blob を返す."""
+        if conn is None:
+            with self.transaction() as own:
+                return self.remove(page_id, own)
+        previous = self._blob_of(conn, page_id)
+        conn.execute("DELETE FROM files WHERE page_id = ?", (page_id,))
+        return self._unreferenced(conn, previous)
+
+    def blob_references(self) -> Iterator[tuple[int, str]]:
+        """共有 blob を参照するファイルを (ページID, blob) で返す."""
+        with self._connect() as conn:
+            yield from conn.execute(
+                "SELECT page_id, blob FROM files WHERE blob IS NOT NULL"
+            )
+
+    def get(self, page_id: int) -> ManifestEntry | None:
+        """ページの索引を返す."""
+        with self._connect() as conn:
+            row = conn.execute(
+                """SELECT page_id, path, size, mtime_ns, sha256, blob FROM files
+                WHERE page_id = ?""",
+                (page_id,),
+            ).fetchone()
+        return None if row is None else ManifestEntry(*row)
+
+    def is_complete(self) -> bool:
+        """全ファイルが索引に登録済みかを返す."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM manifest_meta WHERE key = 'complete'"
+            ).fetchone()
+        return row is not None and row[0] == "1"
+
+    def page_ids(self) -> set[int]:
+        """索引に登録されたページ ID を返す."""
+        with self._connect() as conn:
+            return {int(row[0]) for row in conn.execute("SELECT page_id FROM files")}
+
+    def entries(self) -> Iterator[ManifestEntry]:
+        """索引をページ ID 順に1件ずつ返す."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """SELECT page_id, path, size, mtime_ns, sha256, blob FROM files
+                ORDER BY page_id"""
+            )
+            for row in cursor:
+                yield ManifestEntry(*row)
+
+    def rebuild(self, entries: Iterable[ManifestEntry], *, replace: bool) -> int:
+        """走査したファイルを登録し、索引を完成済みにする.
+
+        Args:
+            entries: 登録するファイル
+            replace: True なら既存の索引を捨てて作り直す. False なら
+                未登録のページだけを追加し、保存時に記録された索引を優先する
+
+        Returns:
+            登録した件数
+        """
+        insert = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        count = 0
+        with self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM files")
+            for entry in entries:
+                conn.execute(
+                    f"""{insert} INTO files
+                    (page_id, path, size, mtime_ns, sha256, blob)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    (
+                        entry.page_id,
+                        entry.path,
+                        entry.size,
+                        entry.mtime_ns,
+                        entry.sha256,
+                        entry.blob,
+                    ),
+                )
+                count += 1
+            conn.execute(
+                """INSERT OR REPLACE INTO manifest_meta (key, value)
+                VALUES ('complete', '1')"""
+            )
+        return count
+
+    @staticmethod
+    def _blob_of(conn: sqlite3.Connection, page_id: int) -> str | None:
+        row = conn.execute(
+            "SELECT blob FROM files WHERE page_id = ?", (page_id,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    @staticmethod
+    def _unreferenced(conn: sqlite3.Connection, blob: str | None) -> str | None:
+        if blob is None:
+            return None
+        row = conn.execute(
+            "SELECT 1 FROM files WHERE blob = ? LIMIT 1", (blob,)
+        ).fetchone()
+        return blob if row is None else None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """1操作分の接続を開き、成功したらコミットする."""
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            if not self._initialized:
+                self._create_tables(conn)
+            with conn:
+                yield conn
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    page_id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT,
+                    blob TEXT
+                )"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+            if "blob" not in columns:
+                conn.execute("ALTER TABLE files ADD COLUMN blob TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_blob ON files(blob)")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS manifest_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )"""
+            )
+        self._initialized = True
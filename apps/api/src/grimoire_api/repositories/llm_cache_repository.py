@@ -0,0 +1,135 @@
+"""Content-addressed LLM result cache persistence."""
+
+from pathlib import Path
+
+from ..config import settings
+from ..utils.datetime import utc_now_isoformat
+from ..utils.exceptions import DatabaseError
+from .database import DatabaseConnection
+
+
+class LLMCacheRepository:
+    """LLM 応答を (モデル, プロンプト版, 結果種別, 内容ハッシュ) で保存する.
+
+    キャッシュは再生成可能なデータなので、本体 DB のマイグレーション管理から
+    切り離した専用の SQLite ファイルに置く。合計サイズが max_bytes を超えたら
+    最終利用が古いものから削除する。
+    """
+
+    def __init__(
+        self,
+        db: DatabaseConnection | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.db = db or DatabaseConnection(settings.LLM_CACHE_PATH)
+        self.max_bytes = (
+            settings.LLM_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self._initialized = False
+
+    async def get(
+        self, model: str, prompt_version: str, kind: str, content_hash: str
+    ) -> str | None:
+        """キャッシュ済みの応答 JSON を返し、最終利用日時を更新する."""
+        await self._ensure_table()
+        key = (model, prompt_version, kind, content_hash)
+        row = await self.db.fetch_one(
+            """SELECT result FROM llm_cache WHERE model=? AND prompt_version=?
+            AND kind=? AND content_hash=?""",
+            key,
+        )
+        if row is None:
+            return None
+        await self.db.execute(
+            """UPDATE llm_cache SET last_used_at=? WHERE model=?
+            AND prompt_version=? AND kind=? AND content_hash=?""",
+            (utc_now_isoformat(), *key),
+        )
+        return str(row["result"])
+
+    async def put(
+        self,
+        model: str,
+        prompt_version: str,
+        kind: str,
+        content_hash: str,
+        result: str,
+    ) -> None:
+        """応答 JSON を保存し、上限を超えた分を LRU で削除する."""
+        await self._ensure_table()
+        size = len(result.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = utc_now_isoformat()
+        await self.db.execute(
+            """INSERT INTO llm_cache
+            (model, prompt_version, kind, content_hash, result, size_bytes,
+             created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(model, prompt_version, kind, content_hash) DO UPDATE SET
+                result=excluded.result, size_bytes=excluded.size_bytes,
+                last_used_at=excluded.last_used_at""",
+            (model, prompt_version, kind, content_hash, result, size, now, now),
+        )
+        await self.evict()
+
+    async def evict(self) -> int:
+        """合計サイズが上限に収まるまで最終利用が古いエントリを削除する."""
+        await self._ensure_table()
+        row = await self.db.fetch_one(
+            "SELECT COALESCE(SUM(size_bytes), 0) AS total FROM llm_cache"
+        )
+        excess = int(row["total"]) - self.max_bytes if row else 0
+        if excess <= 0:
+            return 0
+        rows = await self.db.fetch_all(
+            """SELECT rowid, size_bytes FROM llm_cache
+            ORDER BY last_used_at, rowid"""
+        )
+        victims: list[int] = []
+        for victim in rows:
+            if excess <= 0:
+                break
+            victims.append(int(victim["rowid"]))
+            excess -= int(victim["size_bytes"])
+        placeholders = ", ".join("?" for _ in victims)
+        await self.db.execute(
+            f"DELETE FROM llm_cache WHERE rowid IN ({placeholders})", tuple(victims)
+        )
+        return len(victims)
+
+    async def total_bytes(self) -> int:
+        """保存済み応答の合計サイズを返す."""
+        await self._ensure_table()
+        row = await self.db.fetch_one(
+            "SELECT COALESCE(SUM(size_bytes), 0) AS total FROM llm_cache"
+        )
+        return int(row["total"]) if row else 0
+
+    async def _ensure_table(self) -> None:
+        if self._initialized:
+            return
+        try:
+            Path(self.db.db_path).parent.mkdir(parents=True, exist_ok=True)
+            async with self.db.connect() as conn:
+                await conn.execute(
+                    """CREATE TABLE IF NOT EXISTS llm_cache (
+                        model TEXT NOT NULL,
+                        prompt_version TEXT NOT NULL,
+                        kind TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        result TEXT NOT NULL,
+                        size_bytes INTEGER NOT NULL,
+                        created_at TIMESTAMP NOT NULL,
+                        last_used_at TIMESTAMP NOT NULL,
+                        PRIMARY KEY (model, prompt_version, kind, content_hash)
+                    )"""
+                )
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used "
+                    "ON llm_cache(last_used_at)"
+                )
+                await conn.commit()
+        except Exception as e:
+            raise DatabaseError(f"Failed to initialize LLM cache: {e}") from e
+        self._initialized = True
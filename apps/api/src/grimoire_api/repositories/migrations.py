@@ -6,8 +6,9 @@ from dataclasses import dataclass
 import aiosqlite
 
 from ..utils.exceptions import DatabaseError
+from ..utils.url import url_host
 
-LATEST_SCHEMA_VERSION = 5
+LATEST_SCHEMA_VERSION = 14
 
 
 class SchemaMigrationError(DatabaseError):
@@ -89,6 +90,40 @@ REPAIR_CASE_COLUMNS = (
     "detected_at",
     "resolved_at",
 )
+SUMMARY_CHECKPOINT_COLUMNS = (
+    "page_id",
+    "kind",
+    "content_hash",
+    "summary",
+    "created_at",
+)
+PAGE_CHUNK_COLUMNS = (
+    "page_id",
+    "chunk_id",
+    "chunk_hash",
+)
+CHUNK_ATTRIBUTE_SYNC_COLUMNS = (
+    "page_id",
+    "version",
+)
+INDEX_GENERATION_COLUMNS = (
+    "id",
+    "generation",
+)
+CHUNK_TOMBSTONE_COLUMNS = (
+    "chunk_hash",
+    "created_at",
+    "claim_owner",
+    "claim_expires_at",
+)
+LEGACY_CHUNK_PAGE_COLUMNS = ("page_id",)
+# ページに属さず page_id の外部キーを持たないテーブル
+_PAGE_INDEPENDENT_TABLES = frozenset({"pages", "index_generation", "chunk_tombstones"})
+# 検索結果に影響する pages の変更で索引の世代を進めるトリガー
+_INDEX_GENERATION_TRIGGERS = (
+    "trg_pages_index_generation_update",
+    "trg_pages_index_generation_delete",
+)
 
 
 async def _migration_1(conn: aiosqlite.Connection) -> None:
@@ -220,12 +255,192 @@ async def _migration_5(conn: aiosqlite.Connection) -> None:
             )
 
 
+async def _migration_6(conn: aiosqlite.Connection) -> None:
+    """Track the next pipeline stage of each job so stages are claimed separately."""
+    await conn.execute("ALTER TABLE jobs ADD COLUMN stage TEXT")
+    await conn.execute("ALTER TABLE jobs ADD COLUMN log_id INTEGER")
+    await conn.execute(
+        """UPDATE jobs SET stage = CASE
+            WHEN status IN ('queued', 'running') AND current_step = 'downloaded'
+            THEN 'llm'
+            WHEN status IN ('queued', 'running') AND current_step = 'llm_processed'
+            THEN 'vectorize'
+            ELSE start_step END"""
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_stage_created "
+        "ON jobs(status, stage, created_at, id)"
+    )
+
+
+async def _migration_7(conn: aiosqlite.Connection) -> None:
+    """Add worker leases so live and crashed workers can be told apart."""
+    await conn.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+    await conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at TIMESTAMP")
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_lease "
+        "ON jobs(status, lease_expires_at)"
+    )
+
+
+async def _migration_8(conn: aiosqlite.Connection) -> None:
+    """Add job priorities and source hosts for fair per-host scheduling."""
+    await conn.execute(
+        "ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+    )
+    await conn.execute("ALTER TABLE jobs ADD COLUMN host TEXT")
+    await conn.execute(
+        """UPDATE jobs SET priority = CASE kind
+            WHEN 'initial' THEN 100 WHEN 'retry' THEN 50 ELSE 0 END"""
+    )
+    cursor = await conn.execute(
+        "SELECT jobs.id, pages.url FROM jobs JOIN pages ON pages.id = jobs.page_id"
+    )
+    await conn.executemany(
+        "UPDATE jobs SET host = ? WHERE id = ?",
+        [(url_host(url), job_id) for job_id, url in await cursor.fetchall()],
+    )
+
+
+async def _migration_9(conn: aiosqlite.Connection) -> None:
+    """Persist intermediate chunk summaries so a failed LLM step can resume."""
+    await conn.execute(
+        """CREATE TABLE summary_checkpoints (
+            page_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (page_id, kind, content_hash),
+            FOREIGN KEY (page_id) REFERENCES pages(id)
+        )"""
+    )
+
+
+async def _migration_10(conn: aiosqlite.Connection) -> None:
+    """Record which content-addressed Weaviate chunks each page references."""
+    await conn.execute(
+        """CREATE TABLE page_chunks (
+            page_id INTEGER NOT NULL,
+            chunk_id INTEGER NOT NULL,
+            chunk_hash TEXT NOT NULL,
+            PRIMARY KEY (page_id, chunk_id),
+            FOREIGN KEY (page_id) REFERENCES pages(id)
+        )"""
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_page_chunks_hash ON page_chunks(chunk_hash)"
+    )
+
+
+async def _migration_11(conn: aiosqlite.Connection) -> None:
+    """Queue pages whose search attributes must be copied onto shared chunks."""
+    await conn.execute(
+        """CREATE TABLE chunk_attribute_sync (
+            page_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (page_id) REFERENCES pages(id)
+        )"""
+    )
+    # 検索可否 (succeeded かどうか)・URL・キーワードの変化をどの経路の更新でも拾う
+    await conn.execute(
+        """CREATE TRIGGER trg_pages_chunk_attribute_sync
+        AFTER UPDATE OF status, url, keywords ON pages
+        WHEN (OLD.status = 'succeeded') IS NOT (NEW.status = 'succeeded')
+            OR OLD.url IS NOT NEW.url
+            OR OLD.keywords IS NOT NEW.keywords
+        BEGIN
+            INSERT INTO chunk_attribute_sync (page_id) VALUES (NEW.id)
+            ON CONFLICT(page_id) DO UPDATE SET version = version + 1;
+        END"""
+    )
+    # 属性を持たない既存チャンクへ書き込むため、成功済みの全ページを登録する
+    await conn.execute(
+        """INSERT INTO chunk_attribute_sync (page_id)
+        SELECT id FROM pages WHERE status = 'succeeded'"""
+    )
+
+
+async def _migration_12(conn: aiosqlite.Connection) -> None:
+    """Track an index generation that invalidates cached search results."""
+    await conn.execute(
+        """CREATE TABLE index_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )"""
+    )
+    await conn.execute("INSERT INTO index_generation (id, generation) VALUES (1, 0)")
+    # 検索可否 (succeeded かどうか) と検索結果に返す列の変更を、どの経路の更新でも
+    # 拾う. 処理中の状態遷移ではキャッシュを捨てない
+    await conn.execute(
+        """CREATE TRIGGER trg_pages_index_generation_update
+        AFTER UPDATE OF status, url, title, memo, summary, keywords ON pages
+        WHEN (OLD.status = 'succeeded') IS NOT (NEW.status = 'succeeded')
+            OR OLD.url IS NOT NEW.url
+            OR OLD.title IS NOT NEW.title
+            OR OLD.memo IS NOT NEW.memo
+            OR OLD.summary IS NOT NEW.summary
+            OR OLD.keywords IS NOT NEW.keywords
+        BEGIN
+            UPDATE index_generation SET generation = generation + 1 WHERE id = 1;
+        END"""
+    )
+    await conn.execute(
+        """CREATE TRIGGER trg_pages_index_generation_delete
+        AFTER DELETE ON pages
+        BEGIN
+            UPDATE index_generation SET generation = generation + 1 WHERE id = 1;
+        END"""
+    )
+
+
+async def _migration_13(conn: aiosqlite.Connection) -> None:
+    """Queue unreferenced chunks for deletion outside the write transaction."""
+    await conn.execute(
+        """CREATE TABLE chunk_tombstones (
+            chunk_hash TEXT PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL,
+            claim_owner TEXT,
+            claim_expires_at TIMESTAMP
+        )"""
+    )
+
+
+async def _migration_14(conn: aiosqlite.Connection) -> None:
+    """Mark pages whose chunks may still be stored under the legacy pageId layout."""
+    await conn.execute(
+        """CREATE TABLE legacy_chunk_pages (
+            page_id INTEGER PRIMARY KEY,
+            FOREIGN KEY (page_id) REFERENCES pages(id)
+        )"""
+    )
+    # 内容ハッシュのチャンクを1度も記録していないページだけが
+    # 従来形式のチャンクを持ちうる. 以後に作られたページは
+    # 従来形式で索引されないので登録しない
+    await conn.execute(
+        """INSERT INTO legacy_chunk_pages (page_id)
+        SELECT id FROM pages
+        WHERE NOT EXISTS (
+            SELECT 1 FROM page_chunks WHERE page_chunks.page_id = pages.id
+        )"""
+    )
+
+
 MIGRATIONS = (
     Migration(1, "create_pages_and_process_logs", _migration_1),
     Migration(2, "add_last_success_step", _migration_2),
     Migration(3, "add_persistent_jobs", _migration_3),
     Migration(4, "add_repair_cases", _migration_4),
     Migration(5, "normalize_timestamps_to_utc", _migration_5),
+    Migration(6, "add_job_pipeline_stages", _migration_6),
+    Migration(7, "add_job_leases", _migration_7),
+    Migration(8, "add_job_priority_and_host", _migration_8),
+    Migration(9, "add_summary_checkpoints", _migration_9),
+    Migration(10, "add_page_chunks", _migration_10),
+    Migration(11, "add_chunk_attribute_sync", _migration_11),
+    Migration(12, "add_index_generation", _migration_12),
+    Migration(13, "add_chunk_tombstones", _migration_13),
+    Migration(14, "add_legacy_chunk_pages", _migration_14),
 )
 
 
@@ -272,8 +487,26 @@ def _expected_tables(version: int) -> dict[str, tuple[str, ...]]:
     }
     if version >= 3:
         tables["jobs"] = JOB_COLUMNS
+    if version >= 6:
+        tables["jobs"] += ("stage", "log_id")
+    if version >= 7:
+        tables["jobs"] += ("lease_owner", "lease_expires_at")
+    if version >= 8:
+        tables["jobs"] += ("priority", "host")
     if version >= 4:
         tables["repair_cases"] = REPAIR_CASE_COLUMNS
+    if version >= 9:
+        tables["summary_checkpoints"] = SUMMARY_CHECKPOINT_COLUMNS
+    if version >= 10:
+        tables["page_chunks"] = PAGE_CHUNK_COLUMNS
+    if version >= 11:
+        tables["chunk_attribute_sync"] = CHUNK_ATTRIBUTE_SYNC_COLUMNS
+    if version >= 12:
+        tables["index_generation"] = INDEX_GENERATION_COLUMNS
+    if version >= 13:
+        tables["chunk_tombstones"] = CHUNK_TOMBSTONE_COLUMNS
+    if version >= 14:
+        tables["legacy_chunk_pages"] = LEGACY_CHUNK_PAGE_COLUMNS
     return tables
 
 
@@ -297,7 +530,7 @@ async def _validate_schema(conn: aiosqlite.Connection, version: int) -> None:
                 f"has columns {actual_columns}, expected {columns}"
             )
 
-    for table in set(expected) - {"pages"}:
+    for table in set(expected) - _PAGE_INDEPENDENT_TABLES:
         cursor = await conn.execute(f'PRAGMA foreign_key_list("{table}")')
         foreign_keys = {(row[3], row[2], row[4]) for row in await cursor.fetchall()}
         if foreign_keys != {("page_id", "pages", "id")}:
@@ -337,6 +570,24 @@ async def _validate_schema(conn: aiosqlite.Connection, version: int) -> None:
                 ("status", "detected_at"),
                 False,
             )
+        if version >= 6:
+            required_indexes["idx_jobs_status_stage_created"] = (
+                "jobs",
+                ("status", "stage", "created_at", "id"),
+                False,
+            )
+        if version >= 7:
+            required_indexes["idx_jobs_status_lease"] = (
+                "jobs",
+                ("status", "lease_expires_at"),
+                False,
+            )
+        if version >= 10:
+            required_indexes["idx_page_chunks_hash"] = (
+                "page_chunks",
+                ("chunk_hash",),
+                False,
+            )
         missing_indexes = set(required_indexes) - set(actual_indexes)
         if missing_indexes:
             raise SchemaMigrationError(
@@ -363,6 +614,32 @@ async def _validate_schema(conn: aiosqlite.Connection, version: int) -> None:
                     f"Corrupt SQLite schema: invalid index {name}"
                 )
 
+    if version >= 11:
+        trigger = await (
+            await conn.execute(
+                "SELECT tbl_name FROM sqlite_master WHERE type = 'trigger' "
+                "AND name = 'trg_pages_chunk_attribute_sync'"
+            )
+        ).fetchone()
+        if trigger is None or trigger[0] != "pages":
+            raise SchemaMigrationError(
+                "Corrupt SQLite schema: missing trigger trg_pages_chunk_attribute_sync"
+            )
+
+    if version >= 12:
+        for name in _INDEX_GENERATION_TRIGGERS:
+            trigger = await (
+                await conn.execute(
+                    "SELECT tbl_name FROM sqlite_master WHERE type = 'trigger' "
+                    "AND name = ?",
+                    (name,),
+                )
+            ).fetchone()
+            if trigger is None or trigger[0] != "pages":
+                raise SchemaMigrationError(
+                    f"Corrupt SQLite schema: missing trigger {name}"
+                )
+
 
 async def _detect_legacy_version(conn: aiosqlite.Connection) -> int:
     tables = await _table_names(conn)
@@ -2,18 +2,32 @@
 
 import json
 from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
 
 import aiosqlite
 
-from ..models.database import Page, PageStatus, ProcessingStep
-from ..utils.datetime import as_utc, utc_isoformat, utc_now_isoformat
+from ..models.database import JobPriority, Page, PageStatus, ProcessingStep
+from ..utils.datetime import as_utc, utc_isoformat, utc_now, utc_now_isoformat
 from ..utils.exceptions import DatabaseError, RepairDeletionConflictError
+from ..utils.job_wakeup import notify_job_queued
+from ..utils.url import url_host
 from .database import DatabaseConnection
 
 _ALLOWED_SORT_FIELDS = frozenset({"id", "url", "title", "created_at", "updated_at"})
 _ALLOWED_ORDER = frozenset({"ASC", "DESC"})
 
 
+@dataclass(frozen=True)
+class ChunkReplacement:
+    """replace_page_chunks の結果."""
+
+    # 置き換えでどのページからも参照されなくなり、削除待ちに登録したチャンク
+    unreferenced: list[str]
+    # 新たに参照したが、他の処理が削除を claim 済みのチャンク
+    pending_deletion: list[str]
+
+
 class PageRepository:
     """ページリポジトリ."""
 
@@ -83,13 +97,16 @@ class PageRepository:
                     job_cursor = await conn.execute(
                         """
                         INSERT INTO jobs
-                            (page_id, kind, status, start_step, created_at)
-                        VALUES (?, 'initial', 'queued', 'download', ?)
+                            (page_id, kind, status, start_step, stage, priority,
+                             host, created_at)
+                        VALUES (?, 'initial', 'queued', 'download', 'download', ?,
+                                ?, ?)
                         """,
-                        (page_id, now),
+                        (page_id, int(JobPriority.INTERACTIVE), url_host(url), now),
                     )
                     job_id = int(job_cursor.lastrowid or 0)
                     await conn.commit()
+                    notify_job_queued()
                     return page_id, log_id, job_id
                 except Exception:
                     await conn.rollback()
@@ -143,13 +160,98 @@ class PageRepository:
 
         unique_page_ids = list(dict.fromkeys(page_ids))
         placeholders = ", ".join("?" for _ in unique_page_ids)
-        conditions = [f"id IN ({placeholders})", "status = ?"]
-        params: list[object] = [*unique_page_ids, PageStatus.SUCCEEDED.value]
+        conditions, params = self._search_filter_conditions(filters, exclude_keywords)
+        conditions = [f"id IN ({placeholders})", "status = ?", *conditions]
+        params = [*unique_page_ids, PageStatus.SUCCEEDED.value, *params]
+
+        try:
+            query = f"""
+            SELECT id, url, title, memo, summary, keywords, weaviate_id,
+                   last_success_step, status, created_at, updated_at
+            FROM pages WHERE {" AND ".join(conditions)}
+            """
+            rows = await self.db.fetch_all(query, tuple(params))
+            pages = [self._row_to_page(row) for row in rows]
+            return {page.id: page for page in pages if page.id is not None}
+        except Exception as e:
+            raise DatabaseError(f"Failed to filter searchable pages: {str(e)}")
+
+    async def estimate_search_selectivity(
+        self,
+        filters: dict | None = None,
+        exclude_keywords: list[str] | None = None,
+    ) -> tuple[int, int]:
+        """検索可能なページのうち条件に合う件数と全件数を返す."""
+        conditions, params = self._search_filter_conditions(filters, exclude_keywords)
+        matched = " AND ".join(conditions) or "1"
+        try:
+            row = await self.db.fetch_one(
+                f"""SELECT COALESCE(SUM(CASE WHEN {matched} THEN 1 ELSE 0 END), 0)
+                       AS matched,
+                       COUNT(*) AS total
+                FROM pages WHERE status = ?""",
+                (*params, PageStatus.SUCCEEDED.value),
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to estimate search selectivity: {e}") from e
+        if row is None:
+            return 0, 0
+        return int(row["matched"]), int(row["total"])
+
+    async def get_searchable_chunk_targets(
+        self,
+        filters: dict | None,
+        exclude_keywords: list[str] | None,
+        max_targets: int,
+    ) -> tuple[list[str], list[int]] | None:
+        """条件に合う検索可能ページの本文チャンクを返す.
+
+        Returns:
+            (page_chunks に記録された共有チャンクのハッシュ,
+            page_chunks を持たない旧形式のページID). 合計が max_targets を
+            超える場合は None
+        """
+        conditions, params = self._search_filter_conditions(filters, exclude_keywords)
+        where = " AND ".join(["pages.status = ?", *conditions])
+        params = [PageStatus.SUCCEEDED.value, *params]
+        try:
+            hash_rows = await self.db.fetch_all(
+                f"""SELECT DISTINCT page_chunks.chunk_hash FROM page_chunks
+                JOIN pages ON pages.id = page_chunks.page_id
+                WHERE {where} LIMIT ?""",
+                (*params, max_targets + 1),
+            )
+            if len(hash_rows) > max_targets:
+                return None
+            page_rows = await self.db.fetch_all(
+                f"""SELECT pages.id FROM pages WHERE {where}
+                AND NOT EXISTS (
+                    SELECT 1 FROM page_chunks WHERE page_chunks.page_id = pages.id
+                )
+                LIMIT ?""",
+                (*params, max_targets + 1 - len(hash_rows)),
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to get searchable chunks: {e}") from e
+        if len(hash_rows) + len(page_rows) > max_targets:
+            return None
+        return (
+            [str(row["chunk_hash"]) for row in hash_rows],
+            [int(row["id"]) for row in page_rows],
+        )
+
+    @staticmethod
+    def _search_filter_conditions(
+        filters: dict | None, exclude_keywords: list[str] | None
+    ) -> tuple[list[str], list[object]]:
+        """検索フィルタを pages テーブルの条件式とパラメータに変換する."""
+        conditions: list[str] = []
+        params: list[object] = []
         filters = filters or {}
 
         url = filters.get("url")
         if url:
-            conditions.append("url LIKE ?")
+            conditions.append("pages.url LIKE ?")
             params.append(f"%{url}%")
 
         keywords = filters.get("keywords")
@@ -173,11 +275,11 @@ class PageRepository:
 
         date_from = filters.get("date_from")
         if date_from:
-            conditions.append("created_at >= ?")
+            conditions.append("pages.created_at >= ?")
             params.append(utc_isoformat(date_from))
         date_to = filters.get("date_to")
         if date_to:
-            conditions.append("created_at <= ?")
+            conditions.append("pages.created_at <= ?")
             params.append(utc_isoformat(date_to))
 
         valid_excludes = [
@@ -191,18 +293,7 @@ class PageRepository:
                 "WHERE json_each.value = ?)"
             )
             params.append(keyword)
-
-        try:
-            query = f"""
-            SELECT id, url, title, memo, summary, keywords, weaviate_id,
-                   last_success_step, status, created_at, updated_at
-            FROM pages WHERE {" AND ".join(conditions)}
-            """
-            rows = await self.db.fetch_all(query, tuple(params))
-            pages = [self._row_to_page(row) for row in rows]
-            return {page.id: page for page in pages if page.id is not None}
-        except Exception as e:
-            raise DatabaseError(f"Failed to filter searchable pages: {str(e)}")
+        return conditions, params
 
     async def update_summary_keywords(
         self, page_id: int, summary: str, keywords: list[str]
@@ -368,6 +459,439 @@ class PageRepository:
         except Exception as e:
             raise DatabaseError(f"Failed to clear weaviate_id: {str(e)}")
 
+    async def replace_page_chunks(
+        self,
+        page_id: int,
+        chunk_hashes: list[str],
+        released: list[str] | None = None,
+    ) -> ChunkReplacement:
+        """ページが参照するチャンクを置き換え、参照されなくなったチャンクを記録する.
+
+        どのページからも参照されなくなったチャンクは削除待ち (chunk_tombstones) に
+        登録し、索引からの削除は呼び出し側がトランザクションの外で
+        claim_chunk_tombstones を通して行う。新たに参照するチャンクの削除待ちは
+        取り消す。ただし削除が claim 済みのものは、削除の完了を待って登録し直す
+        必要があるため pending_deletion として返す。
+
+        Args:
+            page_id: ページID
+            chunk_hashes: チャンク順の内容ハッシュ
+            released: 以前の参照に加えて、参照がなければ削除対象にするチャンク
+        """
+        referenced = list(dict.fromkeys(chunk_hashes))
+        try:
+            now = utc_now_isoformat()
+            async with self.db.connect() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                rows = await (
+                    await conn.execute(
+                        "SELECT chunk_hash FROM page_chunks WHERE page_id=?",
+                        (page_id,),
+                    )
+                ).fetchall()
+                await conn.execute(
+                    "DELETE FROM page_chunks WHERE page_id=?", (page_id,)
+                )
+                await conn.executemany(
+                    """INSERT INTO page_chunks (page_id, chunk_id, chunk_hash)
+                    VALUES (?, ?, ?)""",
+                    [
+                        (page_id, chunk_id, chunk_hash)
+                        for chunk_id, chunk_hash in enumerate(chunk_hashes)
+                    ],
+                )
+                candidates = sorted(
+                    ({row[0] for row in rows} | set(released or ())) - set(chunk_hashes)
+                )
+                unreferenced: list[str] = []
+                if candidates:
+                    placeholders = ", ".join("?" for _ in candidates)
+                    still_used = await (
+                        await conn.execute(
+                            f"""SELECT DISTINCT chunk_hash FROM page_chunks
+                            WHERE chunk_hash IN ({placeholders})""",
+                            tuple(candidates),
+                        )
+                    ).fetchall()
+                    used = {row[0] for row in still_used}
+                    unreferenced = [h for h in candidates if h not in used]
+                    await conn.executemany(
+                        """INSERT INTO chunk_tombstones (chunk_hash, created_at)
+                        VALUES (?, ?) ON CONFLICT(chunk_hash) DO NOTHING""",
+                        [(chunk_hash, now) for chunk_hash in unreferenced],
+                    )
+                pending: list[str] = []
+                if referenced:
+                    placeholders = ", ".join("?" for _ in referenced)
+                    claimed = await (
+                        await conn.execute(
+                            f"""SELECT chunk_hash FROM chunk_tombstones
+                            WHERE chunk_hash IN ({placeholders})
+                            AND claim_expires_at >= ?""",
+                            (*referenced, now),
+                        )
+                    ).fetchall()
+                    pending = sorted(row[0] for row in claimed)
+                    await conn.execute(
+                        f"""DELETE FROM chunk_tombstones
+                        WHERE chunk_hash IN ({placeholders})
+                        AND (claim_expires_at IS NULL OR claim_expires_at < ?)""",
+                        (*referenced, now),
+                    )
+                await conn.commit()
+                return ChunkReplacement(unreferenced, pending)
+        except Exception as e:
+            raise DatabaseError(f"Failed to replace page chunks: {e}") from e
+
+    async def claim_chunk_tombstones(
+        self,
+        owner: str,
+        lease_seconds: float,
+        chunk_hashes: list[str] | None = None,
+        limit: int = 100,
+    ) -> list[str]:
+        """どのページからも参照されていない削除待ちのチャンクを claim する.
+
+        claim の時点で参照を確かめ直し、その後に参照し始めたページは
+        replace_page_chunks で削除の完了を待つ。参照されている削除待ちは取り消す。
+
+        Args:
+            owner: claim する削除処理の識別子
+            lease_seconds: claim の有効期間
+            chunk_hashes: 対象のチャンク. None なら古いものから limit 件
+            limit: chunk_hashes が None のときの上限
+        """
+        now = utc_now()
+        stored_now = utc_isoformat(now)
+        claimable = "(claim_expires_at IS NULL OR claim_expires_at < ?)"
+        if chunk_hashes is None:
+            target = "1"
+            params: tuple[object, ...] = ()
+        elif chunk_hashes:
+            target = f"chunk_hash IN ({', '.join('?' for _ in chunk_hashes)})"
+            params = tuple(chunk_hashes)
+        else:
+            return []
+        try:
+            async with self.db.connect() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                await conn.execute(
+                    f"""DELETE FROM chunk_tombstones
+                    WHERE {target} AND {claimable} AND EXISTS (
+                        SELECT 1 FROM page_chunks
+                        WHERE page_chunks.chunk_hash = chunk_tombstones.chunk_hash
+                    )""",
+                    (*params, stored_now),
+                )
+                rows = await (
+                    await conn.execute(
+                        f"""UPDATE chunk_tombstones
+                        SET claim_owner = ?, claim_expires_at = ?
+                        WHERE chunk_hash IN (
+                            SELECT chunk_hash FROM chunk_tombstones
+                            WHERE {target} AND {claimable}
+                            ORDER BY created_at, chunk_hash LIMIT ?
+                        )
+                        RETURNING chunk_hash""",
+                        (
+                            owner,
+                            utc_isoformat(now + timedelta(seconds=lease_seconds)),
+                            *params,
+                            stored_now,
+                            limit if chunk_hashes is None else len(params),
+                        ),
+                    )
+                ).fetchall()
+                await conn.commit()
+                return sorted(row[0] for row in rows)
+        except Exception as e:
+            raise DatabaseError(f"Failed to claim chunk tombstones: {e}") from e
+
+    async def release_chunk_tombstones(
+        self, owner: str, chunk_hashes: list[str], deleted: bool
+    ) -> None:
+        """claim した削除待ちを、削除できたなら消し、失敗したなら claim を外す."""
+        if not chunk_hashes:
+            return
+        placeholders = ", ".join("?" for _ in chunk_hashes)
+        query = (
+            "DELETE FROM chunk_tombstones"
+            if deleted
+            else """UPDATE chunk_tombstones
+            SET claim_owner = NULL, claim_expires_at = NULL"""
+        )
+        try:
+            await self.db.execute(
+                f"""{query} WHERE chunk_hash IN ({placeholders})
+                AND claim_owner = ?""",
+                (*chunk_hashes, owner),
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to release chunk tombstones: {e}") from e
+
+    async def get_claimed_chunk_tombstones(self, chunk_hashes: list[str]) -> list[str]:
+        """削除が claim されていて有効期限内のチャンクを返す."""
+        if not chunk_hashes:
+            return []
+        placeholders = ", ".join("?" for _ in chunk_hashes)
+        try:
+            rows = await self.db.fetch_all(
+                f"""SELECT chunk_hash FROM chunk_tombstones
+                WHERE chunk_hash IN ({placeholders}) AND claim_expires_at >= ?
+                ORDER BY chunk_hash""",
+                (*chunk_hashes, utc_now_isoformat()),
+            )
+            return [str(row["chunk_hash"]) for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get claimed chunk tombstones: {e}") from e
+
+    async def add_chunk_tombstones(self, chunk_hashes: list[str]) -> None:
+        """指定チャンクのうち、どのページからも参照されていないものを削除待ちにする.
+
+        索引へ登録し直したチャンクが、その間に参照を外されて削除済みだった場合に
+        削除し直せるようにする。
+        """
+        unique_hashes = list(dict.fromkeys(chunk_hashes))
+        if not unique_hashes:
+            return
+        try:
+            await self.db.execute(
+                """INSERT INTO chunk_tombstones (chunk_hash, created_at)
+                SELECT value, ? FROM json_each(?)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM page_chunks
+                    WHERE page_chunks.chunk_hash = json_each.value
+                )
+                ON CONFLICT(chunk_hash) DO NOTHING""",
+                (utc_now_isoformat(), json.dumps(unique_hashes)),
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to add chunk tombstones: {e}") from e
+
+    async def get_page_chunk_hashes(self, page_id: int) -> list[str]:
+        """ページが参照するチャンクの内容ハッシュをチャンク順に返す."""
+        try:
+            rows = await self.db.fetch_all(
+                """SELECT chunk_hash FROM page_chunks WHERE page_id = ?
+                ORDER BY chunk_id""",
+                (page_id,),
+            )
+            return [str(row["chunk_hash"]) for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get page chunks: {e}") from e
+
+    async def get_legacy_chunk_pages(self, page_ids: list[int]) -> list[int]:
+        """指定ページのうち、ページ ID を持つ旧形式のチャンクが残りうるものを返す."""
+        unique_ids = list(dict.fromkeys(page_ids))
+        if not unique_ids:
+            return []
+        try:
+            placeholders = ", ".join("?" for _ in unique_ids)
+            rows = await self.db.fetch_all(
+                f"""SELECT page_id FROM legacy_chunk_pages
+                WHERE page_id IN ({placeholders}) ORDER BY page_id""",
+                tuple(unique_ids),
+            )
+            return [int(row["page_id"]) for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get legacy chunk pages: {e}") from e
+
+    async def clear_legacy_chunk_page(self, page_id: int) -> None:
+        """旧形式のチャンクを除去したページの印を外す."""
+        try:
+            await self.db.execute(
+                "DELETE FROM legacy_chunk_pages WHERE page_id = ?", (page_id,)
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to clear legacy chunk page: {e}") from e
+
+    async def get_unshared_chunk_hashes(self, page_id: int) -> list[str]:
+        """ページが参照するチャンクのうち、他のページが参照しないものを返す."""
+        try:
+            rows = await self.db.fetch_all(
+                """SELECT DISTINCT chunk_hash FROM page_chunks AS own
+                WHERE own.page_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM page_chunks AS other
+                    WHERE other.chunk_hash = own.chunk_hash
+                    AND other.page_id != own.page_id
+                )
+                ORDER BY chunk_hash""",
+                (page_id,),
+            )
+            return [str(row["chunk_hash"]) for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get unshared chunks: {e}") from e
+
+    async def get_chunk_owners(
+        self, chunk_hashes: list[str]
+    ) -> dict[str, list[tuple[int, int]]]:
+        """チャンクを参照する (ページID, チャンクID) をチャンクごとに返す."""
+        unique_hashes = list(dict.fromkeys(chunk_hashes))
+        if not unique_hashes:
+            return {}
+        try:
+            placeholders = ", ".join("?" for _ in unique_hashes)
+            rows = await self.db.fetch_all(
+                f"""SELECT chunk_hash, page_id, MIN(chunk_id) AS chunk_id
+                FROM page_chunks WHERE chunk_hash IN ({placeholders})
+                GROUP BY chunk_hash, page_id ORDER BY chunk_hash, page_id""",
+                tuple(unique_hashes),
+            )
+            owners: dict[str, list[tuple[int, int]]] = {}
+            for row in rows:
+                owners.setdefault(str(row["chunk_hash"]), []).append(
+                    (int(row["page_id"]), int(row["chunk_id"]))
+                )
+            return owners
+        except Exception as e:
+            raise DatabaseError(f"Failed to get chunk owners: {e}") from e
+
+    async def get_searchable_chunk_owner_pages(
+        self, chunk_hashes: list[str]
+    ) -> dict[str, list[Page]]:
+        """チャンクを参照する検索可能なページをチャンクごとに返す."""
+        unique_hashes = list(dict.fromkeys(chunk_hashes))
+        if not unique_hashes:
+            return {}
+        try:
+            placeholders = ", ".join("?" for _ in unique_hashes)
+            rows = await self.db.fetch_all(
+                f"""SELECT DISTINCT page_chunks.chunk_hash AS chunk_hash,
+                       pages.id, pages.url, pages.title, pages.memo, pages.summary,
+                       pages.keywords, pages.weaviate_id, pages.last_success_step,
+                       pages.status, pages.created_at, pages.updated_at
+                FROM page_chunks JOIN pages ON pages.id = page_chunks.page_id
+                WHERE page_chunks.chunk_hash IN ({placeholders})
+                AND pages.status = ?
+                ORDER BY page_chunks.chunk_hash, pages.id""",
+                (*unique_hashes, PageStatus.SUCCEEDED.value),
+            )
+            owners: dict[str, list[Page]] = {}
+            for row in rows:
+                owners.setdefault(str(row["chunk_hash"]), []).append(
+                    self._row_to_page(row)
+                )
+            return owners
+        except Exception as e:
+            raise DatabaseError(f"Failed to get chunk owner pages: {e}") from e
+
+    async def get_pages_sharing_chunks(
+        self, page_id: int, chunk_hashes: list[str] | None = None
+    ) -> list[int]:
+        """ページのチャンク (または指定したチャンク) を参照する他のページを返す."""
+        try:
+            if chunk_hashes is None:
+                rows = await self.db.fetch_all(
+                    """SELECT DISTINCT other.page_id FROM page_chunks AS own
+                    JOIN page_chunks AS other ON other.chunk_hash = own.chunk_hash
+                    WHERE own.page_id = ? AND other.page_id != own.page_id
+                    ORDER BY other.page_id""",
+                    (page_id,),
+                )
+            elif chunk_hashes:
+                placeholders = ", ".join("?" for _ in chunk_hashes)
+                rows = await self.db.fetch_all(
+                    f"""SELECT DISTINCT page_id FROM page_chunks
+                    WHERE chunk_hash IN ({placeholders}) AND page_id != ?
+                    ORDER BY page_id""",
+                    (*chunk_hashes, page_id),
+                )
+            else:
+                return []
+            return [int(row["page_id"]) for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get pages sharing chunks: {e}") from e
+
+    async def enqueue_chunk_attribute_sync(self, page_ids: list[int]) -> None:
+        """ページのチャンクへ検索用の属性を書き直すよう登録する.
+
+        状態・URL・キーワードの変更はトリガーで登録されるため、ここではチャンクの
+        参照が変わった場合など、それ以外の理由で書き直すページを登録する。
+        """
+        unique_ids = list(dict.fromkeys(page_ids))
+        if not unique_ids:
+            return
+        placeholders = ", ".join("?" for _ in unique_ids)
+        try:
+            await self.db.execute(
+                f"""INSERT INTO chunk_attribute_sync (page_id)
+                SELECT id FROM pages WHERE id IN ({placeholders})
+                ON CONFLICT(page_id) DO UPDATE SET version = version + 1""",
+                tuple(unique_ids),
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to enqueue chunk attribute sync: {e}") from e
+
+    async def get_chunk_attribute_sync_batch(self, limit: int) -> dict[int, int]:
+        """チャンク属性の書き直しを待つページと登録時の版を返す."""
+        try:
+            rows = await self.db.fetch_all(
+                """SELECT page_id, version FROM chunk_attribute_sync
+                ORDER BY page_id LIMIT ?""",
+                (limit,),
+            )
+            return {int(row["page_id"]): int(row["version"]) for row in rows}
+        except Exception as e:
+            raise DatabaseError(f"Failed to get chunk attribute sync: {e}") from e
+
+    async def ack_chunk_attribute_sync(self, pending: dict[int, int]) -> None:
+        """書き直したページを登録から外す. 処理中に再登録されたページは残す."""
+        if not pending:
+            return
+        try:
+            await self.db.execute_transaction(
+                [
+                    (
+                        """DELETE FROM chunk_attribute_sync
+                        WHERE page_id = ? AND version = ?""",
+                        (page_id, version),
+                    )
+                    for page_id, version in pending.items()
+                ]
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to ack chunk attribute sync: {e}") from e
+
+    async def has_pending_chunk_attribute_sync(self) -> bool:
+        """検索可能なページのうちチャンク属性の書き直しを待つものがあるか返す.
+
+        検索可能でないページの属性が古くても、検索時に SQLite で除外できる。
+        """
+        try:
+            row = await self.db.fetch_one(
+                """SELECT EXISTS (
+                    SELECT 1 FROM chunk_attribute_sync
+                    JOIN pages ON pages.id = chunk_attribute_sync.page_id
+                    WHERE pages.status = ?
+                ) AS pending""",
+                (PageStatus.SUCCEEDED.value,),
+            )
+            return bool(row["pending"]) if row is not None else False
+        except Exception as e:
+            raise DatabaseError(f"Failed to check chunk attribute sync: {e}") from e
+
+    async def get_index_generation(self) -> int:
+        """検索結果に影響する変更のたびに進む索引の世代を返す.
+
+        ページの状態・URL・検索結果に返す列の変更と削除ではトリガーが進める。
+        """
+        try:
+            row = await self.db.fetch_one(
+                "SELECT generation FROM index_generation WHERE id = 1"
+            )
+            return int(row["generation"]) if row is not None else 0
+        except Exception as e:
+            raise DatabaseError(f"Failed to get index generation: {e}") from e
+
+    async def bump_index_generation(self) -> None:
+        """Weaviate の索引を書き換えたときに索引の世代を進める."""
+        try:
+            await self.db.execute(
+                "UPDATE index_generation SET generation = generation + 1 WHERE id = 1"
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to bump index generation: {e}") from e
+
     async def delete_pending_repair_page(
         self,
         page_id: int,
@@ -407,7 +931,15 @@ class PageRepository:
                     )
                 if external_cleanup is not None:
                     await external_cleanup()
-                for table in ("process_logs", "jobs", "repair_cases"):
+                for table in (
+                    "process_logs",
+                    "jobs",
+                    "repair_cases",
+                    "summary_checkpoints",
+                    "page_chunks",
+                    "chunk_attribute_sync",
+                    "legacy_chunk_pages",
+                ):
                     await conn.execute(
                         f"DELETE FROM {table} WHERE page_id=?", (page_id,)
                     )
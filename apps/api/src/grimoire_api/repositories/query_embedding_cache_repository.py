@@ -0,0 +1,160 @@
+"""Persistent cache of search query embeddings."""
+
+import time
+from array import array
+from pathlib import Path
+
+from ..config import settings
+from ..utils.datetime import utc_now_isoformat
+from ..utils.exceptions import DatabaseError
+from .database import DatabaseConnection
+
+# 最終利用日時の更新は書き込みロックを取るため、件数か経過時間でまとめて反映する
+TOUCH_BATCH_SIZE = 64
+TOUCH_FLUSH_SECONDS = 30.0
+
+
+class QueryEmbeddingCacheRepository:
+    """検索クエリの埋め込みを (モデル, 正規化したクエリ) で保存する.
+
+    LLM 応答キャッシュと同じく再生成可能なデータなので、本体 DB のマイグレーション
+    管理から切り離した専用の SQLite ファイルに置く。件数が max_entries を超えたら
+    最終利用が古いものから削除する。ベクトルは float32 の配列として保存する。
+    ヒット時の最終利用日時はメモリに溜めて一括で書き込み、件数は起動後最初の
+    アクセスで数えたあと増減を追跡する。
+    """
+
+    def __init__(
+        self,
+        db: DatabaseConnection | None = None,
+        max_entries: int | None = None,
+    ):
+        self.db = db or DatabaseConnection(settings.SEARCH_EMBEDDING_CACHE_PATH)
+        self.max_entries = (
+            settings.SEARCH_EMBEDDING_CACHE_MAX_ENTRIES
+            if max_entries is None
+            else max_entries
+        )
+        self._initialized = False
+        self._entries = 0
+        self._touched: dict[tuple[str, str], str] = {}
+        self._flushed_at = time.monotonic()
+
+    async def get(self, model: str, query: str) -> list[float] | None:
+        """保存済みの埋め込みを返し、最終利用日時の更新を予約する."""
+        await self._ensure_table()
+        row = await self.db.fetch_one(
+            "SELECT vector FROM query_embeddings WHERE model=? AND query=?",
+            (model, query),
+        )
+        if row is None:
+            return None
+        self._touched[(model, query)] = utc_now_isoformat()
+        if (
+            len(self._touched) >= TOUCH_BATCH_SIZE
+            or time.monotonic() - self._flushed_at >= TOUCH_FLUSH_SECONDS
+        ):
+            await self.flush()
+        vector = array("f")
+        vector.frombytes(row["vector"])
+        return vector.tolist()
+
+    async def put(self, model: str, query: str, vector: list[float]) -> None:
+        """埋め込みを保存し、上限を超えた分を LRU で削除する."""
+        await self._ensure_table()
+        now = utc_now_isoformat()
+        blob = array("f", vector).tobytes()
+        try:
+            async with self.db.connect() as conn:
+                cursor = await conn.execute(
+                    """INSERT INTO query_embeddings
+                    (model, query, vector, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(model, query) DO NOTHING""",
+                    (model, query, blob, now, now),
+                )
+                inserted = cursor.rowcount > 0
+                if not inserted:
+                    await conn.execute(
+                        """UPDATE query_embeddings SET vector=?, last_used_at=?
+                        WHERE model=? AND query=?""",
+                        (blob, now, model, query),
+                    )
+                await conn.commit()
+        except Exception as e:
+            raise DatabaseError(f"Failed to store query embedding: {e}") from e
+        self._touched.pop((model, query), None)
+        if inserted:
+            self._entries += 1
+        await self.evict()
+
+    async def evict(self) -> int:
+        """件数が上限に収まるまで最終利用が古いエントリを削除する."""
+        await self._ensure_table()
+        excess = self._entries - self.max_entries
+        if excess <= 0:
+            return 0
+        # 予約済みの最終利用日時を反映してから古い順に選ぶ
+        await self.flush()
+        try:
+            async with self.db.connect() as conn:
+                cursor = await conn.execute(
+                    """DELETE FROM query_embeddings WHERE rowid IN (
+                        SELECT rowid FROM query_embeddings
+                        ORDER BY last_used_at, rowid LIMIT ?
+                    )""",
+                    (excess,),
+                )
+                await conn.commit()
+                deleted = max(cursor.rowcount, 0)
+        except Exception as e:
+            raise DatabaseError(f"Failed to evict query embeddings: {e}") from e
+        self._entries = max(self._entries - deleted, 0)
+        return deleted
+
+    async def flush(self) -> None:
+        """予約済みの最終利用日時を1トランザクションで書き込む."""
+        self._flushed_at = time.monotonic()
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        await self.db.execute_transaction(
+            [
+                (
+                    """UPDATE query_embeddings SET last_used_at=?
+                    WHERE model=? AND query=?""",
+                    (used_at, model, query),
+                )
+                for (model, query), used_at in touched.items()
+            ]
+        )
+
+    async def _ensure_table(self) -> None:
+        if self._initialized:
+            return
+        try:
+            Path(self.db.db_path).parent.mkdir(parents=True, exist_ok=True)
+            async with self.db.connect() as conn:
+                await conn.execute(
+                    """CREATE TABLE IF NOT EXISTS query_embeddings (
+                        model TEXT NOT NULL,
+                        query TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        created_at TIMESTAMP NOT NULL,
+                        last_used_at TIMESTAMP NOT NULL,
+                        PRIMARY KEY (model, query)
+                    )"""
+                )
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used "
+                    "ON query_embeddings(last_used_at)"
+                )
+                cursor = await conn.execute("SELECT COUNT(*) FROM query_embeddings")
+                row = await cursor.fetchone()
+                await conn.commit()
+        except Exception as e:
+            raise DatabaseError(
+                f"Failed to initialize query embedding cache: {e}"
+            ) from e
+        self._entries = int(row[0]) if row else 0
+        self._initialized = True
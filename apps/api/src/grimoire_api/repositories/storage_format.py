@@ -0,0 +1,217 @@
+"""Storage formats and directory layout for saved Jina responses."""
+
+import gzip
+import json
+import os
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+# 1ディレクトリに置くページ数. 変更すると既存ファイルを探せなくなるため固定する
+SHARD_SIZE = 1000
+# 本文を共有 blob へ移したときに data.content へ置く参照のキー
+BLOB_REFERENCE_KEY = "$blob"
+BLOB_DIRNAME = "blobs"
+
+
+class StorageFormat:
+    """保存済み Jina 応答のファイル形式. 拡張子で形式を判別する."""
+
+    name = "json"
+    suffix = ".json"
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        """保存するバイト列を返す."""
+        return json.dumps(data, ensure_ascii=True, indent=2).encode("utf-8")
+
+    def decode(self, raw: bytes) -> dict[str, Any]:
+        """バイト列を読み込む.
+
+        Raises:
+            ValueError: 形式が不正な場合 (JSONDecodeError・UnicodeDecodeError を含む)
+        """
+        return json.loads(raw.decode("utf-8"))  # type: ignore[no-any-return]
+
+
+class GzipJsonFormat(StorageFormat):
+    """区切りの空白を省き日本語をエスケープしない JSON を gzip で圧縮する形式."""
+
+    name = "json.gz"
+    suffix = ".json.gz"
+
+    def __init__(self, compresslevel: int = 6):
+        """初期化.
+
+        Args:
+            compresslevel: gzip の圧縮レベル (1-9)
+        """
+        self.compresslevel = compresslevel
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        """保存するバイト列を返す."""
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        # mtime を固定して同じ内容から同じバイト列を作る
+        return gzip.compress(
+            text.encode("utf-8"), compresslevel=self.compresslevel, mtime=0
+        )
+
+    def decode(self, raw: bytes) -> dict[str, Any]:
+        """バイト列を読み込む.
+
+        Raises:
+            ValueError: 形式が不正な場合
+        """
+        try:
+            text = gzip.decompress(raw)
+        except (OSError, EOFError, zlib.error) as e:
+            raise ValueError(f"Corrupted gzip data: {e}") from e
+        return super().decode(text)
+
+
+STORAGE_FORMATS: dict[str, StorageFormat] = {
+    fmt.name: fmt for fmt in (StorageFormat(), GzipJsonFormat())
+}
+
+
+def get_storage_format(name: str) -> StorageFormat:
+    """名前から保存形式を返す.
+
+    Raises:
+        ValueError: 未知の形式名の場合
+    """
+    try:
+        return STORAGE_FORMATS[name]
+    except KeyError:
+        supported = ", ".join(sorted(STORAGE_FORMATS))
+        raise ValueError(
+            f"Unknown storage format: {name} (supported: {supported})"
+        ) from None
+
+
+def format_for_path(path: Path) -> StorageFormat | None:
+    """ファイル名の拡張子に対応する保存形式を返す."""
+    # ".json.gz" が ".json" より先に一致するよう長い拡張子から調べる
+    for fmt in sorted(STORAGE_FORMATS.values(), key=lambda f: -len(f.suffix)):
+        if path.name.endswith(fmt.suffix):
+            return fmt
+    return None
+
+
+def page_id_for_path(path: Path) -> int | None:
+    """保存済みファイル名からページ ID を返す. 対象外のファイルは None."""
+    fmt = format_for_path(path)
+    if fmt is None:
+        return None
+    stem = path.name.removesuffix(fmt.suffix)
+    return int(stem) if stem.isdigit() else None
+
+
+def shard_name(page_id: int) -> str:
+    """ページの保存先サブディレクトリ名 (ID を SHARD_SIZE ごとに区切る)."""
+    return f"{page_id // SHARD_SIZE:06d}"
+
+
+def candidate_paths(
+    root: Path, page_id: int, preferred: StorageFormat | None = None
+) -> list[Path]:
+    """ページの保存済みファイルがありうるパスを探す順に返す.
+
+    シャード配下を優先し、最後に従来のフラット配置を調べる。同じ配置の中では
+    preferred の形式を先に調べる。
+    """
+    formats = list(STORAGE_FORMATS.values())
+    if preferred is not None:
+        formats.sort(key=lambda fmt: fmt is not preferred)
+    return [
+        directory / f"{page_id}{fmt.suffix}"
+        for directory in (root / shard_name(page_id), root)
+        for fmt in formats
+    ]
+
+
+def find_stored_file(root: Path, page_id: int) -> Path | None:
+    """ページの保存済みファイルをいずれかの配置・形式で探す."""
+    for path in candidate_paths(root, page_id):
+        if path.is_file():
+            return path
+    return None
+
+
+def iter_stored_files(root: Path) -> Iterator[tuple[int, Path]]:
+    """保存済みファイルをディレクトリ全体を一覧にせず順に返す."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.isdigit():
+                with os.scandir(entry.path) as shard:
+                    for file in shard:
+                        page_id = page_id_for_path(Path(file.path))
+                        if page_id is not None and file.is_file():
+                            yield page_id, Path(file.path)
+            elif entry.is_file():
+                page_id = page_id_for_path(Path(entry.path))
+                if page_id is not None:
+                    yield page_id, Path(entry.path)
+
+
+def read_stored_file(path: Path, root: Path | None = None) -> dict[str, Any]:
+    """保存済みファイルを拡張子に応じた形式で読み込む.
+
+    root を指定すると共有 blob への本文の参照を解決する。
+
+    Raises:
+        OSError: ファイルを読めない場合
+        ValueError: 形式が不正な場合
+    """
+    fmt = format_for_path(path)
+    if fmt is None:
+        raise ValueError(f"Unknown storage format: {path.name}")
+    source = fmt.decode(path.read_bytes())
+    return source if root is None else resolve_blob_reference(root, source)
+
+
+def blob_path(root: Path, digest: str) -> Path:
+    """本文 blob の保存先パス (内容の SHA-256 の先頭2文字で分ける)."""
+    return root / BLOB_DIRNAME / digest[:2] / f"{digest}.txt.gz"
+
+
+def blob_reference(source: Any) -> str | None:
+    """data.content が共有 blob への参照なら、その SHA-256 を返す."""
+    data = source.get("data") if isinstance(source, dict) else None
+    content = data.get("content") if isinstance(data, dict) else None
+    if isinstance(content, dict) and set(content) == {BLOB_REFERENCE_KEY}:
+        digest = content[BLOB_REFERENCE_KEY]
+        if isinstance(digest, str) and len(digest) == 64:
+            return digest
+    return None
+
+
+def with_blob_reference(source: dict[str, Any], digest: str) -> dict[str, Any]:
+    """data.content を blob への参照に置き換えた浅いコピーを返す."""
+    return {
+        **source,
+        "data": {**source["data"], "content": {BLOB_REFERENCE_KEY: digest}},
+    }
+
+
+def encode_blob(content: str) -> bytes:
+    """本文 blob のバイト列を返す."""
+    return gzip.compress(content.encode("utf-8"), mtime=0)
+
+
+def resolve_blob_reference(root: Path, source: dict[str, Any]) -> dict[str, Any]:
+    """data.content が blob への参照なら本文に置き換えたコピーを返す.
+
+    Raises:
+        OSError: blob を読めない場合 (FileNotFoundError を含む)
+        ValueError: blob が壊れている場合
+    """
+    digest = blob_reference(source)
+    if digest is None:
+        return source
+    raw = blob_path(root, digest).read_bytes()
+    try:
+        content = gzip.decompress(raw).decode("utf-8")
+    except (OSError, EOFError, zlib.error) as e:
+        raise ValueError(f"Corrupted content blob {digest}: {e}") from e
+    return {**source, "data": {**source["data"], "content": content}}
@@ -0,0 +1,61 @@
+"""Summary checkpoint repository."""
+
+from ..utils.datetime import utc_now_isoformat
+from ..utils.exceptions import DatabaseError
+from .database import DatabaseConnection
+
+
+class SummaryCheckpointRepository:
+    """分割要約の途中結果 (部分要約・縮約) をページごとに保存する.
+
+    キーはプロンプトの内容ハッシュなので、チャンクや統合対象が変われば
+    自動的に別のキーになる。最終要約が完了したら clear() で削除する。
+    """
+
+    def __init__(self, db: DatabaseConnection):
+        """初期化.
+
+        Args:
+            db: データベース接続
+        """
+        self.db = db
+
+    async def load(self, page_id: int) -> dict[tuple[str, str], str]:
+        """ページの途中結果を (種別, 内容ハッシュ) をキーに取得する."""
+        try:
+            rows = await self.db.fetch_all(
+                """SELECT kind, content_hash, summary FROM summary_checkpoints
+                WHERE page_id = ?""",
+                (page_id,),
+            )
+            return {
+                (str(row["kind"]), str(row["content_hash"])): str(row["summary"])
+                for row in rows
+            }
+        except Exception as e:
+            raise DatabaseError(f"Failed to load summary checkpoints: {e}") from e
+
+    async def save(
+        self, page_id: int, kind: str, content_hash: str, summary: str
+    ) -> None:
+        """途中結果を保存する."""
+        try:
+            await self.db.execute(
+                """INSERT INTO summary_checkpoints
+                (page_id, kind, content_hash, summary, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(page_id, kind, content_hash) DO UPDATE SET
+                    summary = excluded.summary, created_at = excluded.created_at""",
+                (page_id, kind, content_hash, summary, utc_now_isoformat()),
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to save summary checkpoint: {e}") from e
+
+    async def clear(self, page_id: int) -> None:
+        """ページの途中結果を削除する."""
+        try:
+            await self.db.execute(
+                "DELETE FROM summary_checkpoints WHERE page_id = ?", (page_id,)
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to clear summary checkpoints: {e}") from e
@@ -45,7 +45,7 @@ router = APIRouter(prefix="/api/v1", tags=["health"])
 async def _readiness_check(request: Request, response: Response) -> HealthResponse:
     """DB と Weaviate の readiness を確認する."""
     try:
-        database_ready = await get_db_connection().fetch_one("SELECT 1") is not None
+        database_ready = await get_db_connection().health_check()
     except Exception:
         logger.exception("Database readiness check failed")
         database_ready = False
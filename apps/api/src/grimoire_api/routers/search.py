@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 
 from ..dependencies import get_search_service
-from ..models.request import SearchRequest
+from ..models.request import HybridSearchRequest, SearchRequest
 from ..models.response import SearchResponse
 from ..services.search_service import SearchService
 from ..utils.metrics import search_requests, search_results_count
@@ -63,6 +63,59 @@ async def search(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/search/hybrid", response_model=SearchResponse)
+async def hybrid_search(
+    request: HybridSearchRequest,
+    search_service: SearchService = Depends(get_search_service),
+) -> SearchResponse:
+    """複数ベクトルのハイブリッド検索エンドポイント.
+
+    Args:
+        request: ハイブリッド検索リクエスト
+        search_service: 検索サービス
+
+    Returns:
+        ページごとに1件へ統合した検索結果
+
+    Raises:
+        HTTPException: 検索エラー
+    """
+    try:
+        results = await search_service.hybrid_search(
+            query=request.query,
+            limit=request.limit,
+            filters=(
+                request.filters.model_dump(exclude_none=True)
+                if request.filters
+                else None
+            ),
+            vector_names=request.vector_names,
+            exclude_keywords=request.exclude_keywords,
+            fusion=request.fusion,
+            weights=request.weights,
+        )
+
+        search_requests.add(
+            1,
+            {
+                "search_type": "hybrid",
+                "query_length": str(len(request.query)),
+                "has_filters": str(bool(request.filters)),
+            },
+        )
+        search_results_count.record(len(results), {"search_type": "hybrid"})
+
+        return SearchResponse(
+            results=results,
+            total=len(results),
+            query=request.query,
+        )
+
+    except Exception as e:
+        search_requests.add(1, {"search_type": "hybrid", "status": "error"})
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/search/keywords", response_model=SearchResponse)
 async def search_by_keywords(
     keywords: list[str],
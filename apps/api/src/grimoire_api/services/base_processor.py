@@ -79,33 +79,49 @@ class BaseProcessorService:
             url: 処理対象URL
             start_point: 型制約された開始ポイント
         """
-        start_step = PipelineStartStep(start_point)
-        if start_step == PipelineStartStep.DOWNLOAD:
+        stage: PipelineStartStep | None = PipelineStartStep(start_point)
+        while stage is not None:
+            stage = await self._run_stage(page_id, log_id, url, stage, job_id)
+
+    async def _run_stage(
+        self,
+        page_id: int,
+        log_id: int,
+        url: str,
+        stage: PipelineStartStep | str,
+        job_id: int | None = None,
+    ) -> PipelineStartStep | None:
+        """パイプラインの1ステージだけを実行する.
+
+        Returns:
+            次に実行するステージ. vectorize 完了でページ処理が終わった場合は None
+        """
+        current = PipelineStartStep(stage)
+        if current == PipelineStartStep.DOWNLOAD:
             jina_result = await self.jina_client.fetch_content(url)
             await self._save_download_result(log_id, page_id, jina_result)
             if self.job_repo and job_id:
                 await self.job_repo.update_step(job_id, ProcessingStep.DOWNLOADED)
-        if start_step in (PipelineStartStep.DOWNLOAD, PipelineStartStep.LLM):
+            return PipelineStartStep.LLM
+        if current == PipelineStartStep.LLM:
             llm_result = await self.llm_service.generate_summary_keywords(page_id)
             await self._save_llm_result(log_id, page_id, llm_result)
             if self.job_repo and job_id:
                 await self.job_repo.update_step(job_id, ProcessingStep.LLM_PROCESSED)
-        if start_step in (
-            PipelineStartStep.DOWNLOAD,
-            PipelineStartStep.LLM,
-            PipelineStartStep.VECTORIZE,
-        ):
-            try:
-                await self.vectorizer.vectorize_content(page_id)
-            except Exception:
-                await self.page_repo.clear_weaviate_id(page_id)
-                raise
-            await self.page_repo.update_success_step(page_id, ProcessingStep.VECTORIZED)
-            await self.log_repo.update_status(log_id, "vectorize_complete")
-            if self.job_repo and job_id:
-                await self.job_repo.update_step(job_id, ProcessingStep.VECTORIZED)
+            return PipelineStartStep.VECTORIZE
+
+        try:
+            await self.vectorizer.vectorize_content(page_id)
+        except Exception:
+            await self.page_repo.clear_weaviate_id(page_id)
+            raise
+        await self.page_repo.update_success_step(page_id, ProcessingStep.VECTORIZED)
+        await self.log_repo.update_status(log_id, "vectorize_complete")
+        if self.job_repo and job_id:
+            await self.job_repo.update_step(job_id, ProcessingStep.VECTORIZED)
 
         await self.page_repo.update_success_step(page_id, ProcessingStep.COMPLETED)
         await self.log_repo.update_status(log_id, "completed")
         if self.job_repo and job_id:
             await self.job_repo.update_step(job_id, ProcessingStep.COMPLETED)
+        return None
@@ -0,0 +1,144 @@
+"""Per-host fair scheduling on top of the persistent job queue."""
+
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+from ..models.database import Job, PipelineStartStep
+from ..repositories.job_repository import (
+    DEFAULT_LEASE_SECONDS,
+    HOST_LIMITED_STAGE,
+    JobRepository,
+)
+from ..utils.metrics import job_scheduler_throttled_hosts
+
+
+@dataclass
+class TokenBucket:
+    """ホストごとの download 開始レートを制限するトークンバケット."""
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated_at: float
+
+    def refill(self, now: float) -> None:
+        """経過時間分のトークンを補充する."""
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """次のトークンが1つ貯まるまでの秒数."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class JobScheduler:
+    """JobRepository の claim にホスト単位の流量制御と公平性を加える.
+
+    公平性 (優先度順、同じ優先度ではホスト間 round-robin) と、全 worker 合計での
+    ホストごとの同時実行数は claim の SQL で決める。ホストごとの開始レートは
+    このプロセス内のトークンバケットで制限し、トークンがないホストの download
+    ジョブは claim 対象から外す。1回の claim で同じホストから取る download は
+    そのホストに残っているトークンの整数分までに抑える。
+    """
+
+    def __init__(
+        self,
+        job_repo: JobRepository,
+        host_concurrency: int | None = None,
+        host_rate: float | None = None,
+        host_burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初期化.
+
+        Args:
+            host_concurrency: ホストごとの download 同時実行数. None で無制限
+            host_rate: ホストごとの download 開始数/秒. None で無制限
+            host_burst: 連続して開始できる download の最大数
+        """
+        if host_concurrency is not None and host_concurrency <= 0:
+            raise ValueError("host_concurrency must be greater than zero")
+        if host_rate is not None and host_rate <= 0:
+            raise ValueError("host_rate must be greater than zero")
+        if host_burst <= 0:
+            raise ValueError("host_burst must be greater than zero")
+        self.job_repo = job_repo
+        self.host_concurrency = host_concurrency
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self._clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+
+    async def claim(
+        self,
+        capacity: Mapping[PipelineStartStep, int],
+        *,
+        owner: str = "",
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> list[Job]:
+        """空き slot 分のジョブを公平に claim する."""
+        throttled = self._throttled_hosts(self._clock())
+        job_scheduler_throttled_hosts.set(len(throttled))
+        host_tokens = None
+        default_host_tokens = None
+        if self.host_rate is not None:
+            # バケットのないホストは満タン (host_burst) として扱う
+            host_tokens = {
+                host: int(bucket.tokens)
+                for host, bucket in self._buckets.items()
+                if host not in throttled
+            }
+            default_host_tokens = self.host_burst
+        jobs = await self.job_repo.claim_batch(
+            sum(capacity.values()),
+            capacity,
+            owner=owner,
+            lease_seconds=lease_seconds,
+            host_limit=self.host_concurrency,
+            excluded_hosts=throttled,
+            host_tokens=host_tokens,
+            default_host_tokens=default_host_tokens,
+        )
+        now = self._clock()
+        for job in jobs:
+            if job.next_stage == HOST_LIMITED_STAGE and job.host:
+                self._take_token(job.host, now)
+        return jobs
+
+    def next_refill_in(self) -> float | None:
+        """レート制限中のホストが再び claim 可能になるまでの最短秒数."""
+        now = self._clock()
+        waits = []
+        for bucket in self._buckets.values():
+            bucket.refill(now)
+            if bucket.tokens < 1:
+                waits.append(bucket.wait_time())
+        return min(waits, default=None)
+
+    def _throttled_hosts(self, now: float) -> list[str]:
+        throttled = []
+        for host, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                # 満タンのバケットは新規作成と同じなので捨てて肥大化を防ぐ
+                del self._buckets[host]
+            elif bucket.tokens < 1:
+                throttled.append(host)
+        return throttled
+
+    def _take_token(self, host: str, now: float) -> None:
+        if self.host_rate is None:
+            return
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=self.host_rate,
+                capacity=float(self.host_burst),
+                tokens=float(self.host_burst),
+                updated_at=now,
+            )
+            self._buckets[host] = bucket
+        bucket.refill(now)
+        bucket.tokens -= 1
@@ -1,21 +1,51 @@
-"""Single persistent processing job worker."""
+"""Persistent processing job worker with per-stage concurrent slots."""
 
 import asyncio
 import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Mapping
+from typing import Any
 
-from ..models.database import PipelineStartStep, RepairStatus
-from ..repositories.job_repository import JobRepository
+from ..models.database import Job, PipelineStartStep, RepairStatus
+from ..repositories.job_repository import DEFAULT_LEASE_SECONDS, JobRepository
 from ..repositories.log_repository import LogRepository
 from ..repositories.page_repository import PageRepository
 from ..repositories.repair_repository import RepairRepository
+from ..utils.job_wakeup import JobWakeup
+from ..utils.metrics import job_queue_depth, job_slot_duration, job_worker_active_slots
 from .base_processor import BaseProcessorService
+from .job_scheduler import JobScheduler
 from .repair_service import validate_stored_source
 
 logger = logging.getLogger(__name__)
 
+# 本文チャンクの検索用属性を1回に書き直すページ数
+_CHUNK_SYNC_BATCH_PAGES = 50
+# 1回の書き直しで処理するバッチ数の上限. 残りは次の間隔で処理する
+_CHUNK_SYNC_MAX_BATCHES = 10
+
 
 class JobWorker:
-    """SQLite の queued ジョブを単一タスクで処理する."""
+    """SQLite の queued ジョブをステージ単位で並行処理する.
+
+    download / llm / vectorize はそれぞれ独立した slot 数を持ち、1ステージを
+    終えたジョブは次ステージとして再キューされる。そのため、あるページの LLM
+    処理中に別ページのダウンロードやベクトル化を進められる。
+
+    キューが空の間は wakeup 通知・slot の空き・停止要求のいずれかまで待機し、
+    poll_interval は通知を取りこぼした場合のフォールバックとしてのみ使う。
+
+    claim したジョブには worker_id のリースが付き、実行中は lease_seconds の
+    1/3 ごとに延長する。リースが切れたジョブは他の worker (または同じ worker の
+    次の claim) が再取得するため、複数 worker を同じ DB に向けても安全に動く。
+
+    chunk_sync_interval が正なら、ページ状態の変化などで書き直し待ちになった
+    本文チャンクの検索用属性を、その間隔とジョブの完了・失敗のたびに書き直す。
+    あわせて、削除に失敗して削除待ちに残った本文チャンクを Weaviate から消す。
+    """
 
     def __init__(
         self,
@@ -25,18 +55,56 @@ class JobWorker:
         processor: BaseProcessorService,
         repair_repo: RepairRepository | None = None,
         poll_interval: float = 0.5,
+        concurrency: int = 1,
+        stage_concurrency: Mapping[PipelineStartStep, int] | None = None,
+        wakeup: JobWakeup | None = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        scheduler: JobScheduler | None = None,
+        chunk_sync_interval: float = 0.0,
     ):
+        """初期化.
+
+        Args:
+            concurrency: stage_concurrency で指定しないステージの slot 数
+            stage_concurrency: ステージごとの slot 数
+            wakeup: ジョブ投入通知の受信口. None の場合はポーリングのみ
+            lease_seconds: claim したジョブのリース期間
+            scheduler: ホスト単位の流量制御. None の場合は優先度順の claim のみ
+            chunk_sync_interval: 本文チャンクの検索用属性を書き直す間隔 (秒).
+                0 なら書き直さない
+        """
+        limits = {stage: concurrency for stage in PipelineStartStep}
+        limits.update(stage_concurrency or {})
+        if any(limit <= 0 for limit in limits.values()):
+            raise ValueError("concurrency must be greater than zero")
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be greater than zero")
         self.job_repo = job_repo
         self.page_repo = page_repo
         self.log_repo = log_repo
         self.processor = processor
         self.repair_repo = repair_repo
         self.poll_interval = poll_interval
+        self.stage_concurrency = limits
+        self.wakeup = wakeup or JobWakeup(socket_path="")
+        self.lease_seconds = lease_seconds
+        self.scheduler = scheduler or JobScheduler(job_repo)
+        self.chunk_sync_interval = chunk_sync_interval
+        self._chunk_sync_requested = asyncio.Event()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
         self._stop_event = asyncio.Event()
         self._task: asyncio.Task[None] | None = None
+        self._slots: dict[asyncio.Task[None], tuple[PipelineStartStep, int, Job]] = {}
+
+    @property
+    def active_jobs(self) -> int:
+        """実行中のジョブスロット数."""
+        return len(self._slots)
 
     async def start(self) -> None:
-        """中断ジョブを復旧してポーリングを開始する."""
+        """リース切れのジョブを復旧してポーリングを開始する."""
+        if self._task is not None and not self._task.done():
+            raise RuntimeError("Job worker is already running")
         await self.job_repo.recover_running()
         self._stop_event.clear()
         self._task = asyncio.create_task(self.run(), name="grimoire-job-worker")
@@ -81,41 +149,245 @@ class JobWorker:
             pass
 
     async def run(self) -> None:
-        """停止要求まで queued ジョブを順番に処理する."""
-        while not self._stop_event.is_set():
-            # stop() と claim の境界で停止要求を受けても、新しいジョブを取得しない。
-            if self._stop_event.is_set():
-                break
-            job = await self.job_repo.claim_next()
-            if job is None:
-                try:
-                    await asyncio.wait_for(
-                        self._stop_event.wait(), timeout=self.poll_interval
-                    )
-                except TimeoutError:
-                    pass
+        """停止要求まで queued ジョブを空き slot のあるステージから処理する.
+
+        停止要求後は新規 claim を止め、実行中の slot がすべて終わるまで待つ。
+        このタスク自体がキャンセルされた場合は実行中の slot もキャンセルし、
+        それらのジョブは running のまま次回起動時の復旧対象になる。
+        """
+        background = [
+            asyncio.create_task(self._heartbeat(), name="grimoire-job-heartbeat")
+        ]
+        if self.chunk_sync_interval > 0:
+            background.append(
+                asyncio.create_task(
+                    self._chunk_attribute_sync_loop(),
+                    name="grimoire-chunk-attribute-sync",
+                )
+            )
+        try:
+            while not self._stop_event.is_set():
+                capacity = self._free_capacity()
+                if not capacity:
+                    await self._wait_for_slot_or_stop(timeout=None)
+                    continue
+                # stop() と claim の境界で停止要求を受けても、新しいジョブを取得しない。
+                if self._stop_event.is_set():
+                    break
+                # claim 中に届いた通知で次の待機がすぐ終わるよう、claim 前に消費する
+                self.wakeup.clear()
+                jobs = await self.scheduler.claim(
+                    capacity, owner=self.worker_id, lease_seconds=self.lease_seconds
+                )
+                if not jobs:
+                    if capacity == self.stage_concurrency:
+                        job_queue_depth.set(0)
+                    # レート制限中のホストがあればトークンの補充時に再確認する
+                    refill = self.scheduler.next_refill_in()
+                    timeout = self.poll_interval
+                    if refill is not None:
+                        timeout = min(timeout, refill)
+                    await self._wait_for_slot_or_stop(timeout=timeout)
+                    continue
+                for job in jobs:
+                    self._start_slot(job)
+                await self._record_queue_depth()
+            await self._drain_slots()
+        except asyncio.CancelledError:
+            slots = list(self._slots)
+            for task in slots:
+                task.cancel()
+            await asyncio.gather(*slots, return_exceptions=True)
+            raise
+        finally:
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+
+    def _free_capacity(self) -> dict[PipelineStartStep, int]:
+        """空き slot があるステージとその空き数を返す."""
+        used = [stage for stage, _, _ in self._slots.values()]
+        capacity = {
+            stage: limit - used.count(stage)
+            for stage, limit in self.stage_concurrency.items()
+        }
+        return {stage: free for stage, free in capacity.items() if free > 0}
+
+    async def _heartbeat(self) -> None:
+        """実行中ジョブのリースを定期的に延長し、失ったジョブは打ち切る."""
+        interval = self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            running = {job.id: task for task, (_, _, job) in self._slots.items()}
+            if not running:
+                continue
+            try:
+                renewed = await self.job_repo.renew_leases(
+                    running, self.worker_id, self.lease_seconds
+                )
+            except Exception:
+                logger.warning("Failed to renew job leases", exc_info=True)
                 continue
-            await self._execute(job.id, job.page_id, job.start_step)
+            for job_id in running.keys() - renewed:
+                # 他の worker が再取得済みなので、二重処理を避けて打ち切る
+                logger.warning("Lost lease for job %s; cancelling its slot", job_id)
+                running[job_id].cancel()
+
+    async def _chunk_attribute_sync_loop(self) -> None:
+        """チャンク属性の書き直し待ちと削除待ちを、間隔ごとと要求時に処理する."""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._chunk_sync_requested.wait(), self.chunk_sync_interval
+                )
+            except TimeoutError:
+                pass
+            self._chunk_sync_requested.clear()
+            try:
+                await self.sync_chunk_attributes()
+            except Exception:
+                logger.warning("Failed to sync chunk attributes", exc_info=True)
+            try:
+                await self.processor.vectorizer.delete_unreferenced_chunks()
+            except Exception:
+                logger.warning("Failed to delete unreferenced chunks", exc_info=True)
+
+    async def sync_chunk_attributes(
+        self, max_batches: int = _CHUNK_SYNC_MAX_BATCHES
+    ) -> int:
+        """書き直し待ちのページの本文チャンクの属性を書き直す.
+
+        待ちがなくなるか max_batches バッチを処理するまで続け、残りは次の呼び出しに
+        回す。
+
+        Returns:
+            書き直したページ数
+        """
+        synced = 0
+        for _ in range(max_batches):
+            pending = await self.page_repo.get_chunk_attribute_sync_batch(
+                _CHUNK_SYNC_BATCH_PAGES
+            )
+            if not pending:
+                break
+            await self.processor.vectorizer.sync_chunk_attributes(list(pending))
+            await self.page_repo.ack_chunk_attribute_sync(pending)
+            synced += len(pending)
+        return synced
+
+    def _start_slot(self, job: Job) -> None:
+        stage = job.next_stage
+        used = {
+            slot for slot_stage, slot, _ in self._slots.values() if slot_stage == stage
+        }
+        slot = next(index for index in range(len(used) + 1) if index not in used)
+        task = asyncio.create_task(
+            self._run_slot(stage, slot, job),
+            name=f"grimoire-job-{stage.value}-{slot}",
+        )
+        self._slots[task] = (stage, slot, job)
+        job_worker_active_slots.add(1, {"stage": stage.value})
+        task.add_done_callback(self._release_slot)
+
+    def _release_slot(self, task: asyncio.Task[None]) -> None:
+        released = self._slots.pop(task, None)
+        if released is not None:
+            job_worker_active_slots.add(-1, {"stage": released[0].value})
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(
+                "Job slot ended with an unrecorded error",
+                exc_info=(type(error), error, error.__traceback__),
+            )
 
-    async def _execute(
-        self, job_id: int, page_id: int, start_step: PipelineStartStep
-    ) -> None:
-        log_id: int | None = None
+    async def _run_slot(self, stage: PipelineStartStep, slot: int, job: Job) -> None:
+        started = time.perf_counter()
+        outcome = "cancelled"
         try:
-            page = await self.page_repo.get_page(page_id)
+            outcome = await self._execute(job)
+        finally:
+            job_slot_duration.record(
+                time.perf_counter() - started,
+                {"stage": stage.value, "slot": str(slot), "status": outcome},
+            )
+
+    async def _wait_for_slot_or_stop(self, timeout: float | None) -> None:
+        """slot の空き・停止要求・タイムアウトのいずれかまで待つ.
+
+        timeout 付きの待機 (キューが空の場合) ではジョブ投入通知でも起きる。
+        """
+        waiters: set[asyncio.Task[Any]] = {asyncio.create_task(self._stop_event.wait())}
+        if timeout is not None:
+            waiters.add(asyncio.create_task(self.wakeup.wait()))
+        try:
+            await asyncio.wait(
+                {*waiters, *self._slots},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _drain_slots(self) -> None:
+        while self._slots:
+            await asyncio.wait(set(self._slots))
+
+    async def _record_queue_depth(self) -> None:
+        try:
+            job_queue_depth.set(await self.job_repo.count_queued())
+        except Exception:
+            logger.debug("Failed to record job queue depth", exc_info=True)
+
+    async def _execute(self, job: Job) -> str:
+        """ジョブの現在ステージを1つ実行する.
+
+        Returns:
+            advanced (次ステージへ再キュー) / succeeded / failed /
+            lease_lost (リースを失っていて結果を書き込まなかった)
+        """
+        log_id = job.log_id
+        try:
+            page = await self.page_repo.get_page(job.page_id)
             if page is None:
                 raise RuntimeError("Page not found")
-            log_id = await self.log_repo.create_log(page.url, "job_started", page_id)
-            await self.processor._run_pipeline_from(
-                page_id, log_id, page.url, start_step, job_id
+            if log_id is None:
+                log_id = await self.log_repo.create_log(
+                    page.url, "job_started", job.page_id
+                )
+            next_stage = await self.processor._run_stage(
+                job.page_id, log_id, page.url, job.next_stage, job.id
             )
-            await self.job_repo.succeed(job_id, page_id)
-            await self._resolve_repair_if_valid(page_id)
+            if next_stage is not None:
+                if not await self.job_repo.advance(
+                    job.id, next_stage, log_id, self.worker_id
+                ):
+                    return self._lease_lost(job)
+                return "advanced"
+            if not await self.job_repo.succeed(job.id, job.page_id, self.worker_id):
+                return self._lease_lost(job)
+            # 検索可能になったページの属性を本文チャンクへすぐ反映する
+            self._chunk_sync_requested.set()
+            await self._resolve_repair_if_valid(job.page_id)
+            return "succeeded"
         except Exception as e:
-            logger.exception("Job %s failed", job_id)
+            logger.exception("Job %s failed", job.id)
             if log_id is not None:
                 await self.log_repo.update_status(log_id, "failed", str(e))
-            await self.job_repo.fail(job_id, page_id, str(e))
+            if not await self.job_repo.fail(
+                job.id, job.page_id, str(e), self.worker_id
+            ):
+                return self._lease_lost(job)
+            self._chunk_sync_requested.set()
+            return "failed"
+
+    @staticmethod
+    def _lease_lost(job: Job) -> str:
+        # 別 worker に回収されたジョブの状態を古い結果で上書きしない
+        logger.warning("Lost lease for job %s; discarding its result", job.id)
+        return "lease_lost"
 
     async def _resolve_repair_if_valid(self, page_id: int) -> None:
         """正常な保存JSONとWeaviate登録を確認して修復済みにする."""
@@ -0,0 +1,248 @@
+"""Process-wide adaptive concurrency control for LLM requests."""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from litellm import RateLimitError, ServiceUnavailableError, Timeout
+
+from ..config import settings
+from ..utils.metrics import (
+    llm_concurrency_limit,
+    llm_overload_signals,
+    llm_requests_queued,
+)
+
+# 基準応答時間を実測に追従させる割合. 最小値へはすぐ下げ、上へはゆっくり戻す
+_BASELINE_DRIFT = 0.01
+_LATENCY_SMOOTHING = 0.2
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """LLM サーバーの過負荷を示すエラーか判定する."""
+    if isinstance(error, RateLimitError | ServiceUnavailableError | Timeout):
+        return True
+    return getattr(error, "status_code", None) in (429, 503)
+
+
+def _size_class(tokens: int | None) -> int:
+    """トークン数を2倍刻みの大きさの区分にする. 不明なら 0."""
+    return tokens.bit_length() if isinstance(tokens, int) and tokens > 0 else 0
+
+
+@dataclass
+class LLMCallTiming:
+    """slot 内のリクエストが governor へ報告する計測値."""
+
+    clock: Callable[[], float] = field(repr=False)
+    first_token_at: float | None = None
+    output_tokens: int | None = None
+
+    def first_token(self) -> None:
+        """ストリーミングで最初のトークンを受け取った時刻を記録する."""
+        if self.first_token_at is None:
+            self.first_token_at = self.clock()
+
+
+@dataclass
+class _LatencyBaseline:
+    """同じ種類・大きさのリクエストの基準応答時間と平滑化した応答時間."""
+
+    baseline: float
+    latency: float
+
+
+class LLMConcurrencyGovernor:
+    """AIMD で LLM への同時リクエスト数を調整する.
+
+    応答時間が基準内の成功ごとに上限を 1/limit ずつ (上限分の往復で +1) 増やし、
+    429・503・タイムアウト、または平滑化した応答時間が基準の latency_tolerance 倍を
+    超えたときに backoff 倍へ下げる。下げた時点より前に開始したリクエストの結果では
+    再度下げないため、1回の混雑で上限が連続して半減することはない。
+
+    応答時間の基準は、リクエストの種類と入力・出力トークン数の区分 (2倍刻み) ごとに
+    持つ。ストリーミングでは出力長に左右されない初回トークンまでの時間を比べるため、
+    短い部分要約の速い応答が長い縮約や生成の基準になることはない。
+    """
+
+    def __init__(
+        self,
+        model: str,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初期化.
+
+        Args:
+            model: メトリクスに付けるモデル名
+            initial_limit: 開始時の同時リクエスト数 (max_limit で頭打ち)
+            max_limit: 増やせる同時リクエスト数の上限
+            min_limit: 下げられる同時リクエスト数の下限
+            latency_tolerance: 過負荷とみなす応答時間の基準比
+            backoff: 過負荷時に上限へ掛ける係数
+        """
+        if min_limit <= 0:
+            raise ValueError("min_limit must be greater than zero")
+        if initial_limit <= 0:
+            raise ValueError("initial_limit must be greater than zero")
+        if max_limit < min_limit:
+            raise ValueError("max_limit must not be smaller than min_limit")
+        if latency_tolerance <= 1:
+            raise ValueError("latency_tolerance must be greater than one")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between zero and one")
+        self.model = model
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._epoch = 0
+        self._baselines: dict[tuple[object, ...], _LatencyBaseline] = {}
+        self._record()
+
+    @property
+    def limit(self) -> int:
+        """現在の同時リクエスト数の上限."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """実行中のリクエスト数."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """空きを待っているリクエスト数."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(
+        self, kind: str = "default", input_tokens: int | None = None
+    ) -> AsyncIterator[LLMCallTiming]:
+        """同時実行枠を確保して LLM リクエストを実行し、結果から上限を調整する.
+
+        Args:
+            kind: 応答時間を比べるリクエストの種類
+            input_tokens: プロンプトのトークン数 (不明なら None)
+
+        Yields:
+            初回トークンの時刻・出力トークン数を報告する計測値
+        """
+        await self._acquire()
+        epoch = self._epoch
+        started = self._clock()
+        timing = LLMCallTiming(self._clock)
+        try:
+            yield timing
+        except BaseException as e:
+            if isinstance(e, Exception) and is_overload_error(e):
+                self._on_overload(epoch, "error")
+            raise
+        else:
+            if timing.first_token_at is not None:
+                key: tuple[object, ...] = ("ttft", kind, _size_class(input_tokens))
+                latency = timing.first_token_at - started
+            else:
+                key = (
+                    "total",
+                    kind,
+                    _size_class(input_tokens),
+                    _size_class(timing.output_tokens),
+                )
+                latency = self._clock() - started
+            self._on_success(epoch, key, latency)
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._record()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 枠を受け取った直後にキャンセルされたら次の待機者へ渡す
+                self._release()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            self._record()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+        self._record()
+
+    def _on_success(self, epoch: int, key: tuple[object, ...], latency: float) -> None:
+        stats = self._baselines.get(key)
+        if stats is None:
+            stats = self._baselines[key] = _LatencyBaseline(latency, latency)
+        elif latency < stats.baseline:
+            stats.baseline = latency
+        else:
+            stats.baseline += (latency - stats.baseline) * _BASELINE_DRIFT
+        stats.latency += (latency - stats.latency) * _LATENCY_SMOOTHING
+        if stats.latency > stats.baseline * self.latency_tolerance:
+            self._on_overload(epoch, "latency")
+            return
+        self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+        self._wake()
+
+    def _on_overload(self, epoch: int, reason: str) -> None:
+        if epoch != self._epoch:
+            return
+        self._epoch += 1
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        # 混雑中の応答時間で基準を汚さないよう平滑値を基準へ戻す
+        for stats in self._baselines.values():
+            stats.latency = stats.baseline
+        llm_overload_signals.add(1, {"model": self.model, "reason": reason})
+        self._record()
+
+    def _record(self) -> None:
+        attributes = {"model": self.model}
+        llm_concurrency_limit.set(self.limit, attributes)
+        llm_requests_queued.set(self.queued, attributes)
+
+
+_governors: dict[str, LLMConcurrencyGovernor] = {}
+
+
+def get_llm_governor(model: str | None = None) -> LLMConcurrencyGovernor:
+    """モデルごとにプロセスで共有する governor を返す."""
+    name = settings.LLM_MODEL if model is None else model
+    governor = _governors.get(name)
+    if governor is None:
+        governor = LLMConcurrencyGovernor(
+            name,
+            initial_limit=settings.LLM_SUMMARY_CONCURRENCY,
+            max_limit=settings.LLM_MODEL_MAX_CONCURRENCY.get(
+                name, settings.LLM_MAX_CONCURRENCY
+            ),
+            latency_tolerance=settings.LLM_LATENCY_TOLERANCE,
+        )
+        _governors[name] = governor
+    return governor
@@ -1,9 +1,11 @@
 """LLM service for summary and keyword generation."""
 
 import asyncio
+import hashlib
 import json
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 from litellm import acompletion, token_counter
@@ -12,11 +14,30 @@ from pydantic import ValidationError
 from ..config import settings
 from ..models.external import FetchedDocument, PartialSummaryResult, SummaryResult
 from ..repositories.file_repository import FileRepository
+from ..repositories.llm_cache_repository import LLMCacheRepository
+from ..repositories.summary_checkpoint_repository import SummaryCheckpointRepository
 from ..utils.exceptions import LLMServiceError
+from ..utils.json_stream import JsonObjectScanner
+from ..utils.metrics import (
+    llm_cache_requests,
+    llm_output_tokens_per_second,
+    llm_summary_checkpoints,
+    llm_time_to_first_token,
+)
+from ..utils.token_count import TokenCounter
 from .chunking_service import ChunkingService
+from .llm_governor import LLMConcurrencyGovernor, get_llm_governor
 
 logger = logging.getLogger(__name__)
 
+# 文書順に並んだ要約タスク. None で終端を表す
+_SummaryQueue = asyncio.Queue["asyncio.Future[str] | None"]
+# (種別, プロンプトの内容ハッシュ) -> 保存済みの途中要約
+_Checkpoints = dict[tuple[str, str], str]
+
+# プロンプトテンプレートや応答の検証方法を変えたら上げ、古いキャッシュを無効化する
+LLM_PROMPT_VERSION = "1"
+
 
 class LLMService:
     """LLM処理サービス."""
@@ -26,9 +47,21 @@ class LLMService:
         file_repo: FileRepository,
         api_key: str | None = None,
         chunking_service: ChunkingService | None = None,
+        cache: LLMCacheRepository | None = None,
+        governor: LLMConcurrencyGovernor | None = None,
+        checkpoints: SummaryCheckpointRepository | None = None,
     ):
-        """初期化."""
+        """初期化.
+
+        Args:
+            cache: LLM 応答のキャッシュ. None の場合は毎回 LLM を呼ぶ
+            governor: 同時リクエスト数の制御. None の場合はモデルごとに
+                プロセスで共有するものを使う
+            checkpoints: 分割要約の途中結果の保存先. None の場合は再開しない
+        """
         self.file_repo = file_repo
+        self.cache = cache
+        self.checkpoints = checkpoints
         self.api_key = api_key or settings.LLM_API_KEY
         self.input_token_limit = (
             settings.LLM_CONTEXT_WINDOW - settings.LLM_MAX_OUTPUT_TOKENS
@@ -40,7 +73,8 @@ class LLMService:
         if settings.LLM_SUMMARY_CONCURRENCY <= 0:
             raise LLMServiceError("LLM_SUMMARY_CONCURRENCY must be greater than zero")
         self.chunking_service = chunking_service
-        self.semaphore = asyncio.Semaphore(settings.LLM_SUMMARY_CONCURRENCY)
+        self.tokens = TokenCounter(self._tokenize)
+        self.governor = governor
 
     async def generate_summary_keywords(self, page_id: int) -> SummaryResult:
         """ページの長さに応じて単発または分割で要約とキーワードを生成する."""
@@ -48,10 +82,9 @@ class LLMService:
             raise LLMServiceError("LLM API key is not configured")
 
         try:
-            raw_jina_data = await self.file_repo.load_json_file(page_id)
             try:
-                document = FetchedDocument.from_jina_response(
-                    raw_jina_data, source_url=f"artifact://page/{page_id}"
+                document = await self.file_repo.load_document(
+                    page_id, source_url=f"artifact://page/{page_id}"
                 )
             except (ValidationError, ValueError, TypeError):
                 raise LLMServiceError(
@@ -60,15 +93,20 @@ class LLMService:
             title = document.title
             content = document.content
 
-            prompt = self._build_prompt(title, content)
-            prompt_tokens = self._count_tokens(prompt)
+            prompt_tokens = self._prompt_tokens(
+                self._build_prompt(title, ""), [content]
+            )
             if prompt_tokens <= self.input_token_limit:
                 logger.info(
                     "LLM summary mode=single page_id=%d input_tokens=%d",
                     page_id,
                     prompt_tokens,
                 )
-                result = await self._complete_json(prompt, require_keywords=True)
+                result = await self._complete_json(
+                    self._build_prompt(title, content),
+                    require_keywords=True,
+                    input_tokens=prompt_tokens,
+                )
                 if not isinstance(result, SummaryResult):
                     raise LLMServiceError("Invalid final LLM response type")
                 return result
@@ -87,15 +125,11 @@ class LLMService:
             chunk_size=max(1, self.input_token_limit // 2)
         )
         raw_chunks = chunking_service.chunk_document(document)
+        overhead = self._count_tokens(self._build_partial_prompt(title, ""))
         chunks: list[str] = []
         for chunk in raw_chunks:
             if chunk.strip():
-                chunks.extend(
-                    self._split_to_fit(
-                        chunk,
-                        lambda value: self._build_partial_prompt(title, value),
-                    )
-                )
+                chunks.extend(self._split_to_fit(chunk, overhead))
         if not chunks:
             raise LLMServiceError(f"No summary chunks generated: page_id={page_id}")
 
@@ -104,127 +138,300 @@ class LLMService:
             page_id,
             len(chunks),
         )
-        summaries = await self._summarize_chunks(page_id, title, chunks)
-        level = 0
-        while self._count_tokens(self._build_final_prompt(title, summaries)) > (
-            self.input_token_limit
-        ):
-            level += 1
-            if level > 20:
-                raise LLMServiceError(
-                    f"Could not reduce summaries within token limit: page_id={page_id}"
-                )
-            summaries = await self._reduce_summaries(page_id, title, summaries, level)
-            logger.info(
-                "LLM summary reduction page_id=%d level=%d summary_count=%d",
+        final_template = self._build_final_prompt(title, [])
+        saved = await self._load_checkpoints(page_id)
+        tasks: set[asyncio.Future[Any]] = set()
+        try:
+            summaries = await self._tree_reduce(
                 page_id,
-                level,
-                len(summaries),
+                title,
+                self._summarize_chunks(page_id, title, chunks, overhead, tasks, saved),
+                tasks,
+                saved,
             )
+        finally:
+            # 失敗時は投入済みの部分要約・縮約を止める. 成功時は全て完了済み
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         result = await self._complete_json(
-            self._build_final_prompt(title, summaries), require_keywords=True
+            self._build_final_prompt(title, summaries),
+            require_keywords=True,
+            input_tokens=self._summaries_tokens(final_template, summaries),
         )
         if not isinstance(result, SummaryResult):
             raise LLMServiceError("Invalid final LLM response type")
+        await self._clear_checkpoints(page_id)
         return result
 
-    async def _summarize_chunks(
-        self, page_id: int, title: str, chunks: list[str]
-    ) -> list[str]:
+    def _summarize_chunks(
+        self,
+        page_id: int,
+        title: str,
+        chunks: list[str],
+        overhead: int,
+        tasks: set[asyncio.Future[Any]],
+        saved: _Checkpoints,
+    ) -> _SummaryQueue:
+        """全チャンクの部分要約を開始し、文書順に結果を取り出すキューを返す."""
+
         async def summarize(index: int, chunk: str) -> str:
             try:
-                result = await self._complete_json(
-                    self._build_partial_prompt(title, chunk), require_keywords=False
+                return await self._checkpointed_summary(
+                    page_id,
+                    "partial",
+                    self._build_partial_prompt(title, chunk),
+                    overhead + self.tokens.total([chunk]),
+                    saved,
                 )
-                return result.summary
             except Exception as e:
                 raise LLMServiceError(
                     "Partial summary failed: "
                     f"page_id={page_id}, chunk={index + 1}/{len(chunks)}, cause={e}"
                 ) from e
 
-        return list(
-            await asyncio.gather(
-                *(summarize(index, chunk) for index, chunk in enumerate(chunks))
-            )
-        )
+        summaries: _SummaryQueue = asyncio.Queue()
+        for index, chunk in enumerate(chunks):
+            task = asyncio.create_task(summarize(index, chunk))
+            tasks.add(task)
+            summaries.put_nowait(task)
+        summaries.put_nowait(None)
+        return summaries
 
-    async def _reduce_summaries(
-        self, page_id: int, title: str, summaries: list[str], level: int
+    async def _tree_reduce(
+        self,
+        page_id: int,
+        title: str,
+        summaries: _SummaryQueue,
+        tasks: set[asyncio.Future[Any]],
+        saved: _Checkpoints,
     ) -> list[str]:
-        pieces: list[str] = []
-        for summary in summaries:
-            pieces.extend(
-                self._split_to_fit(
-                    summary,
-                    lambda value: self._build_reduction_prompt(title, [value]),
+        """要約を文書順に受け取り、最終プロンプトに収まるまで段階的に縮約する.
+
+        各段は入力を先頭から順に待ち、累計が最終プロンプトの予算を超えた時点で
+        縮約が必要と判断して次の段を始める。次の段は前段の完了を待たず、
+        隣接する要約が予算内のグループにまとまり次第縮約を投入するため、遅い
+        チャンクがあっても先行部分の縮約は先に進む。グループ分けは一括処理と同じ
+        貪欲法なので、LLM の呼び出し回数は変わらない。
+        """
+        final_template = self._build_final_prompt(title, [])
+        level = 0
+        while True:
+            received: list[str] = []
+            while (item := await summaries.get()) is not None:
+                received.append(await item)
+                # トークン数はキャッシュ済みなので、毎回の再集計は整数の和で済む
+                if self._summaries_tokens(final_template, received) > (
+                    self.input_token_limit
+                ):
+                    break
+            else:
+                return received
+
+            level += 1
+            if level > 20:
+                raise LLMServiceError(
+                    f"Could not reduce summaries within token limit: page_id={page_id}"
+                )
+            logger.info("LLM summary reduction page_id=%d level=%d", page_id, level)
+            reduced: _SummaryQueue = asyncio.Queue()
+            producer = asyncio.create_task(
+                self._reduce_stream(
+                    page_id, title, level, received, summaries, reduced, tasks, saved
                 )
             )
-        groups = self._group_to_fit(
-            pieces, lambda values: self._build_reduction_prompt(title, values)
+            tasks.add(producer)
+            summaries = reduced
+
+    async def _reduce_stream(
+        self,
+        page_id: int,
+        title: str,
+        level: int,
+        received: list[str],
+        summaries: _SummaryQueue,
+        reduced: _SummaryQueue,
+        tasks: set[asyncio.Future[Any]],
+        saved: _Checkpoints,
+    ) -> None:
+        """到着順に要約を予算内のグループへまとめ、まとまった順に縮約を投入する."""
+        template = self._build_reduction_prompt(title, [])
+        overhead = self._summaries_tokens(template, [""])
+        base = self._count_tokens(template)
+        group_count = 0
+        current: list[str] = []
+        used = base
+
+        def submit(group: list[str]) -> None:
+            nonlocal group_count
+            task = asyncio.create_task(
+                self._reduce_group(page_id, title, level, group_count, group, saved)
+            )
+            group_count += 1
+            tasks.add(task)
+            reduced.put_nowait(task)
+
+        async def arrivals() -> AsyncIterator[str]:
+            for summary in received:
+                yield summary
+            while (item := await summaries.get()) is not None:
+                yield await item
+
+        try:
+            async for summary in arrivals():
+                for piece in self._split_to_fit(summary, overhead):
+                    cost = self.tokens.total(
+                        [self._summary_marker(len(current)), piece]
+                    )
+                    if current and used + cost > self.input_token_limit:
+                        submit(current)
+                        current = []
+                        used = base
+                        cost = self.tokens.total([self._summary_marker(0), piece])
+                    current.append(piece)
+                    used += cost
+            if current:
+                submit(current)
+        except Exception as e:
+            # 前段や分割の失敗は、文書順でその位置にある要素として後段へ伝える
+            failed: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+            failed.set_exception(e)
+            reduced.put_nowait(failed)
+        finally:
+            reduced.put_nowait(None)
+        logger.info(
+            "LLM summary reduction page_id=%d level=%d summary_count=%d",
+            page_id,
+            level,
+            group_count,
         )
 
-        async def reduce_group(index: int, group: list[str]) -> str:
+    async def _reduce_group(
+        self,
+        page_id: int,
+        title: str,
+        level: int,
+        index: int,
+        group: list[str],
+        saved: _Checkpoints,
+    ) -> str:
+        """隣接する要約のグループを1つの要約へ縮約する."""
+        template = self._build_reduction_prompt(title, [])
+        try:
+            return await self._checkpointed_summary(
+                page_id,
+                "reduction",
+                self._build_reduction_prompt(title, group),
+                self._summaries_tokens(template, group),
+                saved,
+            )
+        except Exception as e:
+            raise LLMServiceError(
+                "Summary reduction failed: "
+                f"page_id={page_id}, level={level}, group={index + 1}, cause={e}"
+            ) from e
+
+    async def _checkpointed_summary(
+        self,
+        page_id: int,
+        kind: str,
+        prompt: str,
+        input_tokens: int,
+        saved: _Checkpoints,
+    ) -> str:
+        """保存済みの途中要約があれば再利用し、なければ生成して保存する."""
+        content_hash = _prompt_hash(prompt)
+        summary = saved.get((kind, content_hash))
+        if summary is not None:
+            llm_summary_checkpoints.add(1, {"kind": kind, "result": "resumed"})
+            return summary
+        result = await self._complete_json(
+            prompt, require_keywords=False, input_tokens=input_tokens
+        )
+        if self.checkpoints is not None:
             try:
-                result = await self._complete_json(
-                    self._build_reduction_prompt(title, group),
-                    require_keywords=False,
-                )
-                return result.summary
+                await self.checkpoints.save(page_id, kind, content_hash, result.summary)
+                llm_summary_checkpoints.add(1, {"kind": kind, "result": "saved"})
             except Exception as e:
-                raise LLMServiceError(
-                    "Summary reduction failed: "
-                    f"page_id={page_id}, level={level}, "
-                    f"group={index + 1}/{len(groups)}, "
-                    f"cause={e}"
-                ) from e
+                logger.warning(
+                    "Summary checkpoint save failed page_id=%d: %s", page_id, e
+                )
+        return result.summary
 
-        return list(
-            await asyncio.gather(
-                *(reduce_group(index, group) for index, group in enumerate(groups))
+    async def _load_checkpoints(self, page_id: int) -> _Checkpoints:
+        """前回失敗した分割要約の途中結果を読み込む. 読めなければ最初から行う."""
+        if self.checkpoints is None:
+            return {}
+        try:
+            saved = await self.checkpoints.load(page_id)
+        except Exception as e:
+            logger.warning("Summary checkpoint load failed page_id=%d: %s", page_id, e)
+            return {}
+        if saved:
+            logger.info(
+                "LLM summary resuming page_id=%d checkpoints=%d", page_id, len(saved)
             )
-        )
+        return saved
 
-    def _split_to_fit(
-        self, text: str, prompt_builder: Callable[[str], str]
-    ) -> list[str]:
-        """プロンプトが入力予算に収まるまで文字境界で安全に二分する."""
-        if self._count_tokens(prompt_builder(text)) <= self.input_token_limit:
+    async def _clear_checkpoints(self, page_id: int) -> None:
+        """最終要約の完了後に途中結果を削除する."""
+        if self.checkpoints is None:
+            return
+        try:
+            await self.checkpoints.clear(page_id)
+        except Exception as e:
+            logger.warning(
+                "Summary checkpoint cleanup failed page_id=%d: %s", page_id, e
+            )
+
+    def _split_to_fit(self, text: str, overhead: int) -> list[str]:
+        """テンプレート分 overhead を除いた入力予算に収まるよう本文を分割する."""
+        budget = self.input_token_limit - overhead
+        if self.tokens.total([text]) <= budget:
             return [text]
-        if len(text) <= 1:
-            raise LLMServiceError("Prompt overhead exceeds LLM input token limit")
-        midpoint = len(text) // 2
-        return self._split_to_fit(text[:midpoint], prompt_builder) + self._split_to_fit(
-            text[midpoint:], prompt_builder
-        )
+        try:
+            return self.tokens.split(text, budget)
+        except ValueError:
+            raise LLMServiceError(
+                "Prompt overhead exceeds LLM input token limit"
+            ) from None
 
-    def _group_to_fit(
-        self,
-        values: list[str],
-        prompt_builder: Callable[[list[str]], str],
-    ) -> list[list[str]]:
-        """順序を保ったまま入力予算内のグループにまとめる."""
-        groups: list[list[str]] = []
-        current: list[str] = []
-        for value in values:
-            candidate = [*current, value]
-            if current and self._count_tokens(prompt_builder(candidate)) > (
-                self.input_token_limit
-            ):
-                groups.append(current)
-                current = [value]
-            else:
-                current = candidate
-        if current:
-            groups.append(current)
-        return groups
+    def _prompt_tokens(self, template: str, pieces: list[str]) -> int:
+        """テンプレートと差し込む部品のトークン数からプロンプト長を見積もる."""
+        return self._count_tokens(template) + self.tokens.total(pieces)
+
+    def _summaries_tokens(self, template: str, summaries: list[str]) -> int:
+        """番号付き要約一覧を差し込んだプロンプト長を見積もる."""
+        markers = [self._summary_marker(index) for index in range(len(summaries))]
+        return self._prompt_tokens(template, [*markers, *summaries])
+
+    @staticmethod
+    def _summary_marker(index: int) -> str:
+        """要約一覧で各要約の前に付く区切りと番号."""
+        return f"\n\n[{index + 1}] "
 
     async def _complete_json(
-        self, prompt: str, *, require_keywords: bool
+        self, prompt: str, *, require_keywords: bool, input_tokens: int | None = None
     ) -> PartialSummaryResult | SummaryResult:
-        """上限を検証してLLMを呼び、JSON応答を検証する."""
-        input_tokens = self._count_tokens(prompt)
+        """上限を検証してLLMを呼び、JSON応答を検証する.
+
+        同じモデル・プロンプト版・プロンプト内容の検証済み応答がキャッシュに
+        あれば、LLM を呼ばずにそれを返す。
+
+        Args:
+            input_tokens: 部品ごとの集計で見積もり済みのプロンプト長.
+                None の場合はプロンプト全体を数える
+        """
+        model = SummaryResult if require_keywords else PartialSummaryResult
+        kind = "summary" if require_keywords else "partial"
+        content_hash = _prompt_hash(prompt)
+        cached = await self._load_cached(model, kind, content_hash)
+        if cached is not None:
+            return cached
+
+        if input_tokens is None:
+            input_tokens = self._count_tokens(prompt)
         if input_tokens > self.input_token_limit:
             raise LLMServiceError(
                 f"LLM input token limit exceeded: {input_tokens} > "
@@ -242,18 +449,10 @@ class LLMService:
         if settings.LLM_API_BASE:
             kwargs["api_base"] = settings.LLM_API_BASE
 
-        try:
-            async with self.semaphore:
-                response = await acompletion(**kwargs)
-        except Exception:
-            raise LLMServiceError("LLM request failed") from None
-        try:
-            response_dict = response.model_dump()
-            response_content = str(response_dict["choices"][0]["message"]["content"])
-        except Exception:
-            raise LLMServiceError(
-                "Failed to extract content from LLM response"
-            ) from None
+        if settings.LLM_STREAMING:
+            response_content = await self._stream_content(kwargs, kind, input_tokens)
+        else:
+            response_content = await self._request_content(kwargs, kind, input_tokens)
         if not response_content.strip():
             raise LLMServiceError("Empty response from LLM")
 
@@ -262,30 +461,146 @@ class LLMService:
         except json.JSONDecodeError:
             raise LLMServiceError("Failed to parse LLM response as JSON") from None
         try:
-            model = SummaryResult if require_keywords else PartialSummaryResult
-            return model.model_validate(result)
+            validated = model.model_validate(result)
         except ValidationError as e:
             fields = sorted(
                 {str(error["loc"][-1]) for error in e.errors() if error.get("loc")}
             )
             detail = f": {', '.join(fields)}" if fields else ""
             raise LLMServiceError(f"Invalid LLM response format{detail}") from None
+        await self._store_cached(kind, content_hash, validated)
+        return validated
+
+    async def _request_content(
+        self, kwargs: dict[str, Any], kind: str, input_tokens: int
+    ) -> str:
+        """LLM の応答全体を待って本文を返す."""
+        try:
+            governor = self.governor or get_llm_governor(settings.LLM_MODEL)
+            async with governor.slot(kind, input_tokens) as timing:
+                response = await acompletion(**kwargs)
+                usage = getattr(response, "usage", None)
+                timing.output_tokens = getattr(usage, "completion_tokens", None)
+        except Exception:
+            raise LLMServiceError("LLM request failed") from None
+        try:
+            response_dict = response.model_dump()
+            return str(response_dict["choices"][0]["message"]["content"])
+        except Exception:
+            raise LLMServiceError(
+                "Failed to extract content from LLM response"
+            ) from None
+
+    async def _stream_content(
+        self, kwargs: dict[str, Any], kind: str, input_tokens: int
+    ) -> str:
+        """LLM の応答を逐次受け取り、JSON オブジェクトが閉じた時点で打ち切る.
+
+        JSON として成立しない出力は生成完了を待たずに中断し、呼び出し側の
+        retry を早める。
+        """
+        attributes = {"model": str(kwargs["model"])}
+        scanner = JsonObjectScanner()
+        parts: list[str] = []
+        first_token_at: float | None = None
+        try:
+            governor = self.governor or get_llm_governor(settings.LLM_MODEL)
+            async with governor.slot(kind, input_tokens) as timing:
+                started = time.monotonic()
+                stream = await acompletion(**kwargs, stream=True)
+                try:
+                    async for chunk in stream:
+                        delta = (
+                            chunk.choices[0].delta.content if chunk.choices else None
+                        )
+                        if not delta:
+                            continue
+                        if first_token_at is None:
+                            timing.first_token()
+                            first_token_at = time.monotonic()
+                            llm_time_to_first_token.record(
+                                first_token_at - started, attributes
+                            )
+                        parts.append(delta)
+                        try:
+                            end = scanner.feed(delta)
+                        except ValueError:
+                            raise LLMServiceError(
+                                "Failed to parse LLM response as JSON"
+                            ) from None
+                        if end is not None:
+                            return "".join(parts)[:end]
+                finally:
+                    await _close_stream(stream)
+                    if first_token_at is not None and len(parts) > 1:
+                        elapsed = time.monotonic() - first_token_at
+                        if elapsed > 0:
+                            # チャンク数ではなく初回以降の出力をトークナイザーで数える
+                            output_tokens = self._tokenize("".join(parts[1:]))
+                            llm_output_tokens_per_second.record(
+                                output_tokens / elapsed, attributes
+                            )
+        except LLMServiceError:
+            raise
+        except Exception:
+            raise LLMServiceError("LLM request failed") from None
+        return "".join(parts)
+
+    async def _load_cached(
+        self,
+        model: type[PartialSummaryResult] | type[SummaryResult],
+        kind: str,
+        content_hash: str,
+    ) -> PartialSummaryResult | SummaryResult | None:
+        """キャッシュ済みの検証済み応答を返す. 読めない場合は None."""
+        if self.cache is None:
+            return None
+        try:
+            cached = await self.cache.get(
+                settings.LLM_MODEL, LLM_PROMPT_VERSION, kind, content_hash
+            )
+            result = None if cached is None else model.model_validate_json(cached)
+        except Exception as e:
+            logger.warning("LLM cache lookup failed: %s", e)
+            result = None
+        llm_cache_requests.add(
+            1, {"kind": kind, "result": "miss" if result is None else "hit"}
+        )
+        return result
+
+    async def _store_cached(
+        self, kind: str, content_hash: str, result: PartialSummaryResult
+    ) -> None:
+        """検証済み応答をキャッシュへ保存する. 失敗しても処理は続ける."""
+        if self.cache is None:
+            return
+        try:
+            await self.cache.put(
+                settings.LLM_MODEL,
+                LLM_PROMPT_VERSION,
+                kind,
+                content_hash,
+                result.model_dump_json(),
+            )
+        except Exception as e:
+            logger.warning("LLM cache store failed: %s", e)
 
     def _count_tokens(self, prompt: str) -> int:
+        """プロンプト1件分のトークン数にメッセージ形式の余白を加える."""
+        return self.tokens.count(prompt) + 16
+
+    def _tokenize(self, text: str) -> int:
         """モデルのトークナイザーを使い、失敗時はUTF-8バイト数で安全側に推定する."""
         try:
-            return (
-                int(
-                    token_counter(
-                        model=settings.LLM_MODEL,
-                        text=prompt,
-                        default_token_count=len(prompt.encode("utf-8")),
-                    )
+            return int(
+                token_counter(
+                    model=settings.LLM_MODEL,
+                    text=text,
+                    default_token_count=len(text.encode("utf-8")),
                 )
-                + 16
             )
         except Exception as e:
-            estimated = len(prompt.encode("utf-8")) + 16
+            estimated = len(text.encode("utf-8"))
             logger.warning(
                 "Token counting failed; using conservative estimate=%d: %s",
                 estimated,
@@ -364,3 +679,22 @@ class LLMService:
 
 - 要約は内容の要点を200文字程度でまとめる
 - キーワードは検索に有用な重要語を重複なく20個生成する"""
+
+
+def _prompt_hash(prompt: str) -> str:
+    """プロンプトの内容ハッシュ. テンプレートと差し込んだ内容の両方を含む."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+async def _close_stream(stream: Any) -> None:
+    """打ち切ったストリームの接続をベストエフォートで閉じる."""
+    inner = getattr(stream, "completion_stream", stream)
+    close = getattr(inner, "aclose", None) or getattr(inner, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception as e:
+        logger.debug("Failed to close LLM stream: %s", e)
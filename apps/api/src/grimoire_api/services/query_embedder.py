@@ -0,0 +1,107 @@
+"""Cached embeddings of search queries."""
+
+import logging
+import unicodedata
+from collections import OrderedDict
+
+from litellm import aembedding
+
+from ..config import settings
+from ..repositories.query_embedding_cache_repository import (
+    QueryEmbeddingCacheRepository,
+)
+from ..utils.metrics import search_query_embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbedder:
+    """検索クエリの埋め込みを作り、プロセス内の LRU と永続キャッシュに保持する.
+
+    Weaviate の near_text はクエリごとに OpenAI で埋め込みを作り直すため、
+    ここで作った埋め込みを near_vector で渡して、同じクエリの2回目以降は外部 API を
+    呼ばずに済ませる。model は Weaviate の text2vec_openai と同じモデルにすること。
+    """
+
+    def __init__(
+        self,
+        model: str,
+        api_key: str | None = None,
+        max_entries: int | None = None,
+        store: QueryEmbeddingCacheRepository | None = None,
+    ):
+        """初期化.
+
+        Args:
+            model: 埋め込みモデル名
+            api_key: OpenAI の API キー. None なら OPENAI_API_KEY
+            max_entries: プロセス内に保持するクエリ数の上限. 0 で保持しない
+            store: 永続キャッシュ. None の場合はプロセス内だけに保持する
+        """
+        self.model = model
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.max_entries = (
+            settings.SEARCH_EMBEDDING_CACHE_SIZE if max_entries is None else max_entries
+        )
+        if self.max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+        self.store = store
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """表記揺れと前後・連続する空白を除いたクエリを返す."""
+        return " ".join(unicodedata.normalize("NFKC", query).split())
+
+    async def embed(self, query: str) -> list[float]:
+        """正規化したクエリの埋め込みを返す.
+
+        Raises:
+            Exception: キャッシュになく、埋め込みの作成にも失敗した場合
+        """
+        text = self.normalize(query)
+        vector = self._entries.get(text)
+        if vector is not None:
+            self._entries.move_to_end(text)
+            search_query_embeddings.add(1, {"result": "memory"})
+            return vector
+
+        vector = await self._load_stored(text)
+        if vector is not None:
+            search_query_embeddings.add(1, {"result": "persistent"})
+        else:
+            search_query_embeddings.add(1, {"result": "miss"})
+            response = await aembedding(
+                model=self.model, input=[text], api_key=self.api_key
+            )
+            vector = [float(value) for value in response.data[0]["embedding"]]
+            await self._store(text, vector)
+        self._remember(text, vector)
+        return vector
+
+    def _remember(self, text: str, vector: list[float]) -> None:
+        if self.max_entries == 0:
+            return
+        self._entries[text] = vector
+        self._entries.move_to_end(text)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load_stored(self, text: str) -> list[float] | None:
+        """永続キャッシュから読む. 読めない場合は None."""
+        if self.store is None:
+            return None
+        try:
+            return await self.store.get(self.model, text)
+        except Exception as e:
+            logger.warning("Query embedding cache lookup failed: %s", e)
+            return None
+
+    async def _store(self, text: str, vector: list[float]) -> None:
+        """永続キャッシュへ保存する. 失敗しても検索は続ける."""
+        if self.store is None:
+            return
+        try:
+            await self.store.put(self.model, text, vector)
+        except Exception as e:
+            logger.warning("Query embedding cache store failed: %s", e)
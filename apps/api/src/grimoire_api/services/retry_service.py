@@ -5,6 +5,7 @@ from typing import Any
 
 from ..models.database import (
     JobKind,
+    JobPriority,
     PageStatus,
     PipelineStartStep,
     ProcessingStep,
@@ -69,8 +70,15 @@ class RetryService(BaseProcessorService):
         else:
             return PipelineStartStep.DOWNLOAD
 
-    async def retry_single_page(self, page_id: int) -> dict[str, Any]:
-        """単一ページの再処理."""
+    async def retry_single_page(
+        self, page_id: int, priority: JobPriority | None = None
+    ) -> dict[str, Any]:
+        """単一ページの再処理.
+
+        Args:
+            page_id: ページID
+            priority: ジョブ優先度. None の場合はジョブ種別の既定値
+        """
         try:
             page = await self.page_repo.get_page(page_id)
             if not page:
@@ -83,7 +91,9 @@ class RetryService(BaseProcessorService):
 
             if self.job_repo is None:
                 raise GrimoireAPIError("Job repository is not configured")
-            job_id = await self._enqueue_job(page_id, JobKind.RETRY, start_point)
+            job_id = await self._enqueue_job(
+                page_id, JobKind.RETRY, start_point, priority
+            )
 
             return {
                 "status": "retry_started",
@@ -136,12 +146,13 @@ class RetryService(BaseProcessorService):
         page_id: int,
         kind: JobKind,
         start_point: PipelineStartStep,
+        priority: JobPriority | None = None,
     ) -> int:
         """Enqueue a job and turn an active-job uniqueness race into a conflict."""
         if self.job_repo is None:
             raise GrimoireAPIError("Job repository is not configured")
         try:
-            return await self.job_repo.enqueue(page_id, kind, start_point)
+            return await self.job_repo.enqueue(page_id, kind, start_point, priority)
         except DatabaseError:
             if await self.job_repo.has_active_for_page(page_id):
                 raise ResourceConflictError("An active job already exists") from None
@@ -168,7 +179,9 @@ class RetryService(BaseProcessorService):
                 try:
                     if page.id is None:
                         continue
-                    result = await self.retry_single_page(page.id)
+                    result = await self.retry_single_page(
+                        page.id, priority=JobPriority.BATCH
+                    )
                     job_ids.append(result["job_id"])
                     retry_count += 1
 
@@ -0,0 +1,86 @@
+"""In-process cache of search results."""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from ..models.response import SearchResult
+from ..utils.metrics import (
+    search_result_cache_requests,
+    search_result_cache_saved_seconds,
+)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    generation: int
+    expires_at: float
+    elapsed: float
+    results: list[SearchResult]
+
+
+class SearchResultCache:
+    """同じ条件の検索結果を保持する LRU.
+
+    エントリは保存時の索引の世代 (PageRepository.get_index_generation) を持ち、
+    世代が進んだか ttl 秒を過ぎたものは使わない。件数が max_entries を超えたら
+    最終利用が古いものから捨てる。
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        """初期化.
+
+        Args:
+            max_entries: 保持する検索条件の数の上限
+            ttl: 保存してから結果を使う秒数
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than zero")
+        if ttl <= 0:
+            raise ValueError("ttl must be greater than zero")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """検索の種類と引数からキーを作る. dict はキーの順序によらない."""
+        return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+    def get(self, key: str, generation: int) -> list[SearchResult] | None:
+        """現在の索引の世代で有効な検索結果を返す."""
+        entry = self._entries.get(key)
+        if entry is None:
+            result = "miss"
+        elif entry.generation != generation:
+            result = "invalidated"
+        elif entry.expires_at <= time.monotonic():
+            result = "expired"
+        else:
+            result = "hit"
+        search_result_cache_requests.add(1, {"result": result})
+        if entry is None:
+            return None
+        if result != "hit":
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        search_result_cache_saved_seconds.record(entry.elapsed)
+        return list(entry.results)
+
+    def put(
+        self,
+        key: str,
+        generation: int,
+        results: list[SearchResult],
+        elapsed: float,
+    ) -> None:
+        """検索結果を、検索前に読んだ索引の世代と検索にかかった秒数とともに保存する."""
+        self._entries[key] = _Entry(
+            generation, time.monotonic() + self.ttl, elapsed, list(results)
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
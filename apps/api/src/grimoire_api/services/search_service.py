@@ -1,7 +1,10 @@
 """Search service for the separated Weaviate page and chunk models."""
 
 import asyncio
-from collections.abc import Awaitable, Callable
+import logging
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
 from typing import Any
 
 import weaviate
@@ -11,12 +14,81 @@ from ..config import settings
 from ..models.database import Page
 from ..models.response import SearchResult
 from ..repositories.page_repository import PageRepository
+from ..utils.datetime import as_utc
 from ..utils.exceptions import VectorizerError
+from ..utils.metrics import search_filter_plans
+from .query_embedder import QueryEmbedder
+from .search_result_cache import SearchResultCache
+
+logger = logging.getLogger(__name__)
 
 _PAGE_VECTORS = frozenset({"title_vector", "memo_vector"})
 _CONTENT_VECTOR = "content_vector"
 _CANDIDATE_BATCH_SIZE = 100
 _MAX_CANDIDATES = 1000
+# ページ代表コレクションで Weaviate に評価させるフィルタ.
+# URL の部分一致と除外キーワードは単語分割で取りこぼすため SQLite だけで判定する
+_PAGE_PUSHDOWN_KEYS = ("keywords", "date_from", "date_to")
+# Weaviate の単語分割で余分に一致しうるため SQLite でも判定するフィルタ
+_PAGE_RECHECK_KEYS = ("url", "keywords")
+# 条件に合うページがないことを表す絞り込み条件
+_NO_MATCH = object()
+# ハイブリッド検索の既定の検索対象と、各ベクトルで limit の何倍を取得するか
+_HYBRID_VECTORS = ("title_vector", "memo_vector", "content_vector")
+_HYBRID_OVERFETCH = 3
+_FUSIONS = frozenset({"rrf", "weighted"})
+# Reciprocal Rank Fusion の順位に足す定数 (原論文の既定値)
+_RRF_K = 60
+
+
+def _fuse_results(
+    ranked: dict[str, list[SearchResult]],
+    fusion: str,
+    weights: dict[str, float],
+    limit: int,
+) -> list[SearchResult]:
+    """ベクトルごとの検索結果をページ単位で統合し、スコアの高い順に返す.
+
+    各ベクトルの結果はページごとに最上位の1件だけを数える。本文チャンクの結果が
+    あるページは、その中で最も近いチャンクを返す。
+    """
+    scores: dict[int, float] = {}
+    best: dict[int, SearchResult] = {}
+    for vector_name, results in ranked.items():
+        weight = weights.get(vector_name, 1.0)
+        rank = 0
+        seen: set[int] = set()
+        for result in results:
+            if result.page_id in seen:
+                continue
+            seen.add(result.page_id)
+            rank += 1
+            contribution = 1.0 / (_RRF_K + rank) if fusion == "rrf" else result.score
+            scores[result.page_id] = (
+                scores.get(result.page_id, 0.0) + weight * contribution
+            )
+            if result.page_id not in best or vector_name == _CONTENT_VECTOR:
+                best[result.page_id] = result
+    ordered = sorted(scores, key=lambda page_id: (-scores[page_id], page_id))
+    return [
+        best[page_id].model_copy(update={"score": scores[page_id]})
+        for page_id in ordered[:limit]
+    ]
+
+
+@dataclass(frozen=True)
+class _FilterPlan:
+    """1回の検索で Weaviate に渡す条件と、取得後に SQLite で判定する条件."""
+
+    # none: 条件なし / attributes: チャンクに複製したページ属性で絞り込む /
+    # pushdown: Weaviate で絞り込む / post_filter: 取得後に SQLite で絞り込む /
+    # empty: 条件に合うページがない
+    strategy: str
+    weaviate_filter: Any = None
+    filters: dict | None = None
+    exclude_keywords: list[str] | None = None
+    # 最初の取得件数. None なら _CANDIDATE_BATCH_SIZE
+    first_batch: int | None = None
 
 
 class SearchService:
@@ -26,9 +98,20 @@ class SearchService:
         self,
         weaviate_client: weaviate.WeaviateClient,
         page_repo: PageRepository | None = None,
+        query_embedder: QueryEmbedder | None = None,
+        result_cache: SearchResultCache | None = None,
     ):
+        """初期化.
+
+        Args:
+            query_embedder: クエリの埋め込み. None の場合は Weaviate の
+                near_text でクエリごとに埋め込みを作らせる
+            result_cache: 検索結果のキャッシュ. None の場合は毎回検索する
+        """
         self.weaviate_client = weaviate_client
         self.page_repo = page_repo or PageRepository()
+        self.query_embedder = query_embedder
+        self.result_cache = result_cache
 
     async def vector_search(
         self,
@@ -42,22 +125,112 @@ class SearchService:
         if vector_name not in {*_PAGE_VECTORS, _CONTENT_VECTOR}:
             raise VectorizerError(f"Unsupported vector name: {vector_name}")
 
+        async def search() -> list[SearchResult]:
+            vector = await self._embed_query(query)
+            return await self._search_vector(
+                query, vector, limit, filters, vector_name, exclude_keywords
+            )
+
         try:
-            if vector_name == _CONTENT_VECTOR:
-                return await self._content_vector_search(
-                    query, limit, filters, exclude_keywords
-                )
-            return await self._page_vector_search(
-                query, limit, filters, vector_name, exclude_keywords
+            return await self._cached_search(
+                ("vector", query, limit, filters, vector_name, exclude_keywords),
+                search,
             )
         except VectorizerError:
             raise
         except Exception as e:
             raise VectorizerError(f"Vector search error: {str(e)}")
 
+    async def hybrid_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: dict | None = None,
+        vector_names: Sequence[str] = _HYBRID_VECTORS,
+        exclude_keywords: list[str] | None = None,
+        fusion: str = "rrf",
+        weights: dict[str, float] | None = None,
+    ) -> list[SearchResult]:
+        """複数のベクトルを並行して検索し、結果をページ単位で統合する.
+
+        クエリの埋め込みは1回だけ作り、各ベクトルの検索に使う。統合後の結果は
+        ページごとに1件で、本文チャンク検索で最も近いチャンクを持つ。score は
+        統合したスコアになる。
+
+        Args:
+            vector_names: 検索するベクトル
+            fusion: "rrf" なら順位の逆数 (Reciprocal Rank Fusion)、"weighted" なら
+                certainty をベクトルごとの重みで足し合わせる
+            weights: ベクトルごとの重み. 指定のないベクトルは 1.0
+        """
+        vector_names = list(dict.fromkeys(vector_names))
+        unsupported = set(vector_names) - {*_PAGE_VECTORS, _CONTENT_VECTOR}
+        if not vector_names:
+            raise VectorizerError("At least one vector name is required")
+        if unsupported:
+            raise VectorizerError(f"Unsupported vector names: {sorted(unsupported)}")
+        if fusion not in _FUSIONS:
+            raise VectorizerError(f"Unsupported fusion: {fusion}")
+        # 統合で順位が入れ替わるため、各ベクトルで limit より多めに取得する
+        sub_limit = max(limit, min(limit * _HYBRID_OVERFETCH, _CANDIDATE_BATCH_SIZE))
+
+        async def search() -> list[SearchResult]:
+            vector = await self._embed_query(query)
+            ranked = await asyncio.gather(
+                *(
+                    self._search_vector(
+                        query, vector, sub_limit, filters, name, exclude_keywords
+                    )
+                    for name in vector_names
+                )
+            )
+            return _fuse_results(
+                dict(zip(vector_names, ranked, strict=True)),
+                fusion,
+                weights or {},
+                limit,
+            )
+
+        try:
+            return await self._cached_search(
+                (
+                    "hybrid",
+                    query,
+                    limit,
+                    filters,
+                    vector_names,
+                    exclude_keywords,
+                    fusion,
+                    weights,
+                ),
+                search,
+            )
+        except VectorizerError:
+            raise
+        except Exception as e:
+            raise VectorizerError(f"Hybrid search error: {str(e)}")
+
+    async def _search_vector(
+        self,
+        query: str,
+        vector: list[float] | None,
+        limit: int,
+        filters: dict | None,
+        vector_name: str,
+        exclude_keywords: list[str] | None,
+    ) -> list[SearchResult]:
+        if vector_name == _CONTENT_VECTOR:
+            return await self._content_vector_search(
+                query, vector, limit, filters, exclude_keywords
+            )
+        return await self._page_vector_search(
+            query, vector, limit, filters, vector_name, exclude_keywords
+        )
+
     async def _content_vector_search(
         self,
         query: str,
+        vector: list[float] | None,
         limit: int,
         filters: dict | None,
         exclude_keywords: list[str] | None,
@@ -65,34 +238,39 @@ class SearchService:
         collection = self.weaviate_client.collections.get(
             settings.WEAVIATE_CHUNK_COLLECTION_NAME
         )
+        plan = await self._plan_chunk_filters(limit, filters, exclude_keywords)
+        if plan.strategy == "empty":
+            return []
 
         async def fetch_batch(batch_limit: int, offset: int) -> Any:
-            return await asyncio.to_thread(
-                collection.query.near_text,
-                query=query,
+            return await self._near_query(
+                collection,
+                query,
+                vector,
                 target_vector=_CONTENT_VECTOR,
                 limit=batch_limit,
                 offset=offset,
-                filters=None,
+                filters=plan.weaviate_filter,
                 return_metadata=MetadataQuery(certainty=True),
             )
 
         candidates = await self._collect_searchable_candidates(
-            fetch_batch, limit, filters, exclude_keywords
+            fetch_batch, limit, plan.filters, plan.exclude_keywords, plan.first_batch
         )
         return [
             self._result_from_page(
                 page=page,
                 score=self._score(obj),
-                chunk_id=int(obj.properties.get("chunkId", 0)),
+                chunk_id=chunk_id,
                 content=obj.properties.get("content", ""),
             )
-            for obj, page in candidates
+            for obj, page, chunk_id in candidates
         ]
 
     async def _page_vector_search(
         self,
         query: str,
+        vector: list[float] | None,
         limit: int,
         filters: dict | None,
         vector_name: str,
@@ -101,26 +279,54 @@ class SearchService:
         collection = self.weaviate_client.collections.get(
             settings.WEAVIATE_PAGE_COLLECTION_NAME
         )
+        plan = self._plan_page_filters(filters, exclude_keywords)
 
         async def fetch_batch(batch_limit: int, offset: int) -> Any:
-            return await asyncio.to_thread(
-                collection.query.near_text,
-                query=query,
+            return await self._near_query(
+                collection,
+                query,
+                vector,
                 target_vector=vector_name,
                 limit=batch_limit,
                 offset=offset,
-                filters=None,
+                filters=plan.weaviate_filter,
                 return_metadata=MetadataQuery(certainty=True),
             )
 
         candidates = await self._collect_searchable_candidates(
-            fetch_batch, limit, filters, exclude_keywords
+            fetch_batch, limit, plan.filters, plan.exclude_keywords
         )
         return [
             self._result_from_page(page, self._score(obj), 0, "")
-            for obj, page in candidates
+            for obj, page, _ in candidates
         ]
 
+    async def _embed_query(self, query: str) -> list[float] | None:
+        """キャッシュ済みか新たに作ったクエリの埋め込みを返す.
+
+        埋め込みを使わない設定か作成に失敗した場合は None を返し、near_text に任せる。
+        """
+        if self.query_embedder is None:
+            return None
+        try:
+            return await self.query_embedder.embed(query)
+        except Exception as e:
+            logger.warning("Query embedding failed; falling back to near_text: %s", e)
+            return None
+
+    @staticmethod
+    async def _near_query(
+        collection: Any, query: str, vector: list[float] | None, **kwargs: Any
+    ) -> Any:
+        """埋め込みがあれば near_vector、なければ near_text で検索する."""
+        if vector is None:
+            return await asyncio.to_thread(
+                collection.query.near_text, query=query, **kwargs
+            )
+        return await asyncio.to_thread(
+            collection.query.near_vector, near_vector=vector, **kwargs
+        )
+
     async def keyword_search(
         self, keywords: list[str], limit: int = 5
     ) -> list[SearchResult]:
@@ -139,58 +345,258 @@ class SearchService:
                     offset=offset,
                 )
 
-            candidates = await self._collect_searchable_candidates(
-                fetch_batch,
-                limit,
-                {"keywords": keywords},
-                None,
-            )
-            return [
-                self._result_from_page(page, self._score(obj), 0, "")
-                for obj, page in candidates
-            ]
+            async def search() -> list[SearchResult]:
+                candidates = await self._collect_searchable_candidates(
+                    fetch_batch,
+                    limit,
+                    {"keywords": keywords},
+                    None,
+                )
+                return [
+                    self._result_from_page(page, self._score(obj), 0, "")
+                    for obj, page, _ in candidates
+                ]
+
+            return await self._cached_search(("keywords", keywords, limit), search)
         except Exception as e:
             raise VectorizerError(f"Keyword search error: {str(e)}")
 
+    async def _cached_search(
+        self,
+        key: tuple[Any, ...],
+        search: Callable[[], Awaitable[list[SearchResult]]],
+    ) -> list[SearchResult]:
+        """索引の世代が変わらない間は、同じ条件の検索結果をキャッシュから返す.
+
+        世代は検索前に読むため、検索中に索引が変わった結果は次回に破棄される。
+        """
+        if self.result_cache is None:
+            return await search()
+        cache_key = self.result_cache.make_key(*key)
+        generation = await self.page_repo.get_index_generation()
+        cached = self.result_cache.get(cache_key, generation)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        results = await search()
+        self.result_cache.put(
+            cache_key, generation, results, time.perf_counter() - started
+        )
+        return results
+
     async def _collect_searchable_candidates(
         self,
         fetch_batch: Callable[[int, int], Awaitable[Any]],
         limit: int,
         filters: dict | None,
         exclude_keywords: list[str] | None,
-    ) -> list[tuple[Any, Page]]:
-        """固定サイズで候補を取得し、SQLiteを正として検索可否を判定する."""
-        results: list[tuple[Any, Page]] = []
+        first_batch: int | None = None,
+    ) -> list[tuple[Any, Page, int]]:
+        """固定サイズで候補を取得し、SQLiteを正として検索可否を判定する.
+
+        複数ページが共有する本文チャンクは、参照するページごとに
+        (オブジェクト, ページ, チャンクID) の候補にする。first_batch を指定すると
+        最初はその件数だけ取得し、不足した場合に固定サイズで補充する。
+        """
+        results: list[tuple[Any, Page, int]] = []
         offset = 0
+        batch_size = first_batch or _CANDIDATE_BATCH_SIZE
         while len(results) < limit and offset < _MAX_CANDIDATES:
-            batch_limit = min(_CANDIDATE_BATCH_SIZE, _MAX_CANDIDATES - offset)
+            batch_limit = min(batch_size, _MAX_CANDIDATES - offset)
+            batch_size = _CANDIDATE_BATCH_SIZE
             response = await fetch_batch(batch_limit, offset)
             objects = response.objects
             if not objects:
                 break
 
+            owners = await self._owners_by_object(objects)
             page_ids = list(
-                dict.fromkeys(
-                    int(obj.properties.get("pageId", 0))
-                    for obj in objects
-                    if obj.properties.get("pageId")
-                )
+                dict.fromkeys(page_id for refs in owners for page_id, _ in refs)
             )
             pages = await self.page_repo.get_searchable_pages_by_ids(
                 page_ids, filters, exclude_keywords
             )
-            for obj in objects:
-                page = pages.get(int(obj.properties.get("pageId", 0)))
-                if page is not None:
-                    results.append((obj, page))
-                    if len(results) == limit:
-                        break
+            for obj, refs in zip(objects, owners, strict=True):
+                for page_id, chunk_id in refs:
+                    page = pages.get(page_id)
+                    if page is not None and len(results) < limit:
+                        results.append((obj, page, chunk_id))
+                if len(results) == limit:
+                    break
 
             offset += len(objects)
             if len(objects) < batch_limit:
                 break
         return results
 
+    async def _owners_by_object(
+        self, objects: list[Any]
+    ) -> list[list[tuple[int, int]]]:
+        """各オブジェクトを参照する (ページID, チャンクID) を返す.
+
+        ページ ID を持つオブジェクトはそのページ、内容ハッシュで共有される
+        本文チャンクは page_chunks に記録された全ページを参照元とする。
+        """
+        shared = [
+            obj.properties["chunkHash"]
+            for obj in objects
+            if not obj.properties.get("pageId") and obj.properties.get("chunkHash")
+        ]
+        chunk_owners = await self.page_repo.get_chunk_owners(shared) if shared else {}
+        owners: list[list[tuple[int, int]]] = []
+        for obj in objects:
+            page_id = obj.properties.get("pageId")
+            if page_id:
+                owners.append(
+                    [(int(page_id), int(obj.properties.get("chunkId", 0) or 0))]
+                )
+            else:
+                owners.append(chunk_owners.get(obj.properties.get("chunkHash"), []))
+        return owners
+
+    def _plan_page_filters(
+        self, filters: dict | None, exclude_keywords: list[str] | None
+    ) -> _FilterPlan:
+        """ページ代表コレクションで評価できる条件を Weaviate に渡す.
+
+        作成日時の範囲とキーワードは Weaviate で絞り込み、キーワードは単語分割で
+        余分に一致しうるため URL・除外キーワードと合わせて SQLite で判定する。
+        状態は常に SQLite で判定する。
+        """
+        filters = filters or {}
+        weaviate_filter = self._build_weaviate_filter(self._pushdown_filters(filters))
+        residual = {key: filters[key] for key in _PAGE_RECHECK_KEYS if key in filters}
+        if weaviate_filter is not None:
+            strategy = "pushdown"
+        elif self._has_filters(filters, exclude_keywords):
+            strategy = "post_filter"
+        else:
+            strategy = "none"
+        search_filter_plans.add(1, {"collection": "page", "strategy": strategy})
+        return _FilterPlan(
+            strategy, weaviate_filter, residual or None, exclude_keywords
+        )
+
+    async def _plan_chunk_filters(
+        self,
+        limit: int,
+        filters: dict | None,
+        exclude_keywords: list[str] | None,
+    ) -> _FilterPlan:
+        """本文チャンク検索の絞り込み方法を選ぶ.
+
+        チャンクに複製した検索可能なページの属性が最新なら、検索可否・作成日時・
+        キーワードを Weaviate で絞り込み、limit 件の取得1回で済ませる。
+
+        URL・除外キーワードの条件があるか、属性の書き直し待ちがある場合は、条件に
+        合うページの割合を SQLite で見積もる。絞り込まずに1回の取得で足りない
+        見込みなら、条件に合うページのチャンクを ID で Weaviate に絞り込ませる。
+        チャンクは条件に合わないページとも共有されうるため、どの場合も取得後に
+        SQLite で全条件を判定する。
+        """
+        filters = filters or {}
+        conditions = []
+        strategy = (
+            "post_filter" if self._has_filters(filters, exclude_keywords) else "none"
+        )
+        first_batch = None
+        if not await self.page_repo.has_pending_chunk_attribute_sync():
+            conditions.append(
+                self._combine_filters(
+                    Filter.by_property("searchable").equal(True),
+                    self._build_weaviate_filter(self._pushdown_filters(filters)),
+                )
+            )
+            strategy = "attributes"
+            first_batch = limit
+
+        residual_only = bool(filters.get("url")) or bool(
+            self._build_exclude_filter(exclude_keywords or [])
+        )
+        if residual_only or strategy == "post_filter":
+            target_filter = await self._plan_chunk_targets(
+                limit, filters, exclude_keywords
+            )
+            if target_filter is _NO_MATCH:
+                strategy = "empty"
+            elif target_filter is not None:
+                conditions.append(target_filter)
+                strategy = "pushdown"
+        search_filter_plans.add(1, {"collection": "chunk", "strategy": strategy})
+        if strategy == "empty":
+            return _FilterPlan("empty")
+        return _FilterPlan(
+            strategy,
+            self._combine_filters(*conditions),
+            filters or None,
+            exclude_keywords,
+            first_batch,
+        )
+
+    async def _plan_chunk_targets(
+        self,
+        limit: int,
+        filters: dict,
+        exclude_keywords: list[str] | None,
+    ) -> Any:
+        """条件に合うページのチャンク ID による絞り込み条件を返す.
+
+        絞り込まなくても足りる見込みか、チャンクが上限を超える場合は None、
+        条件に合うページがなければ _NO_MATCH を返す。
+        """
+        matched, total = await self.page_repo.estimate_search_selectivity(
+            filters, exclude_keywords
+        )
+        if matched == 0:
+            return _NO_MATCH
+        if (
+            limit * total <= _CANDIDATE_BATCH_SIZE * matched
+            or settings.SEARCH_PUSHDOWN_MAX_CHUNKS <= 0
+        ):
+            return None
+        targets = await self.page_repo.get_searchable_chunk_targets(
+            filters, exclude_keywords, settings.SEARCH_PUSHDOWN_MAX_CHUNKS
+        )
+        if targets is None:
+            return None
+        target_filter = self._chunk_target_filter(*targets)
+        return _NO_MATCH if target_filter is None else target_filter
+
+    @staticmethod
+    def _chunk_target_filter(chunk_hashes: list[str], page_ids: list[int]) -> Any:
+        """共有チャンクのハッシュと旧形式チャンクのページIDで絞り込む条件."""
+        conditions = []
+        if chunk_hashes:
+            conditions.append(
+                Filter.by_property("chunkHash").contains_any(chunk_hashes)
+            )
+        if page_ids:
+            conditions.append(Filter.by_property("pageId").contains_any(page_ids))
+        if len(conditions) > 1:
+            return Filter.any_of(conditions)
+        return conditions[0] if conditions else None
+
+    def _has_filters(
+        self, filters: dict | None, exclude_keywords: list[str] | None
+    ) -> bool:
+        if self._build_exclude_filter(exclude_keywords or []) is not None:
+            return True
+        filters = filters or {}
+        return bool(filters.get("url")) or (
+            self._build_weaviate_filter(self._pushdown_filters(filters)) is not None
+        )
+
+    @staticmethod
+    def _pushdown_filters(filters: dict) -> dict:
+        """Weaviate に渡すフィルタを取り出し、日時を UTC の datetime に揃える."""
+        pushdown = {
+            key: filters[key] for key in _PAGE_PUSHDOWN_KEYS if filters.get(key)
+        }
+        for key in ("date_from", "date_to"):
+            if key in pushdown:
+                pushdown[key] = as_utc(pushdown[key])
+        return pushdown
+
     def _build_weaviate_filter(self, filters: dict) -> Any:
         conditions = []
         if filters.get("url"):
@@ -1,38 +1,140 @@
 """Vectorization service for Weaviate."""
 
 import asyncio
+import hashlib
 import logging
+import unicodedata
+import uuid
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Any
 
 import weaviate
 from pydantic import ValidationError
-from weaviate.classes.config import Configure, DataType, Property
+from weaviate.classes.config import (
+    Configure,
+    ConsistencyLevel,
+    DataType,
+    Property,
+    Tokenization,
+)
 from weaviate.classes.query import Filter
+from weaviate.exceptions import UnexpectedStatusCodeError
 from weaviate.util import generate_uuid5
 
 from ..config import settings
-from ..models.database import Page, ProcessingStep
-from ..models.external import FetchedDocument
+from ..models.database import Page, PageStatus, ProcessingStep
 from ..repositories.file_repository import FileRepository
 from ..repositories.page_repository import PageRepository
 from ..utils.datetime import utc_isoformat
 from ..utils.exceptions import VectorizerError
+from ..utils.metrics import (
+    vectorizer_chunk_attribute_updates,
+    vectorizer_chunks,
+    vectorizer_page_objects,
+)
 from .chunking_service import ChunkingService
 
 logger = logging.getLogger(__name__)
 
+# 既存チャンクの確認・削除で1回に指定する UUID 数
+_CHUNK_ID_BATCH_SIZE = 100
+# 旧形式 (ページ ID 付き) のチャンクを1ページ分取得する上限
+_LEGACY_CHUNK_LIMIT = 10_000
+# 参照されなくなったチャンクの削除を claim する期間 (秒)
+_TOMBSTONE_LEASE_SECONDS = 60.0
+# 他の処理による削除の完了を確かめる間隔 (秒)
+_TOMBSTONE_POLL_INTERVAL = 0.1
 
-def _insert_objects_sync(
-    collection: Any, objects_to_insert: list[tuple[dict[str, Any], Any]]
-) -> None:
-    """Weaviateオブジェクトをバッチ挿入し、個別エラーを検査する."""
+
+def chunk_hash(content: str) -> str:
+    """本文チャンクの内容ハッシュ (NFC 正規化・空白の連続をまとめた SHA-256)."""
+    normalized = " ".join(unicodedata.normalize("NFC", content).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def chunk_uuid(content_hash: str) -> str:
+    """内容ハッシュから本文チャンクの UUID を返す."""
+    return str(generate_uuid5(f"chunk-{content_hash}"))
+
+
+def _same_property(stored: Any, expected: Any) -> bool:
+    """Weaviate から読んだプロパティが保存する値と同じか判定する."""
+    if isinstance(stored, datetime):
+        return isinstance(expected, str) and utc_isoformat(stored) == expected
+    if isinstance(expected, list):
+        stored_items = list(stored or [])
+        return len(stored_items) == len(expected) and all(
+            _same_property(item, value)
+            for item, value in zip(stored_items, expected, strict=True)
+        )
+    return bool(stored == expected)
+
+
+def chunk_search_properties(pages: Sequence[Page]) -> dict[str, Any]:
+    """本文チャンクに持たせる、参照する検索可能なページの属性.
+
+    共有チャンクは参照する全ページの値をまとめて持つ。検索可能なページが
+    なければ searchable を False にする。
+    """
+    return {
+        "searchable": bool(pages),
+        "createdAt": sorted({utc_isoformat(page.created_at) for page in pages}),
+        "keywords": sorted({keyword for page in pages for keyword in page.keywords}),
+    }
+
+
+def _update_properties_sync(
+    collection: Any, object_uuid: Any, properties: dict[str, Any]
+) -> bool:
+    """オブジェクトのプロパティを部分更新する. 存在しなければ False を返す."""
+    try:
+        collection.data.update(uuid=object_uuid, properties=properties)
+    except UnexpectedStatusCodeError as e:
+        if e.status_code == 404:
+            return False
+        raise
+    return True
+
+
+def _batch_insert_sync(
+    collection: Any,
+    objects_to_insert: list[tuple[dict[str, Any], Any]],
+    batch_size: int,
+    concurrent_requests: int,
+) -> list[Any]:
+    """Weaviateオブジェクトを1つのバッチで挿入し、失敗したオブジェクトを返す."""
     with collection.batch.fixed_size(
-        batch_size=max(1, len(objects_to_insert)), concurrent_requests=1
+        batch_size=batch_size, concurrent_requests=concurrent_requests
     ) as batch:
         for properties, object_uuid in objects_to_insert:
             batch.add_object(properties=properties, uuid=object_uuid)
+    return list(collection.batch.failed_objects)
 
-    failed_objects = collection.batch.failed_objects
+
+def _batch_replace_sync(
+    collection: Any,
+    objects_to_replace: list[tuple[dict[str, Any], Any, Any]],
+    batch_size: int,
+    concurrent_requests: int,
+) -> list[Any]:
+    """既存オブジェクトを埋め込みごと1つのバッチで置き換え、失敗したものを返す."""
+    with collection.batch.fixed_size(
+        batch_size=batch_size, concurrent_requests=concurrent_requests
+    ) as batch:
+        for properties, object_uuid, vector in objects_to_replace:
+            batch.add_object(properties=properties, uuid=object_uuid, vector=vector)
+    return list(collection.batch.failed_objects)
+
+
+def _insert_objects_sync(
+    collection: Any, objects_to_insert: list[tuple[dict[str, Any], Any]]
+) -> None:
+    """Weaviateオブジェクトをバッチ挿入し、個別エラーを検査する."""
+    failed_objects = _batch_insert_sync(
+        collection, objects_to_insert, max(1, len(objects_to_insert)), 1
+    )
     if failed_objects:
         messages = "; ".join(str(failure.message) for failure in failed_objects)
         raise VectorizerError(
@@ -40,8 +142,45 @@ def _insert_objects_sync(
         )
 
 
+@dataclass
+class _PreparedPage:
+    """一括保存中の1ページ分の本文チャンクと前回のチャンク参照."""
+
+    page_id: int
+    chunks: list[str]
+    previous: list[str] | None = None
+    page: Page | None = None
+    chunk_hashes: list[str] = field(init=False)
+    contents: dict[str, str] = field(init=False)
+    # 既存チャンクを新たに参照した検索可能なページは、チャンクの属性を書き直す
+    needs_attribute_sync: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        self.chunk_hashes = [chunk_hash(content) for content in self.chunks]
+        self.contents = dict(zip(self.chunk_hashes, self.chunks, strict=True))
+
+    @property
+    def page_uuid(self) -> Any:
+        return generate_uuid5(f"page-{self.page_id}")
+
+    @property
+    def searchable(self) -> bool:
+        return self.page is not None and self.page.status == PageStatus.SUCCEEDED
+
+
 class VectorizerService:
-    """ページ代表データと本文チャンクを分離して保存する."""
+    """ページ代表データと本文チャンクを分離して保存する.
+
+    本文チャンクは正規化した内容のハッシュを UUID にして1件だけ保存し、
+    同じ内容のページ間で埋め込みを共有する。どのページがどのチャンクを
+    参照するかは SQLite の page_chunks が正で、チャンク側にはページ ID を
+    持たせない。検索の絞り込み用に、参照する検索可能なページの作成日時と
+    キーワードをまとめてチャンクに複製する (sync_chunk_attributes)。
+
+    再索引では、ページ代表は変わったプロパティだけを更新し、本文チャンクは
+    未登録の内容ハッシュだけを登録・参照されなくなったものだけを削除する。
+    本文と要約・メモが変わらなければ Weaviate へは書き込まない。
+    """
 
     def __init__(
         self,
@@ -49,14 +188,68 @@ class VectorizerService:
         file_repo: FileRepository,
         chunking_service: ChunkingService,
         weaviate_client: weaviate.WeaviateClient,
+        incremental: bool | None = None,
+        poll_deletions: bool | None = None,
+        batch_size: int | None = None,
+        batch_concurrency: int | None = None,
+        coalesce_window: float = 0.0,
     ):
+        """初期化.
+
+        Args:
+            page_repo: ページリポジトリ
+            file_repo: ファイルリポジトリ
+            chunking_service: チャンク分割サービス
+            weaviate_client: Weaviate クライアント
+            incremental: True なら変わったオブジェクトだけを書き込む. False なら
+                ページ代表を削除・再登録し、全チャンクの埋め込みを作り直す.
+                None の場合は VECTORIZER_INCREMENTAL
+            poll_deletions: 削除後に反映を待つ確認を行うか (互換用).
+                None の場合は VECTORIZER_POLL_DELETIONS
+            batch_size: 本文チャンクの一括登録で1リクエストに送るオブジェクト数.
+                None の場合は VECTORIZER_BATCH_SIZE
+            batch_concurrency: 本文チャンクの一括登録の同時リクエスト数.
+                None の場合は VECTORIZER_BATCH_CONCURRENCY
+            coalesce_window: vectorize_content の呼び出しをこの秒数待ってまとめ、
+                vectorize_pages で一括登録する. 0 なら1ページずつ登録する
+        """
         self.page_repo = page_repo
         self.file_repo = file_repo
         self.chunking_service = chunking_service
         self.weaviate_client = weaviate_client
+        self.incremental = (
+            settings.VECTORIZER_INCREMENTAL if incremental is None else incremental
+        )
+        self.poll_deletions = (
+            settings.VECTORIZER_POLL_DELETIONS
+            if poll_deletions is None
+            else poll_deletions
+        )
+        self.batch_size = (
+            settings.VECTORIZER_BATCH_SIZE if batch_size is None else batch_size
+        )
+        self.batch_concurrency = (
+            settings.VECTORIZER_BATCH_CONCURRENCY
+            if batch_concurrency is None
+            else batch_concurrency
+        )
+        if self.batch_size <= 0 or self.batch_concurrency <= 0:
+            raise ValueError("batch_size and batch_concurrency must be positive")
+        self._coalescer = (
+            _PageCoalescer(
+                self.vectorize_pages,
+                coalesce_window,
+                settings.VECTORIZER_BULK_MAX_PAGES,
+            )
+            if coalesce_window > 0
+            else None
+        )
 
     async def vectorize_content(self, page_id: int) -> None:
         """ページを索引化し、SQLiteのWeaviate IDと処理ステップを更新する."""
+        if self._coalescer is not None:
+            await self._coalescer.submit(page_id)
+            return
         try:
             page_data, chunks = await self._load_page_and_chunks(page_id)
             weaviate_id = await self._save_page_to_weaviate(page_data, chunks)
@@ -74,15 +267,92 @@ class VectorizerService:
         except Exception as e:
             raise VectorizerError(f"Reindex error: {str(e)}")
 
+    async def vectorize_pages(
+        self, page_ids: Sequence[int]
+    ) -> dict[int, VectorizerError | None]:
+        """複数ページを一括で索引化し、成功したページの処理状態を更新する.
+
+        Returns:
+            ページ ID ごとの失敗. 成功したページは None
+        """
+        saved = await self._save_pages(page_ids, "Vectorization error")
+        results: dict[int, VectorizerError | None] = {}
+        for page_id, result in saved.items():
+            if isinstance(result, VectorizerError):
+                results[page_id] = result
+                continue
+            try:
+                await self.page_repo.update_weaviate_id_and_step(
+                    page_id, result, ProcessingStep.VECTORIZED
+                )
+                results[page_id] = None
+            except Exception as e:
+                results[page_id] = VectorizerError(f"Vectorization error: {str(e)}")
+        return results
+
+    async def reindex_pages(
+        self, page_ids: Sequence[int]
+    ) -> dict[int, str | VectorizerError]:
+        """処理状態を変更せず、複数ページを一括で再索引化する.
+
+        Returns:
+            ページ ID ごとのページ代表の UUID か失敗
+        """
+        return await self._save_pages(page_ids, "Reindex error")
+
+    async def reindex_chunked_pages(
+        self, pages: Sequence[tuple[Page, list[str]]]
+    ) -> dict[int, str | VectorizerError]:
+        """読み込み・分割済みのページを、処理状態を変更せず一括で再索引化する.
+
+        Returns:
+            ページ ID ごとのページ代表の UUID か失敗
+        """
+        return await self._save_loaded_pages(list(pages), "Reindex error")
+
+    async def _save_pages(
+        self, page_ids: Sequence[int], error_prefix: str
+    ) -> dict[int, str | VectorizerError]:
+        """読み込みに成功したページをまとめて保存し、結果をページ ID 順に返す."""
+        results: dict[int, str | VectorizerError] = {}
+        loaded: list[tuple[Page, list[str]]] = []
+        for page_id in dict.fromkeys(page_ids):
+            try:
+                loaded.append(await self._load_page_and_chunks(page_id))
+            except Exception as e:
+                results[page_id] = VectorizerError(f"{error_prefix}: {str(e)}")
+        if loaded:
+            results.update(await self._save_loaded_pages(loaded, error_prefix))
+        return {page_id: results[page_id] for page_id in dict.fromkeys(page_ids)}
+
+    async def _save_loaded_pages(
+        self, pages: list[tuple[Page, list[str]]], error_prefix: str
+    ) -> dict[int, str | VectorizerError]:
+        try:
+            saved = await self._save_pages_to_weaviate(pages)
+        except Exception as e:
+            saved = {
+                page.id: VectorizerError(str(e))
+                for page, _ in pages
+                if page.id is not None
+            }
+        return {
+            page_id: (
+                VectorizerError(f"{error_prefix}: {str(result)}")
+                if isinstance(result, VectorizerError)
+                else result
+            )
+            for page_id, result in saved.items()
+        }
+
     async def _load_page_and_chunks(self, page_id: int) -> tuple[Page, list[str]]:
         page_data = await self.page_repo.get_page(page_id)
         if not page_data:
             raise VectorizerError(f"Page not found: {page_id}")
 
-        raw_jina_data = await self.file_repo.load_json_file(page_id)
         try:
-            document = FetchedDocument.from_jina_response(
-                raw_jina_data, source_url=page_data.url
+            document = await self.file_repo.load_document(
+                page_id, source_url=page_data.url
             )
         except (ValidationError, ValueError, TypeError):
             raise VectorizerError(
@@ -98,66 +368,423 @@ class VectorizerService:
         """ページ代表オブジェクト1件と本文チャンクを別コレクションへ保存する."""
         if page_data.id is None:
             raise VectorizerError("Page ID is required")
+        result = (await self._save_pages_to_weaviate([(page_data, chunks)]))[
+            page_data.id
+        ]
+        if isinstance(result, VectorizerError):
+            raise result
+        return result
 
+    async def _save_pages_to_weaviate(
+        self, pages: list[tuple[Page, list[str]]]
+    ) -> dict[int, str | VectorizerError]:
+        """複数ページを保存し、索引の世代を進める."""
         try:
-            page_collection = self.weaviate_client.collections.get(
-                settings.WEAVIATE_PAGE_COLLECTION_NAME
-            )
-            chunk_collection = self.weaviate_client.collections.get(
-                settings.WEAVIATE_CHUNK_COLLECTION_NAME
-            )
+            return await self._write_pages_to_weaviate(pages)
+        finally:
+            # 一部だけ書き込んで失敗した場合も検索結果は変わりうる
+            await self._bump_index_generation()
+
+    async def _write_pages_to_weaviate(
+        self, pages: list[tuple[Page, list[str]]]
+    ) -> dict[int, str | VectorizerError]:
+        """複数ページを保存し、ページごとにページ代表の UUID か失敗を返す.
+
+        本文チャンクは全ページ分を1つのバッチに流して登録し、登録に失敗した
+        オブジェクトを参照するページだけを失敗にする。失敗したページの部分登録は、
+        成功したページのチャンク参照を記録した後に除去する。
+        """
+        try:
+            page_collection = self._collection(settings.WEAVIATE_PAGE_COLLECTION_NAME)
+            chunk_collection = self._collection(settings.WEAVIATE_CHUNK_COLLECTION_NAME)
         except Exception as e:
             raise VectorizerError(f"Failed to save page to Weaviate: {str(e)}") from e
 
+        results: dict[int, str | VectorizerError] = {}
+        failures: list[tuple[_PreparedPage, Exception]] = []
+        prepared: list[_PreparedPage] = []
+        for page_data, chunks in pages:
+            if page_data.id is None:
+                raise VectorizerError("Page ID is required")
+            item = _PreparedPage(page_data.id, chunks, page=page_data)
+            try:
+                await self._write_page_object(
+                    page_collection, chunk_collection, page_data, item
+                )
+                prepared.append(item)
+            except Exception as e:
+                failures.append((item, e))
+
         try:
-            await self._delete_existing_objects(page_collection, page_data.id)
-            await self._delete_existing_objects(chunk_collection, page_data.id)
-
-            page_uuid = generate_uuid5(f"page-{page_data.id}")
-            created_at = self._format_created_at(page_data)
-            page_properties = {
-                "pageId": page_data.id,
-                "url": page_data.url,
-                "title": page_data.title,
-                "memo": page_data.memo or "",
-                "summary": page_data.summary or "",
-                "keywords": page_data.keywords or [],
-                "createdAt": created_at,
-            }
+            chunk_errors = await self._insert_chunks_bulk(chunk_collection, prepared)
+        except Exception as e:
+            chunk_errors = {item.page_id: e for item in prepared}
+        for item in prepared:
+            try:
+                if item.page_id in chunk_errors:
+                    raise chunk_errors[item.page_id]
+                await self._sync_page_chunks(chunk_collection, item)
+                results[item.page_id] = str(item.page_uuid)
+            except Exception as e:
+                failures.append((item, e))
+
+        for item, error in failures:
+            cleanup_errors = await self._cleanup_failed_save(
+                page_collection, chunk_collection, item.page_id, item.chunk_hashes
+            )
+            message = f"Failed to save page to Weaviate: {str(error)}"
+            if cleanup_errors:
+                message += f"; cleanup failed: {'; '.join(cleanup_errors)}"
+            failure = VectorizerError(message)
+            failure.__cause__ = error
+            results[item.page_id] = failure
+        return results
+
+    async def _write_page_object(
+        self,
+        page_collection: Any,
+        chunk_collection: Any,
+        page_data: Page,
+        item: _PreparedPage,
+    ) -> None:
+        """ページ代表オブジェクトを登録・更新し、旧形式のチャンクを除去する."""
+        page_properties = {
+            "pageId": item.page_id,
+            "url": page_data.url,
+            "title": page_data.title,
+            "memo": page_data.memo or "",
+            "summary": page_data.summary or "",
+            "keywords": page_data.keywords or [],
+            "createdAt": self._format_created_at(page_data),
+        }
+        if self.incremental:
+            item.previous = await self.page_repo.get_page_chunk_hashes(item.page_id)
+            await self._upsert_page_object(
+                page_collection, item.page_uuid, page_properties
+            )
+        else:
+            # 固定 UUID への登録は既存オブジェクトを置き換えるため削除は不要
             await asyncio.to_thread(
                 _insert_objects_sync,
                 page_collection,
-                [(page_properties, page_uuid)],
+                [(page_properties, item.page_uuid)],
             )
+        if await self.page_repo.get_legacy_chunk_pages([item.page_id]):
+            # ページ ID を持つ旧形式のチャンクを除去する. 印はスキーマ移行時に
+            # 残っていたページにだけあり、新しいページでは削除を送らない
+            await self._delete_existing_objects(chunk_collection, item.page_id)
+            await self.page_repo.clear_legacy_chunk_page(item.page_id)
 
-            chunk_objects = [
-                (
-                    {
-                        "pageId": page_data.id,
-                        "chunkId": chunk_id,
-                        "content": content,
-                    },
-                    generate_uuid5(f"chunk-{page_data.id}-{chunk_id}"),
-                )
-                for chunk_id, content in enumerate(chunks)
-            ]
+    async def _insert_chunks_bulk(
+        self, collection: Any, pages: list[_PreparedPage]
+    ) -> dict[int, Exception]:
+        """全ページの未登録チャンクを1つのバッチで登録し、失敗をページ別に返す.
+
+        複数ページが同じ内容のチャンクを持つ場合は1回だけ登録する。埋め込みの
+        生成は書き込みロックの外で済ませておく。
+        """
+        contents: dict[str, str] = {}
+        owners: dict[str, list[int]] = {}
+        for item in pages:
+            for content_hash, content in item.contents.items():
+                contents.setdefault(content_hash, content)
+                owners.setdefault(content_hash, []).append(item.page_id)
+        existing = (
+            await self._existing_chunk_hashes(collection, list(contents))
+            if self.incremental
+            else set()
+        )
+        searchable = {item.page_id: item.page for item in pages if item.searchable}
+        for item in pages:
+            added = set(item.chunk_hashes) - set(item.previous or ())
+            item.needs_attribute_sync = item.searchable and bool(added & existing)
+        stored_owners = await self.page_repo.get_searchable_chunk_owner_pages(
+            [content_hash for content_hash in contents if content_hash not in existing]
+        )
+        missing = []
+        for content_hash, content in contents.items():
+            if content_hash in existing:
+                continue
+            owner_pages = {
+                page.id: page for page in stored_owners.get(content_hash, [])
+            }
+            owner_pages.update(
+                (page_id, page)
+                for page_id in owners[content_hash]
+                if (page := searchable.get(page_id)) is not None
+            )
+            properties = {
+                "chunkHash": content_hash,
+                "content": content,
+                **chunk_search_properties(list(owner_pages.values())),
+            }
+            missing.append((properties, chunk_uuid(content_hash)))
+        failed = (
             await asyncio.to_thread(
-                _insert_objects_sync, chunk_collection, chunk_objects
+                _batch_insert_sync,
+                collection,
+                missing,
+                self.batch_size,
+                self.batch_concurrency,
             )
-            return str(page_uuid)
+            if missing
+            else []
+        )
+        vectorizer_chunks.add(
+            sum(len(item.contents) for item in pages) - len(missing),
+            {"result": "reused"},
+        )
+        vectorizer_chunks.add(len(missing), {"result": "inserted"})
+
+        hashes_by_uuid = {
+            str(object_uuid): props["chunkHash"] for props, object_uuid in missing
+        }
+        messages: dict[int, list[str]] = {}
+        for failure in failed:
+            failed_hash = hashes_by_uuid.get(str(failure.object_.uuid))
+            # 対象を特定できない失敗はバッチ内の全ページの失敗とみなす
+            page_ids = (
+                owners[failed_hash]
+                if failed_hash is not None
+                else [item.page_id for item in pages]
+            )
+            for page_id in page_ids:
+                messages.setdefault(page_id, []).append(str(failure.message))
+        return {
+            page_id: VectorizerError(
+                f"Failed to insert {len(errors)} Weaviate objects: {'; '.join(errors)}"
+            )
+            for page_id, errors in messages.items()
+        }
+
+    async def _sync_page_chunks(self, collection: Any, item: _PreparedPage) -> None:
+        """ページのチャンク参照を記録し、参照されなくなったチャンクを削除する.
+
+        参照の記録を先にコミットし、Weaviate への書き込み・削除はトランザクションの
+        外で行う。属性が変わりうるチャンクは、それを参照するページを書き直し待ちに
+        登録する。
+        """
+        if item.previous == item.chunk_hashes:
+            # 参照中のチャンクは他ページの更新で削除されないため同期は不要
+            return
+
+        replacement = await self.page_repo.replace_page_chunks(
+            item.page_id, item.chunk_hashes
+        )
+        if replacement.pending_deletion:
+            await self._wait_for_chunk_deletions(replacement.pending_deletion)
+        # 存在確認の後、参照の記録までに他ページの更新で消えたチャンクを補う
+        inserted = await self._insert_missing_chunks(
+            collection, item.contents, record_metrics=False
+        )
+        if inserted and item.searchable:
+            # 属性なしで登録し直したチャンクにページの属性を書き込む
+            item.needs_attribute_sync = True
+        try:
+            await self._delete_unreferenced_chunks(collection, replacement.unreferenced)
         except Exception as e:
-            cleanup_errors = await self._cleanup_failed_save(
-                page_collection, chunk_collection, page_data.id
+            # 削除待ちに残したチャンクは delete_unreferenced_chunks が後で消す
+            logger.warning(
+                "Failed to delete unreferenced chunks for page %d: %s",
+                item.page_id,
+                e,
             )
-            message = f"Failed to save page to Weaviate: {str(e)}"
-            if cleanup_errors:
-                message += f"; cleanup failed: {'; '.join(cleanup_errors)}"
-            raise VectorizerError(message) from e
+        stale = [item.page_id] if item.needs_attribute_sync else []
+        released = sorted(set(item.previous or ()) - set(item.chunk_hashes))
+        if released:
+            # 参照を外したチャンクにはこのページの属性が残っているため書き直す
+            stale += await self.page_repo.get_pages_sharing_chunks(
+                item.page_id, released
+            )
+        await self.page_repo.enqueue_chunk_attribute_sync(stale)
+
+    async def sync_chunk_attributes(self, page_ids: Sequence[int]) -> None:
+        """ページが参照する本文チャンクの検索用属性を SQLite の現在の値で書き直す.
+
+        共有チャンクには参照する全ページのうち検索可能なものの属性を、ページ ID を
+        持つ旧形式のチャンクにはそのページの属性を書き込む。
+
+        Raises:
+            VectorizerError: 書き込みに失敗した場合
+        """
+        try:
+            collection = self._collection(settings.WEAVIATE_CHUNK_COLLECTION_NAME)
+            hashes: dict[str, None] = {}
+            for page_id in dict.fromkeys(page_ids):
+                page_hashes = await self.page_repo.get_page_chunk_hashes(page_id)
+                hashes.update(dict.fromkeys(page_hashes))
+            legacy = await self.page_repo.get_legacy_chunk_pages(list(page_ids))
+
+            owners = await self.page_repo.get_searchable_chunk_owner_pages(list(hashes))
+            # 参照するページが同じチャンクは同じ属性を共有する
+            payloads: dict[tuple[int | None, ...], dict[str, Any]] = {}
+            attributes: dict[str, dict[str, Any]] = {}
+            for content_hash in hashes:
+                owner_pages = owners.get(content_hash, [])
+                key = tuple(page.id for page in owner_pages)
+                if key not in payloads:
+                    payloads[key] = chunk_search_properties(owner_pages)
+                attributes[content_hash] = payloads[key]
+            await self._replace_chunk_attributes(collection, attributes)
+
+            updates: list[tuple[Any, dict[str, Any]]] = []
+            legacy_pages = (
+                await self.page_repo.get_searchable_pages_by_ids(legacy)
+                if legacy
+                else {}
+            )
+            for page_id in legacy:
+                response = await asyncio.to_thread(
+                    collection.query.fetch_objects,
+                    filters=Filter.by_property("pageId").equal(page_id),
+                    limit=_LEGACY_CHUNK_LIMIT,
+                )
+                page = legacy_pages.get(page_id)
+                properties = chunk_search_properties([page] if page else [])
+                updates.extend((obj.uuid, properties) for obj in response.objects)
+            await self._update_chunk_properties(collection, updates)
+        except Exception as e:
+            raise VectorizerError(f"Failed to sync chunk attributes: {str(e)}") from e
+        finally:
+            await self._bump_index_generation()
+
+    async def _bump_index_generation(self) -> None:
+        """検索結果のキャッシュを無効にするため索引の世代を進める. 失敗しても続ける."""
+        try:
+            await self.page_repo.bump_index_generation()
+        except Exception as e:
+            logger.warning("Failed to bump search index generation: %s", e)
+
+    async def _replace_chunk_attributes(
+        self, collection: Any, attributes: dict[str, dict[str, Any]]
+    ) -> None:
+        """内容ハッシュのチャンクの検索用属性を、固定 UUID のバッチで書き直す.
+
+        Weaviate には複数オブジェクトを部分更新する API が無いため、既存の
+        プロパティと埋め込みを取得し、属性だけを差し替えてバッチで登録し直す。
+        埋め込みを渡すので再計算はされず、属性が変わらないチャンクは書き込まない。
+        取得から登録までの間に削除されたチャンクを登録し直しうるため、書き込んだ
+        チャンクのうち参照の無くなったものは削除待ちに戻す。
+        """
+        hashes_by_uuid = {
+            str(chunk_uuid(content_hash)): content_hash for content_hash in attributes
+        }
+        ids = list(hashes_by_uuid)
+        for start in range(0, len(ids), _CHUNK_ID_BATCH_SIZE):
+            batch = ids[start : start + _CHUNK_ID_BATCH_SIZE]
+            response = await asyncio.to_thread(
+                collection.query.fetch_objects,
+                filters=Filter.by_id().contains_any(batch),
+                limit=len(batch),
+                include_vector=True,
+            )
+            replacements: list[tuple[dict[str, Any], Any, Any]] = []
+            written: list[str] = []
+            for obj in response.objects:
+                content_hash = hashes_by_uuid.get(str(obj.uuid))
+                if content_hash is None:
+                    continue
+                properties = attributes[content_hash]
+                if all(
+                    _same_property(obj.properties.get(name), value)
+                    for name, value in properties.items()
+                ):
+                    continue
+                stored = {
+                    name: value
+                    for name, value in obj.properties.items()
+                    if value is not None
+                }
+                replacements.append(({**stored, **properties}, obj.uuid, obj.vector))
+                written.append(content_hash)
+            found = len(response.objects)
+            vectorizer_chunk_attribute_updates.add(
+                len(replacements), {"result": "updated"}
+            )
+            vectorizer_chunk_attribute_updates.add(
+                found - len(replacements), {"result": "unchanged"}
+            )
+            vectorizer_chunk_attribute_updates.add(
+                len(batch) - found, {"result": "missing"}
+            )
+            if not replacements:
+                continue
+            failed = await asyncio.to_thread(
+                _batch_replace_sync,
+                collection,
+                replacements,
+                self.batch_size,
+                self.batch_concurrency,
+            )
+            await self.page_repo.add_chunk_tombstones(written)
+            if failed:
+                messages = "; ".join(str(failure.message) for failure in failed)
+                raise VectorizerError(
+                    f"Failed to rewrite {len(failed)} chunk attributes: {messages}"
+                )
+
+    async def _update_chunk_properties(
+        self, collection: Any, updates: list[tuple[Any, dict[str, Any]]]
+    ) -> None:
+        """旧形式のチャンクのプロパティを batch_size 件ずつ並行して部分更新する.
+
+        旧形式のチャンクはページの再索引で削除されるため、削除後に登録し直さない
+        よう部分更新を使う。
+        """
+        for start in range(0, len(updates), self.batch_size):
+            batch = updates[start : start + self.batch_size]
+            found = await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        _update_properties_sync, collection, object_uuid, properties
+                    )
+                    for object_uuid, properties in batch
+                )
+            )
+            updated = sum(found)
+            vectorizer_chunk_attribute_updates.add(updated, {"result": "updated"})
+            vectorizer_chunk_attribute_updates.add(
+                len(found) - updated, {"result": "missing"}
+            )
+
+    async def _upsert_page_object(
+        self, collection: Any, page_uuid: Any, properties: dict[str, Any]
+    ) -> None:
+        """ページ代表オブジェクトを、変わったプロパティだけ更新する."""
+        existing = await asyncio.to_thread(
+            collection.query.fetch_object_by_id, page_uuid
+        )
+        if existing is None:
+            await asyncio.to_thread(
+                _insert_objects_sync, collection, [(properties, page_uuid)]
+            )
+            vectorizer_page_objects.add(1, {"result": "inserted"})
+            return
+        changed = {
+            name: value
+            for name, value in properties.items()
+            if not _same_property(existing.properties.get(name), value)
+        }
+        if not changed:
+            vectorizer_page_objects.add(1, {"result": "unchanged"})
+            return
+        await asyncio.to_thread(
+            collection.data.update, uuid=page_uuid, properties=changed
+        )
+        vectorizer_page_objects.add(1, {"result": "updated"})
 
     async def _cleanup_failed_save(
-        self, page_collection: Any, chunk_collection: Any, page_id: int
+        self,
+        page_collection: Any,
+        chunk_collection: Any,
+        page_id: int,
+        chunk_hashes: list[str],
     ) -> list[str]:
-        """保存失敗後、両コレクションから対象ページの部分登録を除去する."""
+        """保存失敗後、両コレクションから対象ページの部分登録を除去する.
+
+        ページのチャンク参照も外し、どのページからも参照されないチャンクは
+        今回登録しかけたものを含めて削除する。
+        """
         errors: list[str] = []
         for collection_name, collection in (
             ("page", page_collection),
@@ -173,19 +800,38 @@ class VectorizerService:
                     cleanup_error,
                 )
                 errors.append(f"{collection_name}: {cleanup_error}")
-        return errors
 
-    async def delete_page_from_index(self, page_id: int) -> None:
-        """再構築先のページ代表・本文チャンクをページID単位で削除する."""
         try:
-            page_collection = self.weaviate_client.collections.get(
-                settings.WEAVIATE_PAGE_COLLECTION_NAME
+            replacement = await self.page_repo.replace_page_chunks(
+                page_id, [], released=chunk_hashes
             )
-            chunk_collection = self.weaviate_client.collections.get(
-                settings.WEAVIATE_CHUNK_COLLECTION_NAME
+            await self._delete_unreferenced_chunks(
+                chunk_collection, replacement.unreferenced
             )
+        except Exception as cleanup_error:
+            logger.error(
+                "Failed to release shared chunks for page %d: %s",
+                page_id,
+                cleanup_error,
+            )
+            errors.append(f"shared chunks: {cleanup_error}")
+        return errors
+
+    async def delete_page_from_index(self, page_id: int) -> None:
+        """再構築先のページ代表と、他ページと共有しない本文チャンクを削除する.
+
+        page_chunks の行は呼び出し側がページと同じトランザクションで削除する。
+        索引の世代は、同じトランザクションでのページの削除をトリガーが進める。
+        """
+        try:
+            page_collection = self._collection(settings.WEAVIATE_PAGE_COLLECTION_NAME)
+            chunk_collection = self._collection(settings.WEAVIATE_CHUNK_COLLECTION_NAME)
             await self._delete_existing_objects(page_collection, page_id)
             await self._delete_existing_objects(chunk_collection, page_id)
+            await self._delete_chunks_by_hash(
+                chunk_collection,
+                await self.page_repo.get_unshared_chunk_hashes(page_id),
+            )
         except Exception as e:
             raise VectorizerError(
                 f"Failed to remove page {page_id} from Weaviate: {str(e)}"
@@ -199,39 +845,23 @@ class VectorizerService:
     def _format_created_at(page_data: Page) -> str:
         return utc_isoformat(page_data.created_at)
 
+    def _collection(self, name: str) -> Any:
+        """全レプリカの確認を待って書き込むコレクションを返す.
+
+        削除・登録は応答の時点でどの整合性レベルの読み取りにも反映されるため、
+        削除後に反映を待つ必要がない。
+        """
+        return self.weaviate_client.collections.get(name).with_consistency_level(
+            ConsistencyLevel.ALL
+        )
+
     async def _delete_existing_objects(self, collection: Any, page_id: int) -> None:
-        """対象ページの既存オブジェクトを削除し、削除完了を確認する."""
+        """対象ページの既存オブジェクトを削除する."""
         try:
-            result = await asyncio.to_thread(
-                collection.data.delete_many,
-                where=Filter.by_property("pageId").equal(page_id),
-            )
-            if hasattr(result, "matches"):
-                logger.info("Deleted %d objects for page %d", result.matches, page_id)
-            if hasattr(result, "failed") and result.failed > 0:
-                raise VectorizerError(
-                    f"Failed to delete {result.failed} objects for page {page_id}"
-                )
-            if not hasattr(result, "matches") or result.matches == 0:
-                return
-
-            for attempt in range(10):
-                await asyncio.sleep(0.1)
-                remaining = await asyncio.to_thread(
-                    collection.query.fetch_objects,
-                    filters=Filter.by_property("pageId").equal(page_id),
-                    limit=1,
-                )
-                if not remaining.objects:
-                    return
-                logger.debug(
-                    "Waiting for deletion for page %d (attempt %d/10)",
-                    page_id,
-                    attempt + 1,
-                )
-            raise VectorizerError(
-                f"Deletion of objects for page {page_id} "
-                "did not complete within timeout"
+            await self._delete_where(
+                collection,
+                Filter.by_property("pageId").equal(page_id),
+                f"page {page_id}",
             )
         except VectorizerError:
             raise
@@ -239,6 +869,152 @@ class VectorizerService:
             logger.error("Failed to delete objects for page %d: %s", page_id, e)
             raise
 
+    async def _delete_where(self, collection: Any, where: Any, target: str) -> None:
+        """条件に一致するオブジェクトを削除する.
+
+        poll_deletions が有効なら、削除が検索に反映されるまで 0.1 秒間隔で最大10回
+        確認する (互換用)。
+        """
+        result = await asyncio.to_thread(collection.data.delete_many, where=where)
+        if hasattr(result, "matches"):
+            logger.info("Deleted %d objects for %s", result.matches, target)
+        if hasattr(result, "failed") and result.failed > 0:
+            raise VectorizerError(
+                f"Failed to delete {result.failed} objects for {target}"
+            )
+        if not self.poll_deletions:
+            return
+        if not hasattr(result, "matches") or result.matches == 0:
+            return
+
+        for attempt in range(10):
+            await asyncio.sleep(0.1)
+            remaining = await asyncio.to_thread(
+                collection.query.fetch_objects, filters=where, limit=1
+            )
+            if not remaining.objects:
+                return
+            logger.debug(
+                "Waiting for deletion for %s (attempt %d/10)", target, attempt + 1
+            )
+        raise VectorizerError(
+            f"Deletion of objects for {target} did not complete within timeout"
+        )
+
+    async def _existing_chunk_hashes(
+        self, collection: Any, content_hashes: list[str]
+    ) -> set[str]:
+        """Weaviate に登録済みのチャンクの内容ハッシュを返す."""
+        uuids = {
+            chunk_uuid(content_hash): content_hash for content_hash in content_hashes
+        }
+        existing: set[str] = set()
+        ids = list(uuids)
+        for start in range(0, len(ids), _CHUNK_ID_BATCH_SIZE):
+            batch = ids[start : start + _CHUNK_ID_BATCH_SIZE]
+            response = await asyncio.to_thread(
+                collection.query.fetch_objects,
+                filters=Filter.by_id().contains_any(batch),
+                limit=len(batch),
+            )
+            existing.update(
+                uuids[str(obj.uuid)]
+                for obj in response.objects
+                if str(obj.uuid) in uuids
+            )
+        return existing
+
+    async def _insert_missing_chunks(
+        self,
+        collection: Any,
+        contents: dict[str, str],
+        record_metrics: bool = True,
+        replace_existing: bool = False,
+    ) -> int:
+        """未登録の内容ハッシュのチャンクだけを登録し、登録した件数を返す.
+
+        replace_existing なら登録済みのチャンクも書き直して埋め込みを作り直す。
+        """
+        existing = (
+            set()
+            if replace_existing
+            else await self._existing_chunk_hashes(collection, list(contents))
+        )
+        missing = [
+            ({"chunkHash": content_hash, "content": content}, chunk_uuid(content_hash))
+            for content_hash, content in contents.items()
+            if content_hash not in existing
+        ]
+        if missing:
+            await asyncio.to_thread(_insert_objects_sync, collection, missing)
+        if record_metrics:
+            vectorizer_chunks.add(len(existing), {"result": "reused"})
+            vectorizer_chunks.add(len(missing), {"result": "inserted"})
+        return len(missing)
+
+    async def _delete_chunks_by_hash(
+        self, collection: Any, content_hashes: list[str]
+    ) -> None:
+        """内容ハッシュのチャンクを削除する."""
+        ids = [chunk_uuid(content_hash) for content_hash in content_hashes]
+        for start in range(0, len(ids), _CHUNK_ID_BATCH_SIZE):
+            batch = ids[start : start + _CHUNK_ID_BATCH_SIZE]
+            await self._delete_where(
+                collection, Filter.by_id().contains_any(batch), "shared chunks"
+            )
+
+    async def delete_unreferenced_chunks(self, limit: int = 100) -> int:
+        """削除待ちに残ったチャンクを古いものから limit 件まで削除する.
+
+        Returns:
+            削除したチャンク数
+
+        Raises:
+            VectorizerError: 削除に失敗した場合
+        """
+        try:
+            collection = self._collection(settings.WEAVIATE_CHUNK_COLLECTION_NAME)
+            deleted = await self._delete_unreferenced_chunks(
+                collection, None, limit=limit
+            )
+        except Exception as e:
+            raise VectorizerError(
+                f"Failed to delete unreferenced chunks: {str(e)}"
+            ) from e
+        if deleted:
+            await self._bump_index_generation()
+        return deleted
+
+    async def _delete_unreferenced_chunks(
+        self, collection: Any, content_hashes: list[str] | None, limit: int = 100
+    ) -> int:
+        """削除待ちのチャンクを claim し、まだ参照されていないものだけを削除する.
+
+        content_hashes が None なら古い削除待ちから limit 件を対象にする。
+        """
+        if content_hashes is not None and not content_hashes:
+            return 0
+        owner = uuid.uuid4().hex
+        claimed = await self.page_repo.claim_chunk_tombstones(
+            owner, _TOMBSTONE_LEASE_SECONDS, content_hashes, limit=limit
+        )
+        if not claimed:
+            return 0
+        try:
+            await self._delete_chunks_by_hash(collection, claimed)
+        except BaseException:
+            await self.page_repo.release_chunk_tombstones(owner, claimed, False)
+            raise
+        await self.page_repo.release_chunk_tombstones(owner, claimed, True)
+        return len(claimed)
+
+    async def _wait_for_chunk_deletions(self, content_hashes: list[str]) -> None:
+        """他の処理が claim 済みのチャンク削除の完了 (または claim の失効) を待つ."""
+        pending = content_hashes
+        while pending:
+            await asyncio.sleep(_TOMBSTONE_POLL_INTERVAL)
+            pending = await self.page_repo.get_claimed_chunk_tombstones(pending)
+
     async def _delete_existing_chunks(self, collection: Any, page_id: int) -> None:
         """後方互換用の内部エイリアス."""
         await self._delete_existing_objects(collection, page_id)
@@ -252,9 +1028,7 @@ class VectorizerService:
 
     async def is_page_registered(self, page_id: int) -> bool:
         """ページ代表オブジェクトがWeaviateに存在するか確認する."""
-        collection = self.weaviate_client.collections.get(
-            settings.WEAVIATE_PAGE_COLLECTION_NAME
-        )
+        collection = self._collection(settings.WEAVIATE_PAGE_COLLECTION_NAME)
         response = await asyncio.to_thread(
             collection.query.fetch_objects,
             filters=Filter.by_property("pageId").equal(page_id),
@@ -298,9 +1072,11 @@ class VectorizerService:
                     name=settings.WEAVIATE_CHUNK_COLLECTION_NAME,
                     description="Grimoire Keeperの本文チャンク",
                     properties=[
+                        # pageId・chunkId は共有化前に登録したチャンク用
                         Property(name="pageId", data_type=DataType.INT),
                         Property(name="chunkId", data_type=DataType.INT),
                         Property(name="content", data_type=DataType.TEXT),
+                        *_chunk_extra_properties(),
                     ],
                     vector_config=[
                         Configure.Vectors.text2vec_openai(
@@ -308,5 +1084,101 @@ class VectorizerService:
                         )
                     ],
                 )
+            else:
+                chunk_collection = self.weaviate_client.collections.get(
+                    settings.WEAVIATE_CHUNK_COLLECTION_NAME
+                )
+                config = chunk_collection.config.get()
+                existing = {prop.name for prop in config.properties}
+                for prop in _chunk_extra_properties():
+                    if prop.name not in existing:
+                        chunk_collection.config.add_property(prop)
         except Exception as e:
             raise VectorizerError(f"Failed to ensure schema: {str(e)}")
+
+
+class _PageCoalescer:
+    """短い待ち時間内に届いたページをまとめて一括索引化へ渡す.
+
+    待ち時間が過ぎるか max_pages 件たまった時点で flush を呼び、各呼び出し元へ
+    自分のページの結果だけを返す。
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Sequence[int]], Awaitable[dict[int, VectorizerError | None]]],
+        window: float,
+        max_pages: int,
+    ):
+        self.flush = flush
+        self.window = window
+        self.max_pages = max(1, max_pages)
+        self._pending: dict[int, list[asyncio.Future[None]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, page_id: int) -> None:
+        """ページを次の一括索引化に加え、そのページの結果を待つ.
+
+        Raises:
+            VectorizerError: ページの索引化に失敗した場合
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        self._pending.setdefault(page_id, []).append(future)
+        if len(self._pending) >= self.max_pages:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+        await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        # 呼び出し元がキャンセルされても他のページの索引化は続ける
+        task = asyncio.create_task(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: dict[int, list[asyncio.Future[None]]]) -> None:
+        try:
+            results = await self.flush(list(pending))
+        except Exception as e:
+            error = VectorizerError(f"Vectorization error: {str(e)}")
+            results = dict.fromkeys(pending, error)
+        for page_id, futures in pending.items():
+            result = results.get(page_id)
+            for future in futures:
+                if future.done():
+                    continue
+                if result is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(result)
+
+
+def _chunk_extra_properties() -> list[Property]:
+    """本文チャンクに後から追加したプロパティ (既存コレクションにも追加する)."""
+    return [
+        Property(
+            name="chunkHash",
+            data_type=DataType.TEXT,
+            tokenization=Tokenization.FIELD,
+            skip_vectorization=True,
+        ),
+        # 参照する検索可能なページの属性 (chunk_search_properties)
+        Property(name="searchable", data_type=DataType.BOOL, skip_vectorization=True),
+        Property(
+            name="createdAt", data_type=DataType.DATE_ARRAY, skip_vectorization=True
+        ),
+        Property(
+            name="keywords",
+            data_type=DataType.TEXT_ARRAY,
+            tokenization=Tokenization.FIELD,
+            skip_vectorization=True,
+        ),
+    ]
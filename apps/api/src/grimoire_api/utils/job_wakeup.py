@@ -0,0 +1,115 @@
+"""ジョブ投入を worker プロセスへ即時通知するユーティリティ.
+
+API と worker は同じデータボリュームを共有する別プロセスのため、Unix ドメインの
+データグラムソケットで「キューに新しいジョブがある」ことだけを伝える。通知は
+ベストエフォートで、取りこぼしても worker のフォールバックポーリングが拾う。
+"""
+
+import asyncio
+import logging
+import socket
+import stat
+from pathlib import Path
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def notify_job_queued(socket_path: str | None = None) -> None:
+    """worker へジョブ投入を通知する.
+
+    worker が起動していない・ソケットが無効な場合は何もしない。
+
+    Args:
+        socket_path: 通知先ソケット. None の場合は設定値を使う
+    """
+    path = settings.JOB_WAKEUP_SOCKET_PATH if socket_path is None else socket_path
+    if not path:
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.sendto(b"1", path)
+    except OSError as e:
+        # 受信側の未起動やバッファ満杯 (未処理の通知が既にある) は無視してよい
+        logger.debug("Job wakeup notification skipped: %s", e)
+
+
+class _WakeupProtocol(asyncio.DatagramProtocol):
+    def __init__(self, event: asyncio.Event):
+        self._event = event
+
+    def datagram_received(self, data: bytes, addr: object) -> None:
+        self._event.set()
+
+
+class JobWakeup:
+    """worker 側でジョブ投入通知を受け取る.
+
+    通知は asyncio.Event に集約されるため、claim 前に clear() してから待つことで
+    claim 中に届いた通知も取りこぼさない。
+    """
+
+    def __init__(self, socket_path: str | None = None):
+        """初期化.
+
+        Args:
+            socket_path: 待ち受けソケット. None の場合は設定値、空文字で無効
+        """
+        self.socket_path = (
+            settings.JOB_WAKEUP_SOCKET_PATH if socket_path is None else socket_path
+        )
+        self._event = asyncio.Event()
+        self._transport: asyncio.DatagramTransport | None = None
+
+    @property
+    def is_listening(self) -> bool:
+        """ソケットで通知を待ち受けているか."""
+        return self._transport is not None
+
+    async def start(self) -> None:
+        """ソケットを bind する. 失敗時はポーリングのみで動作を続ける."""
+        if not self.socket_path or self._transport is not None:
+            return
+        path = Path(self.socket_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and stat.S_ISSOCK(path.stat().st_mode):
+                path.unlink()
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _WakeupProtocol(self._event),
+                local_addr=str(path),
+                family=socket.AF_UNIX,
+            )
+        except OSError:
+            logger.warning(
+                "Job wakeup socket %s unavailable; falling back to polling",
+                path,
+                exc_info=True,
+            )
+            return
+        self._transport = transport
+        logger.info("Listening for job wakeups on %s", path)
+
+    def close(self) -> None:
+        """ソケットを閉じて削除する."""
+        transport = self._transport
+        if transport is None:
+            return
+        self._transport = None
+        transport.close()
+        Path(self.socket_path).unlink(missing_ok=True)
+
+    def notify(self) -> None:
+        """同一プロセス内から待機中の worker を起こす."""
+        self._event.set()
+
+    def clear(self) -> None:
+        """受信済みの通知を消費する."""
+        self._event.clear()
+
+    async def wait(self) -> None:
+        """次の通知まで待つ."""
+        await self._event.wait()
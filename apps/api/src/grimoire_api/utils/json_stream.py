@@ -0,0 +1,60 @@
+"""ストリーミング中の LLM 出力から JSON オブジェクトの終端を検出するユーティリティ."""
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JsonObjectScanner:
+    """逐次受け取るテキストから最初のトップレベル JSON オブジェクトを切り出す.
+
+    文字列・エスケープ・括弧の対応だけを追い、オブジェクトが閉じた位置を返す。
+    値の妥当性は最後に json.loads で検証する前提で、ここでは明らかに JSON として
+    成立しない出力 (オブジェクト以外で始まる、括弧が食い違う、文字列中の制御文字)
+    だけを早期に検出する。
+    """
+
+    def __init__(self) -> None:
+        self._stack: list[str] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._length = 0
+
+    def feed(self, text: str) -> int | None:
+        """テキストを追加し、オブジェクトが閉じたらその終端位置を返す.
+
+        Returns:
+            これまでに受け取ったテキスト全体での終端位置. 未完了なら None
+
+        Raises:
+            ValueError: 出力が JSON オブジェクトとして成立しない場合
+        """
+        for offset, char in enumerate(text):
+            if not self._started:
+                if char.isspace():
+                    continue
+                if char != "{":
+                    raise ValueError(f"Expected JSON object, got {char!r}")
+                self._started = True
+                self._stack.append("}")
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                elif char < " ":
+                    raise ValueError("Unescaped control character in JSON string")
+            elif char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(_CLOSERS[char])
+            elif char in "}]":
+                if not self._stack or self._stack.pop() != char:
+                    raise ValueError(f"Unbalanced {char!r} in JSON object")
+                if not self._stack:
+                    end = self._length + offset + 1
+                    self._length = end
+                    return end
+        self._length += len(text)
+        return None
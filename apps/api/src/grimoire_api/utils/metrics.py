@@ -24,6 +24,26 @@ search_results_count = meter.create_histogram(
     "search_results_count", description="Number of search results returned"
 )
 
+search_filter_plans = meter.create_counter(
+    "search_filter_plans_total",
+    description="Filter strategies chosen per search by collection",
+)
+
+search_query_embeddings = meter.create_counter(
+    "search_query_embeddings_total",
+    description="Search query embeddings by cache tier (memory, persistent, miss)",
+)
+
+search_result_cache_requests = meter.create_counter(
+    "search_result_cache_requests_total",
+    description="Search result cache lookups (hit, miss, expired, invalidated)",
+)
+
+search_result_cache_saved_seconds = meter.create_histogram(
+    "search_result_cache_saved_seconds",
+    description="Search time saved per cache hit (duration of the cached search)",
+)
+
 # データベース操作メトリクス
 database_operations = meter.create_counter(
     "database_operations_total", description="Total number of database operations"
@@ -37,3 +57,81 @@ external_api_calls = meter.create_counter(
 external_api_duration = meter.create_histogram(
     "external_api_duration_seconds", description="Duration of external API calls"
 )
+
+# LLMメトリクス
+llm_cache_requests = meter.create_counter(
+    "llm_cache_requests_total", description="Total number of LLM cache lookups"
+)
+
+llm_summary_checkpoints = meter.create_counter(
+    "llm_summary_checkpoints_total",
+    description="Intermediate chunk summaries saved or resumed from checkpoints",
+)
+
+llm_concurrency_limit = meter.create_gauge(
+    "llm_concurrency_limit",
+    description="Current adaptive limit of concurrent LLM requests",
+)
+
+llm_requests_queued = meter.create_gauge(
+    "llm_requests_queued",
+    description="Number of LLM requests waiting for a concurrency slot",
+)
+
+llm_time_to_first_token = meter.create_histogram(
+    "llm_time_to_first_token_seconds",
+    description="Time from sending a streaming LLM request to its first token",
+)
+
+llm_output_tokens_per_second = meter.create_histogram(
+    "llm_output_tokens_per_second",
+    description="Streaming LLM output rate after the first token",
+)
+
+llm_overload_signals = meter.create_counter(
+    "llm_overload_signals_total",
+    description="LLM overload signals that reduced the concurrency limit",
+)
+
+# 保存済み文書キャッシュメトリクス
+document_cache_requests = meter.create_counter(
+    "document_cache_requests_total",
+    description="Lookups of cached stored Jina responses and parsed documents",
+)
+
+# 本文チャンクの共有メトリクス
+vectorizer_chunks = meter.create_counter(
+    "vectorizer_chunks_total",
+    description="Content chunks reused from or inserted into Weaviate by content hash",
+)
+vectorizer_page_objects = meter.create_counter(
+    "vectorizer_page_objects_total",
+    description="Page objects inserted, updated or left unchanged on vectorization",
+)
+vectorizer_chunk_attribute_updates = meter.create_counter(
+    "vectorizer_chunk_attribute_updates_total",
+    description="Content chunks whose copied page search attributes were rewritten",
+)
+
+# ジョブワーカーメトリクス
+job_queue_depth = meter.create_gauge(
+    "job_queue_depth", description="Number of queued jobs waiting to be claimed"
+)
+
+job_worker_active_slots = meter.create_up_down_counter(
+    "job_worker_active_slots", description="Number of job slots currently running"
+)
+
+job_leases_reclaimed = meter.create_counter(
+    "job_leases_reclaimed_total",
+    description="Running jobs requeued because their worker lease expired",
+)
+
+job_scheduler_throttled_hosts = meter.create_gauge(
+    "job_scheduler_throttled_hosts",
+    description="Number of hosts whose download rate limit is exhausted",
+)
+
+job_slot_duration = meter.create_histogram(
+    "job_slot_duration_seconds", description="Time a job occupied a worker slot"
+)
@@ -0,0 +1,108 @@
+"""内容ごとにトークン数を一度だけ数えるためのユーティリティ.
+
+トークナイザーは長文ほど高コストなので、プロンプト全体を何度も数え直さず、
+本文・部分要約などの部品ごとに数えた結果を内容ハッシュでキャッシュする。
+プロンプトのトークン数はテンプレート部分と部品の合計として見積もる。
+"""
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+# 部品を連結したときに境界で増えうるトークン数の見積もり
+BOUNDARY_TOKENS = 1
+_SEGMENT_BREAKS = ("\n", "。", ". ", " ")
+
+
+class TokenCounter:
+    """テキストのトークン数を内容ハッシュで LRU キャッシュする."""
+
+    def __init__(self, tokenize: Callable[[str], int], max_entries: int = 4096):
+        """初期化.
+
+        Args:
+            tokenize: テキストのトークン数を返す関数
+            max_entries: キャッシュするテキストの最大件数
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than zero")
+        self._tokenize = tokenize
+        self.max_entries = max_entries
+        self._counts: OrderedDict[tuple[int, bytes], int] = OrderedDict()
+
+    def count(self, text: str) -> int:
+        """テキストのトークン数を返す. 同じ内容は2回目以降トークナイズしない."""
+        encoded = text.encode("utf-8")
+        key = (len(encoded), hashlib.blake2b(encoded, digest_size=16).digest())
+        cached = self._counts.get(key)
+        if cached is not None:
+            self._counts.move_to_end(key)
+            return cached
+        tokens = self._tokenize(text)
+        self._counts[key] = tokens
+        if len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return tokens
+
+    def total(self, pieces: list[str]) -> int:
+        """部品を連結したテキストのトークン数を安全側に見積もる."""
+        return sum(self.count(piece) + BOUNDARY_TOKENS for piece in pieces)
+
+    def split(self, text: str, budget: int) -> list[str]:
+        """各部分が budget トークン以内に収まるよう順序を保って分割する.
+
+        テキストを区切り文字付近で小さなセグメントに分けて各セグメントを一度だけ
+        数え、累積トークン数が budget を超える位置で区切る。
+
+        Raises:
+            ValueError: 1文字でも budget を超える場合
+        """
+        if budget <= 0:
+            raise ValueError("Token budget must be greater than zero")
+        pieces: list[str] = []
+        current: list[str] = []
+        current_tokens = 0
+        for segment, tokens in self._segments(text, budget):
+            if current and current_tokens + tokens > budget:
+                pieces.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(segment)
+            current_tokens += tokens
+        if current:
+            pieces.append("".join(current))
+        return pieces
+
+    def _segments(self, text: str, budget: int) -> Iterator[tuple[str, int]]:
+        """budget 以内のセグメントとそのトークン数 (境界分を含む) を順に返す."""
+        width = max(1, min(1024, budget))
+        start = 0
+        while start < len(text):
+            end = _segment_end(text, start, width)
+            yield from self._fit(text[start:end], budget)
+            start = end
+
+    def _fit(self, segment: str, budget: int) -> Iterator[tuple[str, int]]:
+        tokens = self.count(segment) + BOUNDARY_TOKENS
+        if tokens <= budget:
+            yield segment, tokens
+            return
+        if len(segment) <= 1:
+            raise ValueError("A single character exceeds the token budget")
+        # 1文字あたりのトークン数が多いテキストだけ、セグメント内で二分する
+        midpoint = len(segment) // 2
+        yield from self._fit(segment[:midpoint], budget)
+        yield from self._fit(segment[midpoint:], budget)
+
+
+def _segment_end(text: str, start: int, width: int) -> int:
+    """start から最大 width 文字の範囲で、なるべく区切り文字の直後を返す."""
+    end = min(len(text), start + width)
+    if end == len(text):
+        return end
+    window = text[start:end]
+    for separator in _SEGMENT_BREAKS:
+        index = window.rfind(separator)
+        # 区切りが先頭寄りだと細かすぎるセグメントになるため後半だけを使う
+        if index >= len(window) // 2:
+            return start + index + len(separator)
+    return end
@@ -0,0 +1,11 @@
+"""URL ユーティリティ."""
+
+from urllib.parse import urlsplit
+
+
+def url_host(url: str) -> str | None:
+    """URL のホスト名を小文字で返す. 取得できない場合は None."""
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        return None
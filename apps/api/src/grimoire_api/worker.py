@@ -14,19 +14,25 @@ from .config import settings
 from .dependencies import (
     get_chunking_service,
     get_db_connection,
-    get_file_repository,
     get_jina_client,
+    get_llm_cache_repository,
 )
+from .models.database import PipelineStartStep
+from .repositories.document_cache import DocumentCache
+from .repositories.file_repository import FileRepository
 from .repositories.job_repository import JobRepository
 from .repositories.log_repository import LogRepository
 from .repositories.page_repository import PageRepository
 from .repositories.repair_repository import RepairRepository
+from .repositories.summary_checkpoint_repository import SummaryCheckpointRepository
 from .services.base_processor import BaseProcessorService
+from .services.job_scheduler import JobScheduler
 from .services.job_worker import JobWorker
 from .services.llm_service import LLMService
 from .services.vectorizer import VectorizerService
 from .services.weaviate_connection import WeaviateConnectionManager
 from .utils.database_init import ensure_database_initialized
+from .utils.job_wakeup import JobWakeup
 
 logger = logging.getLogger(__name__)
 
@@ -36,28 +42,72 @@ if not os.getenv("PYTEST_CURRENT_TEST"):
 setup_telemetry("grimoire-worker")
 
 
-def build_job_worker(weaviate_client: Any) -> JobWorker:
+def build_job_worker(
+    weaviate_client: Any, wakeup: JobWakeup | None = None
+) -> JobWorker:
     """Build a job worker with process-local dependencies."""
     db = get_db_connection()
     page_repo = PageRepository(db)
     log_repo = LogRepository(db)
     job_repo = JobRepository(db)
-    file_repo = get_file_repository()
+    # 同じページの JSON を download・llm・vectorize・修復確認で何度も読むため、
+    # worker 内だけ解析済みの文書をキャッシュする
+    file_repo = FileRepository(
+        document_cache=(
+            DocumentCache(settings.DOCUMENT_CACHE_MAX_BYTES)
+            if settings.DOCUMENT_CACHE_MAX_BYTES > 0
+            else None
+        )
+    )
     processor = BaseProcessorService(
         jina_client=get_jina_client(),
-        llm_service=LLMService(file_repo),
+        llm_service=LLMService(
+            file_repo,
+            cache=get_llm_cache_repository(),
+            checkpoints=SummaryCheckpointRepository(db),
+        ),
         vectorizer=VectorizerService(
             page_repo,
             file_repo,
             get_chunking_service(),
             weaviate_client,
+            coalesce_window=settings.JOB_VECTORIZE_BATCH_WINDOW,
         ),
         page_repo=page_repo,
         log_repo=log_repo,
         file_repo=file_repo,
         job_repo=job_repo,
     )
-    return JobWorker(job_repo, page_repo, log_repo, processor, RepairRepository(db))
+    scheduler = JobScheduler(
+        job_repo,
+        host_concurrency=settings.JOB_HOST_CONCURRENCY,
+        host_rate=settings.JOB_HOST_RATE,
+        host_burst=settings.JOB_HOST_BURST,
+    )
+    return JobWorker(
+        job_repo,
+        page_repo,
+        log_repo,
+        processor,
+        RepairRepository(db),
+        concurrency=settings.JOB_WORKER_CONCURRENCY,
+        stage_concurrency=_stage_concurrency(),
+        poll_interval=settings.JOB_WORKER_POLL_INTERVAL,
+        wakeup=wakeup,
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+        scheduler=scheduler,
+        chunk_sync_interval=settings.JOB_CHUNK_ATTRIBUTE_SYNC_INTERVAL,
+    )
+
+
+def _stage_concurrency() -> dict[PipelineStartStep, int]:
+    """個別設定されたステージごとの slot 数を返す."""
+    limits = {
+        PipelineStartStep.DOWNLOAD: settings.JOB_DOWNLOAD_CONCURRENCY,
+        PipelineStartStep.LLM: settings.JOB_LLM_CONCURRENCY,
+        PipelineStartStep.VECTORIZE: settings.JOB_VECTORIZE_CONCURRENCY,
+    }
+    return {stage: limit for stage, limit in limits.items() if limit is not None}
 
 
 @asynccontextmanager
@@ -65,6 +115,11 @@ async def worker_lifespan() -> AsyncIterator[None]:
     """Manage the dedicated worker and its Weaviate connection."""
     await ensure_database_initialized()
     logger.info("Database initialized successfully")
+    db = get_db_connection()
+    await db.open()
+    # 再接続で JobWorker を作り直しても同じソケットで通知を受け続ける
+    wakeup = JobWakeup()
+    await wakeup.start()
 
     job_worker: JobWorker | None = None
     retiring_worker: JobWorker | None = None
@@ -72,7 +127,7 @@ async def worker_lifespan() -> AsyncIterator[None]:
 
     async def start_job_worker_now(weaviate_client: Any) -> None:
         nonlocal job_worker
-        worker = build_job_worker(weaviate_client)
+        worker = build_job_worker(weaviate_client, wakeup)
         await worker.start()
         job_worker = worker
         logger.info("Persistent job worker started")
@@ -145,6 +200,8 @@ async def worker_lifespan() -> AsyncIterator[None]:
         await manager.stop()
         await stop_job_worker()
         await get_jina_client().close()
+        wakeup.close()
+        await db.close()
         logger.info("Worker process shutting down")
 
 
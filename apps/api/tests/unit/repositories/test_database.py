@@ -1,8 +1,10 @@
 """Test database initialization."""
 
+import asyncio
 import tempfile
 from dataclasses import replace
 from pathlib import Path
+from unittest.mock import patch
 
 import aiosqlite
 import grimoire_api.repositories.migrations as migration_module
@@ -181,6 +183,148 @@ class TestReadOnlyDatabaseConnection:
             await db.execute("INSERT INTO samples VALUES ('ng')")
 
 
+class TestConnectionPool:
+    """open() 後の長寿命接続プールを検証する."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_reader_and_writer_connections(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """プール有効時はクエリごとに接続を開き直さない."""
+        await temp_db.open()
+        try:
+            with patch.object(temp_db, "_connect", wraps=temp_db._connect) as connect:
+                for _ in range(3):
+                    await temp_db.fetch_one("SELECT 1")
+                    await temp_db.execute(
+                        "INSERT INTO pages (url, title) VALUES (?, ?)",
+                        (f"https://example.com/{_}", "title"),
+                    )
+
+            assert connect.call_count == 2
+        finally:
+            await temp_db.close()
+
+    @pytest.mark.asyncio
+    async def test_reader_connections_are_bounded(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """同時読み取りでも pool_size を超える接続を作らない."""
+        temp_db.pool_size = 2
+        await temp_db.open()
+        try:
+            rows = await asyncio.gather(
+                *(temp_db.fetch_all("SELECT 1 AS value") for _ in range(10))
+            )
+
+            assert all(row[0]["value"] == 1 for row in rows)
+            assert len(temp_db._open_readers) <= 2
+        finally:
+            await temp_db.close()
+
+    @pytest.mark.asyncio
+    async def test_pragmas_apply_to_pooled_connections(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """使い回す接続でも外部キー制約が有効."""
+        await temp_db.open()
+        try:
+            row = await temp_db.fetch_one("PRAGMA foreign_keys")
+            assert row is not None and row[0] == 1
+            with pytest.raises(DatabaseError, match="FOREIGN KEY constraint failed"):
+                await temp_db.execute(
+                    "INSERT INTO process_logs (page_id, url, status) VALUES (?, ?, ?)",
+                    (999, "https://example.com", "started"),
+                )
+        finally:
+            await temp_db.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_transaction_is_rolled_back_before_reuse(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """例外で抜けた書き込みトランザクションは次の利用者へ持ち越さない."""
+        await temp_db.open()
+        try:
+            with pytest.raises(RuntimeError):
+                async with temp_db.connect() as conn:
+                    await conn.execute("BEGIN IMMEDIATE")
+                    await conn.execute(
+                        "INSERT INTO pages (url, title) VALUES (?, ?)",
+                        ("https://rolled-back.example.com", "title"),
+                    )
+                    raise RuntimeError("boom")
+
+            async with temp_db.connect() as conn:
+                assert not conn.in_transaction
+            assert await temp_db.fetch_one("SELECT id FROM pages") is None
+        finally:
+            await temp_db.close()
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_reader_is_discarded(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """応答しない待機中接続はヘルスチェックで破棄される."""
+        await temp_db.open()
+        try:
+            await temp_db.fetch_one("SELECT 1")
+            broken = temp_db._idle_readers[0]
+            await broken.close()
+
+            assert await temp_db.health_check()
+            assert broken not in temp_db._open_readers
+        finally:
+            await temp_db.close()
+
+    @pytest.mark.asyncio
+    async def test_health_check_does_not_share_readers_with_queries(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """検査中の接続は読み取りに貸し出されず、並行実行でもプールが壊れない."""
+        temp_db.pool_size = 2
+        await temp_db.open()
+        try:
+            await asyncio.gather(*(temp_db.fetch_one("SELECT 1") for _ in range(2)))
+            checked = asyncio.Event()
+            is_healthy = temp_db._is_healthy
+
+            async def slow_is_healthy(conn: aiosqlite.Connection) -> bool:
+                assert conn not in temp_db._idle_readers
+                checked.set()
+                await asyncio.sleep(0.01)
+                return await is_healthy(conn)
+
+            with patch.object(temp_db, "_is_healthy", side_effect=slow_is_healthy):
+                results = await asyncio.gather(
+                    temp_db.health_check(),
+                    *(temp_db.fetch_one("SELECT 1") for _ in range(5)),
+                )
+
+            assert checked.is_set()
+            assert results[0] is True
+            assert len(temp_db._open_readers) <= 2
+            assert len(set(temp_db._idle_readers)) == len(temp_db._idle_readers)
+        finally:
+            await temp_db.close()
+
+    @pytest.mark.asyncio
+    async def test_close_releases_all_connections(
+        self, temp_db: DatabaseConnection
+    ) -> None:
+        """close() 後は接続を保持せず、従来の都度接続に戻る."""
+        await temp_db.open()
+        await temp_db.fetch_one("SELECT 1")
+        await temp_db.execute("DELETE FROM pages")
+
+        await temp_db.close()
+
+        assert not temp_db.is_pooled
+        assert temp_db._writer is None
+        assert not temp_db._open_readers
+        assert await temp_db.fetch_one("SELECT 1") is not None
+
+
 class TestLegacyDatabaseMigration:
     """旧データベースの移行処理を検証する."""
 
@@ -220,7 +364,7 @@ class TestLegacyDatabaseMigration:
 
         assert inspection.current_version == 2
         assert inspection.has_history is False
-        assert inspection.pending_versions == (3, 4, 5)
+        assert inspection.pending_versions == tuple(range(3, LATEST_SCHEMA_VERSION + 1))
         assert inspection.backup_required is True
 
         async with aiosqlite.connect(db_path) as conn:
@@ -336,6 +480,112 @@ class TestLegacyDatabaseMigration:
         assert log_row is not None
         assert log_row["created_at"] == "2025-01-01T12:00:00.000Z"
 
+    @pytest.mark.asyncio
+    async def test_active_job_stage_is_derived_from_current_step(
+        self, tmp_path: Path
+    ) -> None:
+        """実行中ジョブは完了済みステップの次ステージから再開できるよう移行する."""
+        db_path = str(tmp_path / "stages.db")
+        await self.create_legacy_schema(db_path, 5)
+        async with aiosqlite.connect(db_path) as conn:
+            page = await conn.execute(
+                "INSERT INTO pages (url, title, status) VALUES (?, ?, ?)",
+                ("https://example.com", "example", "processing"),
+            )
+            page_id = int(page.lastrowid or 0)
+            await conn.executemany(
+                """INSERT INTO jobs (page_id, kind, status, current_step, start_step)
+                VALUES (?, ?, ?, ?, ?)""",
+                [
+                    (page_id, "process_url", "running", "downloaded", "download"),
+                    (page_id, "process_url", "failed", "llm_processed", "download"),
+                ],
+            )
+            await conn.commit()
+
+        db = DatabaseConnection(db_path)
+        await db.initialize_tables()
+        rows = await db.fetch_all("SELECT stage, log_id FROM jobs ORDER BY id")
+
+        assert [(row["stage"], row["log_id"]) for row in rows] == [
+            ("llm", None),
+            ("download", None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_job_priority_and_host_are_backfilled(self, tmp_path: Path) -> None:
+        """既存ジョブの優先度を種別から、ホストをページURLから補完する."""
+        db_path = str(tmp_path / "priority.db")
+        await self.create_legacy_schema(db_path, 7)
+        async with aiosqlite.connect(db_path) as conn:
+            page = await conn.execute(
+                "INSERT INTO pages (url, title, status) VALUES (?, ?, ?)",
+                ("https://Example.COM/a", "example", "queued"),
+            )
+            await conn.execute(
+                """INSERT INTO jobs (page_id, kind, status, start_step, stage)
+                VALUES (?, 'reprocess', 'queued', 'llm', 'llm')""",
+                (page.lastrowid,),
+            )
+            await conn.commit()
+
+        db = DatabaseConnection(db_path)
+        await db.initialize_tables()
+        row = await db.fetch_one("SELECT priority, host FROM jobs")
+
+        assert row is not None
+        assert (row["priority"], row["host"]) == (0, "example.com")
+
+    @pytest.mark.asyncio
+    async def test_succeeded_pages_are_queued_for_chunk_attribute_sync(
+        self, tmp_path: Path
+    ) -> None:
+        """既存の成功済みページをチャンク属性の書き直し待ちに登録する."""
+        db_path = str(tmp_path / "chunk-attributes.db")
+        await self.create_legacy_schema(db_path, 10)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                "INSERT INTO pages (url, title, status) VALUES (?, ?, ?)",
+                [
+                    ("https://example.com/a", "a", "succeeded"),
+                    ("https://example.com/b", "b", "failed"),
+                ],
+            )
+            await conn.commit()
+
+        db = DatabaseConnection(db_path)
+        await db.initialize_tables()
+        rows = await db.fetch_all("SELECT page_id, version FROM chunk_attribute_sync")
+
+        assert [tuple(row) for row in rows] == [(1, 1)]
+
+    @pytest.mark.asyncio
+    async def test_pages_without_chunk_rows_are_marked_legacy(
+        self, tmp_path: Path
+    ) -> None:
+        """内容ハッシュのチャンクを記録していない既存ページだけに旧形式の印を付ける."""
+        db_path = str(tmp_path / "legacy-chunks.db")
+        await self.create_legacy_schema(db_path, 13)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                "INSERT INTO pages (url, title, status) VALUES (?, ?, ?)",
+                [
+                    ("https://example.com/a", "a", "succeeded"),
+                    ("https://example.com/b", "b", "succeeded"),
+                ],
+            )
+            await conn.execute(
+                "INSERT INTO page_chunks (page_id, chunk_id, chunk_hash) "
+                "VALUES (2, 0, 'hash')"
+            )
+            await conn.commit()
+
+        db = DatabaseConnection(db_path)
+        await db.initialize_tables()
+        rows = await db.fetch_all("SELECT page_id FROM legacy_chunk_pages")
+
+        assert [row["page_id"] for row in rows] == [1]
+
     @pytest.mark.asyncio
     async def test_invalid_timestamp_migration_rolls_back_without_data_loss(
         self, tmp_path: Path
@@ -0,0 +1,88 @@
+"""Test document cache."""
+
+from typing import Any
+
+import pytest
+from grimoire_api.models.external import FetchedDocument
+from grimoire_api.repositories.document_cache import DocumentCache
+
+
+def make_document(source: dict[str, Any], source_url: str) -> FetchedDocument:
+    """テスト用の FetchedDocument を作る."""
+    return FetchedDocument.from_jina_response(source, source_url=source_url)
+
+
+class TestDocumentCache:
+    """DocumentCacheのテストクラス."""
+
+    def test_rejects_non_positive_size(self: Any) -> None:
+        """上限が0以下なら作成できない."""
+        with pytest.raises(ValueError):
+            DocumentCache(0)
+
+    def test_hit_requires_same_version(self: Any) -> None:
+        """ファイル版が変わったエントリは使わない."""
+        cache = DocumentCache(100)
+        source = {"data": {"content": "a"}}
+        cache.put(1, (10, 5), 5, source)
+
+        assert cache.get(1, (10, 5)) is source
+        assert cache.get(1, (11, 5)) is None
+        # 古い版は捨てられている
+        assert cache.get(1, (10, 5)) is None
+
+    def test_evicts_least_recently_used_by_bytes(self: Any) -> None:
+        """合計バイト数が上限を超えたら最終利用が古いものから捨てる."""
+        cache = DocumentCache(10)
+        cache.put(1, (1, 4), 4, {"id": 1})
+        cache.put(2, (1, 4), 4, {"id": 2})
+        assert cache.get(1, (1, 4)) is not None
+
+        cache.put(3, (1, 4), 4, {"id": 3})
+
+        assert cache.get(2, (1, 4)) is None
+        assert cache.get(1, (1, 4)) == {"id": 1}
+        assert cache.get(3, (1, 4)) == {"id": 3}
+
+    def test_skips_entries_larger_than_limit(self: Any) -> None:
+        """上限より大きいファイルは保存しない."""
+        cache = DocumentCache(10)
+        cache.put(1, (1, 4), 4, {"id": 1})
+        cache.put(2, (1, 11), 11, {"id": 2})
+
+        assert cache.get(2, (1, 11)) is None
+        assert cache.get(1, (1, 4)) == {"id": 1}
+
+    def test_document_is_tied_to_cached_source(self: Any) -> None:
+        """FetchedDocument はキャッシュ中の同じ JSON に対してだけ返す."""
+        cache = DocumentCache(100)
+        source = {"data": {"title": "T", "content": "body"}}
+        cache.put(1, (1, 10), 10, source)
+        document = make_document(source, "https://example.com/a")
+        cache.put_document(1, source, document)
+
+        assert cache.get_document(1, source, "https://example.com/a") is document
+        assert cache.get_document(1, dict(source), "https://example.com/a") is None
+
+    def test_document_source_url_follows_request(self: Any) -> None:
+        """source_url が異なる場合はその URL に差し替えたコピーを返す."""
+        cache = DocumentCache(100)
+        source = {"data": {"title": "T", "content": "body"}}
+        cache.put(1, (1, 10), 10, source)
+        document = make_document(source, "https://example.com/a")
+        cache.put_document(1, source, document)
+
+        moved = cache.get_document(1, source, "https://example.com/b")
+
+        assert moved is not None
+        assert moved.source_url == "https://example.com/b"
+        assert moved.content == document.content
+        assert document.source_url == "https://example.com/a"
+
+    def test_invalidate(self: Any) -> None:
+        """invalidate でエントリを捨てる."""
+        cache = DocumentCache(100)
+        cache.put(1, (1, 4), 4, {"id": 1})
+        cache.invalidate(1)
+
+        assert cache.get(1, (1, 4)) is None
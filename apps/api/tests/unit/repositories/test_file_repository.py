@@ -1,11 +1,19 @@
 """Test file repository."""
 
+import hashlib
+import json
+import os
+import sqlite3
 import tempfile
 from pathlib import Path
 from typing import Any
+from unittest.mock import patch
 
 import pytest
+from grimoire_api.models.external import FetchedDocument
+from grimoire_api.repositories.document_cache import DocumentCache
 from grimoire_api.repositories.file_repository import FileRepository
+from grimoire_api.repositories.storage_format import iter_stored_files
 from grimoire_api.utils.exceptions import FileOperationError
 
 
@@ -126,3 +134,411 @@ class TestFileRepository:
         await file_repo.save_json_file(page_id, test_data)
         loaded_data = await file_repo.load_json_file(page_id)
         assert loaded_data == test_data
+
+
+class TestFileRepositoryDocumentCache:
+    """DocumentCache を使う FileRepository のテストクラス."""
+
+    SOURCE = {"data": {"title": "Title", "content": "Body", "url": "https://e.com"}}
+
+    @pytest.fixture
+    def file_repo(self) -> Any:
+        """キャッシュ付き FileRepository フィクスチャ."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield FileRepository(
+                storage_path=temp_dir, document_cache=DocumentCache(1024 * 1024)
+            )
+
+    @pytest.mark.asyncio
+    async def test_second_load_reuses_parsed_json(self: Any, file_repo: Any) -> None:
+        """2回目の読み込みはファイルを開かずキャッシュを返す."""
+        await file_repo.save_json_file(1, self.SOURCE)
+        first = await file_repo.load_json_file(1)
+
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            second = await file_repo.load_json_file(1)
+
+        assert second is first
+        assert second == self.SOURCE
+
+    @pytest.mark.asyncio
+    async def test_save_invalidates_cache(self: Any, file_repo: Any) -> None:
+        """保存し直したら新しい内容を読む."""
+        await file_repo.save_json_file(1, self.SOURCE)
+        await file_repo.load_json_file(1)
+
+        updated = {"data": {"title": "New", "content": "Body"}}
+        await file_repo.save_json_file(1, updated)
+
+        assert await file_repo.load_json_file(1) == updated
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_cache(self: Any, file_repo: Any) -> None:
+        """削除したファイルはキャッシュからも返さない."""
+        await file_repo.save_json_file(1, self.SOURCE)
+        await file_repo.load_json_file(1)
+        await file_repo.delete_json_file(1)
+
+        with pytest.raises(FileOperationError, match="JSON file not found"):
+            await file_repo.load_json_file(1)
+
+    @pytest.mark.asyncio
+    async def test_load_document_reuses_validated_document(
+        self: Any, file_repo: Any
+    ) -> None:
+        """検証済み FetchedDocument を再利用する."""
+        await file_repo.save_json_file(1, self.SOURCE)
+        first = await file_repo.load_document(1, source_url="https://e.com")
+
+        with patch.object(
+            FetchedDocument, "from_jina_response", side_effect=AssertionError
+        ):
+            second = await file_repo.load_document(1, source_url="https://e.com")
+
+        assert second is first
+        assert second.title == "Title"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"storage_format": "json.gz", "dedup_min_bytes": 0},
+            {"storage_format": "json", "dedup_min_bytes": 1},
+        ],
+        ids=["gzip", "blob"],
+    )
+    async def test_cache_counts_decompressed_size(
+        self: Any, options: dict[str, Any]
+    ) -> None:
+        """圧縮・blob 参照のファイルも展開後の大きさでキャッシュ容量を数える."""
+        source = {"data": {"title": "Title", "content": "a" * 8192}}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_repo = FileRepository(
+                storage_path=temp_dir, document_cache=DocumentCache(4096), **options
+            )
+            await file_repo.save_json_file(1, source)
+            stored = [path for _, path in iter_stored_files(Path(temp_dir))]
+            assert all(path.stat().st_size < 4096 for path in stored)
+
+            first = await file_repo.load_json_file(1)
+            second = await file_repo.load_json_file(1)
+
+        assert first == second == source
+        assert second is not first
+
+    @pytest.mark.asyncio
+    async def test_load_document_without_cache(self: Any) -> None:
+        """キャッシュなしでも FetchedDocument を返す."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_repo = FileRepository(storage_path=temp_dir)
+            await file_repo.save_json_file(1, self.SOURCE)
+
+            document = await file_repo.load_document(1, source_url="https://e.com")
+
+        assert document.content == "Body"
+        assert document.source_url == "https://e.com"
+
+
+def stored_files(root: str) -> list[str]:
+    """保存済みファイルの相対パスを返す."""
+    return sorted(
+        path.relative_to(root).as_posix() for _, path in iter_stored_files(Path(root))
+    )
+
+
+def write_legacy_file(root: str, page_id: int, data: dict[str, Any]) -> None:
+    """従来のフラット配置・整形済み JSON のファイルを書く."""
+    (Path(root) / f"{page_id}.json").write_text(
+        json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"
+    )
+
+
+class TestFileRepositoryStorageFormat:
+    """保存形式・配置に関する FileRepository のテストクラス."""
+
+    SOURCE = {"data": {"title": "タイトル", "content": "本文" * 100}}
+
+    @pytest.fixture
+    def temp_dir(self) -> Any:
+        """一時ディレクトリフィクスチャ."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @pytest.mark.asyncio
+    async def test_saves_in_configured_format(self: Any, temp_dir: Any) -> None:
+        """指定した形式の拡張子でページ ID のシャードに保存する."""
+        file_repo = FileRepository(storage_path=temp_dir, storage_format="json.gz")
+        await file_repo.save_json_file(1, self.SOURCE)
+        await file_repo.save_json_file(12345, self.SOURCE)
+
+        assert stored_files(temp_dir) == [
+            "000000/1.json.gz",
+            "000012/12345.json.gz",
+        ]
+        assert await file_repo.load_json_file(12345) == self.SOURCE
+
+    @pytest.mark.asyncio
+    async def test_reads_legacy_json(self: Any, temp_dir: Any) -> None:
+        """従来のフラット配置の .json もそのまま読める."""
+        write_legacy_file(temp_dir, 1, self.SOURCE)
+        file_repo = FileRepository(storage_path=temp_dir, storage_format="json.gz")
+
+        assert await file_repo.file_exists(1)
+        assert await file_repo.get_existing_page_ids() == {1}
+        assert await file_repo.load_json_file(1) == self.SOURCE
+
+    @pytest.mark.asyncio
+    async def test_save_replaces_legacy_file(self: Any, temp_dir: Any) -> None:
+        """保存すると他の配置・形式のファイルは削除される."""
+        write_legacy_file(temp_dir, 1, {"data": "old"})
+        FileRepository(temp_dir, storage_format="json").save_json_file_sync(
+            1, {"data": "old"}
+        )
+        file_repo = FileRepository(storage_path=temp_dir, storage_format="json.gz")
+        await file_repo.save_json_file(1, self.SOURCE)
+
+        assert stored_files(temp_dir) == ["000000/1.json.gz"]
+        assert await file_repo.load_json_file(1) == self.SOURCE
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_every_format(self: Any, temp_dir: Any) -> None:
+        """削除はすべての配置・形式のファイルを消す."""
+        write_legacy_file(temp_dir, 1, self.SOURCE)
+        file_repo = FileRepository(storage_path=temp_dir, storage_format="json.gz")
+        await file_repo.save_json_file(1, self.SOURCE)
+        write_legacy_file(temp_dir, 1, self.SOURCE)
+
+        await file_repo.delete_json_file(1)
+
+        assert not await file_repo.file_exists(1)
+        assert stored_files(temp_dir) == []
+        assert await file_repo.get_existing_page_ids() == set()
+
+    @pytest.mark.asyncio
+    async def test_corrupted_compressed_file(self: Any, temp_dir: Any) -> None:
+        """壊れた圧縮ファイルは FileOperationError にする."""
+        (Path(temp_dir) / "1.json.gz").write_bytes(b"broken")
+        file_repo = FileRepository(storage_path=temp_dir, storage_format="json.gz")
+
+        with pytest.raises(FileOperationError, match="Invalid stored file"):
+            await file_repo.load_json_file(1)
+
+    def test_convert_file(self: Any, temp_dir: Any) -> None:
+        """従来形式を現在の形式・配置へ書き換え、サイズを返す."""
+        write_legacy_file(temp_dir, 1, self.SOURCE)
+        file_repo = FileRepository(storage_path=temp_dir, storage_format="json.gz")
+
+        sizes = file_repo.convert_file_sync(1)
+
+        assert sizes is not None and sizes[1] < sizes[0]
+        assert stored_files(temp_dir) == ["000000/1.json.gz"]
+        assert file_repo._load_json_file_sync(1) == self.SOURCE
+        # 既に現在の形式なら何もしない
+        assert file_repo.convert_file_sync(1) is None
+
+    def test_unknown_format(self: Any, temp_dir: Any) -> None:
+        """未知の保存形式は作成時に拒否する."""
+        with pytest.raises(ValueError, match="Unknown storage format"):
+            FileRepository(storage_path=temp_dir, storage_format="msgpack")
+
+
+class TestFileRepositoryManifest:
+    """索引 (manifest) に関する FileRepository のテストクラス."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Any:
+        """一時ディレクトリフィクスチャ."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @pytest.mark.asyncio
+    async def test_save_and_delete_update_manifest(self: Any, temp_dir: Any) -> None:
+        """保存・削除のたびに索引を更新する."""
+        file_repo = FileRepository(storage_path=temp_dir)
+        await file_repo.save_json_file(7, {"data": "a"})
+
+        entry = file_repo.manifest.get(7)
+        stored = Path(temp_dir) / "000000" / "7.json.gz"
+        assert entry is not None
+        assert entry.path == "000000/7.json.gz"
+        assert entry.size == stored.stat().st_size
+        assert entry.sha256 == hashlib.sha256(stored.read_bytes()).hexdigest()
+
+        await file_repo.delete_json_file(7)
+        assert file_repo.manifest.get(7) is None
+
+    @pytest.mark.asyncio
+    async def test_existing_ids_come_from_manifest(self: Any, temp_dir: Any) -> None:
+        """索引が完成したらディレクトリを走査せずにページ ID を返す."""
+        write_legacy_file(temp_dir, 3, {"data": "legacy"})
+        file_repo = FileRepository(storage_path=temp_dir)
+        await file_repo.save_json_file(5, {"data": "new"})
+
+        # 初回は未登録の従来ファイルを走査して索引を完成させる
+        assert await file_repo.get_existing_page_ids() == {3, 5}
+        assert file_repo.manifest.is_complete()
+
+        with patch(
+            "grimoire_api.repositories.file_repository.iter_stored_files",
+            side_effect=AssertionError("scanned"),
+        ):
+            assert await file_repo.get_existing_page_ids() == {3, 5}
+
+    def test_rebuild_and_verify(self: Any, temp_dir: Any) -> None:
+        """再構築した索引と実ファイルの不一致を検出する."""
+        write_legacy_file(temp_dir, 1, {"data": "a"})
+        write_legacy_file(temp_dir, 2, {"data": "b"})
+        write_legacy_file(temp_dir, 3, {"data": "c"})
+        file_repo = FileRepository(storage_path=temp_dir)
+
+        assert file_repo.rebuild_manifest_sync() == 3
+        assert list(file_repo.verify_manifest_sync(check_hash=True)) == []
+
+        (Path(temp_dir) / "1.json").unlink()
+        (Path(temp_dir) / "2.json").write_text('{"data": "changed"}')
+        path = Path(temp_dir) / "3.json"
+        stat = path.stat()
+        path.write_text(json.dumps({"data": "x"}, ensure_ascii=True, indent=2))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert list(file_repo.verify_manifest_sync()) == [
+            (1, "missing"),
+            (2, "modified"),
+        ]
+        assert list(file_repo.verify_manifest_sync(check_hash=True)) == [
+            (1, "missing"),
+            (2, "modified"),
+            (3, "hash_mismatch"),
+        ]
+
+
+def blob_files(root: str) -> list[str]:
+    """共有 blob のファイル名を返す."""
+    return sorted(path.name for path in (Path(root) / "blobs").glob("*/*.txt.gz"))
+
+
+class TestFileRepositoryContentDedup:
+    """本文の共有 blob に関する FileRepository のテストクラス."""
+
+    CONTENT = "同じ本文 " * 100
+
+    @pytest.fixture
+    def temp_dir(self) -> Any:
+        """一時ディレクトリフィクスチャ."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @pytest.fixture
+    def file_repo(self, temp_dir: Any) -> Any:
+        """FileRepositoryフィクスチャ."""
+        return FileRepository(storage_path=temp_dir, dedup_min_bytes=100)
+
+    def source(self, title: str, content: str | None = None) -> dict[str, Any]:
+        return {
+            "code": 200,
+            "data": {"title": title, "content": content or self.CONTENT},
+        }
+
+    @pytest.mark.asyncio
+    async def test_pages_with_same_content_share_one_blob(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """同じ本文のページは1つの blob を参照し、読み込みで本文に戻る."""
+        await file_repo.save_json_file(1, self.source("A"))
+        await file_repo.save_json_file(2, self.source("B"))
+
+        digest = hashlib.sha256(self.CONTENT.encode("utf-8")).hexdigest()
+        assert blob_files(temp_dir) == [f"{digest}.txt.gz"]
+        assert file_repo.manifest.get(1).blob == digest
+        assert "同じ本文" not in (Path(temp_dir) / "000000" / "1.json.gz").read_text(
+            "latin-1"
+        )
+        assert await file_repo.load_json_file(2) == self.source("B")
+
+    @pytest.mark.asyncio
+    async def test_blob_removed_after_last_reference(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """どのページからも参照されなくなった blob を削除する."""
+        await file_repo.save_json_file(1, self.source("A"))
+        await file_repo.save_json_file(2, self.source("B"))
+        await file_repo.save_json_file(3, self.source("C"))
+
+        await file_repo.delete_json_file(1)
+        assert len(blob_files(temp_dir)) == 1
+        await file_repo.save_json_file(2, self.source("B", "別の本文 " * 100))
+        assert len(blob_files(temp_dir)) == 2
+        await file_repo.delete_json_file(3)
+        assert len(blob_files(temp_dir)) == 1
+        assert await file_repo.load_json_file(2) == self.source("B", "別の本文 " * 100)
+
+    @pytest.mark.asyncio
+    async def test_small_content_stays_inline(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """閾値未満の本文と無効化時は blob を作らない."""
+        await file_repo.save_json_file(1, self.source("A", "short"))
+        disabled = FileRepository(storage_path=temp_dir, dedup_min_bytes=0)
+        await disabled.save_json_file(2, self.source("B"))
+
+        assert not (Path(temp_dir) / "blobs").exists()
+        assert await file_repo.load_json_file(2) == self.source("B")
+
+    @pytest.mark.asyncio
+    async def test_inline_fallback_when_manifest_unavailable(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """参照を記録できない場合は本文を埋め込んで保存する."""
+        with patch.object(
+            file_repo.manifest,
+            "transaction",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            await file_repo.save_json_file(1, self.source("A"))
+
+        assert not (Path(temp_dir) / "blobs").exists()
+        assert await file_repo.load_json_file(1) == self.source("A")
+
+    @pytest.mark.asyncio
+    async def test_missing_blob_is_reported(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """blob が無いページは読み込みエラーとし、検証で報告する."""
+        await file_repo.save_json_file(1, self.source("A"))
+        for path in (Path(temp_dir) / "blobs").glob("*/*.txt.gz"):
+            path.unlink()
+
+        with pytest.raises(FileOperationError, match="Content blob not found"):
+            await file_repo.load_json_file(1)
+        assert list(file_repo.verify_manifest_sync()) == [(1, "missing_blob")]
+
+    @pytest.mark.asyncio
+    async def test_rebuild_restores_blob_references(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """索引を作り直しても blob の参照を失わず、共有中の blob を消さない."""
+        await file_repo.save_json_file(1, self.source("A"))
+        await file_repo.save_json_file(2, self.source("B"))
+        (Path(temp_dir) / "manifest.db").unlink()
+
+        rebuilt = FileRepository(storage_path=temp_dir, dedup_min_bytes=100)
+        assert rebuilt.rebuild_manifest_sync() == 2
+        await rebuilt.delete_json_file(1)
+
+        assert len(blob_files(temp_dir)) == 1
+        assert await rebuilt.load_json_file(2) == self.source("B")
+
+    def test_convert_keeps_blob_reference(
+        self: Any, file_repo: Any, temp_dir: Any
+    ) -> None:
+        """形式の変換後も blob の参照を保つ."""
+        file_repo.save_json_file_sync(1, self.source("A"))
+        json_repo = FileRepository(
+            storage_path=temp_dir, storage_format="json", dedup_min_bytes=100
+        )
+
+        assert json_repo.convert_file_sync(1) is not None
+        assert stored_files(temp_dir) == ["000000/1.json"]
+        assert json_repo.manifest.get(1).blob is not None
+        assert len(blob_files(temp_dir)) == 1
+        assert json_repo._load_json_file_sync(1) == self.source("A")
@@ -2,9 +2,15 @@
 
 import asyncio
 from datetime import UTC
+from unittest.mock import patch
 
 import pytest
-from grimoire_api.models.database import JobKind, JobStatus, PipelineStartStep
+from grimoire_api.models.database import (
+    JobKind,
+    JobPriority,
+    JobStatus,
+    PipelineStartStep,
+)
 from grimoire_api.repositories.job_repository import JobRepository
 from grimoire_api.utils.exceptions import DatabaseError
 
@@ -60,7 +66,7 @@ async def test_recover_running_jobs(temp_db, page_repo) -> None:
     repo = JobRepository(temp_db)
     page_id = await page_repo.create_page("https://example.com", "title")
     await repo.enqueue(page_id, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
-    claimed = await repo.claim_next()
+    claimed = await repo.claim_next(owner="crashed", lease_seconds=-1)
     assert claimed is not None
 
     assert await repo.recover_running() == 1
@@ -71,6 +77,119 @@ async def test_recover_running_jobs(temp_db, page_repo) -> None:
     assert recovered.attempt == 2
 
 
+async def test_recover_running_keeps_live_leases(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    live_page = await page_repo.create_page("https://live.example.com", "live")
+    legacy_page = await page_repo.create_page("https://legacy.example.com", "old")
+    await repo.enqueue(live_page, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    await repo.enqueue(legacy_page, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    live, legacy = await repo.claim_batch(2, owner="other-worker")
+    await temp_db.execute(
+        "UPDATE jobs SET lease_owner=NULL, lease_expires_at=NULL WHERE id=?",
+        (legacy.id,),
+    )
+
+    assert await repo.recover_running() == 1
+
+    reclaimed = await repo.claim_batch(2, owner="new-worker")
+    assert [job.id for job in reclaimed] == [legacy.id]
+    assert reclaimed[0].attempt == 2
+
+
+async def test_recover_running_requeues_only_reclaimed_pages(
+    temp_db, page_repo
+) -> None:
+    repo = JobRepository(temp_db)
+    crashed_page = await page_repo.create_page("https://crashed.example.com", "c")
+    staged_page = await page_repo.create_page("https://staged.example.com", "s")
+    await repo.enqueue(crashed_page, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    await repo.claim_next(owner="crashed", lease_seconds=-1)
+    # 次ステージの claim 待ちで処理中のページ
+    await repo.enqueue(staged_page, JobKind.RETRY, PipelineStartStep.LLM)
+    await temp_db.execute(
+        "UPDATE pages SET status='processing', updated_at=? WHERE id=?",
+        ("2000-01-01T00:00:00.000Z", staged_page),
+    )
+    await temp_db.execute(
+        "UPDATE pages SET updated_at=? WHERE id=?",
+        ("2000-01-01T00:00:00.000Z", crashed_page),
+    )
+
+    assert await repo.recover_running() == 1
+
+    crashed = await page_repo.get_page(crashed_page)
+    staged = await page_repo.get_page(staged_page)
+    assert crashed is not None and staged is not None
+    assert crashed.status.value == "queued"
+    assert crashed.updated_at.year > 2000
+    assert staged.status.value == "processing"
+    assert staged.updated_at.year == 2000
+
+
+async def test_claim_batch_respects_stage_limits(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    for index, stage in enumerate(
+        [PipelineStartStep.DOWNLOAD, PipelineStartStep.DOWNLOAD, PipelineStartStep.LLM]
+    ):
+        page_id = await page_repo.create_page(f"https://{index}.example.com", "t")
+        await repo.enqueue(page_id, JobKind.RETRY, stage)
+
+    jobs = await repo.claim_batch(
+        3,
+        {PipelineStartStep.DOWNLOAD: 1, PipelineStartStep.LLM: 2},
+        owner="worker-a",
+        lease_seconds=30,
+    )
+
+    assert [job.stage for job in jobs] == [
+        PipelineStartStep.DOWNLOAD,
+        PipelineStartStep.LLM,
+    ]
+    assert {job.lease_owner for job in jobs} == {"worker-a"}
+    assert all(job.lease_expires_at is not None for job in jobs)
+    assert await repo.count_queued() == 1
+
+
+async def test_expired_lease_is_reclaimed_by_next_claim(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    page_id = await page_repo.create_page("https://example.com", "title")
+    await repo.enqueue(page_id, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    crashed = await repo.claim_next(owner="crashed", lease_seconds=-1)
+    assert crashed is not None
+
+    reclaimed = await repo.claim_next(owner="worker-b")
+
+    assert reclaimed is not None
+    assert reclaimed.id == crashed.id
+    assert reclaimed.lease_owner == "worker-b"
+    assert await repo.renew_leases([crashed.id], "crashed") == set()
+    assert await repo.renew_leases([crashed.id], "worker-b") == {crashed.id}
+
+
+async def test_stale_owner_cannot_finish_reclaimed_job(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    page_id = await page_repo.create_page("https://example.com", "title")
+    await repo.enqueue(page_id, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    stale = await repo.claim_next(owner="stale", lease_seconds=-1)
+    assert stale is not None
+    assert await repo.claim_next(owner="worker-b") is not None
+
+    assert await repo.succeed(stale.id, page_id, "stale") is False
+    assert await repo.fail(stale.id, page_id, "late", "stale") is False
+    assert await repo.advance(stale.id, PipelineStartStep.LLM, 7, "stale") is False
+
+    job = await repo.get_latest_for_page(page_id)
+    assert job is not None
+    assert job.status == JobStatus.RUNNING
+    assert job.stage == PipelineStartStep.DOWNLOAD
+    assert job.lease_owner == "worker-b"
+    page = await page_repo.get_page(page_id)
+    assert page is not None
+    assert page.status.value == "processing"
+
+    assert await repo.succeed(stale.id, page_id, "worker-b") is True
+
+
 async def test_success_and_failure_update_page_status(temp_db, page_repo) -> None:
     repo = JobRepository(temp_db)
     page_id = await page_repo.create_page("https://example.com", "title")
@@ -102,3 +221,125 @@ async def test_has_active_for_page(temp_db, page_repo) -> None:
 
     await repo.succeed(job_id, page_id)
     assert not await repo.has_active_for_page(page_id)
+
+
+async def test_count_queued(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    first_page = await page_repo.create_page("https://one.example.com", "one")
+    second_page = await page_repo.create_page("https://two.example.com", "two")
+    await repo.enqueue(first_page, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    await repo.enqueue(second_page, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+    assert await repo.count_queued() == 2
+
+    await repo.claim_next()
+
+    assert await repo.count_queued() == 1
+
+
+async def test_claim_filters_by_stage_and_advance_requeues(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    page_id = await page_repo.create_page("https://example.com", "title")
+    job_id = await repo.enqueue(page_id, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+
+    assert await repo.claim_next([PipelineStartStep.LLM]) is None
+    job = await repo.claim_next([PipelineStartStep.DOWNLOAD])
+    assert job is not None and job.stage == PipelineStartStep.DOWNLOAD
+
+    await repo.advance(job_id, PipelineStartStep.LLM, 7)
+
+    assert await repo.has_active_for_page(page_id) is True
+    assert await repo.claim_next([PipelineStartStep.DOWNLOAD]) is None
+    advanced = await repo.claim_next([PipelineStartStep.LLM])
+    assert advanced is not None
+    assert advanced.stage == PipelineStartStep.LLM
+    assert advanced.log_id == 7
+    assert advanced.attempt == 1
+
+
+async def test_claim_on_empty_queue_does_not_open_write_transaction(
+    temp_db, page_repo
+) -> None:
+    repo = JobRepository(temp_db)
+
+    with patch.object(temp_db, "connect") as connect:
+        assert await repo.claim_next() is None
+
+    connect.assert_not_called()
+
+
+async def test_enqueue_notifies_worker(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    page_id = await page_repo.create_page("https://example.com", "title")
+
+    with patch("grimoire_api.repositories.job_repository.notify_job_queued") as notify:
+        await repo.enqueue(page_id, JobKind.INITIAL, PipelineStartStep.DOWNLOAD)
+
+    notify.assert_called_once_with()
+
+
+async def enqueue_urls(repo, page_repo, urls, kind=JobKind.RETRY) -> list[int]:
+    job_ids = []
+    for url in urls:
+        page_id = await page_repo.create_page(url, "title")
+        job_ids.append(await repo.enqueue(page_id, kind, PipelineStartStep.DOWNLOAD))
+    return job_ids
+
+
+async def test_claim_batch_round_robins_hosts_by_priority(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    bulk = await enqueue_urls(
+        repo,
+        page_repo,
+        [f"https://bulk.example.com/{index}" for index in range(3)],
+        JobKind.REPROCESS,
+    )
+    other = await enqueue_urls(repo, page_repo, ["https://other.example.com/1"])
+    interactive = await enqueue_urls(
+        repo, page_repo, ["https://slack.example.com/1"], JobKind.INITIAL
+    )
+
+    jobs = await repo.claim_batch(4)
+
+    assert [job.id for job in jobs] == [interactive[0], other[0], bulk[0], bulk[1]]
+    assert jobs[0].priority == JobPriority.INTERACTIVE
+    assert jobs[0].host == "slack.example.com"
+
+
+async def test_claim_batch_caps_running_downloads_per_host(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    job_ids = await enqueue_urls(
+        repo, page_repo, [f"https://bulk.example.com/{index}" for index in range(4)]
+    )
+    other = await enqueue_urls(repo, page_repo, ["https://other.example.com/1"])
+
+    first = await repo.claim_batch(10, host_limit=2)
+    second = await repo.claim_batch(10, host_limit=2)
+
+    assert [job.id for job in first] == [job_ids[0], other[0], job_ids[1]]
+    assert second == []
+
+
+async def test_claim_batch_skips_excluded_hosts(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    await enqueue_urls(repo, page_repo, ["https://busy.example.com/1"])
+    other = await enqueue_urls(repo, page_repo, ["https://other.example.com/1"])
+
+    jobs = await repo.claim_batch(10, excluded_hosts=["busy.example.com"])
+
+    assert [job.id for job in jobs] == other
+
+
+async def test_claim_batch_caps_downloads_at_host_tokens(temp_db, page_repo) -> None:
+    repo = JobRepository(temp_db)
+    bulk = await enqueue_urls(
+        repo, page_repo, [f"https://bulk.example.com/{index}" for index in range(3)]
+    )
+    other = await enqueue_urls(
+        repo, page_repo, [f"https://other.example.com/{index}" for index in range(3)]
+    )
+
+    jobs = await repo.claim_batch(
+        10, host_tokens={"bulk.example.com": 1}, default_host_tokens=2
+    )
+
+    assert sorted(job.id for job in jobs) == sorted([bulk[0], *other[:2]])
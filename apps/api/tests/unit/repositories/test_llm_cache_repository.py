@@ -0,0 +1,71 @@
+"""LLM result cache repository tests."""
+
+from collections.abc import Iterator
+from itertools import count
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from grimoire_api.repositories.database import DatabaseConnection
+from grimoire_api.repositories.llm_cache_repository import LLMCacheRepository
+
+
+def make_repo(tmp_path: Path, max_bytes: int = 1024) -> LLMCacheRepository:
+    db = DatabaseConnection(str(tmp_path / "cache" / "llm-cache.db"))
+    return LLMCacheRepository(db, max_bytes=max_bytes)
+
+
+@pytest.fixture(autouse=True)
+def monotonic_clock() -> Iterator[None]:
+    """ミリ秒精度の時刻が同値にならないよう、呼び出しごとに1秒進める."""
+    seconds = count()
+    with patch(
+        "grimoire_api.repositories.llm_cache_repository.utc_now_isoformat",
+        side_effect=lambda: f"2026-01-01T00:00:{next(seconds):02d}.000Z",
+    ):
+        yield
+
+
+async def test_put_then_get_round_trip(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path)
+
+    await repo.put("model", "1", "summary", "abc", '{"summary": "s"}')
+
+    assert await repo.get("model", "1", "summary", "abc") == '{"summary": "s"}'
+    assert await repo.get("model", "2", "summary", "abc") is None
+    assert await repo.get("other", "1", "summary", "abc") is None
+    assert await repo.get("model", "1", "partial", "abc") is None
+
+
+async def test_put_overwrites_existing_entry(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path)
+
+    await repo.put("model", "1", "summary", "abc", "old")
+    await repo.put("model", "1", "summary", "abc", "newer")
+
+    assert await repo.get("model", "1", "summary", "abc") == "newer"
+    assert await repo.total_bytes() == len("newer")
+
+
+async def test_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path, max_bytes=20)
+    await repo.put("model", "1", "partial", "a", "x" * 8)
+    await repo.put("model", "1", "partial", "b", "y" * 8)
+    # a を参照して b より新しくする
+    assert await repo.get("model", "1", "partial", "a") is not None
+
+    await repo.put("model", "1", "partial", "c", "z" * 8)
+
+    assert await repo.get("model", "1", "partial", "b") is None
+    assert await repo.get("model", "1", "partial", "a") == "x" * 8
+    assert await repo.get("model", "1", "partial", "c") == "z" * 8
+    assert await repo.total_bytes() <= 20
+
+
+async def test_oversized_result_is_not_stored(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path, max_bytes=4)
+
+    await repo.put("model", "1", "summary", "abc", "too large")
+
+    assert await repo.get("model", "1", "summary", "abc") is None
+    assert await repo.total_bytes() == 0
@@ -23,6 +23,15 @@ async def test_delete_pending_repair_page_is_atomic(temp_db, page_repo) -> None:
         "INSERT INTO jobs (page_id, kind, status, start_step) VALUES (?, ?, ?, ?)",
         (page_id, "retry", "failed", "download"),
     )
+    await temp_db.execute(
+        "INSERT INTO summary_checkpoints "
+        "(page_id, kind, content_hash, summary, created_at) VALUES (?, ?, ?, ?, ?)",
+        (page_id, "partial", "hash", "summary", "2026-01-01T00:00:00.000Z"),
+    )
+    await temp_db.execute(
+        "INSERT INTO page_chunks (page_id, chunk_id, chunk_hash) VALUES (?, ?, ?)",
+        (page_id, 0, "chunk-hash"),
+    )
 
     await temp_db.execute(
         "CREATE TRIGGER reject_test_page_delete BEFORE DELETE ON pages "
@@ -31,7 +40,14 @@ async def test_delete_pending_repair_page_is_atomic(temp_db, page_repo) -> None:
     with pytest.raises(DatabaseError, match="test rollback"):
         await page_repo.delete_pending_repair_page(page_id)
 
-    for table in ("pages", "process_logs", "jobs", "repair_cases"):
+    for table in (
+        "pages",
+        "process_logs",
+        "jobs",
+        "repair_cases",
+        "summary_checkpoints",
+        "page_chunks",
+    ):
         row = await temp_db.fetch_one(
             f"SELECT COUNT(*) AS count FROM {table} WHERE "
             + ("id=?" if table == "pages" else "page_id=?"),
@@ -40,6 +56,133 @@ async def test_delete_pending_repair_page_is_atomic(temp_db, page_repo) -> None:
         assert row is not None and row["count"] == 1
 
 
+class TestPageChunks:
+    """内容ハッシュで共有する本文チャンクの参照管理テスト."""
+
+    @pytest.mark.asyncio
+    async def test_replace_reports_only_unreferenced_chunks(
+        self, page_repo: Any
+    ) -> None:
+        first = await page_repo.create_page("https://a.example.com", "A")
+        second = await page_repo.create_page("https://b.example.com", "B")
+
+        results = [
+            await page_repo.replace_page_chunks(first, ["h1", "h2", "h3"]),
+            await page_repo.replace_page_chunks(second, ["h2"]),
+            await page_repo.replace_page_chunks(first, ["h3", "h4"]),
+        ]
+
+        assert [result.unreferenced for result in results] == [[], [], ["h1"]]
+        assert await page_repo.get_chunk_owners(["h2", "h3", "h9"]) == {
+            "h2": [(second, 0)],
+            "h3": [(first, 0)],
+        }
+        assert await page_repo.get_unshared_chunk_hashes(first) == ["h3", "h4"]
+        assert await page_repo.get_page_chunk_hashes(first) == ["h3", "h4"]
+        assert await page_repo.get_page_chunk_hashes(999) == []
+
+    @pytest.mark.asyncio
+    async def test_replace_reports_released_candidates(self, page_repo: Any) -> None:
+        first = await page_repo.create_page("https://a.example.com", "A")
+        second = await page_repo.create_page("https://b.example.com", "B")
+
+        await page_repo.replace_page_chunks(second, ["shared"])
+        result = await page_repo.replace_page_chunks(
+            first, [], released=["shared", "orphan"]
+        )
+
+        assert result.unreferenced == ["orphan"]
+        assert result.pending_deletion == []
+
+    @pytest.mark.asyncio
+    async def test_owners_lists_every_page_sharing_a_chunk(
+        self, page_repo: Any
+    ) -> None:
+        first = await page_repo.create_page("https://a.example.com", "A")
+        second = await page_repo.create_page("https://b.example.com", "B")
+
+        await page_repo.replace_page_chunks(first, ["x", "shared"])
+        await page_repo.replace_page_chunks(second, ["shared"])
+
+        assert await page_repo.get_chunk_owners(["shared"]) == {
+            "shared": [(first, 1), (second, 0)]
+        }
+        assert await page_repo.get_unshared_chunk_hashes(second) == []
+
+    @pytest.mark.asyncio
+    async def test_tombstones_are_claimed_only_while_unreferenced(
+        self, page_repo: Any
+    ) -> None:
+        """削除待ちは claim の時点で参照がなければ claim でき、削除後に消える."""
+        first = await page_repo.create_page("https://a.example.com", "A")
+        second = await page_repo.create_page("https://b.example.com", "B")
+        await page_repo.replace_page_chunks(first, ["old", "revived"])
+        await page_repo.replace_page_chunks(first, ["new"])
+        # 削除待ちに登録された後、claim の前に別のページが参照し直す
+        await page_repo.db.execute(
+            "INSERT INTO page_chunks (page_id, chunk_id, chunk_hash) VALUES (?, ?, ?)",
+            (second, 0, "revived"),
+        )
+
+        claimed = await page_repo.claim_chunk_tombstones("deleter", 60)
+
+        assert claimed == ["old"]
+        assert await page_repo.claim_chunk_tombstones("other", 60) == []
+        await page_repo.release_chunk_tombstones("deleter", claimed, True)
+        assert await page_repo.claim_chunk_tombstones("other", 60) == []
+
+    @pytest.mark.asyncio
+    async def test_referencing_claimed_tombstone_reports_pending_deletion(
+        self, page_repo: Any
+    ) -> None:
+        """削除が claim 済みのチャンクを参照したら削除の完了を待つよう返す."""
+        first = await page_repo.create_page("https://a.example.com", "A")
+        second = await page_repo.create_page("https://b.example.com", "B")
+        await page_repo.replace_page_chunks(first, ["claimed", "idle"])
+        await page_repo.replace_page_chunks(first, [])
+        assert await page_repo.claim_chunk_tombstones("deleter", 60, ["claimed"]) == [
+            "claimed"
+        ]
+
+        result = await page_repo.replace_page_chunks(second, ["claimed", "idle"])
+
+        assert result.pending_deletion == ["claimed"]
+        assert await page_repo.get_claimed_chunk_tombstones(["claimed", "idle"]) == [
+            "claimed"
+        ]
+        # 参照されたチャンクの未 claim の削除待ちは取り消す
+        assert await page_repo.claim_chunk_tombstones("other", 60, ["idle"]) == []
+
+        await page_repo.release_chunk_tombstones("deleter", ["claimed"], False)
+        assert await page_repo.get_claimed_chunk_tombstones(["claimed"]) == []
+
+    @pytest.mark.asyncio
+    async def test_add_tombstones_skips_referenced_chunks(self, page_repo: Any) -> None:
+        """登録し直したチャンクのうち参照の無いものだけを削除待ちにする."""
+        page_id = await page_repo.create_page("https://a.example.com", "A")
+        await page_repo.replace_page_chunks(page_id, ["used"])
+
+        await page_repo.add_chunk_tombstones(["used", "orphan", "orphan"])
+        await page_repo.add_chunk_tombstones(["orphan"])
+
+        assert await page_repo.claim_chunk_tombstones("deleter", 60) == ["orphan"]
+
+    @pytest.mark.asyncio
+    async def test_new_pages_are_not_marked_legacy(
+        self, temp_db: Any, page_repo: Any
+    ) -> None:
+        """旧形式の印はスキーマ移行で付いたページにだけ残り、外せば消える."""
+        legacy = await page_repo.create_page("https://legacy.example.com", "a")
+        fresh = await page_repo.create_page("https://fresh.example.com", "b")
+        await temp_db.execute(
+            "INSERT INTO legacy_chunk_pages (page_id) VALUES (?)", (legacy,)
+        )
+
+        assert await page_repo.get_legacy_chunk_pages([fresh, legacy]) == [legacy]
+        await page_repo.clear_legacy_chunk_page(legacy)
+        assert await page_repo.get_legacy_chunk_pages([fresh, legacy]) == []
+
+
 class TestListPages:
     """list_pages の純粋SQLテスト."""
 
@@ -232,6 +375,127 @@ class TestPageRepository:
         """候補が空ならDB問い合わせなしで空の結果を返す."""
         assert await page_repo.get_searchable_pages_by_ids([]) == {}
 
+    @pytest.mark.asyncio
+    async def test_estimate_search_selectivity(self, page_repo: Any) -> None:
+        """検索可能なページのうち条件に合う件数と全件数を返す."""
+        python_id = await page_repo.create_page("https://docs.example/py", "Py")
+        await page_repo.update_summary_keywords(python_id, "s", ["python"])
+        await page_repo.update_status(python_id, PageStatus.SUCCEEDED)
+        other_id = await page_repo.create_page("https://docs.example/go", "Go")
+        await page_repo.update_status(other_id, PageStatus.SUCCEEDED)
+        await page_repo.create_page("https://docs.example/new", "Processing")
+
+        assert await page_repo.estimate_search_selectivity(
+            {"keywords": ["python"]}
+        ) == (1, 2)
+        assert await page_repo.estimate_search_selectivity(
+            {"url": "docs.example"}, ["python"]
+        ) == (1, 2)
+        assert await page_repo.estimate_search_selectivity() == (2, 2)
+
+    @pytest.mark.asyncio
+    async def test_get_searchable_chunk_targets(self, page_repo: Any) -> None:
+        """条件に合うページの共有チャンクと旧形式ページを上限付きで返す."""
+
+        shared_id = await page_repo.create_page("https://docs.example/a", "A")
+        await page_repo.replace_page_chunks(shared_id, ["h1", "h2"])
+        await page_repo.update_status(shared_id, PageStatus.SUCCEEDED)
+        legacy_id = await page_repo.create_page("https://docs.example/b", "B")
+        await page_repo.update_status(legacy_id, PageStatus.SUCCEEDED)
+        other_id = await page_repo.create_page("https://other.example", "C")
+        await page_repo.replace_page_chunks(other_id, ["h2", "h3"])
+        await page_repo.update_status(other_id, PageStatus.SUCCEEDED)
+
+        hashes, page_ids = await page_repo.get_searchable_chunk_targets(
+            {"url": "docs.example"}, None, max_targets=3
+        )
+
+        assert sorted(hashes) == ["h1", "h2"]
+        assert page_ids == [legacy_id]
+        assert (
+            await page_repo.get_searchable_chunk_targets(
+                {"url": "docs.example"}, None, max_targets=2
+            )
+            is None
+        )
+
+    @pytest.mark.asyncio
+    async def test_status_and_attribute_changes_queue_chunk_attribute_sync(
+        self, page_repo: Any
+    ) -> None:
+        """検索可否や属性が変わったページだけがチャンク属性の書き直し待ちになる."""
+        page_id = await page_repo.create_page("https://docs.example/a", "A")
+        await page_repo.update_status(page_id, PageStatus.QUEUED)
+        assert await page_repo.get_chunk_attribute_sync_batch(10) == {}
+
+        await page_repo.update_status(page_id, PageStatus.SUCCEEDED)
+        assert await page_repo.has_pending_chunk_attribute_sync()
+        pending = await page_repo.get_chunk_attribute_sync_batch(10)
+        assert pending == {page_id: 1}
+
+        # 取り出した後の変更は版が上がるので、古い版の確認では消えない
+        await page_repo.update_summary_keywords(page_id, "s", ["python"])
+        await page_repo.ack_chunk_attribute_sync(pending)
+        assert await page_repo.get_chunk_attribute_sync_batch(10) == {page_id: 2}
+
+        await page_repo.ack_chunk_attribute_sync({page_id: 2})
+        assert not await page_repo.has_pending_chunk_attribute_sync()
+
+    @pytest.mark.asyncio
+    async def test_pending_sync_of_unsearchable_page_does_not_block_pushdown(
+        self, page_repo: Any
+    ) -> None:
+        """検索対象外になったページの書き直し待ちは属性の絞り込みを妨げない."""
+        page_id = await page_repo.create_page("https://docs.example/a", "A")
+        await page_repo.enqueue_chunk_attribute_sync([page_id, 999])
+
+        assert await page_repo.get_chunk_attribute_sync_batch(10) == {page_id: 1}
+        assert not await page_repo.has_pending_chunk_attribute_sync()
+
+    @pytest.mark.asyncio
+    async def test_chunk_owner_and_sharing_pages(self, page_repo: Any) -> None:
+        """チャンクを参照する検索可能なページと、チャンクを共有するページを返す."""
+
+        first = await page_repo.create_page("https://docs.example/a", "A")
+        await page_repo.replace_page_chunks(first, ["h1", "h2"])
+        await page_repo.update_status(first, PageStatus.SUCCEEDED)
+        second = await page_repo.create_page("https://docs.example/b", "B")
+        await page_repo.replace_page_chunks(second, ["h2"])
+
+        owners = await page_repo.get_searchable_chunk_owner_pages(["h1", "h2"])
+
+        assert {
+            chunk: [page.id for page in pages] for chunk, pages in owners.items()
+        } == {
+            "h1": [first],
+            "h2": [first],
+        }
+        assert await page_repo.get_pages_sharing_chunks(first) == [second]
+        assert await page_repo.get_pages_sharing_chunks(first, ["h1"]) == []
+
+    @pytest.mark.asyncio
+    async def test_index_generation_advances_on_search_visible_changes(
+        self, page_repo: Any
+    ) -> None:
+        """検索結果に影響するページの変更と索引の書き換えで索引の世代が進む."""
+        page_id = await page_repo.create_page("https://docs.example/a", "A")
+        start = await page_repo.get_index_generation()
+
+        await page_repo.update_weaviate_id(page_id, "uuid")
+        await page_repo.update_status(page_id, PageStatus.QUEUED)
+        await page_repo.update_status(page_id, PageStatus.PROCESSING)
+        assert await page_repo.get_index_generation() == start
+
+        await page_repo.update_status(page_id, PageStatus.SUCCEEDED)
+        assert await page_repo.get_index_generation() == start + 1
+        assert await page_repo.update_url_if_current(
+            page_id, "https://docs.example/a", "https://docs.example/b"
+        )
+        assert await page_repo.get_index_generation() == start + 2
+
+        await page_repo.bump_index_generation()
+        assert await page_repo.get_index_generation() == start + 3
+
     @pytest.mark.asyncio
     async def test_get_nonexistent_page(self, page_repo: Any) -> None:
         """存在しないページの取得テスト."""
@@ -0,0 +1,88 @@
+"""Query embedding cache repository tests."""
+
+from collections.abc import Iterator
+from itertools import count
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from grimoire_api.repositories.database import DatabaseConnection
+from grimoire_api.repositories.query_embedding_cache_repository import (
+    QueryEmbeddingCacheRepository,
+)
+
+
+def make_repo(tmp_path: Path, max_entries: int = 10) -> QueryEmbeddingCacheRepository:
+    db = DatabaseConnection(str(tmp_path / "cache" / "query-embedding-cache.db"))
+    return QueryEmbeddingCacheRepository(db, max_entries=max_entries)
+
+
+@pytest.fixture(autouse=True)
+def monotonic_clock() -> Iterator[None]:
+    """ミリ秒精度の時刻が同値にならないよう、呼び出しごとに1秒進める."""
+    seconds = count()
+    with patch(
+        "grimoire_api.repositories.query_embedding_cache_repository.utc_now_isoformat",
+        side_effect=lambda: f"2026-01-01T00:00:{next(seconds):02d}.000Z",
+    ):
+        yield
+
+
+async def test_put_then_get_round_trip(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path)
+
+    await repo.put("model", "python asyncio", [0.5, -0.25, 1.0])
+
+    assert await repo.get("model", "python asyncio") == [0.5, -0.25, 1.0]
+    assert await repo.get("other", "python asyncio") is None
+    assert await repo.get("model", "python") is None
+
+
+async def test_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path, max_entries=2)
+    await repo.put("model", "a", [1.0])
+    await repo.put("model", "b", [2.0])
+    # a を参照して b より新しくする
+    assert await repo.get("model", "a") == [1.0]
+
+    await repo.put("model", "c", [3.0])
+
+    assert await repo.get("model", "b") is None
+    assert await repo.get("model", "a") == [1.0]
+    assert await repo.get("model", "c") == [3.0]
+
+
+async def test_hits_update_last_used_in_batches(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path)
+    await repo.put("model", "a", [1.0])
+    stored = "SELECT last_used_at FROM query_embeddings WHERE query='a'"
+    before = await repo.db.fetch_one(stored)
+
+    assert await repo.get("model", "a") == [1.0]
+    assert await repo.db.fetch_one(stored) == before
+
+    await repo.flush()
+    after = await repo.db.fetch_one(stored)
+    assert after is not None and before is not None
+    assert after["last_used_at"] > before["last_used_at"]
+
+
+async def test_overwriting_entry_does_not_count_towards_limit(tmp_path: Path) -> None:
+    repo = make_repo(tmp_path, max_entries=2)
+    await repo.put("model", "a", [1.0])
+    await repo.put("model", "b", [2.0])
+
+    await repo.put("model", "a", [1.5])
+
+    assert await repo.get("model", "a") == [1.5]
+    assert await repo.get("model", "b") == [2.0]
+
+
+async def test_counts_existing_entries_on_first_use(tmp_path: Path) -> None:
+    await make_repo(tmp_path).put("model", "a", [1.0])
+    repo = make_repo(tmp_path, max_entries=1)
+
+    await repo.put("model", "b", [2.0])
+
+    assert await repo.get("model", "a") is None
+    assert await repo.get("model", "b") == [2.0]
@@ -0,0 +1,85 @@
+"""Test storage formats."""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from grimoire_api.repositories.storage_format import (
+    GzipJsonFormat,
+    StorageFormat,
+    find_stored_file,
+    get_storage_format,
+    iter_stored_files,
+    page_id_for_path,
+    read_stored_file,
+)
+
+SOURCE = {"data": {"title": "日本語タイトル", "content": "本文です。" * 50}}
+
+
+class TestStorageFormat:
+    """保存形式のテストクラス."""
+
+    def test_legacy_json_round_trip(self: Any) -> None:
+        """従来形式は整形済み ASCII JSON のまま読み書きする."""
+        fmt = get_storage_format("json")
+        raw = fmt.encode(SOURCE)
+
+        assert raw == json.dumps(SOURCE, ensure_ascii=True, indent=2).encode()
+        assert fmt.decode(raw) == SOURCE
+
+    def test_gzip_json_is_smaller_and_deterministic(self: Any) -> None:
+        """圧縮形式は従来形式より小さく、同じ内容から同じバイト列を作る."""
+        fmt = get_storage_format("json.gz")
+        raw = fmt.encode(SOURCE)
+
+        assert fmt.decode(raw) == SOURCE
+        assert raw == fmt.encode(SOURCE)
+        assert len(raw) < len(StorageFormat().encode(SOURCE)) / 10
+        assert "日本語" in gzip.decompress(raw).decode("utf-8")
+
+    def test_gzip_json_rejects_corrupted_data(self: Any) -> None:
+        """壊れた圧縮データは ValueError にする."""
+        with pytest.raises(ValueError, match="Corrupted gzip data"):
+            GzipJsonFormat().decode(b"not gzip")
+
+    def test_unknown_format(self: Any) -> None:
+        """未知の形式名は ValueError にする."""
+        with pytest.raises(ValueError, match="Unknown storage format"):
+            get_storage_format("msgpack")
+
+    def test_page_id_for_path(self: Any) -> None:
+        """保存済みファイル名だけからページ ID を取り出す."""
+        assert page_id_for_path(Path("12.json")) == 12
+        assert page_id_for_path(Path("12.json.gz")) == 12
+        assert page_id_for_path(Path("tmpabc.tmp")) is None
+        assert page_id_for_path(Path("notes.json")) is None
+
+    def test_find_and_read_any_format(self: Any, tmp_path: Path) -> None:
+        """どちらの形式のファイルも探して読める."""
+        (tmp_path / "1.json").write_bytes(StorageFormat().encode(SOURCE))
+        (tmp_path / "2.json.gz").write_bytes(GzipJsonFormat().encode(SOURCE))
+
+        for page_id in (1, 2):
+            path = find_stored_file(tmp_path, page_id)
+            assert path is not None
+            assert read_stored_file(path) == SOURCE
+        assert find_stored_file(tmp_path, 3) is None
+
+    def test_sharded_files_are_found_first(self: Any, tmp_path: Path) -> None:
+        """シャード配下のファイルを従来のフラット配置より優先する."""
+        (tmp_path / "1234.json").write_bytes(StorageFormat().encode({"old": 1}))
+        (tmp_path / "000001").mkdir()
+        (tmp_path / "000001" / "1234.json.gz").write_bytes(
+            GzipJsonFormat().encode(SOURCE)
+        )
+
+        path = find_stored_file(tmp_path, 1234)
+
+        assert path == tmp_path / "000001" / "1234.json.gz"
+        assert sorted(
+            (page_id, p.relative_to(tmp_path).as_posix())
+            for page_id, p in iter_stored_files(tmp_path)
+        ) == [(1234, "000001/1234.json.gz"), (1234, "1234.json")]
@@ -0,0 +1,44 @@
+"""Summary checkpoint repository tests."""
+
+import pytest
+from grimoire_api.repositories.summary_checkpoint_repository import (
+    SummaryCheckpointRepository,
+)
+from grimoire_api.utils.exceptions import DatabaseError
+
+
+async def test_save_load_and_clear(temp_db, page_repo) -> None:
+    page_id = await page_repo.create_page("https://example.com", "title")
+    other_page = await page_repo.create_page("https://other.example.com", "other")
+    repo = SummaryCheckpointRepository(temp_db)
+
+    await repo.save(page_id, "partial", "hash-1", "first")
+    await repo.save(page_id, "reduction", "hash-1", "reduced")
+    await repo.save(other_page, "partial", "hash-1", "other")
+
+    assert await repo.load(page_id) == {
+        ("partial", "hash-1"): "first",
+        ("reduction", "hash-1"): "reduced",
+    }
+
+    await repo.clear(page_id)
+
+    assert await repo.load(page_id) == {}
+    assert await repo.load(other_page) == {("partial", "hash-1"): "other"}
+
+
+async def test_save_overwrites_same_key(temp_db, page_repo) -> None:
+    page_id = await page_repo.create_page("https://example.com", "title")
+    repo = SummaryCheckpointRepository(temp_db)
+
+    await repo.save(page_id, "partial", "hash-1", "old")
+    await repo.save(page_id, "partial", "hash-1", "new")
+
+    assert await repo.load(page_id) == {("partial", "hash-1"): "new"}
+
+
+async def test_save_rejects_unknown_page(temp_db) -> None:
+    repo = SummaryCheckpointRepository(temp_db)
+
+    with pytest.raises(DatabaseError, match="Failed to save summary checkpoint"):
+        await repo.save(999, "partial", "hash-1", "summary")
@@ -16,7 +16,7 @@ class TestHealthRouter:
         app.state.weaviate_manager = MagicMock()
         app.state.weaviate_manager.get_ready_client = AsyncMock(return_value=object())
         database = MagicMock()
-        database.fetch_one = AsyncMock(return_value=(1,))
+        database.health_check = AsyncMock(return_value=True)
         with patch(
             "grimoire_api.routers.health.get_db_connection", return_value=database
         ):
@@ -37,7 +37,7 @@ class TestHealthRouter:
         app.state.weaviate_manager.get_ready_client = AsyncMock(return_value=None)
 
         database = MagicMock()
-        database.fetch_one = AsyncMock(return_value=(1,))
+        database.health_check = AsyncMock(return_value=True)
         with patch(
             "grimoire_api.routers.health.get_db_connection", return_value=database
         ):
@@ -52,7 +52,7 @@ class TestHealthRouter:
         app.state.weaviate_manager = MagicMock()
         app.state.weaviate_manager.get_ready_client = AsyncMock(return_value=object())
         database = MagicMock()
-        database.fetch_one = AsyncMock(side_effect=RuntimeError("database down"))
+        database.health_check = AsyncMock(side_effect=RuntimeError("database down"))
 
         with patch(
             "grimoire_api.routers.health.get_db_connection", return_value=database
@@ -64,6 +64,22 @@ class TestHealthRouter:
         assert response.json()["database"] == "unavailable"
         assert response.json()["weaviate"] == "ready"
 
+    def test_readiness_uses_database_pool_health_check(self) -> None:
+        """プールの検査で接続が使えなければ readiness エラーになる."""
+        app.state.weaviate_manager = MagicMock()
+        app.state.weaviate_manager.get_ready_client = AsyncMock(return_value=object())
+        database = MagicMock()
+        database.health_check = AsyncMock(return_value=False)
+
+        with patch(
+            "grimoire_api.routers.health.get_db_connection", return_value=database
+        ):
+            response = client.get("/api/v1/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["database"] == "unavailable"
+        database.health_check.assert_awaited_once_with()
+
     def test_liveness_ignores_dependency_failures(self) -> None:
         """liveness は DB と Weaviate の状態を確認しない."""
         app.state.weaviate_manager = None
@@ -82,7 +98,7 @@ class TestHealthRouter:
         app.state.weaviate_manager = MagicMock()
         app.state.weaviate_manager.get_ready_client = AsyncMock(return_value=object())
         database = MagicMock()
-        database.fetch_one = AsyncMock(return_value=(1,))
+        database.health_check = AsyncMock(return_value=True)
         mock_settings.GIT_COMMIT = "abc1234"
         mock_settings.BUILD_DATE = "2026-04-09T12:00:00Z"
 
@@ -204,3 +204,42 @@ class TestSearchRouter:
         )
 
         assert response.status_code == 200
+
+    def test_hybrid_search_uses_all_vectors_by_default(self) -> None:
+        """ハイブリッド検索は既定で全ベクトルを RRF で統合する."""
+        mock_service = AsyncMock()
+        mock_service.hybrid_search.return_value = []
+        app.dependency_overrides[get_search_service] = lambda: mock_service
+
+        response = client.post("/api/v1/search/hybrid", json={"query": "query"})
+
+        assert response.status_code == 200
+        mock_service.hybrid_search.assert_called_once_with(
+            query="query",
+            limit=5,
+            filters=None,
+            vector_names=["title_vector", "memo_vector", "content_vector"],
+            exclude_keywords=None,
+            fusion="rrf",
+            weights=None,
+        )
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"query": "query", "vector_names": []},
+            {"query": "query", "vector_names": ["summary_vector"]},
+            {"query": "query", "fusion": "max"},
+            {"query": "query", "weights": {"summary_vector": 1.0}},
+            {"query": "query", "weights": {"title_vector": -1.0}},
+        ],
+    )
+    def test_hybrid_search_rejects_invalid_request(
+        self, payload: dict[str, object]
+    ) -> None:
+        """存在しないベクトル・統合方法・負の重みは 422 になる."""
+        app.dependency_overrides[get_search_service] = lambda: AsyncMock()
+
+        response = client.post("/api/v1/search/hybrid", json=payload)
+
+        assert response.status_code == 422
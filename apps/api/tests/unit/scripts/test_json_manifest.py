@@ -0,0 +1,21 @@
+"""Tests for the JSON manifest command."""
+
+from pathlib import Path
+
+from grimoire_api.repositories.file_repository import FileRepository
+
+from scripts.json_manifest import rebuild, verify
+
+
+def test_rebuild_then_verify(tmp_path: Path) -> None:
+    """再構築後は不一致なし、ファイルが消えたら失敗を返す."""
+    file_repo = FileRepository(str(tmp_path))
+    file_repo.save_json_file_sync(1, {"data": "a"})
+    file_repo.save_json_file_sync(2, {"data": "b"})
+
+    assert rebuild(str(tmp_path)) == 0
+    assert verify(str(tmp_path), check_hash=True) == 0
+
+    file_repo.target_path(2).unlink()
+
+    assert verify(str(tmp_path), check_hash=False) == 1
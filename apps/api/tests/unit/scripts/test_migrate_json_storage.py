@@ -0,0 +1,57 @@
+"""Tests for the JSON storage migration command."""
+
+import json
+from pathlib import Path
+
+from grimoire_api.repositories.file_repository import FileRepository
+from grimoire_api.repositories.storage_format import iter_stored_files
+
+from scripts.migrate_json_storage import migrate
+
+SOURCE = {"data": {"title": "タイトル", "content": "本文" * 100}}
+
+
+def _legacy_files(root: Path, page_ids: list[int]) -> None:
+    for page_id in page_ids:
+        (root / f"{page_id}.json").write_text(
+            json.dumps(SOURCE, ensure_ascii=True, indent=2), encoding="utf-8"
+        )
+
+
+def _stored(root: Path) -> list[str]:
+    return sorted(
+        path.relative_to(root).as_posix() for _, path in iter_stored_files(root)
+    )
+
+
+def test_migrate_rewrites_legacy_files(tmp_path: Path) -> None:
+    """従来のフラット配置を圧縮形式・シャード配置へ移行する."""
+    _legacy_files(tmp_path, [1, 2500])
+
+    assert migrate("json.gz", None, False, str(tmp_path)) == 0
+
+    assert _stored(tmp_path) == ["000000/1.json.gz", "000002/2500.json.gz"]
+    file_repo = FileRepository(str(tmp_path), storage_format="json.gz")
+    assert file_repo._load_json_file_sync(2500) == SOURCE
+    assert file_repo.manifest.get(2500) is not None
+
+
+def test_migrate_dry_run_and_limit(tmp_path: Path) -> None:
+    """ドライランは変更せず、件数上限を守る."""
+    _legacy_files(tmp_path, [1, 2, 3])
+
+    assert migrate("json.gz", None, True, str(tmp_path)) == 0
+    assert _stored(tmp_path) == ["1.json", "2.json", "3.json"]
+
+    assert migrate("json.gz", 2, False, str(tmp_path)) == 0
+    assert _stored(tmp_path) == ["000000/1.json.gz", "000000/2.json.gz", "3.json"]
+
+
+def test_migrate_reports_broken_files(tmp_path: Path) -> None:
+    """読めないファイルは残して失敗を返す."""
+    _legacy_files(tmp_path, [1])
+    (tmp_path / "2.json").write_text("not json", encoding="utf-8")
+
+    assert migrate("json.gz", None, False, str(tmp_path)) == 1
+
+    assert _stored(tmp_path) == ["000000/1.json.gz", "2.json"]
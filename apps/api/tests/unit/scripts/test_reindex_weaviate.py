@@ -7,21 +7,49 @@ from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from grimoire_api.config import settings
 from grimoire_api.models.database import Page
+from grimoire_api.utils.exceptions import VectorizerError
 
-from scripts.reindex_weaviate import _positive_int, reindex
+from scripts.reindex_weaviate import (
+    Checkpoint,
+    ReindexBatch,
+    _positive_int,
+    reindex,
+)
 from tools.weaviate_1_38_migration.source_validation import (
     RepairPendingPage,
     RepairReason,
 )
 
 
+def make_page(page_id: int, url: str | None = None) -> Page:
+    return Page(
+        id=page_id,
+        url=url or f"https://example.com/{page_id}",
+        title="title",
+        memo=None,
+        summary="summary",
+        keywords=[],
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        weaviate_id=None,
+    )
+
+
+def make_page_repo(total: int, batches: list[list[Page]]) -> MagicMock:
+    page_repo = MagicMock()
+    page_repo.count_completed_pages = AsyncMock(return_value=total)
+    page_repo.get_completed_pages = AsyncMock(side_effect=[*batches, []])
+    page_repo.get_page = AsyncMock(side_effect=make_page)
+    page_repo.update_weaviate_id = AsyncMock()
+    return page_repo
+
+
 @pytest.mark.asyncio
 async def test_dry_run_targets_all_completed_pages() -> None:
     """上限未指定なら1万件を超えても成功済み全ページを対象にする."""
-    page_repo = MagicMock()
-    page_repo.count_completed_pages = AsyncMock(return_value=10_001)
-    page_repo.get_completed_pages = AsyncMock(return_value=[])
+    page_repo = make_page_repo(10_001, [])
 
     with (
         patch("scripts.reindex_weaviate.DatabaseConnection") as database_connection,
@@ -29,25 +57,30 @@ async def test_dry_run_targets_all_completed_pages() -> None:
             "scripts.reindex_weaviate.MigrationPageRepository",
             return_value=page_repo,
         ),
+        patch("scripts.reindex_weaviate.ChunkingService"),
     ):
-        result = await reindex(max_pages=None, dry_run=True)
+        result = await reindex(max_pages=None, dry_run=True, workers=0)
 
     assert result == 0
     database_connection.assert_called_once_with(read_only=True)
-    page_repo.get_completed_pages.assert_awaited_once_with(limit=10_001)
+    page_repo.get_completed_pages.assert_awaited_once_with(
+        limit=settings.VECTORIZER_BULK_MAX_PAGES, after_id=0
+    )
 
 
 @pytest.mark.asyncio
 async def test_dry_run_respects_max_pages() -> None:
     """--max-pages 指定時だけ対象件数を制限する."""
-    page_repo = MagicMock()
-    page_repo.count_completed_pages = AsyncMock(return_value=100)
-    page_repo.get_completed_pages = AsyncMock(return_value=[])
+    page_repo = make_page_repo(100, [])
 
-    with patch(
-        "scripts.reindex_weaviate.MigrationPageRepository", return_value=page_repo
+    with (
+        patch(
+            "scripts.reindex_weaviate.MigrationPageRepository",
+            return_value=page_repo,
+        ),
+        patch("scripts.reindex_weaviate.ChunkingService"),
     ):
-        result = await reindex(max_pages=5, dry_run=True)
+        result = await reindex(max_pages=5, dry_run=True, workers=0)
 
     assert result == 0
     assert page_repo.get_completed_pages.await_args.kwargs["limit"] == 5
@@ -64,20 +97,8 @@ async def test_dry_run_reports_and_excludes_repair_pending_page(
     tmp_path: Path,
 ) -> None:
     """修復待ちをレポートし、移行対象から除外する."""
-    page = Page(
-        id=56,
-        url="https://example.com/broken%3E",
-        title="broken",
-        memo=None,
-        summary="summary",
-        keywords=[],
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-        weaviate_id="old-id",
-    )
-    page_repo = MagicMock()
-    page_repo.count_completed_pages = AsyncMock(return_value=1)
-    page_repo.get_completed_pages = AsyncMock(return_value=[page])
+    page = make_page(56, "https://example.com/broken%3E")
+    page_repo = make_page_repo(1, [[page]])
     pending = RepairPendingPage(
         page_id=56,
         url=page.url,
@@ -90,9 +111,13 @@ async def test_dry_run_reports_and_excludes_repair_pending_page(
             "scripts.reindex_weaviate.MigrationPageRepository",
             return_value=page_repo,
         ),
-        patch("scripts.reindex_weaviate.classify_stored_source", return_value=pending),
+        patch("scripts.reindex_weaviate.ChunkingService"),
+        patch(
+            "scripts.reindex_weaviate.prepare_stored_source",
+            return_value=(pending, []),
+        ),
     ):
-        result = await reindex(None, True, output)
+        result = await reindex(None, True, output, workers=0)
 
     assert result == 0
     report = json.loads(output.read_text(encoding="utf-8"))
@@ -100,3 +125,115 @@ async def test_dry_run_reports_and_excludes_repair_pending_page(
     assert report["migration_targets"] == 0
     assert report["repair_pending_count"] == 1
     assert report["repair_pending"][0]["page_id"] == 56
+
+
+async def run_reindex(
+    page_repo: MagicMock, vectorizer: MagicMock, **kwargs: object
+) -> int:
+    with (
+        patch("scripts.reindex_weaviate.DatabaseConnection"),
+        patch(
+            "scripts.reindex_weaviate.MigrationPageRepository",
+            return_value=page_repo,
+        ),
+        patch("scripts.reindex_weaviate.ChunkingService"),
+        patch("scripts.reindex_weaviate.FileRepository"),
+        patch(
+            "scripts.reindex_weaviate.prepare_stored_source",
+            side_effect=lambda page, *_: (None, [f"chunk-{page.id}"]),
+        ),
+        patch("scripts.reindex_weaviate.weaviate"),
+        patch("scripts.reindex_weaviate.VectorizerService", return_value=vectorizer),
+    ):
+        return await reindex(None, False, workers=0, **kwargs)  # type: ignore[arg-type]
+
+
+def make_vectorizer(failed: set[int]) -> MagicMock:
+    vectorizer = MagicMock()
+    vectorizer.ensure_schema = AsyncMock()
+    vectorizer.reindex_chunked_pages = AsyncMock(
+        side_effect=lambda pages: {
+            page.id: (
+                VectorizerError("chunk failed")
+                if page.id in failed
+                else f"uuid-{page.id}"
+            )
+            for page, _ in pages
+        }
+    )
+    return vectorizer
+
+
+@pytest.mark.asyncio
+async def test_reindex_streams_chunked_batches_and_counts_failures(
+    tmp_path: Path,
+) -> None:
+    """SQLite から batch_pages 件ずつ読み出し、失敗したページを進捗ファイルに残す."""
+    page_repo = make_page_repo(3, [[make_page(1), make_page(2)], [make_page(3)]])
+    vectorizer = make_vectorizer(failed={2})
+    checkpoint = tmp_path / "checkpoint.json"
+
+    result = await run_reindex(
+        page_repo, vectorizer, batch_pages=2, concurrency=1, checkpoint_path=checkpoint
+    )
+
+    assert result == 1
+    assert [
+        call.kwargs["after_id"]
+        for call in page_repo.get_completed_pages.await_args_list
+    ] == [0, 2, 3]
+    batches = [
+        call.args[0] for call in vectorizer.reindex_chunked_pages.await_args_list
+    ]
+    assert [[(page.id, chunks) for page, chunks in batch] for batch in batches] == [
+        [(1, ["chunk-1"]), (2, ["chunk-2"])],
+        [(3, ["chunk-3"])],
+    ]
+    assert [call.args for call in page_repo.update_weaviate_id.await_args_list] == [
+        (1, "uuid-1"),
+        (3, "uuid-3"),
+    ]
+    assert json.loads(checkpoint.read_text(encoding="utf-8")) == {
+        "last_page_id": 3,
+        "failed_page_ids": [2],
+    }
+
+
+@pytest.mark.asyncio
+async def test_reindex_resumes_from_checkpoint_and_retries_failures(
+    tmp_path: Path,
+) -> None:
+    """前回失敗したページを再試行してから続きを処理し、全件成功で進捗を消す."""
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(
+        json.dumps({"last_page_id": 3, "failed_page_ids": [2]}), encoding="utf-8"
+    )
+    page_repo = make_page_repo(1, [[make_page(4)]])
+    vectorizer = make_vectorizer(failed=set())
+
+    result = await run_reindex(page_repo, vectorizer, checkpoint_path=checkpoint)
+
+    assert result == 0
+    page_repo.get_page.assert_awaited_once_with(2)
+    assert page_repo.get_completed_pages.await_args_list[0].kwargs["after_id"] == 3
+    indexed = [
+        page.id
+        for call in vectorizer.reindex_chunked_pages.await_args_list
+        for page, _ in call.args[0]
+    ]
+    assert indexed == [2, 4]
+    assert not checkpoint.exists()
+
+
+def test_checkpoint_advances_only_past_contiguous_batches(tmp_path: Path) -> None:
+    """並行して終わったバッチは、先行するバッチが終わるまで再開位置を進めない."""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path)
+
+    checkpoint.commit(ReindexBatch([make_page(3), make_page(4)], seq=1), failed={4})
+    assert Checkpoint.load(path).last_page_id == 0
+
+    checkpoint.commit(ReindexBatch([make_page(1), make_page(2)], seq=0), failed=set())
+    restored = Checkpoint.load(path)
+    assert restored.last_page_id == 4
+    assert restored.failed_page_ids == {4}
@@ -202,3 +202,38 @@ class TestRunPipelineFrom:
             await base_processor._run_pipeline_from(page_id, log_id, url, "llm")
 
         mock_services["vectorizer"].vectorize_content.assert_not_called()
+
+
+class TestRunStage:
+    """_run_stage メソッドのテストクラス."""
+
+    @pytest.mark.asyncio
+    async def test_download_stage_returns_llm(
+        self, base_processor: BaseProcessorService, mock_services: Any
+    ) -> None:
+        """download ステージは取得のみ行い次ステージを返す."""
+        url = "https://example.com"
+        raw_response = {"data": {"title": "Test Title", "content": "Test content"}}
+        mock_services[
+            "jina_client"
+        ].fetch_content.return_value = FetchedDocument.from_jina_response(
+            raw_response, source_url=url
+        )
+
+        next_stage = await base_processor._run_stage(1, 10, url, "download")
+
+        assert next_stage == "llm"
+        mock_services["llm_service"].generate_summary_keywords.assert_not_called()
+        mock_services["vectorizer"].vectorize_content.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_vectorize_stage_is_last(
+        self, base_processor: BaseProcessorService, mock_services: Any
+    ) -> None:
+        """vectorize ステージ完了後は次ステージがない."""
+        next_stage = await base_processor._run_stage(
+            1, 10, "https://example.com", "vectorize"
+        )
+
+        assert next_stage is None
+        mock_services["vectorizer"].vectorize_content.assert_called_once_with(1)
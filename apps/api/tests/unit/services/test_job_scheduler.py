@@ -0,0 +1,121 @@
+"""Job scheduler tests."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from grimoire_api.models.database import Job, JobKind, JobStatus, PipelineStartStep
+from grimoire_api.services.job_scheduler import JobScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_job(job_id: int, host: str, stage: PipelineStartStep) -> Job:
+    return Job(
+        id=job_id,
+        page_id=job_id,
+        kind=JobKind.INITIAL,
+        status=JobStatus.RUNNING,
+        current_step=None,
+        start_step=stage,
+        attempt=1,
+        error_message=None,
+        created_at=datetime.now(),
+        started_at=datetime.now(),
+        finished_at=None,
+        host=host,
+    )
+
+
+async def test_claim_passes_host_limits_to_repository() -> None:
+    job_repo = AsyncMock()
+    job_repo.claim_batch.return_value = []
+    scheduler = JobScheduler(job_repo, host_concurrency=2)
+    capacity = {PipelineStartStep.DOWNLOAD: 3, PipelineStartStep.LLM: 1}
+
+    await scheduler.claim(capacity, owner="worker", lease_seconds=30)
+
+    job_repo.claim_batch.assert_awaited_once_with(
+        4,
+        capacity,
+        owner="worker",
+        lease_seconds=30,
+        host_limit=2,
+        excluded_hosts=[],
+        host_tokens=None,
+        default_host_tokens=None,
+    )
+
+
+async def test_host_is_throttled_until_token_refills() -> None:
+    clock = FakeClock()
+    job_repo = AsyncMock()
+    job_repo.claim_batch.return_value = [
+        make_job(1, "bulk.example.com", PipelineStartStep.DOWNLOAD),
+        make_job(2, "bulk.example.com", PipelineStartStep.DOWNLOAD),
+    ]
+    scheduler = JobScheduler(job_repo, host_rate=2.0, host_burst=2, clock=clock)
+    capacity = {PipelineStartStep.DOWNLOAD: 2}
+
+    await scheduler.claim(capacity)
+    job_repo.claim_batch.return_value = []
+    await scheduler.claim(capacity)
+
+    assert job_repo.claim_batch.await_args.kwargs["excluded_hosts"] == [
+        "bulk.example.com"
+    ]
+    assert scheduler.next_refill_in() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    await scheduler.claim(capacity)
+
+    assert job_repo.claim_batch.await_args.kwargs["excluded_hosts"] == []
+
+
+async def test_claim_caps_each_host_at_its_available_tokens() -> None:
+    clock = FakeClock()
+    job_repo = AsyncMock()
+    job_repo.claim_batch.return_value = [
+        make_job(1, "bulk.example.com", PipelineStartStep.DOWNLOAD),
+    ]
+    scheduler = JobScheduler(job_repo, host_rate=1.0, host_burst=3, clock=clock)
+    capacity = {PipelineStartStep.DOWNLOAD: 5}
+
+    await scheduler.claim(capacity)
+
+    kwargs = job_repo.claim_batch.await_args.kwargs
+    assert kwargs["host_tokens"] == {}
+    assert kwargs["default_host_tokens"] == 3
+
+    clock.now += 0.5
+    await scheduler.claim(capacity)
+
+    assert job_repo.claim_batch.await_args.kwargs["host_tokens"] == {
+        "bulk.example.com": 2
+    }
+    assert scheduler.next_refill_in() is None
+
+
+async def test_non_download_stages_do_not_consume_tokens() -> None:
+    job_repo = AsyncMock()
+    job_repo.claim_batch.return_value = [
+        make_job(1, "bulk.example.com", PipelineStartStep.LLM)
+    ]
+    scheduler = JobScheduler(job_repo, host_rate=1.0, clock=FakeClock())
+
+    await scheduler.claim({PipelineStartStep.LLM: 1})
+
+    assert scheduler.next_refill_in() is None
+
+
+def test_rejects_non_positive_limits() -> None:
+    with pytest.raises(ValueError, match="host_rate"):
+        JobScheduler(AsyncMock(), host_rate=0)
+    with pytest.raises(ValueError, match="host_concurrency"):
+        JobScheduler(AsyncMock(), host_concurrency=0)
@@ -1,9 +1,11 @@
 """Persistent job worker tests."""
 
 import asyncio
+from collections.abc import Callable
 from datetime import datetime
 from unittest.mock import AsyncMock
 
+import pytest
 from grimoire_api.models.database import (
     Job,
     JobKind,
@@ -13,6 +15,7 @@ from grimoire_api.models.database import (
     PipelineStartStep,
 )
 from grimoire_api.services.job_worker import JobWorker
+from grimoire_api.utils.job_wakeup import JobWakeup
 
 
 def make_job() -> Job:
@@ -50,7 +53,7 @@ def make_page() -> Page:
 async def test_worker_recovers_on_start() -> None:
     job_repo = AsyncMock()
     worker = JobWorker(job_repo, AsyncMock(), AsyncMock(), AsyncMock())
-    job_repo.claim_next.return_value = None
+    job_repo.claim_batch.return_value = []
 
     await worker.start()
     await worker.stop()
@@ -65,7 +68,7 @@ async def test_worker_does_not_claim_after_stop_requested() -> None:
 
     await worker.run()
 
-    job_repo.claim_next.assert_not_awaited()
+    job_repo.claim_batch.assert_not_awaited()
 
 
 async def test_worker_cancels_task_after_stop_timeout() -> None:
@@ -114,14 +117,55 @@ async def test_worker_marks_success() -> None:
     processor = AsyncMock()
     page_repo.get_page.return_value = make_page()
     log_repo.create_log.return_value = 9
+    processor._run_stage.return_value = None
     worker = JobWorker(job_repo, page_repo, log_repo, processor)
+    job = make_job()
+    job.stage = PipelineStartStep.VECTORIZE
+    job.log_id = 9
 
-    await worker._execute(3, 2, PipelineStartStep.DOWNLOAD)
+    await worker._execute(job)
 
-    processor._run_pipeline_from.assert_awaited_once_with(
+    processor._run_stage.assert_awaited_once_with(
+        2, 9, "https://example.com", PipelineStartStep.VECTORIZE, 3
+    )
+    log_repo.create_log.assert_not_awaited()
+    job_repo.succeed.assert_awaited_once_with(3, 2, worker.worker_id)
+
+
+async def test_worker_requeues_job_for_next_stage() -> None:
+    job_repo = AsyncMock()
+    page_repo = AsyncMock()
+    log_repo = AsyncMock()
+    processor = AsyncMock()
+    page_repo.get_page.return_value = make_page()
+    log_repo.create_log.return_value = 9
+    processor._run_stage.return_value = PipelineStartStep.LLM
+    worker = JobWorker(job_repo, page_repo, log_repo, processor)
+
+    assert await worker._execute(make_job()) == "advanced"
+
+    processor._run_stage.assert_awaited_once_with(
         2, 9, "https://example.com", PipelineStartStep.DOWNLOAD, 3
     )
-    job_repo.succeed.assert_awaited_once_with(3, 2)
+    job_repo.advance.assert_awaited_once_with(
+        3, PipelineStartStep.LLM, 9, worker.worker_id
+    )
+    job_repo.succeed.assert_not_awaited()
+
+
+async def test_worker_discards_result_when_lease_was_lost() -> None:
+    job_repo = AsyncMock()
+    page_repo = AsyncMock()
+    page_repo.get_page.return_value = make_page()
+    processor = AsyncMock()
+    processor._run_stage.return_value = None
+    job_repo.succeed.return_value = False
+    worker = JobWorker(job_repo, page_repo, AsyncMock(), processor)
+
+    assert await worker._execute(make_job()) == "lease_lost"
+
+    assert not worker._chunk_sync_requested.is_set()
+    job_repo.fail.assert_not_awaited()
 
 
 async def test_worker_records_failure() -> None:
@@ -131,13 +175,13 @@ async def test_worker_records_failure() -> None:
     processor = AsyncMock()
     page_repo.get_page.return_value = make_page()
     log_repo.create_log.return_value = 9
-    processor._run_pipeline_from.side_effect = RuntimeError("boom")
+    processor._run_stage.side_effect = RuntimeError("boom")
     worker = JobWorker(job_repo, page_repo, log_repo, processor)
 
-    await worker._execute(3, 2, PipelineStartStep.DOWNLOAD)
+    await worker._execute(make_job())
 
     log_repo.update_status.assert_awaited_once_with(9, "failed", "boom")
-    job_repo.fail.assert_awaited_once_with(3, 2, "boom")
+    job_repo.fail.assert_awaited_once_with(3, 2, "boom", worker.worker_id)
 
 
 async def test_worker_records_failure_when_log_creation_fails() -> None:
@@ -148,7 +192,247 @@ async def test_worker_records_failure_when_log_creation_fails() -> None:
     log_repo.create_log.side_effect = RuntimeError("log unavailable")
     worker = JobWorker(job_repo, page_repo, log_repo, AsyncMock())
 
-    await worker._execute(3, 2, PipelineStartStep.DOWNLOAD)
+    await worker._execute(make_job())
 
     log_repo.update_status.assert_not_awaited()
-    job_repo.fail.assert_awaited_once_with(3, 2, "log unavailable")
+    job_repo.fail.assert_awaited_once_with(3, 2, "log unavailable", worker.worker_id)
+
+
+def make_jobs(count: int) -> list[Job]:
+    jobs = []
+    for index in range(count):
+        job = make_job()
+        job.id = index + 1
+        job.page_id = index + 1
+        jobs.append(job)
+    return jobs
+
+
+def make_blocking_worker(
+    jobs: list[Job],
+    concurrency: int,
+    stage_concurrency: dict[PipelineStartStep, int] | None = None,
+) -> tuple[JobWorker, AsyncMock, asyncio.Event, list[int]]:
+    job_repo = AsyncMock()
+    queued = list(jobs)
+
+    async def claim_batch(
+        n: int, stages: dict[PipelineStartStep, int], **lease: object
+    ) -> list[Job]:
+        claimed: list[Job] = []
+        for job in list(queued):
+            stage = job.next_stage
+            if len(claimed) < n and stages.get(stage, 0) > 0:
+                stages = {**stages, stage: stages[stage] - 1}
+                queued.remove(job)
+                claimed.append(job)
+        return claimed
+
+    job_repo.claim_batch.side_effect = claim_batch
+    job_repo.count_queued.return_value = 0
+    page_repo = AsyncMock()
+    page_repo.get_page.return_value = make_page()
+    release = asyncio.Event()
+    running: list[int] = []
+
+    async def run_stage(
+        page_id: int, log_id: int, url: str, stage: object, job_id: int
+    ) -> None:
+        running.append(job_id)
+        await release.wait()
+
+    processor = AsyncMock()
+    processor._run_stage.side_effect = run_stage
+    worker = JobWorker(
+        job_repo,
+        page_repo,
+        AsyncMock(),
+        processor,
+        poll_interval=0.01,
+        concurrency=concurrency,
+        stage_concurrency=stage_concurrency,
+    )
+    return worker, job_repo, release, running
+
+
+async def wait_until(predicate: Callable[[], bool], timeout: float = 1.0) -> None:
+    async def poll() -> None:
+        while not predicate():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout=timeout)
+
+
+async def test_worker_runs_jobs_concurrently_up_to_limit() -> None:
+    worker, job_repo, release, running = make_blocking_worker(make_jobs(3), 2)
+
+    await worker.start()
+    await wait_until(lambda: len(running) == 2)
+    await asyncio.sleep(0.05)
+
+    assert sorted(running) == [1, 2]
+    assert worker.active_jobs == 2
+    release.set()
+    await wait_until(lambda: len(running) == 3)
+    await worker.stop()
+
+    assert job_repo.succeed.await_count == 3
+
+
+async def test_worker_stop_drains_running_slots_without_new_claims() -> None:
+    worker, job_repo, release, running = make_blocking_worker(make_jobs(3), 2)
+
+    await worker.start()
+    await wait_until(lambda: len(running) == 2)
+    stopping = asyncio.create_task(worker.stop())
+    await asyncio.sleep(0.05)
+
+    assert not stopping.done()
+    release.set()
+    assert await stopping
+    assert sorted(running) == [1, 2]
+    assert job_repo.succeed.await_count == 2
+    assert worker.active_jobs == 0
+
+
+async def test_worker_stop_timeout_cancels_running_slots() -> None:
+    worker, job_repo, _, running = make_blocking_worker(make_jobs(2), 2)
+
+    await worker.start()
+    await wait_until(lambda: len(running) == 2)
+
+    assert not await worker.stop(timeout=0.01)
+    await worker.wait_stopped()
+
+    assert worker.active_jobs == 0
+    job_repo.succeed.assert_not_awaited()
+    job_repo.fail.assert_not_awaited()
+
+
+async def test_worker_limits_each_stage_independently() -> None:
+    jobs = make_jobs(4)
+    jobs[2].stage = PipelineStartStep.LLM
+    jobs[3].stage = PipelineStartStep.VECTORIZE
+    worker, job_repo, release, running = make_blocking_worker(
+        jobs, 1, {PipelineStartStep.DOWNLOAD: 2}
+    )
+
+    await worker.start()
+    await wait_until(lambda: len(running) == 4)
+
+    assert worker.active_jobs == 4
+    assert worker._free_capacity() == {}
+    release.set()
+    await worker.stop()
+    assert job_repo.succeed.await_count == 4
+
+
+async def test_worker_rejects_non_positive_concurrency() -> None:
+    with pytest.raises(ValueError, match="concurrency"):
+        JobWorker(AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock(), concurrency=0)
+    with pytest.raises(ValueError, match="concurrency"):
+        JobWorker(
+            AsyncMock(),
+            AsyncMock(),
+            AsyncMock(),
+            AsyncMock(),
+            stage_concurrency={PipelineStartStep.LLM: 0},
+        )
+
+
+async def test_worker_wakes_on_notification_before_poll_interval() -> None:
+    job = make_job()
+    job_repo = AsyncMock()
+    job_repo.count_queued.return_value = 0
+    queued: list[Job] = []
+
+    async def claim_batch(
+        n: int, stages: dict[PipelineStartStep, int], **lease: object
+    ) -> list[Job]:
+        return [queued.pop()] if queued else []
+
+    job_repo.claim_batch.side_effect = claim_batch
+    page_repo = AsyncMock()
+    page_repo.get_page.return_value = make_page()
+    processor = AsyncMock()
+    processor._run_stage.return_value = None
+    wakeup = JobWakeup("")
+    worker = JobWorker(
+        job_repo,
+        page_repo,
+        AsyncMock(),
+        processor,
+        poll_interval=60.0,
+        wakeup=wakeup,
+    )
+
+    await worker.start()
+    await wait_until(lambda: job_repo.claim_batch.await_count == 1)
+    queued.append(job)
+    wakeup.notify()
+    await wait_until(lambda: job_repo.succeed.await_count == 1)
+    await worker.stop()
+
+    job_repo.succeed.assert_awaited_once_with(3, 2, worker.worker_id)
+
+
+async def test_worker_cancels_job_whose_lease_was_lost() -> None:
+    worker, job_repo, release, running = make_blocking_worker(make_jobs(2), 2)
+    worker.lease_seconds = 0.03
+    job_repo.renew_leases.return_value = {2}
+
+    await worker.start()
+    await wait_until(lambda: len(running) == 2)
+    await wait_until(lambda: worker.active_jobs == 1)
+
+    job_repo.renew_leases.assert_awaited()
+    assert job_repo.renew_leases.await_args.args[1] == worker.worker_id
+    release.set()
+    await worker.stop()
+    job_repo.succeed.assert_awaited_once_with(2, 2, worker.worker_id)
+
+
+async def test_worker_syncs_chunk_attributes_until_queue_is_empty() -> None:
+    page_repo = AsyncMock()
+    processor = AsyncMock()
+    page_repo.get_chunk_attribute_sync_batch.side_effect = [{2: 1, 3: 4}, {5: 1}, {}]
+    worker = JobWorker(AsyncMock(), page_repo, AsyncMock(), processor)
+
+    synced = await worker.sync_chunk_attributes()
+
+    assert synced == 3
+    assert [
+        call.args[0]
+        for call in processor.vectorizer.sync_chunk_attributes.await_args_list
+    ] == [[2, 3], [5]]
+    assert [
+        call.args[0] for call in page_repo.ack_chunk_attribute_sync.await_args_list
+    ] == [{2: 1, 3: 4}, {5: 1}]
+
+
+async def test_worker_bounds_chunk_attribute_sync_per_call() -> None:
+    page_repo = AsyncMock()
+    processor = AsyncMock()
+    page_repo.get_chunk_attribute_sync_batch.side_effect = [{2: 1}, {3: 1}, {5: 1}]
+    worker = JobWorker(AsyncMock(), page_repo, AsyncMock(), processor)
+
+    synced = await worker.sync_chunk_attributes(max_batches=2)
+
+    # 残りは次の間隔で書き直す
+    assert synced == 2
+    assert page_repo.get_chunk_attribute_sync_batch.await_count == 2
+
+
+async def test_worker_syncs_chunk_attributes_after_job_success() -> None:
+    worker, job_repo, release, _ = make_blocking_worker(make_jobs(1), 1)
+    worker.chunk_sync_interval = 60.0
+    worker.page_repo.get_chunk_attribute_sync_batch.return_value = {}
+
+    await worker.start()
+    release.set()
+    await wait_until(
+        lambda: worker.page_repo.get_chunk_attribute_sync_batch.await_count == 1
+    )
+    await worker.stop()
+
+    job_repo.succeed.assert_awaited_once()
@@ -0,0 +1,211 @@
+"""Adaptive LLM concurrency governor tests."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from grimoire_api.services.llm_governor import (
+    LLMConcurrencyGovernor,
+    get_llm_governor,
+    is_overload_error,
+)
+from litellm import RateLimitError
+
+
+class FakeClock:
+    """テストから進める単調時計."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def rate_limit_error() -> RateLimitError:
+    return RateLimitError("rate limited", llm_provider="openai", model="test")
+
+
+async def run_request(
+    governor: LLMConcurrencyGovernor, clock: FakeClock, latency: float
+) -> None:
+    async with governor.slot():
+        clock.now += latency
+
+
+async def test_limit_caps_concurrent_requests() -> None:
+    governor = LLMConcurrencyGovernor("test", initial_limit=2, max_limit=2)
+    release = asyncio.Event()
+    active = 0
+    maximum_active = 0
+
+    async def request() -> None:
+        nonlocal active, maximum_active
+        async with governor.slot():
+            active += 1
+            maximum_active = max(maximum_active, active)
+            await release.wait()
+            active -= 1
+
+    tasks = [asyncio.create_task(request()) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    assert governor.in_flight == 2
+    assert governor.queued == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert maximum_active == 2
+    assert governor.in_flight == 0
+    assert governor.queued == 0
+
+
+async def test_successes_increase_limit_additively() -> None:
+    clock = FakeClock()
+    governor = LLMConcurrencyGovernor("test", initial_limit=2, max_limit=4, clock=clock)
+
+    for _ in range(3):
+        await run_request(governor, clock, 1.0)
+    assert governor.limit == 3
+
+    for _ in range(20):
+        await run_request(governor, clock, 1.0)
+    assert governor.limit == 4
+
+
+async def test_rate_limit_halves_limit_once_per_congestion_event() -> None:
+    governor = LLMConcurrencyGovernor("test", initial_limit=8, max_limit=8)
+    started = asyncio.Event()
+    fail = asyncio.Event()
+
+    async def request() -> None:
+        async with governor.slot():
+            started.set()
+            await fail.wait()
+            raise rate_limit_error()
+
+    tasks = [asyncio.create_task(request()) for _ in range(4)]
+    await started.wait()
+    fail.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RateLimitError) for result in results)
+    assert governor.limit == 4
+
+
+async def test_rising_latency_reduces_limit() -> None:
+    clock = FakeClock()
+    governor = LLMConcurrencyGovernor(
+        "test", initial_limit=8, max_limit=8, latency_tolerance=2.0, clock=clock
+    )
+    await run_request(governor, clock, 1.0)
+
+    for _ in range(10):
+        await run_request(governor, clock, 5.0)
+        if governor.limit < 8:
+            break
+
+    assert governor.limit == 4
+
+
+async def test_mixed_size_calls_do_not_collapse_limit() -> None:
+    clock = FakeClock()
+    governor = LLMConcurrencyGovernor(
+        "test", initial_limit=4, max_limit=8, latency_tolerance=2.0, clock=clock
+    )
+
+    async def run_call(kind: str, input_tokens: int, latency: float) -> None:
+        async with governor.slot(kind, input_tokens):
+            clock.now += latency
+
+    # 短い部分要約の速い応答と、長い縮約の遅い応答が交互に届く
+    for _ in range(20):
+        await run_call("partial", 200, 0.5)
+        await run_call("partial", 8000, 4.0)
+        await run_call("summary", 6000, 6.0)
+
+    assert governor.limit == 8
+
+
+async def test_streaming_compares_time_to_first_token() -> None:
+    clock = FakeClock()
+    governor = LLMConcurrencyGovernor(
+        "test", initial_limit=4, max_limit=4, latency_tolerance=2.0, clock=clock
+    )
+
+    async def stream(output_seconds: float, first_token_seconds: float) -> None:
+        async with governor.slot("summary", 1000) as timing:
+            clock.now += first_token_seconds
+            timing.first_token()
+            clock.now += output_seconds
+
+    await stream(0.5, 0.2)
+    for _ in range(10):
+        # 出力が長いだけなら過負荷とみなさない
+        await stream(20.0, 0.2)
+    assert governor.limit == 4
+
+    for _ in range(10):
+        await stream(0.5, 1.0)
+        if governor.limit < 4:
+            break
+    assert governor.limit == 2
+
+
+async def test_limit_never_drops_below_minimum() -> None:
+    governor = LLMConcurrencyGovernor("test", initial_limit=1, max_limit=4)
+
+    for _ in range(3):
+        with pytest.raises(RateLimitError):
+            async with governor.slot():
+                raise rate_limit_error()
+
+    assert governor.limit == 1
+
+
+async def test_cancelled_waiter_does_not_leak_slot() -> None:
+    governor = LLMConcurrencyGovernor("test", initial_limit=1, max_limit=1)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with governor.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert governor.in_flight == 0
+    async with governor.slot():
+        assert governor.in_flight == 1
+
+
+def test_overload_errors_are_detected() -> None:
+    assert is_overload_error(rate_limit_error())
+    assert is_overload_error(MagicMock(status_code=503))
+    assert not is_overload_error(ValueError("bad request"))
+
+
+def test_governors_are_shared_per_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    from grimoire_api.services import llm_governor
+
+    monkeypatch.setattr(llm_governor, "_governors", {})
+    monkeypatch.setattr(
+        llm_governor.settings, "LLM_MODEL_MAX_CONCURRENCY", {"small": 1}
+    )
+
+    small = get_llm_governor("small")
+    large = get_llm_governor("large")
+
+    assert get_llm_governor("small") is small
+    assert large is not small
+    assert small.max_limit == 1
+    assert small.limit == 1
+    assert large.max_limit == llm_governor.settings.LLM_MAX_CONCURRENCY
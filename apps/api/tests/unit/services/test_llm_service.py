@@ -3,15 +3,49 @@
 import asyncio
 import json
 import traceback
+from functools import partial
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from grimoire_api.models.external import SummaryResult
+from grimoire_api.repositories.file_repository import FileRepository
+from grimoire_api.services import llm_governor
+from grimoire_api.services.llm_governor import LLMConcurrencyGovernor
 from grimoire_api.services.llm_service import LLMService
 from grimoire_api.utils.exceptions import LLMServiceError
 
 
+def use_stored_documents(file_repo: Any) -> None:
+    """load_json_file のモック応答から実装どおりに FetchedDocument を作る."""
+    file_repo.document_cache = None
+    file_repo.load_document = partial(FileRepository.load_document, file_repo)
+
+
+class InMemoryCheckpoints:
+    """SummaryCheckpointRepository のメモリ実装."""
+
+    def __init__(self) -> None:
+        self.rows: dict[int, dict[tuple[str, str], str]] = {}
+
+    async def load(self, page_id: int) -> dict[tuple[str, str], str]:
+        return dict(self.rows.get(page_id, {}))
+
+    async def save(
+        self, page_id: int, kind: str, content_hash: str, summary: str
+    ) -> None:
+        self.rows.setdefault(page_id, {})[(kind, content_hash)] = summary
+
+    async def clear(self, page_id: int) -> None:
+        self.rows.pop(page_id, None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_llm_governors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """プロセス共有の同時実行制御をテストごとに初期化する."""
+    monkeypatch.setattr(llm_governor, "_governors", {})
+
+
 class TestLLMService:
     """LLMServiceのテストクラス."""
 
@@ -28,6 +62,7 @@ class TestLLMService:
     def mock_file_repo(self: Any) -> Any:
         """ファイルリポジトリモック."""
         mock_repo = AsyncMock()
+        use_stored_documents(mock_repo)
         mock_repo.load_json_file.return_value = {
             "data": {
                 "title": "Test Title",
@@ -300,7 +335,7 @@ class TestLLMService:
         chunker.chunk_document.return_value = [" ", "\n"]
         service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
         service.input_token_limit = 100
-        service._count_tokens = MagicMock(return_value=101)
+        service._prompt_tokens = MagicMock(return_value=101)
 
         with pytest.raises(
             LLMServiceError, match="No summary chunks generated: page_id=8"
@@ -311,7 +346,7 @@ class TestLLMService:
     async def test_boundary_uses_single_summary(self, llm_service: LLMService) -> None:
         """入力上限ちょうどなら従来の単発要約を使う."""
         llm_service.input_token_limit = 100
-        llm_service._count_tokens = MagicMock(return_value=100)
+        llm_service._prompt_tokens = MagicMock(return_value=100)
         expected = {"summary": "single", "keywords": ["keyword"]}
 
         with patch("grimoire_api.services.llm_service.acompletion") as completion:
@@ -329,13 +364,7 @@ class TestLLMService:
         chunker = MagicMock()
         chunker.chunk_document.return_value = ["first", "second"]
         service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
-        service.input_token_limit = 100
-        full_prompt = service._build_prompt(
-            "Test Title", "This is test content for LLM processing."
-        )
-        service._count_tokens = MagicMock(
-            side_effect=lambda prompt: 101 if prompt == full_prompt else 10
-        )
+        self._exceed_limit_for_page(service)
 
         async def complete(**kwargs: Any) -> MagicMock:
             prompt = kwargs["messages"][0]["content"]
@@ -361,13 +390,7 @@ class TestLLMService:
         chunker = MagicMock()
         chunker.chunk_document.return_value = ["first", "second"]
         service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
-        service.input_token_limit = 100
-        full_prompt = service._build_prompt(
-            "Test Title", "This is test content for LLM processing."
-        )
-        service._count_tokens = MagicMock(
-            side_effect=lambda prompt: 101 if prompt == full_prompt else 10
-        )
+        self._exceed_limit_for_page(service)
 
         with patch(
             "grimoire_api.services.llm_service.acompletion",
@@ -384,14 +407,8 @@ class TestLLMService:
         chunker = MagicMock()
         chunker.chunk_document.return_value = ["one", "two", "three"]
         service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
-        service.semaphore = asyncio.Semaphore(2)
-        service.input_token_limit = 100
-        full_prompt = service._build_prompt(
-            "Test Title", "This is test content for LLM processing."
-        )
-        service._count_tokens = MagicMock(
-            side_effect=lambda prompt: 101 if prompt == full_prompt else 10
-        )
+        service.governor = LLMConcurrencyGovernor("test", initial_limit=2, max_limit=2)
+        self._exceed_limit_for_page(service)
         active = 0
         maximum_active = 0
 
@@ -434,19 +451,17 @@ class TestLLMService:
         chunker = MagicMock()
         chunker.chunk_document.return_value = ["first", "second"]
         service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
-        service.input_token_limit = 100
-        full_prompt = service._build_prompt(
-            "Test Title", "This is test content for LLM processing."
-        )
+        self._exceed_limit_for_page(service)
+        estimate = service._prompt_tokens
 
-        def count(prompt: str) -> int:
-            if prompt == full_prompt:
+        def count(template: str, pieces: list[str]) -> int:
+            if "最終要約" in template and {"summary-first", "summary-second"} <= set(
+                pieces
+            ):
                 return 101
-            if "summary-first" in prompt and "summary-second" in prompt:
-                return 101 if "最終要約" in prompt else 10
-            return 10
+            return estimate(template, pieces)
 
-        service._count_tokens = MagicMock(side_effect=count)
+        service._prompt_tokens = MagicMock(side_effect=count)
         responses = [
             self._response({"summary": "summary-first"}),
             self._response({"summary": "summary-second"}),
@@ -461,6 +476,199 @@ class TestLLMService:
         assert result.summary == "final"
         assert completion.await_count == 4
 
+    @pytest.mark.asyncio
+    async def test_reduction_starts_before_slow_chunk_finishes(
+        self, mock_file_repo: Any
+    ) -> None:
+        """遅いチャンクを待たずに先行部分の縮約を始め、呼び出し回数は変えない."""
+        chunker = MagicMock()
+        chunker.chunk_document.return_value = [f"chunk-{n}" for n in range(1, 7)]
+        service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
+        self._exceed_limit_for_page(service)
+        reduction_started = asyncio.Event()
+        reduced_groups: list[str] = []
+
+        async def complete(**kwargs: Any) -> MagicMock:
+            prompt = kwargs["messages"][0]["content"]
+            if "最終要約" in prompt:
+                assert prompt.index("reduced-1") < prompt.index("reduced-2")
+                return self._response({"summary": "final", "keywords": ["keyword"]})
+            if "連続した部分要約" in prompt:
+                reduced_groups.append(prompt)
+                reduction_started.set()
+                return self._response({"summary": f"reduced-{len(reduced_groups)}"})
+            if "chunk-6" in prompt:
+                await reduction_started.wait()
+            return self._response({"summary": "m" * 20})
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion", side_effect=complete
+        ) as completion:
+            result = await asyncio.wait_for(
+                service.generate_summary_keywords(1), timeout=5
+            )
+
+        assert result.summary == "final"
+        # 部分要約6件 + 3件ずつの縮約2件 + 最終要約1件
+        assert completion.await_count == 9
+        assert len(reduced_groups) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_cancels_pending_work(self, mock_file_repo: Any) -> None:
+        """部分要約の失敗時は未完了の要約を取り消してエラーを返す."""
+        chunker = MagicMock()
+        chunker.chunk_document.return_value = ["first", "second"]
+        service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
+        self._exceed_limit_for_page(service)
+        never = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def complete(**kwargs: Any) -> MagicMock:
+            prompt = kwargs["messages"][0]["content"]
+            if "first" in prompt:
+                raise Exception("timeout")
+            try:
+                await never.wait()
+            finally:
+                cancelled.set()
+            raise AssertionError("unreachable")
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion", side_effect=complete
+        ):
+            with pytest.raises(LLMServiceError, match=r"chunk=1/2"):
+                await service.generate_summary_keywords(1)
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_from_saved_partial_summaries(
+        self, mock_file_repo: Any
+    ) -> None:
+        """失敗したチャンクだけを再要約し、完了後に途中結果を削除する."""
+        chunker = MagicMock()
+        chunker.chunk_document.return_value = ["first", "second", "third"]
+        checkpoints = InMemoryCheckpoints()
+        service = LLMService(
+            mock_file_repo,
+            api_key="key",
+            chunking_service=chunker,
+            checkpoints=checkpoints,
+        )
+        self._exceed_limit_for_page(service)
+        prompts: list[str] = []
+
+        async def flaky(**kwargs: Any) -> MagicMock:
+            prompt = kwargs["messages"][0]["content"]
+            prompts.append(prompt)
+            if "third" in prompt:
+                raise Exception("timeout")
+            return self._response({"summary": f"summary-{len(prompts)}"})
+
+        with patch("grimoire_api.services.llm_service.acompletion", side_effect=flaky):
+            with pytest.raises(LLMServiceError, match=r"chunk=3/3"):
+                await service.generate_summary_keywords(5)
+        assert len(checkpoints.rows[5]) == 2
+
+        prompts.clear()
+
+        async def healthy(**kwargs: Any) -> MagicMock:
+            prompt = kwargs["messages"][0]["content"]
+            prompts.append(prompt)
+            if "最終要約" in prompt:
+                return self._response({"summary": "final", "keywords": ["keyword"]})
+            return self._response({"summary": "summary-third"})
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion", side_effect=healthy
+        ):
+            result = await service.generate_summary_keywords(5)
+
+        assert result.summary == "final"
+        assert len(prompts) == 2
+        assert "third" in prompts[0]
+        assert 5 not in checkpoints.rows
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_failures_do_not_fail_summary(
+        self, mock_file_repo: Any
+    ) -> None:
+        """途中結果の保存先が壊れていても要約は完了する."""
+        chunker = MagicMock()
+        chunker.chunk_document.return_value = ["first", "second"]
+        checkpoints = AsyncMock()
+        checkpoints.load.side_effect = RuntimeError("database is locked")
+        checkpoints.save.side_effect = RuntimeError("database is locked")
+        checkpoints.clear.side_effect = RuntimeError("database is locked")
+        service = LLMService(
+            mock_file_repo,
+            api_key="key",
+            chunking_service=chunker,
+            checkpoints=checkpoints,
+        )
+        self._exceed_limit_for_page(service)
+
+        async def complete(**kwargs: Any) -> MagicMock:
+            if "最終要約" in kwargs["messages"][0]["content"]:
+                return self._response({"summary": "final", "keywords": ["keyword"]})
+            return self._response({"summary": "partial"})
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion", side_effect=complete
+        ):
+            result = await service.generate_summary_keywords(1)
+
+        assert result.summary == "final"
+
+    @pytest.mark.asyncio
+    async def test_long_content_is_tokenized_once(self, mock_file_repo: Any) -> None:
+        """長文ページの本文と分割片は内容ごとに一度だけトークナイズする."""
+        content = "\n".join(f"line {index} " + "x" * 40 for index in range(200))
+        mock_file_repo.load_json_file.return_value["data"]["content"] = content
+        chunker = MagicMock()
+        chunker.chunk_document.return_value = [content]
+        service = LLMService(mock_file_repo, api_key="key", chunking_service=chunker)
+        service.input_token_limit = 2000
+        tokenized: list[str] = []
+
+        def tokenize(**kwargs: Any) -> int:
+            tokenized.append(kwargs["text"])
+            return len(kwargs["text"].encode("utf-8"))
+
+        async def complete(**kwargs: Any) -> MagicMock:
+            if "最終要約" in kwargs["messages"][0]["content"]:
+                return self._response({"summary": "final", "keywords": ["keyword"]})
+            return self._response({"summary": "partial"})
+
+        with (
+            patch(
+                "grimoire_api.services.llm_service.token_counter",
+                side_effect=tokenize,
+            ),
+            patch(
+                "grimoire_api.services.llm_service.acompletion", side_effect=complete
+            ) as completion,
+        ):
+            result = await service.generate_summary_keywords(1)
+
+        assert result.summary == "final"
+        assert completion.await_count > 2
+        assert tokenized.count(content) == 1
+        assert len(tokenized) == len(set(tokenized))
+        assert sum(len(text) for text in tokenized) < 3 * len(content)
+
+    def _exceed_limit_for_page(self, service: LLMService) -> None:
+        """ページ全体だけが入力上限を超え、部分要約は収まる見積もりにする."""
+        service.input_token_limit = 100
+        service._count_tokens = MagicMock(return_value=10)
+        page_template = service._build_prompt("Test Title", "")
+        estimate = service._prompt_tokens
+        service._prompt_tokens = MagicMock(
+            side_effect=lambda template, pieces: (
+                101 if template == page_template else estimate(template, pieces)
+            )
+        )
+
     @staticmethod
     def _response(result: dict[str, Any]) -> MagicMock:
         response = MagicMock()
@@ -468,3 +676,221 @@ class TestLLMService:
             "choices": [{"message": {"content": json.dumps(result)}}]
         }
         return response
+
+
+class TestLLMServiceCache:
+    """LLM応答キャッシュのテストクラス."""
+
+    @pytest.fixture(autouse=True)
+    def mock_token_counter(self):
+        """テストでは外部トークナイザー解決を避けて決定的に計測する."""
+        with patch(
+            "grimoire_api.services.llm_service.token_counter",
+            side_effect=lambda **kwargs: len(kwargs["text"].encode("utf-8")),
+        ):
+            yield
+
+    @pytest.fixture
+    def mock_file_repo(self) -> Any:
+        """ファイルリポジトリモック."""
+        mock_repo = AsyncMock()
+        use_stored_documents(mock_repo)
+        mock_repo.load_json_file.return_value = {
+            "data": {"title": "Test Title", "content": "Cached content."}
+        }
+        return mock_repo
+
+    @pytest.fixture
+    def cache(self) -> Any:
+        """キャッシュリポジトリモック."""
+        return AsyncMock()
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_llm(self, mock_file_repo: Any, cache: Any) -> None:
+        """キャッシュ済みの応答があればLLMを呼ばない."""
+        cached = {"summary": "cached", "keywords": ["a"]}
+        cache.get.return_value = json.dumps(cached)
+        service = LLMService(file_repo=mock_file_repo, api_key="key", cache=cache)
+
+        with patch("grimoire_api.services.llm_service.acompletion") as completion:
+            result = await service.generate_summary_keywords(1)
+
+        assert result == SummaryResult.model_validate(cached)
+        completion.assert_not_called()
+        cache.put.assert_not_called()
+        _, prompt_version, kind, content_hash = cache.get.call_args.args
+        assert (prompt_version, kind) == ("1", "summary")
+        assert len(content_hash) == 64
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_stores_validated_result(
+        self, mock_file_repo: Any, cache: Any
+    ) -> None:
+        """キャッシュにない応答は検証後に保存する."""
+        cache.get.return_value = None
+        expected = {"summary": "fresh", "keywords": ["b"]}
+        service = LLMService(file_repo=mock_file_repo, api_key="key", cache=cache)
+
+        with patch("grimoire_api.services.llm_service.acompletion") as completion:
+            response = MagicMock()
+            response.model_dump.return_value = {
+                "choices": [{"message": {"content": json.dumps(expected)}}]
+            }
+            completion.return_value = response
+            result = await service.generate_summary_keywords(1)
+
+        assert result == SummaryResult.model_validate(expected)
+        stored = cache.put.call_args.args
+        assert stored[:4] == cache.get.call_args.args
+        assert json.loads(stored[4]) == expected
+
+    @pytest.mark.asyncio
+    async def test_cache_failure_falls_back_to_llm(
+        self, mock_file_repo: Any, cache: Any
+    ) -> None:
+        """キャッシュ障害時もLLM呼び出しで処理を続ける."""
+        cache.get.side_effect = RuntimeError("disk I/O error")
+        cache.put.side_effect = RuntimeError("disk I/O error")
+        expected = {"summary": "fresh", "keywords": ["b"]}
+        service = LLMService(file_repo=mock_file_repo, api_key="key", cache=cache)
+
+        with patch("grimoire_api.services.llm_service.acompletion") as completion:
+            response = MagicMock()
+            response.model_dump.return_value = {
+                "choices": [{"message": {"content": json.dumps(expected)}}]
+            }
+            completion.return_value = response
+            result = await service.generate_summary_keywords(1)
+
+        assert result == SummaryResult.model_validate(expected)
+        completion.assert_called_once()
+
+
+class TestLLMServiceStreaming:
+    """ストリーミング応答のテストクラス."""
+
+    @pytest.fixture(autouse=True)
+    def streaming_settings(self):
+        """ストリーミングを有効にし、トークナイザーを決定的にする."""
+        with (
+            patch(
+                "grimoire_api.services.llm_service.token_counter",
+                side_effect=lambda **kwargs: len(kwargs["text"].encode("utf-8")),
+            ),
+            patch("grimoire_api.services.llm_service.settings.LLM_STREAMING", True),
+        ):
+            yield
+
+    @pytest.fixture
+    def service(self) -> LLMService:
+        """ストリーミング用サービス."""
+        file_repo = AsyncMock()
+        use_stored_documents(file_repo)
+        file_repo.load_json_file.return_value = {
+            "data": {"title": "Test Title", "content": "Streamed content."}
+        }
+        return LLMService(
+            file_repo=file_repo,
+            api_key="key",
+            governor=LLMConcurrencyGovernor("test", initial_limit=1, max_limit=1),
+        )
+
+    @staticmethod
+    def _stream(parts: list[str], consumed: list[str]) -> Any:
+        async def generate() -> Any:
+            for part in parts:
+                consumed.append(part)
+                yield MagicMock(choices=[MagicMock(delta=MagicMock(content=part))])
+
+        return generate()
+
+    @pytest.mark.asyncio
+    async def test_stops_when_object_is_complete(self, service: LLMService) -> None:
+        """JSONオブジェクトが閉じた時点で残りのストリームを読まない."""
+        consumed: list[str] = []
+        parts = ['{"summary": "s", ', '"keywords": ["k"]}', " extra", " never"]
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion",
+            return_value=self._stream(parts, consumed),
+        ) as completion:
+            result = await service.generate_summary_keywords(1)
+
+        assert result == SummaryResult(summary="s", keywords=["k"])
+        assert consumed == parts[:2]
+        assert completion.call_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_malformed_output_aborts_early(self, service: LLMService) -> None:
+        """JSONとして成立しない出力は生成完了を待たずに中断する."""
+        consumed: list[str] = []
+        parts = ["Sure!", " Here", " is", " the", " summary"]
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion",
+            return_value=self._stream(parts, consumed),
+        ):
+            with pytest.raises(
+                LLMServiceError, match="Failed to parse LLM response as JSON"
+            ):
+                await service.generate_summary_keywords(1)
+
+        assert consumed == parts[:1]
+
+    @pytest.mark.asyncio
+    async def test_records_stream_timing_metrics(self, service: LLMService) -> None:
+        """初回トークンまでの時間と出力速度を記録する."""
+        parts = ['{"summary": "s",', ' "keywords":', ' ["k"]}']
+
+        with (
+            patch(
+                "grimoire_api.services.llm_service.acompletion",
+                return_value=self._stream(parts, []),
+            ),
+            patch("grimoire_api.services.llm_service.llm_time_to_first_token") as ttft,
+            patch(
+                "grimoire_api.services.llm_service.llm_output_tokens_per_second"
+            ) as rate,
+        ):
+            await service.generate_summary_keywords(1)
+
+        ttft.record.assert_called_once()
+        assert rate.record.call_count <= 1
+
+    @pytest.mark.asyncio
+    async def test_output_rate_counts_tokens_not_chunks(
+        self, service: LLMService
+    ) -> None:
+        """出力速度は初回チャンク以降の本文をトークナイザーで数えて求める."""
+        parts = ['{"summary": "s",', ' "keywords":', ' ["k"]}']
+
+        with (
+            patch(
+                "grimoire_api.services.llm_service.acompletion",
+                return_value=self._stream(parts, []),
+            ),
+            patch("grimoire_api.services.llm_service.time") as clock,
+            patch(
+                "grimoire_api.services.llm_service.llm_output_tokens_per_second"
+            ) as rate,
+        ):
+            clock.monotonic.side_effect = [10.0, 11.0, 13.0]
+            await service.generate_summary_keywords(1)
+
+        # テストのトークナイザーは UTF-8 バイト数 (ASCII では文字数) を返す
+        expected = len(' "keywords": ["k"]}') / 2.0
+        assert rate.record.call_args.args[0] == pytest.approx(expected)
+
+    @pytest.mark.asyncio
+    async def test_stream_error_is_request_failure(self, service: LLMService) -> None:
+        """ストリーム途中の例外は LLM リクエスト失敗として扱う."""
+
+        async def broken() -> Any:
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content="{"))])
+            raise ConnectionError("reset")
+
+        with patch(
+            "grimoire_api.services.llm_service.acompletion", return_value=broken()
+        ):
+            with pytest.raises(LLMServiceError, match="LLM request failed"):
+                await service.generate_summary_keywords(1)
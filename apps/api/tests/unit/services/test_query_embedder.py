@@ -0,0 +1,85 @@
+"""Query embedding cache tests."""
+
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from grimoire_api.services.query_embedder import QueryEmbedder
+
+
+def embedding_response(vector: list[float]) -> MagicMock:
+    response = MagicMock()
+    response.data = [{"embedding": vector}]
+    return response
+
+
+@pytest.fixture
+def aembedding() -> Iterator[AsyncMock]:
+    with patch(
+        "grimoire_api.services.query_embedder.aembedding",
+        new=AsyncMock(return_value=embedding_response([0.1, 0.2])),
+    ) as mock:
+        yield mock
+
+
+async def test_embeds_normalized_query_once(aembedding: AsyncMock) -> None:
+    """空白や全角の違いだけのクエリは同じ埋め込みを使う."""
+    embedder = QueryEmbedder("text-embedding-3-small", api_key="key")
+
+    first = await embedder.embed("  Ｐｙｔｈｏｎ   asyncio ")
+    second = await embedder.embed("Python asyncio")
+
+    assert first == second == [0.1, 0.2]
+    aembedding.assert_awaited_once_with(
+        model="text-embedding-3-small", input=["Python asyncio"], api_key="key"
+    )
+
+
+async def test_evicts_least_recently_used_query(aembedding: AsyncMock) -> None:
+    embedder = QueryEmbedder("model", api_key="key", max_entries=2)
+    await embedder.embed("a")
+    await embedder.embed("b")
+    await embedder.embed("a")
+
+    await embedder.embed("c")
+    await embedder.embed("a")
+    await embedder.embed("b")
+
+    assert [call.kwargs["input"] for call in aembedding.await_args_list] == [
+        ["a"],
+        ["b"],
+        ["c"],
+        ["b"],
+    ]
+
+
+async def test_persistent_tier_avoids_embedding_request(
+    aembedding: AsyncMock,
+) -> None:
+    """プロセス内にないクエリは永続キャッシュから読み、外部 API を呼ばない."""
+    store = MagicMock()
+    store.get = AsyncMock(return_value=[0.3, 0.4])
+    store.put = AsyncMock()
+    embedder = QueryEmbedder("model", api_key="key", store=store)
+
+    assert await embedder.embed("query") == [0.3, 0.4]
+    assert await embedder.embed("query") == [0.3, 0.4]
+
+    store.get.assert_awaited_once_with("model", "query")
+    store.put.assert_not_awaited()
+    aembedding.assert_not_awaited()
+
+
+async def test_store_failure_does_not_fail_embedding(aembedding: AsyncMock) -> None:
+    store = MagicMock()
+    store.get = AsyncMock(side_effect=OSError("disk"))
+    store.put = AsyncMock(side_effect=OSError("disk"))
+    embedder = QueryEmbedder("model", api_key="key", store=store)
+
+    assert await embedder.embed("query") == [0.1, 0.2]
+    store.put.assert_awaited_once_with("model", "query", [0.1, 0.2])
+
+
+def test_rejects_negative_size() -> None:
+    with pytest.raises(ValueError):
+        QueryEmbedder("model", api_key="key", max_entries=-1)
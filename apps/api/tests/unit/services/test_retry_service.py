@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock
 import pytest
 from grimoire_api.models.database import (
     JobKind,
+    JobPriority,
     Page,
     PageStatus,
     PipelineStartStep,
@@ -102,7 +103,7 @@ async def test_retry_enqueues_job_without_running_pipeline(
     result = await service.retry_single_page(1)
 
     dependencies["job_repo"].enqueue.assert_awaited_once_with(
-        1, JobKind.RETRY, PipelineStartStep.LLM
+        1, JobKind.RETRY, PipelineStartStep.LLM, None
     )
     assert result["job_id"] == 10
     assert result["restart_from"] == "llm"
@@ -119,7 +120,7 @@ async def test_reprocess_explicit_step_enqueues_job(
     result = await service.reprocess_page(1, "download")
 
     dependencies["job_repo"].enqueue.assert_awaited_once_with(
-        1, JobKind.REPROCESS, PipelineStartStep.DOWNLOAD
+        1, JobKind.REPROCESS, PipelineStartStep.DOWNLOAD, None
     )
     assert result["job_id"] == 11
 
@@ -146,6 +147,7 @@ async def test_retry_all_uses_only_current_failed_pages(
     )
     assert result["job_ids"] == [21, 22]
     assert result["retry_count"] == 2
+    service.retry_single_page.assert_awaited_with(2, priority=JobPriority.BATCH)
 
 
 async def test_retry_all_without_max_uses_fallback_limit(
@@ -0,0 +1,72 @@
+"""Search result cache tests."""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from grimoire_api.models.response import SearchResult
+from grimoire_api.services.search_result_cache import SearchResultCache
+
+
+def make_result(page_id: int) -> SearchResult:
+    return SearchResult(
+        page_id=page_id,
+        chunk_id=0,
+        url=f"https://example.com/{page_id}",
+        title="title",
+        memo=None,
+        content="",
+        summary="",
+        keywords=[],
+        created_at=datetime(2024, 1, 1),
+        score=0.5,
+    )
+
+
+def test_returns_results_while_generation_is_unchanged() -> None:
+    cache = SearchResultCache(max_entries=4, ttl=60)
+    key = cache.make_key("vector", "query", 5, {"url": "a", "keywords": ["k"]})
+    cache.put(key, 3, [make_result(1)], elapsed=0.2)
+
+    assert cache.get(key, 3) == [make_result(1)]
+    # フィルタの dict はキーの順序によらず同じ条件とみなす
+    assert cache.make_key("vector", "query", 5, {"keywords": ["k"], "url": "a"}) == key
+    assert cache.get(cache.make_key("vector", "query", 6, None), 3) is None
+
+
+def test_discards_entries_from_older_generation() -> None:
+    cache = SearchResultCache(max_entries=4, ttl=60)
+    cache.put("key", 3, [make_result(1)], elapsed=0.2)
+
+    assert cache.get("key", 4) is None
+    assert cache.get("key", 3) is None
+
+
+def test_discards_expired_entries() -> None:
+    cache = SearchResultCache(max_entries=4, ttl=10)
+    with patch(
+        "grimoire_api.services.search_result_cache.time.monotonic",
+        side_effect=[100.0, 105.0, 111.0],
+    ):
+        cache.put("key", 1, [make_result(1)], elapsed=0.2)
+        assert cache.get("key", 1) is not None
+        assert cache.get("key", 1) is None
+
+
+def test_evicts_least_recently_used_entries() -> None:
+    cache = SearchResultCache(max_entries=2, ttl=60)
+    cache.put("a", 1, [make_result(1)], elapsed=0.1)
+    cache.put("b", 1, [make_result(2)], elapsed=0.1)
+    assert cache.get("a", 1) is not None
+
+    cache.put("c", 1, [make_result(3)], elapsed=0.1)
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is not None
+    assert cache.get("c", 1) is not None
+
+
+@pytest.mark.parametrize(("max_entries", "ttl"), [(0, 60), (4, 0)])
+def test_rejects_non_positive_bounds(max_entries: int, ttl: float) -> None:
+    with pytest.raises(ValueError):
+        SearchResultCache(max_entries=max_entries, ttl=ttl)
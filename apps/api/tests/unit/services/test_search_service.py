@@ -2,12 +2,14 @@
 
 import asyncio
 import threading
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from grimoire_api.config import settings
 from grimoire_api.models.database import Page, PageStatus
+from grimoire_api.services.search_result_cache import SearchResultCache
 from grimoire_api.services.search_service import SearchService
 from grimoire_api.utils.exceptions import VectorizerError
 from pydantic import ValidationError
@@ -49,6 +51,10 @@ class TestSearchService:
             }
         )
         page_repo.get_pages_by_ids = AsyncMock(return_value=pages)
+        page_repo.estimate_search_selectivity = AsyncMock(return_value=(5, 5))
+        page_repo.get_searchable_chunk_targets = AsyncMock(return_value=None)
+        # 既定ではチャンク属性の書き直し待ちがあり、属性での絞り込みを使わない
+        page_repo.has_pending_chunk_attribute_sync = AsyncMock(return_value=True)
         return SearchService(weaviate_client=mock_weaviate_client, page_repo=page_repo)
 
     def test_init(self: Any) -> None:
@@ -324,6 +330,38 @@ class TestSearchService:
         assert all(call.kwargs["limit"] == 100 for call in calls)
         assert all(call.kwargs["filters"] is None for call in calls)
 
+    @pytest.mark.asyncio
+    async def test_shared_chunk_maps_to_every_owning_page(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """内容ハッシュで共有されたチャンクは参照する全ページの結果になる."""
+        shared = MagicMock()
+        shared.properties = {"chunkHash": "a" * 64, "content": "shared text"}
+        shared.metadata.certainty = 0.9
+        legacy = MagicMock()
+        legacy.properties = {"pageId": 4, "chunkId": 2, "content": "legacy text"}
+        legacy.metadata.certainty = 0.8
+        response = MagicMock()
+        response.objects = [shared, legacy]
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = response
+        search_service.page_repo.get_chunk_owners = AsyncMock(  # type: ignore[method-assign]
+            return_value={"a" * 64: [(1, 3), (2, 0), (99, 1)]}
+        )
+
+        results = await search_service.vector_search("query", limit=5)
+
+        assert [(r.page_id, r.chunk_id, r.content) for r in results] == [
+            (1, 3, "shared text"),
+            (2, 0, "shared text"),
+            (4, 2, "legacy text"),
+        ]
+        search_service.page_repo.get_chunk_owners.assert_awaited_once_with(["a" * 64])
+        page_ids = search_service.page_repo.get_searchable_pages_by_ids.call_args.args[
+            0
+        ]
+        assert page_ids == [1, 2, 99, 4]
+
     @pytest.mark.asyncio
     async def test_search_stops_at_candidate_scan_limit(
         self, search_service: SearchService, mock_weaviate_client: MagicMock
@@ -355,6 +393,302 @@ class TestSearchService:
         assert len(repo_calls) == 10
         assert all(len(call.args[0]) <= 100 for call in repo_calls)
 
+    @pytest.mark.asyncio
+    async def test_page_vector_search_pushes_down_evaluable_filters(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """日付とキーワードを Weaviate に渡し、URL・除外は SQLite で判定する."""
+        candidate = MagicMock()
+        candidate.properties = {"pageId": 1}
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[candidate])
+        filters = {
+            "url": "docs",
+            "keywords": ["python"],
+            "date_from": "2023-01-01T00:00:00",
+        }
+
+        with patch("grimoire_api.services.search_service.Filter") as mock_filter:
+            date_filter = mock_filter.by_property.return_value.greater_or_equal
+            keyword_filter = mock_filter.by_property.return_value.contains_any
+            await search_service.vector_search(
+                "query",
+                filters=filters,
+                vector_name="title_vector",
+                exclude_keywords=["legacy"],
+            )
+
+        mock_filter.by_property.assert_any_call("createdAt")
+        assert date_filter.call_args.args[0] == datetime(2023, 1, 1, tzinfo=UTC)
+        keyword_filter.assert_called_once_with(["python"])
+        mock_filter.by_property.return_value.like.assert_not_called()
+        weaviate_filter = collection.query.near_text.call_args.kwargs["filters"]
+        assert weaviate_filter is mock_filter.all_of.return_value
+        repo_call = search_service.page_repo.get_searchable_pages_by_ids.call_args
+        assert repo_call.args[1:] == (
+            {"url": "docs", "keywords": ["python"]},
+            ["legacy"],
+        )
+
+    @pytest.mark.asyncio
+    async def test_selective_chunk_filter_is_pushed_down_as_chunk_ids(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """条件に合うページが少なければ、そのチャンクで Weaviate に絞り込ませる."""
+        page_repo: Any = search_service.page_repo
+        page_repo.estimate_search_selectivity.return_value = (2, 10_000)
+        page_repo.get_searchable_chunk_targets.return_value = (["h1", "h2"], [4])
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[])
+        filters = {"url": "docs"}
+
+        with patch("grimoire_api.services.search_service.Filter") as mock_filter:
+            await search_service.vector_search("query", filters=filters)
+
+        page_repo.get_searchable_chunk_targets.assert_awaited_once_with(
+            filters, None, settings.SEARCH_PUSHDOWN_MAX_CHUNKS
+        )
+        mock_filter.by_property.assert_any_call("chunkHash")
+        mock_filter.by_property.assert_any_call("pageId")
+        contains_any = mock_filter.by_property.return_value.contains_any
+        assert [call.args[0] for call in contains_any.call_args_list] == [
+            ["h1", "h2"],
+            [4],
+        ]
+        weaviate_filter = collection.query.near_text.call_args.kwargs["filters"]
+        assert weaviate_filter is mock_filter.any_of.return_value
+
+    @pytest.mark.asyncio
+    async def test_chunk_filter_falls_back_to_post_filter_when_too_many_chunks(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """絞り込むチャンクが上限を超えれば取得後に SQLite で判定する."""
+        page_repo: Any = search_service.page_repo
+        page_repo.estimate_search_selectivity.return_value = (2, 10_000)
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[])
+
+        await search_service.vector_search("query", filters={"url": "docs"})
+
+        page_repo.get_searchable_chunk_targets.assert_awaited_once()
+        assert collection.query.near_text.call_args.kwargs["filters"] is None
+
+    @pytest.mark.asyncio
+    async def test_chunk_search_skips_weaviate_when_no_page_matches(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """条件に合うページがなければ Weaviate に問い合わせない."""
+        page_repo: Any = search_service.page_repo
+        page_repo.estimate_search_selectivity.return_value = (0, 10)
+        collection = mock_weaviate_client.collections.get.return_value
+
+        results = await search_service.vector_search(
+            "query", exclude_keywords=["python"]
+        )
+
+        assert results == []
+        collection.query.near_text.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_chunk_attributes_filter_in_single_exact_query(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """チャンクの属性が最新なら、検索可否と条件を付けて limit 件だけ取得する."""
+        page_repo: Any = search_service.page_repo
+        page_repo.has_pending_chunk_attribute_sync.return_value = False
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[])
+
+        with patch("grimoire_api.services.search_service.Filter") as mock_filter:
+            await search_service.vector_search(
+                "query", limit=7, filters={"keywords": ["python"]}
+            )
+
+        mock_filter.by_property.assert_any_call("searchable")
+        mock_filter.by_property.return_value.equal.assert_any_call(True)
+        mock_filter.by_property.return_value.contains_any.assert_any_call(["python"])
+        page_repo.estimate_search_selectivity.assert_not_awaited()
+        near_text = collection.query.near_text.call_args.kwargs
+        assert near_text["limit"] == 7
+        assert near_text["filters"] is mock_filter.all_of.return_value
+
+    @pytest.mark.asyncio
+    async def test_chunk_attributes_still_estimate_url_filters(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """URL の条件はチャンクの属性で判定できないため、割合を見積もる."""
+        page_repo: Any = search_service.page_repo
+        page_repo.has_pending_chunk_attribute_sync.return_value = False
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[])
+
+        await search_service.vector_search("query", filters={"url": "docs"})
+
+        page_repo.estimate_search_selectivity.assert_awaited_once_with(
+            {"url": "docs"}, None
+        )
+        assert collection.query.near_text.call_args.kwargs["filters"] is not None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("vector_name", ["content_vector", "title_vector"])
+    async def test_cached_query_embedding_is_sent_as_near_vector(
+        self,
+        search_service: SearchService,
+        mock_weaviate_client: MagicMock,
+        vector_name: str,
+    ) -> None:
+        """クエリの埋め込みがあれば near_text ではなく near_vector で検索する."""
+        embedder = MagicMock()
+        embedder.embed = AsyncMock(return_value=[0.1, 0.2])
+        search_service.query_embedder = embedder
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_vector.return_value = MagicMock(objects=[])
+
+        await search_service.vector_search("query", vector_name=vector_name)
+
+        embedder.embed.assert_awaited_once_with("query")
+        collection.query.near_text.assert_not_called()
+        near_vector = collection.query.near_vector.call_args.kwargs
+        assert near_vector["near_vector"] == [0.1, 0.2]
+        assert near_vector["target_vector"] == vector_name
+
+    @pytest.mark.asyncio
+    async def test_query_embedding_failure_falls_back_to_near_text(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """埋め込みを作れなければ Weaviate の near_text に任せる."""
+        embedder = MagicMock()
+        embedder.embed = AsyncMock(side_effect=RuntimeError("rate limited"))
+        search_service.query_embedder = embedder
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[])
+
+        await search_service.vector_search("query")
+
+        assert collection.query.near_text.call_args.kwargs["query"] == "query"
+        collection.query.near_vector.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_result_cache_reuses_results_until_index_generation_changes(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """同じ条件の検索は、索引の世代が進むまで Weaviate に問い合わせない."""
+        page_repo: Any = search_service.page_repo
+        page_repo.get_index_generation = AsyncMock(return_value=1)
+        search_service.result_cache = SearchResultCache(max_entries=8, ttl=60)
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.return_value = MagicMock(objects=[])
+        filters = {"keywords": ["python"]}
+
+        await search_service.vector_search("query", filters=filters)
+        await search_service.vector_search("query", filters=filters)
+        assert collection.query.near_text.call_count == 1
+
+        await search_service.vector_search("query", limit=6, filters=filters)
+        assert collection.query.near_text.call_count == 2
+
+        page_repo.get_index_generation.return_value = 2
+        await search_service.vector_search("query", filters=filters)
+        assert collection.query.near_text.call_count == 3
+
+    @staticmethod
+    def hit(page_id: int, certainty: float, chunk_id: int = 0) -> MagicMock:
+        obj = MagicMock()
+        obj.metadata.certainty = certainty
+        obj.properties = {
+            "pageId": page_id,
+            "chunkId": chunk_id,
+            "content": f"chunk {chunk_id} of page {page_id}",
+        }
+        return obj
+
+    def setup_hybrid_hits(self, mock_weaviate_client: MagicMock) -> MagicMock:
+        hits = {
+            "title_vector": [self.hit(2, 0.9), self.hit(1, 0.3)],
+            "memo_vector": [],
+            "content_vector": [
+                self.hit(1, 0.95, chunk_id=3),
+                self.hit(1, 0.7, chunk_id=1),
+                self.hit(3, 0.6),
+            ],
+        }
+        # 3つの検索が同時に走らなければ待ち合わせがタイムアウトする
+        barrier = threading.Barrier(3, timeout=1)
+
+        def near_text(**kwargs: Any) -> MagicMock:
+            if kwargs["offset"] == 0:
+                barrier.wait()
+            return MagicMock(
+                objects=hits[kwargs["target_vector"]] if kwargs["offset"] == 0 else []
+            )
+
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_text.side_effect = near_text
+        return collection
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_fuses_vectors_by_reciprocal_rank(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """各ベクトルを並行して検索し、ページごとに最も近いチャンクを返す."""
+        self.setup_hybrid_hits(mock_weaviate_client)
+
+        results = await search_service.hybrid_search("query", limit=2)
+
+        assert [result.page_id for result in results] == [1, 2]
+        assert results[0].chunk_id == 3
+        assert results[0].content == "chunk 3 of page 1"
+        assert results[0].score == pytest.approx(1 / 61 + 1 / 62)
+        assert results[1].content == ""
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_fuses_weighted_scores(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """weighted では certainty をベクトルごとの重みで足し合わせる."""
+        self.setup_hybrid_hits(mock_weaviate_client)
+
+        results = await search_service.hybrid_search(
+            "query", fusion="weighted", weights={"title_vector": 3.0}
+        )
+
+        assert [result.page_id for result in results] == [2, 1, 3]
+        assert [result.score for result in results] == pytest.approx([2.7, 1.85, 0.6])
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_embeds_query_once(
+        self, search_service: SearchService, mock_weaviate_client: MagicMock
+    ) -> None:
+        """クエリの埋め込みは1回だけ作り、全ベクトルの検索で使う."""
+        embedder = MagicMock()
+        embedder.embed = AsyncMock(return_value=[0.1, 0.2])
+        search_service.query_embedder = embedder
+        collection = mock_weaviate_client.collections.get.return_value
+        collection.query.near_vector.return_value = MagicMock(objects=[])
+
+        await search_service.hybrid_search(
+            "query", vector_names=["title_vector", "content_vector"]
+        )
+
+        embedder.embed.assert_awaited_once_with("query")
+        assert sorted(
+            call.kwargs["target_vector"]
+            for call in collection.query.near_vector.call_args_list
+        ) == ["content_vector", "title_vector"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("vector_names", "fusion"),
+        [([], "rrf"), (["unknown_vector"], "rrf"), (["title_vector"], "max")],
+    )
+    async def test_hybrid_search_rejects_invalid_options(
+        self, search_service: SearchService, vector_names: list[str], fusion: str
+    ) -> None:
+        with pytest.raises(VectorizerError):
+            await search_service.hybrid_search(
+                "query", vector_names=vector_names, fusion=fusion
+            )
+
     def test_build_weaviate_filter_url(self, search_service: SearchService) -> None:
         """URLフィルター構築テスト."""
         filters = {"url": "example"}
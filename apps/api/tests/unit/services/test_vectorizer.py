@@ -1,14 +1,29 @@
 """Test vectorizer service."""
 
-from datetime import datetime
+import asyncio
+from datetime import UTC, datetime
+from functools import partial
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from grimoire_api.config import settings
-from grimoire_api.models.database import Page, ProcessingStep
-from grimoire_api.services.vectorizer import VectorizerService
+from grimoire_api.models.database import Page, PageStatus, ProcessingStep
+from grimoire_api.repositories.file_repository import FileRepository
+from grimoire_api.repositories.page_repository import ChunkReplacement
+from grimoire_api.services.vectorizer import (
+    VectorizerService,
+    chunk_hash,
+    chunk_uuid,
+)
 from grimoire_api.utils.exceptions import VectorizerError
+from weaviate.classes.config import ConsistencyLevel
+from weaviate.exceptions import UnexpectedStatusCodeError
+
+
+def _raise(error: Exception) -> None:
+    raise error
 
 
 class TestVectorizerService:
@@ -19,6 +34,8 @@ class TestVectorizerService:
         """依存関係のモック."""
         mock_collection = MagicMock()
         mock_page_collection = MagicMock()
+        mock_collection.with_consistency_level.return_value = mock_collection
+        mock_page_collection.with_consistency_level.return_value = mock_page_collection
         # delete_many のデフォルトは削除対象なし (matches=0, failed=0) とする
         mock_delete_result = MagicMock()
         mock_delete_result.matches = 0
@@ -36,6 +53,50 @@ class TestVectorizerService:
         mock_collection.batch.failed_objects = []
         mock_page_collection.batch.failed_objects = []
 
+        # 登録した本文チャンクを UUID で取得できるようにする
+        stored_chunks: dict[str, dict[str, Any]] = {}
+        stored_vectors: dict[str, Any] = {}
+
+        def add_chunk(
+            properties: dict[str, Any], uuid: Any, vector: Any = None
+        ) -> None:
+            stored_chunks[str(uuid)] = properties
+            stored_vectors[str(uuid)] = vector or {"content_vector": [0.1]}
+
+        def fetch_chunks(filters: Any = None, **_: Any) -> Any:
+            ids = filters.value if getattr(filters, "target", None) == "_id" else []
+            response = MagicMock()
+            response.objects = [
+                MagicMock(
+                    uuid=chunk_id,
+                    properties=stored_chunks[chunk_id],
+                    vector=stored_vectors[chunk_id],
+                )
+                for chunk_id in ids
+                if chunk_id in stored_chunks
+            ]
+            return response
+
+        mock_chunk_batch.add_object.side_effect = add_chunk
+        mock_collection.query.fetch_objects.side_effect = fetch_chunks
+
+        # ページ代表も UUID で取得・部分更新できるようにする
+        stored_pages: dict[str, dict[str, Any]] = {}
+
+        def add_page(properties: dict[str, Any], uuid: Any) -> None:
+            stored_pages[str(uuid)] = dict(properties)
+
+        def fetch_page(uuid: Any) -> Any:
+            properties = stored_pages.get(str(uuid))
+            return None if properties is None else MagicMock(properties=properties)
+
+        def update_page(uuid: Any, properties: dict[str, Any]) -> None:
+            stored_pages[str(uuid)].update(properties)
+
+        mock_page_batch.add_object.side_effect = add_page
+        mock_page_collection.query.fetch_object_by_id.side_effect = fetch_page
+        mock_page_collection.data.update.side_effect = update_page
+
         mock_collections = MagicMock()
         mock_collections.get.side_effect = lambda name: (
             mock_page_collection
@@ -52,10 +113,85 @@ class TestVectorizerService:
         mock_page_repo = MagicMock()
         mock_page_repo.get_page = AsyncMock()
         mock_page_repo.update_weaviate_id_and_step = AsyncMock()
+        mock_page_repo.page_chunks = {}
+        mock_page_repo.tombstones = set()
+
+        def in_use() -> set[str]:
+            return {
+                chunk_hash
+                for hashes in mock_page_repo.page_chunks.values()
+                for chunk_hash in hashes
+            }
+
+        async def replace_page_chunks(
+            page_id: int,
+            chunk_hashes: list[str],
+            released: list[str] | None = None,
+        ) -> ChunkReplacement:
+            previous = mock_page_repo.page_chunks.pop(page_id, [])
+            mock_page_repo.page_chunks[page_id] = chunk_hashes
+            unreferenced = sorted({*previous, *(released or [])} - in_use())
+            mock_page_repo.tombstones.update(unreferenced)
+            mock_page_repo.tombstones.difference_update(chunk_hashes)
+            return ChunkReplacement(unreferenced, [])
+
+        async def claim_chunk_tombstones(
+            owner: str,
+            lease_seconds: float,
+            chunk_hashes: list[str] | None = None,
+            limit: int = 100,
+        ) -> list[str]:
+            targets = mock_page_repo.tombstones - in_use()
+            if chunk_hashes is not None:
+                targets &= set(chunk_hashes)
+            return sorted(targets)[:limit]
+
+        async def release_chunk_tombstones(
+            owner: str, chunk_hashes: list[str], deleted: bool
+        ) -> None:
+            if deleted:
+                mock_page_repo.tombstones.difference_update(chunk_hashes)
+
+        mock_page_repo.replace_page_chunks = AsyncMock(side_effect=replace_page_chunks)
+        mock_page_repo.claim_chunk_tombstones = AsyncMock(
+            side_effect=claim_chunk_tombstones
+        )
+        mock_page_repo.release_chunk_tombstones = AsyncMock(
+            side_effect=release_chunk_tombstones
+        )
+        mock_page_repo.get_claimed_chunk_tombstones = AsyncMock(return_value=[])
+        mock_page_repo.add_chunk_tombstones = AsyncMock(
+            side_effect=lambda chunk_hashes: mock_page_repo.tombstones.update(
+                set(chunk_hashes) - in_use()
+            )
+        )
+        mock_page_repo.legacy_pages = set()
+        mock_page_repo.get_legacy_chunk_pages = AsyncMock(
+            side_effect=lambda page_ids: sorted(
+                mock_page_repo.legacy_pages.intersection(page_ids)
+            )
+        )
+        mock_page_repo.clear_legacy_chunk_page = AsyncMock(
+            side_effect=mock_page_repo.legacy_pages.discard
+        )
+        mock_page_repo.get_unshared_chunk_hashes = AsyncMock(return_value=[])
+        mock_page_repo.get_searchable_chunk_owner_pages = AsyncMock(return_value={})
+        mock_page_repo.get_pages_sharing_chunks = AsyncMock(return_value=[])
+        mock_page_repo.enqueue_chunk_attribute_sync = AsyncMock()
+        mock_page_repo.bump_index_generation = AsyncMock()
+        mock_page_repo.get_page_chunk_hashes = AsyncMock(
+            side_effect=lambda page_id: list(
+                mock_page_repo.page_chunks.get(page_id, [])
+            )
+        )
 
         # FileRepositoryのモック
         mock_file_repo = MagicMock()
         mock_file_repo.load_json_file = AsyncMock()
+        mock_file_repo.document_cache = None
+        mock_file_repo.load_document = partial(
+            FileRepository.load_document, mock_file_repo
+        )
 
         return {
             "page_repo": mock_page_repo,
@@ -66,6 +202,8 @@ class TestVectorizerService:
             "mock_page_collection": mock_page_collection,
             "mock_chunk_batch": mock_chunk_batch,
             "mock_page_batch": mock_page_batch,
+            "stored_chunks": stored_chunks,
+            "stored_pages": stored_pages,
         }
 
     @pytest.fixture
@@ -199,6 +337,390 @@ class TestVectorizerService:
         with pytest.raises(VectorizerError, match="Failed to remove page"):
             await vectorizer_service.delete_page_from_index(56)
 
+    @pytest.mark.asyncio
+    async def test_delete_page_from_index_removes_unshared_chunks(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """他ページと共有しないチャンクだけを内容ハッシュのIDで削除する."""
+        mock_dependencies["page_repo"].get_unshared_chunk_hashes.return_value = [
+            chunk_hash("only mine")
+        ]
+
+        await vectorizer_service.delete_page_from_index(56)
+
+        delete_calls = mock_dependencies[
+            "mock_collection"
+        ].data.delete_many.call_args_list
+        assert len(delete_calls) == 2
+        id_filter = delete_calls[1].kwargs["where"]
+        assert id_filter.value == [chunk_uuid(chunk_hash("only mine"))]
+
+    def test_chunk_hash_ignores_whitespace_and_unicode_form(self):
+        """空白の違いと Unicode の合成形の違いは同じ内容として扱う."""
+        assert chunk_hash("ガイド  本文\n") == chunk_hash("ガイド 本文")
+        assert chunk_hash("\u30ac") == chunk_hash("\u30ab\u3099")
+        assert chunk_hash("本文A") != chunk_hash("本文B")
+
+    @pytest.mark.asyncio
+    async def test_identical_content_reuses_chunks_across_pages(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """同じ本文のページはチャンクを再登録せず共有する."""
+        first, second = (
+            Page(
+                id=page_id,
+                url=f"https://example.com/?utm_source={page_id}",
+                title="Title",
+                memo=None,
+                summary=None,
+                keywords=None,
+                created_at=datetime(2024, 1, 1),
+                updated_at=datetime(2024, 1, 1),
+                weaviate_id=None,
+            )
+            for page_id in (1, 2)
+        )
+
+        await vectorizer_service._save_page_to_weaviate(first, ["chunk1", "chunk2"])
+        await vectorizer_service._save_page_to_weaviate(second, ["chunk1", "chunk2"])
+
+        assert mock_dependencies["mock_chunk_batch"].add_object.call_count == 2
+        assert mock_dependencies["mock_page_batch"].add_object.call_count == 2
+        page_chunks = mock_dependencies["page_repo"].page_chunks
+        assert page_chunks[1] == page_chunks[2]
+
+    @pytest.mark.asyncio
+    async def test_revectorize_deletes_only_unreferenced_chunks(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """本文が変わったら、他ページが参照しない旧チャンクだけを削除する."""
+        pages = [
+            Page(
+                id=page_id,
+                url=f"https://example.com/{page_id}",
+                title="Title",
+                memo=None,
+                summary=None,
+                keywords=None,
+                created_at=datetime(2024, 1, 1),
+                updated_at=datetime(2024, 1, 1),
+                weaviate_id=None,
+            )
+            for page_id in (1, 2)
+        ]
+        await vectorizer_service._save_page_to_weaviate(pages[0], ["shared", "old"])
+        await vectorizer_service._save_page_to_weaviate(pages[1], ["shared"])
+        delete_many = mock_dependencies["mock_collection"].data.delete_many
+        delete_many.reset_mock()
+
+        await vectorizer_service._save_page_to_weaviate(pages[0], ["new"])
+
+        id_filters = [
+            call.kwargs["where"]
+            for call in delete_many.call_args_list
+            if call.kwargs["where"].target == "_id"
+        ]
+        assert [f.value for f in id_filters] == [[chunk_uuid(chunk_hash("old"))]]
+        assert mock_dependencies["page_repo"].page_chunks[1] == [chunk_hash("new")]
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_delete_is_left_for_sweep(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """参照の記録後の削除に失敗しても保存は成功し、削除待ちを後で消す."""
+        page_repo = mock_dependencies["page_repo"]
+        delete_many = mock_dependencies["mock_collection"].data.delete_many
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["old"])
+        delete_many.side_effect = Exception("weaviate unavailable")
+
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["new"])
+
+        assert page_repo.page_chunks[1] == [chunk_hash("new")]
+        assert page_repo.tombstones == {chunk_hash("old")}
+        page_repo.release_chunk_tombstones.assert_awaited_with(
+            ANY, [chunk_hash("old")], False
+        )
+
+        delete_many.side_effect = None
+        delete_many.reset_mock()
+        assert await vectorizer_service.delete_unreferenced_chunks() == 1
+
+        assert page_repo.tombstones == set()
+        assert delete_many.call_args.kwargs["where"].value == [
+            chunk_uuid(chunk_hash("old"))
+        ]
+
+    @pytest.mark.asyncio
+    async def test_waits_for_claimed_deletion_and_reinserts_chunk(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """他の処理が削除中のチャンクを参照したら、削除の完了後に登録し直す."""
+        page_repo = mock_dependencies["page_repo"]
+        stored_chunks = mock_dependencies["stored_chunks"]
+        shared = chunk_hash("shared")
+        page_repo.replace_page_chunks.side_effect = None
+        page_repo.replace_page_chunks.return_value = ChunkReplacement([], [shared])
+        waits: list[list[str]] = []
+
+        async def finish_deletion(chunk_hashes: list[str]) -> list[str]:
+            # 存在確認の後に削除を claim していた処理が、待っている間に削除を終える
+            waits.append(chunk_hashes)
+            stored_chunks.pop(chunk_uuid(shared), None)
+            return []
+
+        page_repo.get_claimed_chunk_tombstones.side_effect = finish_deletion
+
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["shared"])
+
+        assert waits == [[shared]]
+        assert chunk_uuid(shared) in stored_chunks
+
+    @staticmethod
+    def make_page(
+        memo: str | None = None, summary: str = "Summary", page_id: int = 1
+    ) -> Page:
+        return Page(
+            id=page_id,
+            url="https://example.com",
+            title="Title",
+            memo=memo,
+            summary=summary,
+            keywords=["kw"],
+            created_at=datetime(2024, 1, 1),
+            updated_at=datetime(2024, 1, 1),
+            weaviate_id=None,
+        )
+
+    @pytest.mark.asyncio
+    async def test_unchanged_reindex_writes_nothing(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """本文・要約・メモが同じならWeaviateへ書き込まない."""
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(), ["chunk1", "chunk2"]
+        )
+        for key in ("mock_chunk_batch", "mock_page_batch"):
+            mock_dependencies[key].add_object.reset_mock()
+        mock_dependencies["mock_collection"].data.delete_many.reset_mock()
+        mock_dependencies["page_repo"].replace_page_chunks.reset_mock()
+
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(), ["chunk1", "chunk2"]
+        )
+
+        mock_dependencies["mock_page_batch"].add_object.assert_not_called()
+        mock_dependencies["mock_chunk_batch"].add_object.assert_not_called()
+        mock_dependencies["mock_page_collection"].data.update.assert_not_called()
+        mock_dependencies["mock_page_collection"].data.delete_many.assert_not_called()
+        mock_dependencies["mock_collection"].data.delete_many.assert_not_called()
+        mock_dependencies["page_repo"].replace_page_chunks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_legacy_chunks_are_deleted_once_for_marked_pages(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """ページIDでの旧形式チャンクの削除は印のあるページで1度だけ送る."""
+        delete_many = mock_dependencies["mock_collection"].data.delete_many
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(page_id=1), ["chunk1"]
+        )
+        delete_many.assert_not_called()
+
+        mock_dependencies["page_repo"].legacy_pages.add(2)
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(page_id=2), ["chunk2"]
+        )
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(page_id=2), ["chunk3"]
+        )
+
+        page_filters = [
+            call.kwargs["where"].value
+            for call in delete_many.call_args_list
+            if call.kwargs["where"].target == "pageId"
+        ]
+        assert page_filters == [2]
+        assert mock_dependencies["page_repo"].legacy_pages == set()
+
+    @pytest.mark.asyncio
+    async def test_memo_change_updates_only_changed_property(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """メモだけが変わった場合はページ代表の memo だけを更新する."""
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["chunk1"])
+        mock_dependencies["mock_chunk_batch"].add_object.reset_mock()
+
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(memo="new memo"), ["chunk1"]
+        )
+
+        mock_dependencies["mock_page_collection"].data.update.assert_called_once()
+        update = mock_dependencies["mock_page_collection"].data.update.call_args
+        assert update.kwargs["properties"] == {"memo": "new memo"}
+        mock_dependencies["mock_chunk_batch"].add_object.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_body_change_inserts_changed_and_deletes_trailing_chunks(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """変わったチャンクだけを登録し、余った末尾のチャンクだけを削除する."""
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(), ["same", "old", "tail"]
+        )
+        mock_dependencies["mock_chunk_batch"].add_object.reset_mock()
+        delete_many = mock_dependencies["mock_collection"].data.delete_many
+        delete_many.reset_mock()
+
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(), ["same", "new"]
+        )
+
+        inserted = [
+            call.kwargs["properties"]["content"]
+            for call in mock_dependencies["mock_chunk_batch"].add_object.call_args_list
+        ]
+        assert inserted == ["new"]
+        deleted = [call.kwargs["where"].value for call in delete_many.call_args_list]
+        assert len(deleted) == 1
+        assert set(deleted[0]) == {
+            chunk_uuid(chunk_hash("old")),
+            chunk_uuid(chunk_hash("tail")),
+        }
+        mock_dependencies["mock_page_collection"].data.update.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_full_mode_replaces_page_and_reembeds_chunks(self, mock_dependencies):
+        """増分モードを無効にすると全オブジェクトを書き直す."""
+        service = VectorizerService(
+            page_repo=mock_dependencies["page_repo"],
+            file_repo=mock_dependencies["file_repo"],
+            chunking_service=mock_dependencies["chunking_service"],
+            weaviate_client=mock_dependencies["weaviate_client"],
+            incremental=False,
+        )
+        await service._save_page_to_weaviate(self.make_page(), ["chunk1"])
+        await service._save_page_to_weaviate(self.make_page(), ["chunk1"])
+
+        assert mock_dependencies["mock_page_batch"].add_object.call_count == 2
+        assert mock_dependencies["mock_chunk_batch"].add_object.call_count == 2
+        # 固定 UUID への登録で置き換えるためページの削除は行わない
+        mock_dependencies["mock_page_collection"].data.delete_many.assert_not_called()
+        mock_dependencies[
+            "mock_page_collection"
+        ].query.fetch_object_by_id.assert_not_called()
+
+    @staticmethod
+    def setup_pages(mock_dependencies: Any, chunks: dict[int, list[str]]) -> None:
+        """ページ ID ごとの本文チャンクを読み込めるようにする."""
+        mock_dependencies["page_repo"].get_page.side_effect = lambda page_id: (
+            TestVectorizerService.make_page(page_id=page_id)
+            if page_id in chunks
+            else None
+        )
+        mock_dependencies["file_repo"].load_json_file.return_value = {
+            "data": {"title": "Title", "content": "Body"}
+        }
+        mock_dependencies["chunking_service"].chunk_document.side_effect = [
+            chunks[page_id] for page_id in chunks
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reindex_pages_streams_chunks_into_one_batch(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """複数ページのチャンクを1つのバッチで登録し、共有チャンクは1回だけ登録する."""
+        self.setup_pages(mock_dependencies, {1: ["a", "b"], 2: ["b", "c"]})
+
+        results = await vectorizer_service.reindex_pages([1, 2])
+
+        assert all(isinstance(result, str) for result in results.values())
+        mock_dependencies["mock_collection"].batch.fixed_size.assert_called_once_with(
+            batch_size=settings.VECTORIZER_BATCH_SIZE,
+            concurrent_requests=settings.VECTORIZER_BATCH_CONCURRENCY,
+        )
+        assert mock_dependencies["mock_chunk_batch"].add_object.call_count == 3
+        assert mock_dependencies["page_repo"].page_chunks == {
+            1: [chunk_hash("a"), chunk_hash("b")],
+            2: [chunk_hash("b"), chunk_hash("c")],
+        }
+        mock_dependencies["page_repo"].update_weaviate_id_and_step.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reindex_pages_fails_only_pages_owning_failed_objects(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """失敗したオブジェクトを参照するページだけを失敗にする."""
+        self.setup_pages(mock_dependencies, {1: ["a", "b"], 2: ["b", "c"], 3: ["d"]})
+        failure = MagicMock()
+        failure.message = "chunk c failed"
+        failure.object_.uuid = chunk_uuid(chunk_hash("c"))
+        mock_dependencies["mock_collection"].batch.failed_objects = [failure]
+
+        results = await vectorizer_service.reindex_pages([1, 2, 3, 4])
+
+        assert isinstance(results[1], str)
+        assert isinstance(results[3], str)
+        assert isinstance(results[2], VectorizerError)
+        assert "chunk c failed" in str(results[2])
+        assert isinstance(results[4], VectorizerError)
+        assert "Page not found: 4" in str(results[4])
+        assert mock_dependencies["page_repo"].page_chunks == {
+            1: [chunk_hash("a"), chunk_hash("b")],
+            2: [],
+            3: [chunk_hash("d")],
+        }
+
+    @pytest.mark.asyncio
+    async def test_vectorize_content_coalesces_concurrent_pages(
+        self, mock_dependencies
+    ):
+        """待ち時間内に届いたページをまとめて一括登録する."""
+        service = VectorizerService(
+            page_repo=mock_dependencies["page_repo"],
+            file_repo=mock_dependencies["file_repo"],
+            chunking_service=mock_dependencies["chunking_service"],
+            weaviate_client=mock_dependencies["weaviate_client"],
+            coalesce_window=0.01,
+        )
+        self.setup_pages(mock_dependencies, {1: ["a"], 2: ["b"], 3: ["c"]})
+
+        results = await asyncio.gather(
+            service.vectorize_content(1),
+            service.vectorize_content(2),
+            service.vectorize_content(3),
+            return_exceptions=True,
+        )
+
+        assert results == [None, None, None]
+        mock_dependencies["mock_collection"].batch.fixed_size.assert_called_once()
+        assert (
+            mock_dependencies["page_repo"].update_weaviate_id_and_step.await_count == 3
+        )
+
+    @pytest.mark.asyncio
+    async def test_coalesced_failure_is_raised_to_its_caller_only(
+        self, mock_dependencies
+    ):
+        """まとめて登録したページの失敗は、そのページの呼び出し元にだけ返す."""
+        service = VectorizerService(
+            page_repo=mock_dependencies["page_repo"],
+            file_repo=mock_dependencies["file_repo"],
+            chunking_service=mock_dependencies["chunking_service"],
+            weaviate_client=mock_dependencies["weaviate_client"],
+            coalesce_window=0.01,
+        )
+        self.setup_pages(mock_dependencies, {1: ["a"]})
+
+        results = await asyncio.gather(
+            service.vectorize_content(1),
+            service.vectorize_content(2),
+            return_exceptions=True,
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], VectorizerError)
+        assert "Vectorization error: Page not found: 2" in str(results[1])
+
     @pytest.mark.asyncio
     async def test_vectorize_content_no_chunks(
         self, vectorizer_service, mock_dependencies
@@ -290,22 +812,29 @@ class TestVectorizerService:
         # Weaviateへの保存が2回呼ばれたことを確認
         assert mock_dependencies["mock_chunk_batch"].add_object.call_count == 2
 
-        # チャンク側にはページ情報を複製しない
         call_args_list = mock_dependencies["mock_chunk_batch"].add_object.call_args_list
 
-        # 最初のチャンク
+        # ページとの対応は SQLite に記録し、チャンクには検索可能なページの属性
+        # だけを複製する (処理中のページは検索対象外)
         first_call = call_args_list[0]
         first_data = first_call[1]["properties"]
-        assert first_data["pageId"] == 1
-        assert first_data["chunkId"] == 0
-        assert first_data["content"] == "chunk1"
-        assert set(first_data) == {"pageId", "chunkId", "content"}
+        assert first_data == {
+            "chunkHash": chunk_hash("chunk1"),
+            "content": "chunk1",
+            "searchable": False,
+            "createdAt": [],
+            "keywords": [],
+        }
+        assert first_call[1]["uuid"] == chunk_uuid(chunk_hash("chunk1"))
 
-        # 2番目のチャンク
         second_call = call_args_list[1]
         second_data = second_call[1]["properties"]
-        assert second_data["chunkId"] == 1
         assert second_data["content"] == "chunk2"
+        mock_dependencies["page_repo"].replace_page_chunks.assert_awaited_once()
+        assert mock_dependencies["page_repo"].page_chunks[1] == [
+            chunk_hash("chunk1"),
+            chunk_hash("chunk2"),
+        ]
 
     @pytest.mark.asyncio
     async def test_delete_existing_chunks_failure(
@@ -339,11 +868,43 @@ class TestVectorizerService:
         mock_collection.query.fetch_objects.assert_not_called()
         mock_sleep.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_delete_existing_chunks_does_not_poll_by_default(
+        self, vectorizer_service, mock_dependencies: Any
+    ) -> None:
+        """既定では削除後に反映を待つ確認を行わないテスト."""
+        mock_collection = MagicMock()
+        mock_result = MagicMock()
+        mock_result.matches = 3
+        mock_result.failed = 0
+        mock_collection.data.delete_many.return_value = mock_result
+
+        with patch(
+            "grimoire_api.services.vectorizer.asyncio.sleep", new_callable=AsyncMock
+        ) as mock_sleep:
+            await vectorizer_service._delete_existing_chunks(mock_collection, 1)
+
+        mock_collection.data.delete_many.assert_called_once()
+        mock_collection.query.fetch_objects.assert_not_called()
+        mock_sleep.assert_not_called()
+
+    def test_write_collections_use_consistency_level_all(
+        self, vectorizer_service, mock_dependencies: Any
+    ) -> None:
+        """書き込みに使うコレクションは全レプリカの確認を待つテスト."""
+        collection = vectorizer_service._collection("GrimoireContentChunk")
+
+        assert collection is mock_dependencies["mock_collection"]
+        mock_dependencies[
+            "mock_collection"
+        ].with_consistency_level.assert_called_once_with(ConsistencyLevel.ALL)
+
     @pytest.mark.asyncio
     async def test_delete_existing_chunks_completes_on_first_check(
         self, vectorizer_service, mock_dependencies: Any
     ) -> None:
         """初回確認で削除完了する場合のテスト (sleep→check 順)."""
+        vectorizer_service.poll_deletions = True
         mock_collection = MagicMock()
         mock_result = MagicMock()
         mock_result.matches = 3
@@ -369,6 +930,7 @@ class TestVectorizerService:
         self, vectorizer_service, mock_dependencies: Any
     ) -> None:
         """数回リトライ後に削除完了する場合のテスト (sleep→check 順)."""
+        vectorizer_service.poll_deletions = True
         mock_collection = MagicMock()
         mock_result = MagicMock()
         mock_result.matches = 2
@@ -400,6 +962,7 @@ class TestVectorizerService:
         self, vectorizer_service, mock_dependencies: Any
     ) -> None:
         """タイムアウト（10回超え）で VectorizerError が発生するテスト."""
+        vectorizer_service.poll_deletions = True
         mock_collection = MagicMock()
         mock_result = MagicMock()
         mock_result.matches = 5
@@ -449,17 +1012,17 @@ class TestVectorizerService:
         ) as mock_to_thread:
             await vectorizer_service._save_chunks_to_weaviate(mock_page, chunks)
 
-        # asyncio.to_thread が _insert_objects_sync で呼ばれたことを確認
-        from grimoire_api.services.vectorizer import _insert_objects_sync
+        # asyncio.to_thread が _batch_insert_sync で呼ばれたことを確認
+        from grimoire_api.services.vectorizer import _batch_insert_sync
 
         insert_calls = [
             call
             for call in mock_to_thread.call_args_list
-            if call[0][0] is _insert_objects_sync and len(call[0][2]) == 2
+            if call[0][0] is _batch_insert_sync and len(call[0][2]) == 2
         ]
         assert len(insert_calls) == 1
 
-        # _insert_objects_sync に渡されたチャンクが正しいことを確認
+        # _batch_insert_sync に渡されたチャンクが正しいことを確認
         _, objects_to_insert = insert_calls[0][0][1], insert_calls[0][0][2]
         assert len(objects_to_insert) == 2
         assert objects_to_insert[0][0]["content"] == "chunk1"
@@ -489,8 +1052,9 @@ class TestVectorizerService:
             await vectorizer_service._save_page_to_weaviate(mock_page, ["chunk1"])
 
         assert (
-            mock_dependencies["mock_page_collection"].data.delete_many.call_count == 2
+            mock_dependencies["mock_page_collection"].data.delete_many.call_count == 1
         )
+        # 清掃時の旧形式チャンクのページID削除と、参照されないチャンクのID削除
         assert mock_dependencies["mock_collection"].data.delete_many.call_count == 2
         mock_dependencies["mock_chunk_batch"].add_object.assert_not_called()
 
@@ -522,8 +1086,9 @@ class TestVectorizerService:
         assert mock_dependencies["mock_page_batch"].add_object.call_count == 1
         assert mock_dependencies["mock_chunk_batch"].add_object.call_count == 2
         assert (
-            mock_dependencies["mock_page_collection"].data.delete_many.call_count == 2
+            mock_dependencies["mock_page_collection"].data.delete_many.call_count == 1
         )
+        # 清掃時の旧形式チャンクのページID削除と、参照されないチャンクのID削除
         assert mock_dependencies["mock_collection"].data.delete_many.call_count == 2
 
     @pytest.mark.asyncio
@@ -575,10 +1140,9 @@ class TestVectorizerService:
         failure = MagicMock()
         failure.message = "batch failed"
         mock_dependencies["mock_page_collection"].batch.failed_objects = [failure]
-        mock_dependencies["mock_page_collection"].data.delete_many.side_effect = [
-            mock_dependencies["mock_collection"].data.delete_many.return_value,
-            Exception("page cleanup unavailable"),
-        ]
+        mock_dependencies[
+            "mock_page_collection"
+        ].data.delete_many.side_effect = Exception("page cleanup unavailable")
 
         with pytest.raises(
             VectorizerError, match="cleanup failed: page: page cleanup unavailable"
@@ -603,6 +1167,7 @@ class TestVectorizerService:
             updated_at=datetime(2024, 1, 1),
             weaviate_id=None,
         )
+        mock_dependencies["page_repo"].legacy_pages.add(1)
 
         mock_dependencies["mock_collection"].data.delete_many.side_effect = Exception(
             "Weaviate delete error"
@@ -636,6 +1201,182 @@ class TestVectorizerService:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_new_chunks_carry_searchable_owner_attributes(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """新しいチャンクには参照する検索可能なページの属性をまとめて持たせる."""
+        page = self.make_page(page_id=1)
+        page.status = PageStatus.SUCCEEDED
+        other = Page(
+            id=7,
+            url="https://Docs.Example.com/other",
+            title="Other",
+            memo=None,
+            summary="",
+            keywords=["other"],
+            created_at=datetime(2023, 5, 1, tzinfo=UTC),
+            updated_at=datetime(2023, 5, 1, tzinfo=UTC),
+            weaviate_id=None,
+            status=PageStatus.SUCCEEDED,
+        )
+        page_repo = mock_dependencies["page_repo"]
+        page_repo.get_searchable_chunk_owner_pages.return_value = {
+            chunk_hash("b"): [other]
+        }
+
+        await vectorizer_service._save_page_to_weaviate(page, ["a", "b"])
+
+        inserted = {
+            call.kwargs["properties"]["content"]: call.kwargs["properties"]
+            for call in mock_dependencies["mock_chunk_batch"].add_object.call_args_list
+        }
+        assert inserted["a"]["searchable"] is True
+        assert inserted["a"]["createdAt"] == ["2024-01-01T00:00:00.000Z"]
+        assert inserted["b"]["keywords"] == ["kw", "other"]
+        page_repo.enqueue_chunk_attribute_sync.assert_awaited_once_with([])
+
+    @pytest.mark.asyncio
+    async def test_reused_chunk_queues_searchable_page_for_attribute_sync(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """検索可能なページが既存チャンクを参照したら属性の書き直しを登録する."""
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(page_id=1), ["shared"]
+        )
+        page = self.make_page(page_id=2)
+        page.status = PageStatus.SUCCEEDED
+        page_repo = mock_dependencies["page_repo"]
+        page_repo.enqueue_chunk_attribute_sync.reset_mock()
+
+        await vectorizer_service._save_page_to_weaviate(page, ["shared"])
+
+        page_repo.enqueue_chunk_attribute_sync.assert_awaited_once_with([2])
+
+    @pytest.mark.asyncio
+    async def test_released_chunks_queue_their_remaining_owners(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """参照を外したチャンクを共有する他のページの属性を書き直す."""
+        page_repo = mock_dependencies["page_repo"]
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(page_id=1), ["old"]
+        )
+        page_repo.get_pages_sharing_chunks.return_value = [5]
+
+        await vectorizer_service._save_page_to_weaviate(
+            self.make_page(page_id=1), ["new"]
+        )
+
+        page_repo.get_pages_sharing_chunks.assert_awaited_once_with(
+            1, [chunk_hash("old")]
+        )
+        page_repo.enqueue_chunk_attribute_sync.assert_awaited_with([5])
+
+    @pytest.mark.asyncio
+    async def test_sync_chunk_attributes_rewrites_shared_and_legacy_chunks(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """共有チャンクは全参照ページ、旧形式のチャンクはそのページの属性で書き直す."""
+        page = self.make_page(page_id=1)
+        page.status = PageStatus.SUCCEEDED
+        page_repo = mock_dependencies["page_repo"]
+        # 処理中に登録したチャンクは検索対象外の属性を持つ
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["a", "same"])
+        page_repo.page_chunks = {
+            1: [chunk_hash("a"), chunk_hash("same"), chunk_hash("gone")]
+        }
+        page_repo.legacy_pages.add(2)
+        page_repo.get_searchable_chunk_owner_pages.return_value = {
+            chunk_hash("a"): [page]
+        }
+        page_repo.get_searchable_pages_by_ids = AsyncMock(return_value={})
+        collection = mock_dependencies["mock_collection"]
+        fetch_chunks = collection.query.fetch_objects.side_effect
+        legacy_objects = [MagicMock(uuid="legacy-uuid"), MagicMock(uuid="lost-uuid")]
+        collection.query.fetch_objects.side_effect = lambda filters, **kwargs: (
+            MagicMock(objects=legacy_objects)
+            if filters.target == "pageId"
+            else fetch_chunks(filters, **kwargs)
+        )
+        missing = UnexpectedStatusCodeError(
+            "Object was not updated.", httpx.Response(404)
+        )
+        collection.data.update.side_effect = lambda uuid, properties: (
+            _raise(missing) if uuid == "lost-uuid" else None
+        )
+        batch = mock_dependencies["mock_chunk_batch"]
+        batch.add_object.reset_mock()
+
+        await vectorizer_service.sync_chunk_attributes([1, 2, 3])
+
+        # 内容ハッシュのチャンクは埋め込みごとバッチで置き換え、属性が同じものと
+        # Weaviate に無いものは書き込まない
+        batch.add_object.assert_called_once()
+        replaced = batch.add_object.call_args.kwargs
+        assert replaced["uuid"] == chunk_uuid(chunk_hash("a"))
+        assert replaced["vector"] == {"content_vector": [0.1]}
+        assert replaced["properties"] == {
+            "chunkHash": chunk_hash("a"),
+            "content": "a",
+            "searchable": True,
+            "createdAt": ["2024-01-01T00:00:00.000Z"],
+            "keywords": ["kw"],
+        }
+        updates = {
+            call.kwargs["uuid"]: call.kwargs["properties"]
+            for call in collection.data.update.call_args_list
+        }
+        assert set(updates) == {"legacy-uuid", "lost-uuid"}
+        assert updates["legacy-uuid"]["searchable"] is False
+        page_repo.get_searchable_pages_by_ids.assert_awaited_once_with([2])
+        page_repo.add_chunk_tombstones.assert_awaited_once_with([chunk_hash("a")])
+
+    @pytest.mark.asyncio
+    async def test_sync_chunk_attributes_requeues_chunk_deleted_meanwhile(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """書き直しの間に参照が外れたチャンクは削除待ちに戻して後で削除する."""
+        page = self.make_page(page_id=1)
+        page.status = PageStatus.SUCCEEDED
+        page_repo = mock_dependencies["page_repo"]
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["a"])
+        page_repo.get_searchable_chunk_owner_pages.return_value = {
+            chunk_hash("a"): [page]
+        }
+        collection = mock_dependencies["mock_collection"]
+        fetch_chunks = collection.query.fetch_objects.side_effect
+
+        def fetch_then_release(*args: Any, **kwargs: Any) -> Any:
+            # 取得の直後に他のページの再索引が参照を外し、削除まで済ませる
+            response = fetch_chunks(*args, **kwargs)
+            page_repo.page_chunks = {}
+            return response
+
+        collection.query.fetch_objects.side_effect = fetch_then_release
+
+        await vectorizer_service.sync_chunk_attributes([1])
+
+        assert page_repo.tombstones == {chunk_hash("a")}
+
+    @pytest.mark.asyncio
+    async def test_save_bumps_index_generation_even_when_it_fails(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """一部だけ書き込んで失敗した場合も検索結果のキャッシュを無効にする."""
+        page_repo = mock_dependencies["page_repo"]
+        await vectorizer_service._save_page_to_weaviate(self.make_page(), ["a"])
+        page_repo.bump_index_generation.assert_awaited_once()
+
+        failure = MagicMock()
+        failure.message = "chunk b failed"
+        failure.object_.uuid = chunk_uuid(chunk_hash("b"))
+        mock_dependencies["mock_collection"].batch.failed_objects = [failure]
+        with pytest.raises(VectorizerError, match="chunk b failed"):
+            await vectorizer_service._save_page_to_weaviate(self.make_page(), ["b"])
+
+        assert page_repo.bump_index_generation.await_count == 2
+
     @pytest.mark.asyncio
     async def test_ensure_schema_create_new(
         self, vectorizer_service, mock_dependencies
@@ -694,3 +1435,25 @@ class TestVectorizerService:
         }
         assert len(vectors_by_name[settings.WEAVIATE_PAGE_COLLECTION_NAME]) == 2
         assert len(vectors_by_name[settings.WEAVIATE_CHUNK_COLLECTION_NAME]) == 1
+
+    @pytest.mark.asyncio
+    async def test_ensure_schema_adds_chunk_hash_to_existing_collection(
+        self, vectorizer_service, mock_dependencies
+    ):
+        """既存の本文チャンクコレクションに無いプロパティだけを追加する."""
+        mock_dependencies["weaviate_client"].collections.exists.return_value = True
+        chunk_collection = mock_dependencies["mock_collection"]
+        existing = []
+        for name in ("pageId", "chunkHash"):
+            prop = MagicMock()
+            prop.name = name
+            existing.append(prop)
+        chunk_collection.config.get.return_value.properties = existing
+
+        await vectorizer_service.ensure_schema()
+
+        added = [
+            call.args[0].name
+            for call in chunk_collection.config.add_property.call_args_list
+        ]
+        assert added == ["searchable", "createdAt", "keywords"]
@@ -37,6 +37,21 @@ def test_api_and_worker_receive_canonical_llm_api_key() -> None:
         assert "GRIMOIRE_KEEPER_LLM_API_KEY:-dummy" not in service_section
 
 
+def test_api_and_worker_keep_cache_files_on_data_volume() -> None:
+    """再生成可能なキャッシュも再起動で消えないよう永続ボリュームに置く."""
+    compose = (PROJECT_ROOT / "docker-compose.prod.yml").read_text()
+    api_section = compose.split("  api:", 1)[1].split("  worker:", 1)[0]
+    worker_section = compose.split("  worker:", 1)[1].split("  weaviate:", 1)[0]
+
+    for service_section in (api_section, worker_section):
+        assert "/opt/grimoire-keeper-data/database:/data" in service_section
+        assert "LLM_CACHE_PATH=/data/llm-cache.db" in service_section
+        assert (
+            "SEARCH_EMBEDDING_CACHE_PATH=/data/query-embedding-cache.db"
+            in service_section
+        )
+
+
 def test_dev_script_maps_canonical_llm_api_key() -> None:
     """開発起動スクリプトも本番Composeと同じLLMキーを渡す."""
     script = (PROJECT_ROOT / "scripts/dev.sh").read_text()
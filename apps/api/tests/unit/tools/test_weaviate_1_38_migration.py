@@ -20,7 +20,10 @@ from tools.weaviate_1_38_migration.check_counts import verify_migration
 from tools.weaviate_1_38_migration.page_repository import MigrationPageRepository
 from tools.weaviate_1_38_migration.preflight import run_preflight
 from tools.weaviate_1_38_migration.rollback_check import run_rollback_check
-from tools.weaviate_1_38_migration.source_validation import classify_stored_source
+from tools.weaviate_1_38_migration.source_validation import (
+    classify_stored_source,
+    prepare_stored_source,
+)
 
 
 def test_migration_compose_allows_sqlite_wal_locking() -> None:
@@ -225,6 +228,30 @@ def test_classify_stored_source_accepts_jina_status_20000(tmp_path: Path) -> Non
     assert classify_stored_source(page, tmp_path) is None
 
 
+def test_prepare_stored_source_returns_chunks_for_valid_page(tmp_path: Path) -> None:
+    """修復不要なページは索引化に使うチャンクも返す."""
+    page = Page(
+        id=1,
+        url="https://example.com/page",
+        title="title",
+        memo=None,
+        summary="summary",
+        keywords=[],
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        weaviate_id="old-id",
+    )
+    (tmp_path / "1.json").write_text(
+        json.dumps({"code": 200, "data": {"title": "title", "content": "body"}}),
+        encoding="utf-8",
+    )
+    chunking_service = MagicMock()
+    chunking_service.chunk_document.return_value = ["body"]
+
+    assert prepare_stored_source(page, tmp_path, chunking_service) == (None, ["body"])
+    assert prepare_stored_source(page, tmp_path / "missing", chunking_service)[1] == []
+
+
 @pytest.mark.asyncio
 async def test_migration_repository_reads_legacy_pages_schema(tmp_path: Path) -> None:
     """status列のない旧DBから完了ページだけを取得する."""
@@ -273,6 +300,8 @@ async def test_migration_repository_reads_legacy_pages_schema(tmp_path: Path) ->
     assert [page.id for page in pages] == [1]
     assert pages[0].status.value == "succeeded"
     assert (await repository.get_page(1)) == pages[0]
+    assert await repository.count_completed_pages(after_id=1) == 0
+    assert await repository.get_completed_pages(limit=10, after_id=1) == []
 
 
 def _write_queries_and_baseline(
@@ -0,0 +1,63 @@
+"""Tests for cross-process job wakeup notifications."""
+
+import asyncio
+import socket
+from pathlib import Path
+
+from grimoire_api.utils.job_wakeup import JobWakeup, notify_job_queued
+
+
+async def test_notification_wakes_listener(tmp_path: Path) -> None:
+    socket_path = str(tmp_path / "wakeup.sock")
+    wakeup = JobWakeup(socket_path)
+    await wakeup.start()
+    try:
+        assert wakeup.is_listening
+
+        notify_job_queued(socket_path)
+
+        await asyncio.wait_for(wakeup.wait(), timeout=1.0)
+    finally:
+        wakeup.close()
+
+    assert not Path(socket_path).exists()
+
+
+async def test_clear_consumes_pending_notification(tmp_path: Path) -> None:
+    wakeup = JobWakeup(str(tmp_path / "wakeup.sock"))
+    wakeup.notify()
+    wakeup.clear()
+
+    waiter = asyncio.create_task(wakeup.wait())
+    await asyncio.sleep(0.01)
+
+    assert not waiter.done()
+    waiter.cancel()
+
+
+async def test_stale_socket_file_is_replaced(tmp_path: Path) -> None:
+    socket_path = tmp_path / "wakeup.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as stale:
+        stale.bind(str(socket_path))
+    wakeup = JobWakeup(str(socket_path))
+
+    await wakeup.start()
+    try:
+        notify_job_queued(str(socket_path))
+        await asyncio.wait_for(wakeup.wait(), timeout=1.0)
+    finally:
+        wakeup.close()
+
+
+async def test_disabled_listener_does_not_bind(tmp_path: Path) -> None:
+    wakeup = JobWakeup("")
+
+    await wakeup.start()
+
+    assert not wakeup.is_listening
+    wakeup.close()
+
+
+def test_notify_without_listener_is_ignored(tmp_path: Path) -> None:
+    notify_job_queued(str(tmp_path / "missing.sock"))
+    notify_job_queued("")
@@ -0,0 +1,50 @@
+"""Tests for incremental JSON object detection."""
+
+import json
+
+import pytest
+from grimoire_api.utils.json_stream import JsonObjectScanner
+
+
+def feed_all(parts: list[str]) -> int | None:
+    scanner = JsonObjectScanner()
+    for part in parts:
+        end = scanner.feed(part)
+        if end is not None:
+            return end
+    return None
+
+
+def test_detects_end_of_object_across_chunks() -> None:
+    text = '{"summary": "a {b} [c]", "keywords": ["x", "y"]} trailing'
+    parts = [text[index : index + 3] for index in range(0, len(text), 3)]
+
+    end = feed_all(parts)
+
+    assert end is not None
+    assert json.loads(text[:end])["keywords"] == ["x", "y"]
+
+
+def test_escaped_quotes_do_not_end_strings() -> None:
+    text = '  {"summary": "say \\"}\\" now"}'
+
+    end = feed_all(list(text))
+
+    assert end == len(text)
+
+
+def test_incomplete_object_returns_none() -> None:
+    assert feed_all(['{"summary": ', '"partial']) is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Here is the JSON: {}",
+        '{"keywords": ["a"}',
+        '{"summary": "line\nbreak"}',
+    ],
+)
+def test_malformed_output_is_rejected_early(text: str) -> None:
+    with pytest.raises(ValueError):
+        feed_all([text])
@@ -0,0 +1,85 @@
+"""Tests for memoized token counting."""
+
+import pytest
+from grimoire_api.utils.token_count import BOUNDARY_TOKENS, TokenCounter
+
+
+class RecordingTokenizer:
+    """UTF-8 バイト数をトークン数とし、呼び出しを記録する."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def __call__(self, text: str) -> int:
+        self.calls.append(text)
+        return len(text.encode("utf-8"))
+
+
+def test_count_is_memoized_by_content() -> None:
+    tokenizer = RecordingTokenizer()
+    counter = TokenCounter(tokenizer)
+
+    assert counter.count("hello") == 5
+    assert counter.count("hel" + "lo") == 5
+
+    assert tokenizer.calls == ["hello"]
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    tokenizer = RecordingTokenizer()
+    counter = TokenCounter(tokenizer, max_entries=2)
+    counter.count("a")
+    counter.count("b")
+    counter.count("a")
+
+    counter.count("c")
+    counter.count("a")
+    counter.count("b")
+
+    assert tokenizer.calls == ["a", "b", "c", "b"]
+
+
+def test_total_adds_boundary_margin_per_piece() -> None:
+    counter = TokenCounter(RecordingTokenizer())
+
+    assert counter.total(["abc", "de"]) == 5 + 2 * BOUNDARY_TOKENS
+
+
+def test_split_keeps_order_and_budget() -> None:
+    tokenizer = RecordingTokenizer()
+    counter = TokenCounter(tokenizer)
+    text = "\n".join(f"line {index:03d}" for index in range(300))
+
+    pieces = counter.split(text, 100)
+
+    assert "".join(pieces) == text
+    assert len(pieces) > 1
+    assert all(counter.total([piece]) <= 100 for piece in pieces)
+    # 各セグメントは一度だけ数え、本文全体を繰り返し数え直さない
+    assert sum(len(call) for call in tokenizer.calls) <= len(text)
+
+
+def test_split_prefers_line_breaks() -> None:
+    counter = TokenCounter(RecordingTokenizer())
+    text = "first line\nsecond line\nthird line"
+
+    pieces = counter.split(text, 16)
+
+    assert pieces == ["first line\n", "second line\n", "third line"]
+
+
+def test_split_handles_multibyte_text() -> None:
+    counter = TokenCounter(RecordingTokenizer())
+    text = "日本語の文章です" * 20
+
+    pieces = counter.split(text, 10)
+
+    assert "".join(pieces) == text
+    assert all(counter.total([piece]) <= 10 for piece in pieces)
+
+
+def test_split_rejects_budget_smaller_than_one_character() -> None:
+    counter = TokenCounter(RecordingTokenizer())
+
+    with pytest.raises(ValueError, match="single character"):
+        counter.split("日本", 3)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Rebuild or verify the index of saved Jina response files."""
+
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "apps" / "api" / "src"))
+
+from grimoire_api.repositories.file_repository import FileRepository  # noqa: E402
+from grimoire_api.utils.exceptions import FileOperationError  # noqa: E402
+
+
+def rebuild(storage_path: str | None) -> int:
+    """全ファイルを走査してハッシュ付きの索引を作り直す."""
+    file_repo = FileRepository(storage_path)
+    try:
+        count = file_repo.rebuild_manifest_sync()
+    except FileOperationError as e:
+        print(f"ERROR: {e}")
+        return 1
+    print(f"索引を再構築しました: {count} ファイル")
+    return 0
+
+
+def verify(storage_path: str | None, check_hash: bool) -> int:
+    """索引と実ファイルを突き合わせ、不一致を表示する."""
+    file_repo = FileRepository(storage_path)
+    problems = 0
+    for page_id, reason in file_repo.verify_manifest_sync(check_hash=check_hash):
+        problems += 1
+        print(f"  {reason.upper()} page_id={page_id}")
+    print(f"完了: problems={problems}")
+    return 1 if problems else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="保存済みJina応答の索引を管理する")
+    parser.add_argument("--storage-path", help="既定: JSON_STORAGE_PATH")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="全ファイルを走査して索引を作り直す")
+    verify_parser = commands.add_parser("verify", help="索引と実ファイルを突き合わせる")
+    verify_parser.add_argument(
+        "--hash", action="store_true", help="内容の SHA-256 も照合する"
+    )
+    args = parser.parse_args()
+    if args.command == "rebuild":
+        raise SystemExit(rebuild(args.storage_path))
+    raise SystemExit(verify(args.storage_path, args.hash))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Rewrite saved Jina responses into the configured storage format and layout."""
+
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "apps" / "api" / "src"))
+
+from grimoire_api.config import settings  # noqa: E402
+from grimoire_api.repositories.file_repository import FileRepository  # noqa: E402
+from grimoire_api.repositories.storage_format import (  # noqa: E402
+    STORAGE_FORMATS,
+    iter_stored_files,
+)
+from grimoire_api.utils.exceptions import FileOperationError  # noqa: E402
+
+
+def migrate(
+    storage_format: str, max_pages: int | None, dry_run: bool, storage_path: str | None
+) -> int:
+    """保存済みファイルを1件ずつ指定形式・シャード配置へ書き換える.
+
+    1件ごとに一時ファイルへ書いてからリネームし、その後に旧ファイルを削除する。
+    API・worker はどの形式・配置も読めるため、稼働中に実行しても読み込みは失敗しない。
+    """
+    file_repo = FileRepository(storage_path, storage_format=storage_format)
+    target = file_repo.storage_format
+    pending = sorted(
+        (page_id, path)
+        for page_id, path in iter_stored_files(file_repo.storage_path)
+        if path != file_repo.target_path(page_id)
+    )
+    if max_pages is not None:
+        pending = pending[:max_pages]
+    print(f"移行対象: {len(pending)} ファイル → {target.name}")
+    if dry_run:
+        for _, path in pending:
+            print(f"  {path.relative_to(file_repo.storage_path)}")
+        print("ドライランのためファイルは変更していません。")
+        return 0
+
+    converted = 0
+    failed = 0
+    before_bytes = 0
+    after_bytes = 0
+    for index, (page_id, _) in enumerate(pending, 1):
+        try:
+            sizes = file_repo.convert_file_sync(page_id)
+        except FileOperationError as e:
+            failed += 1
+            print(f"[{index}/{len(pending)}] page_id={page_id} ERROR: {e}")
+            continue
+        if sizes is None:
+            continue
+        converted += 1
+        before_bytes += sizes[0]
+        after_bytes += sizes[1]
+    print(
+        f"完了: converted={converted}, failed={failed}, "
+        f"bytes={before_bytes} → {after_bytes}"
+    )
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="保存済みJina応答を指定の保存形式へ移行する"
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(STORAGE_FORMATS),
+        default=settings.JSON_STORAGE_FORMAT,
+        help="移行先の保存形式 (既定: JSON_STORAGE_FORMAT)",
+    )
+    parser.add_argument("--max-pages", type=_positive_int)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--storage-path", help="既定: JSON_STORAGE_PATH")
+    args = parser.parse_args()
+    raise SystemExit(
+        migrate(args.format, args.max_pages, args.dry_run, args.storage_path)
+    )
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("1以上の整数を指定してください")
+    return parsed
+
+
+if __name__ == "__main__":
+    main()
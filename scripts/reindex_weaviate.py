@@ -3,14 +3,22 @@
 
 import argparse
 import asyncio
+import json
+import os
 import sys
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "apps" / "api" / "src"))
 
 import weaviate  # noqa: E402
 from grimoire_api.config import settings  # noqa: E402
+from grimoire_api.models.database import Page  # noqa: E402
 from grimoire_api.repositories.database import DatabaseConnection  # noqa: E402
 from grimoire_api.repositories.file_repository import FileRepository  # noqa: E402
 from grimoire_api.services.chunking_service import ChunkingService  # noqa: E402
@@ -20,88 +28,394 @@ from tools.weaviate_1_38_migration.page_repository import (  # noqa: E402
     MigrationPageRepository,
 )
 from tools.weaviate_1_38_migration.source_validation import (  # noqa: E402
-    classify_stored_source,
+    RepairPendingPage,
+    prepare_stored_source,
     write_repair_report,
 )
 
 
+@dataclass
+class PreparedPage:
+    """読み込み・検証・チャンク分割を終えた1ページ."""
+
+    page: Page
+    pending: RepairPendingPage | None
+    chunks: list[str]
+
+
+@dataclass
+class ReindexBatch:
+    """SQLite から読み出した1回分のページ.
+
+    seq は通常のバッチの連番で、前回失敗したページの再試行では None。
+    """
+
+    pages: list[Page]
+    seq: int | None
+    prepared: list[PreparedPage] = field(default_factory=list)
+
+
+class Checkpoint:
+    """再索引を再開するための進捗ファイル.
+
+    last_page_id 以下のページは処理済みで、そのうち失敗したページを
+    failed_page_ids に残す。再開時は失敗したページを再試行してから
+    last_page_id の次から続ける。バッチは並行して終わるため、先行する
+    バッチがすべて終わった位置までしか last_page_id を進めない。
+    """
+
+    def __init__(self, path: Path | None):
+        """初期化.
+
+        Args:
+            path: 進捗ファイル. None なら保存しない
+        """
+        self.path = path
+        self.last_page_id = 0
+        self.failed_page_ids: set[int] = set()
+        self._next_seq = 0
+        self._finished: dict[int, int] = {}
+
+    @classmethod
+    def load(cls, path: Path | None) -> "Checkpoint":
+        """進捗ファイルがあれば読み込む."""
+        checkpoint = cls(path)
+        if path is not None and path.exists():
+            document = json.loads(path.read_text(encoding="utf-8"))
+            checkpoint.last_page_id = int(document["last_page_id"])
+            checkpoint.failed_page_ids = {
+                int(page_id) for page_id in document["failed_page_ids"]
+            }
+        return checkpoint
+
+    def commit(self, batch: ReindexBatch, failed: set[int]) -> None:
+        """バッチの結果を記録し、進捗ファイルを書き換える."""
+        page_ids = {page.id for page in batch.pages if page.id is not None}
+        if batch.seq is None:
+            self.failed_page_ids -= page_ids
+        else:
+            self._finished[batch.seq] = max(page_ids, default=self.last_page_id)
+            while self._next_seq in self._finished:
+                self.last_page_id = max(
+                    self.last_page_id, self._finished.pop(self._next_seq)
+                )
+                self._next_seq += 1
+        self.failed_page_ids |= failed
+        self.save()
+
+    def save(self) -> None:
+        """一時ファイルに書いてから置き換える."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f"{self.path.name}.tmp")
+        temp.write_text(
+            json.dumps(
+                {
+                    "last_page_id": self.last_page_id,
+                    "failed_page_ids": sorted(self.failed_page_ids),
+                }
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        os.replace(temp, self.path)
+
+    def clear(self) -> None:
+        """全ページの再索引が成功したら進捗ファイルを削除する."""
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+class Progress:
+    """処理済み件数・処理速度・残り時間を表示する."""
+
+    def __init__(self, total: int):
+        """初期化."""
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+
+    def advance(self, count: int) -> str:
+        """処理済み件数を進め、進捗の1行を返す."""
+        self.done += count
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        eta = _format_duration(remaining / rate) if rate > 0 else "--:--"
+        percent = self.done / self.total * 100 if self.total else 100.0
+        return (
+            f"[{self.done}/{self.total} {percent:.1f}%] {rate:.1f} pages/s, ETA {eta}"
+        )
+
+
+_chunking_service: ChunkingService | None = None
+
+
+def _init_preparer() -> None:
+    """プロセスごとにチャンク分割サービスを1回だけ作る."""
+    global _chunking_service
+    _chunking_service = ChunkingService()
+
+
+def _prepare(page: Page, json_root: Path) -> PreparedPage:
+    """保存済み JSON の読み込み・検証・チャンク分割 (プロセスプールで実行する)."""
+    if _chunking_service is None:
+        _init_preparer()
+    pending, chunks = prepare_stored_source(page, json_root, _chunking_service)
+    return PreparedPage(page, pending, chunks)
+
+
+async def _produce(
+    page_repo: MigrationPageRepository,
+    checkpoint: Checkpoint,
+    max_pages: int | None,
+    batch_pages: int,
+    queue: asyncio.Queue[ReindexBatch | None],
+) -> None:
+    """前回失敗したページ、続いて未処理の成功済みページを ID 順に読み出す."""
+    retry = sorted(checkpoint.failed_page_ids)
+    for start in range(0, len(retry), batch_pages):
+        pages = []
+        for page_id in retry[start : start + batch_pages]:
+            page = await page_repo.get_page(page_id)
+            if page is None:
+                # 削除済みのページは再試行しない
+                checkpoint.failed_page_ids.discard(page_id)
+            else:
+                pages.append(page)
+        await queue.put(ReindexBatch(pages, None))
+
+    after_id = checkpoint.last_page_id
+    remaining = max_pages
+    seq = 0
+    while remaining is None or remaining > 0:
+        limit = batch_pages if remaining is None else min(batch_pages, remaining)
+        pages = await page_repo.get_completed_pages(limit=limit, after_id=after_id)
+        if not pages:
+            break
+        await queue.put(ReindexBatch(pages, seq))
+        seq += 1
+        after_id = max(page.id or 0 for page in pages)
+        if remaining is not None:
+            remaining -= len(pages)
+    await queue.put(None)
+
+
+async def prepared_batches(
+    page_repo: MigrationPageRepository,
+    checkpoint: Checkpoint,
+    json_root: Path,
+    *,
+    max_pages: int | None,
+    batch_pages: int,
+    workers: int,
+) -> AsyncIterator[ReindexBatch]:
+    """SQLite から読み出したページを、プロセスプールで準備して順に返す.
+
+    読み出しは2バッチ先まで進め、workers が 0 ならこのプロセスで準備する。
+    """
+    queue: asyncio.Queue[ReindexBatch | None] = asyncio.Queue(maxsize=2)
+    producer = asyncio.create_task(
+        _produce(page_repo, checkpoint, max_pages, batch_pages, queue)
+    )
+    executor = (
+        ProcessPoolExecutor(max_workers=workers, initializer=_init_preparer)
+        if workers > 0
+        else None
+    )
+    loop = asyncio.get_running_loop()
+    try:
+        while (batch := await queue.get()) is not None:
+            if executor is None:
+                batch.prepared = [_prepare(page, json_root) for page in batch.pages]
+            else:
+                batch.prepared = list(
+                    await asyncio.gather(
+                        *(
+                            loop.run_in_executor(executor, _prepare, page, json_root)
+                            for page in batch.pages
+                        )
+                    )
+                )
+            yield batch
+        await producer
+    finally:
+        producer.cancel()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+async def _index_batch(
+    batch: ReindexBatch,
+    vectorizer: VectorizerService,
+    page_repo: MigrationPageRepository,
+) -> tuple[int, set[int]]:
+    """1バッチを Weaviate へ登録し、成功件数と失敗したページ ID を返す."""
+    failed: set[int] = set()
+    targets: list[tuple[Page, list[str]]] = []
+    for item in batch.prepared:
+        if item.page.id is None:
+            continue
+        if item.pending is None:
+            targets.append((item.page, item.chunks))
+            continue
+        try:
+            await vectorizer.delete_page_from_index(item.page.id)
+        except Exception as e:
+            failed.add(item.page.id)
+            print(f"  ERROR page_id={item.page.id}: {e}")
+
+    succeeded = 0
+    results = await vectorizer.reindex_chunked_pages(targets) if targets else {}
+    for page_id, result in results.items():
+        try:
+            if isinstance(result, Exception):
+                raise result
+            await page_repo.update_weaviate_id(page_id, result)
+            succeeded += 1
+        except Exception as e:
+            failed.add(page_id)
+            print(f"  ERROR page_id={page_id}: {e}")
+    return succeeded, failed
+
+
 async def reindex(
-    max_pages: int | None, dry_run: bool, repair_pending_output: Path | None = None
+    max_pages: int | None,
+    dry_run: bool,
+    repair_pending_output: Path | None = None,
+    full: bool = False,
+    batch_pages: int | None = None,
+    workers: int | None = None,
+    concurrency: int = 2,
+    checkpoint_path: Path | None = None,
 ) -> int:
-    """成功済みページを新しいWeaviateコレクションへ再構築する."""
+    """成功済みページを新しいWeaviateコレクションへ再構築する.
+
+    SQLite から batch_pages 件ずつ読み出し、保存済み JSON の読み込み・検証・
+    チャンク分割を workers 個のプロセスで行い、concurrency 個のバッチを並行して
+    一括登録する。checkpoint_path を指定すると進捗を保存し、次回は続きから再開する。
+    full を指定すると、変わっていないオブジェクトも書き直して埋め込みを作り直す。
+    """
+    batch_pages = batch_pages or settings.VECTORIZER_BULK_MAX_PAGES
+    if workers is None:
+        workers = os.cpu_count() or 1
     page_repo = MigrationPageRepository(DatabaseConnection(read_only=dry_run))
+    checkpoint = Checkpoint.load(checkpoint_path)
+    if checkpoint.last_page_id or checkpoint.failed_page_ids:
+        print(
+            f"再開: page_id>{checkpoint.last_page_id} と "
+            f"前回失敗した {len(checkpoint.failed_page_ids)} ページ"
+        )
     total_pages = await page_repo.count_completed_pages()
-    target_count = min(total_pages, max_pages) if max_pages is not None else total_pages
-    pages = await page_repo.get_completed_pages(limit=target_count)
-    chunking_service = ChunkingService()
+    remaining = await page_repo.count_completed_pages(after_id=checkpoint.last_page_id)
+    if max_pages is not None:
+        remaining = min(remaining, max_pages)
+    progress = Progress(remaining + len(checkpoint.failed_page_ids))
     json_root = Path(settings.JSON_STORAGE_PATH)
-    repair_pending = []
-    migration_pages = []
-    for page in pages:
-        pending = classify_stored_source(page, json_root, chunking_service)
-        if pending:
-            repair_pending.append(pending)
-        else:
-            migration_pages.append(page)
+
+    client = None
+    vectorizer = None
+    if not dry_run:
+        client = weaviate.connect_to_local(
+            host=settings.WEAVIATE_HOST,
+            port=settings.WEAVIATE_PORT,
+            headers={"X-OpenAI-Api-Key": settings.OPENAI_API_KEY},
+        )
+        vectorizer = VectorizerService(
+            page_repo,
+            FileRepository(),
+            ChunkingService(),
+            client,
+            incremental=not full,
+        )
+
+    scanned = 0
+    migration_targets = 0
+    repair_pending: list[RepairPendingPage] = []
+    succeeded = 0
+    failed = 0
+    slots = asyncio.Semaphore(max(1, concurrency))
+    tasks: set[asyncio.Task[Any]] = set()
+
+    async def index(batch: ReindexBatch, vectorizer: VectorizerService) -> None:
+        nonlocal succeeded, failed
+        try:
+            batch_succeeded, batch_failed = await _index_batch(
+                batch, vectorizer, page_repo
+            )
+            succeeded += batch_succeeded
+            failed += len(batch_failed)
+            checkpoint.commit(batch, batch_failed)
+            print(progress.advance(len(batch.pages)))
+        finally:
+            slots.release()
+
+    try:
+        if vectorizer is not None:
+            await vectorizer.ensure_schema()
+        async for batch in prepared_batches(
+            page_repo,
+            checkpoint,
+            json_root,
+            max_pages=max_pages,
+            batch_pages=batch_pages,
+            workers=workers,
+        ):
+            scanned += len(batch.pages)
+            for item in batch.prepared:
+                if item.pending is None:
+                    migration_targets += 1
+                    if dry_run:
+                        print(f"  {item.page.id}: {item.page.url}")
+                    continue
+                repair_pending.append(item.pending)
+                reason_codes = ", ".join(reason.code for reason in item.pending.reasons)
+                print(
+                    f"  REPAIR_PENDING page_id={item.pending.page_id}: {reason_codes}"
+                )
+            if vectorizer is None:
+                print(progress.advance(len(batch.pages)))
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(index(batch, vectorizer))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if client is not None:
+            client.close()
+
     if repair_pending_output:
         write_repair_report(
             repair_pending_output,
             completed_pages=total_pages,
-            scanned_pages=len(pages),
-            migration_targets=len(migration_pages),
+            scanned_pages=scanned,
+            migration_targets=migration_targets,
             repair_pending=repair_pending,
         )
         print(f"修復待ちレポート: {repair_pending_output}")
     print(
-        f"移行対象: {len(migration_pages)}, 修復待ち: {len(repair_pending)}, "
+        f"移行対象: {migration_targets}, 修復待ち: {len(repair_pending)}, "
         f"成功済みページ: {total_pages}"
     )
-    for pending in repair_pending:
-        reason_codes = ", ".join(reason.code for reason in pending.reasons)
-        print(f"  REPAIR_PENDING page_id={pending.page_id}: {reason_codes}")
     if dry_run:
-        for page in migration_pages:
-            print(f"  {page.id}: {page.url}")
         print("ドライランのためWeaviateは変更していません。")
         return 0
 
-    client = weaviate.connect_to_local(
-        host=settings.WEAVIATE_HOST,
-        port=settings.WEAVIATE_PORT,
-        headers={"X-OpenAI-Api-Key": settings.OPENAI_API_KEY},
-    )
-    vectorizer = VectorizerService(
-        page_repo,
-        FileRepository(),
-        chunking_service,
-        client,
-    )
-    succeeded = 0
-    failed = 0
-    try:
-        await vectorizer.ensure_schema()
-        for pending in repair_pending:
-            await vectorizer.delete_page_from_index(pending.page_id)
-        for index, page in enumerate(migration_pages, 1):
-            if page.id is None:
-                failed += 1
-                continue
-            print(f"[{index}/{len(migration_pages)}] page_id={page.id} {page.url}")
-            try:
-                page_uuid = await vectorizer.reindex_content(page.id)
-                await page_repo.update_weaviate_id(page.id, page_uuid)
-                succeeded += 1
-            except Exception as e:
-                failed += 1
-                print(f"  ERROR: {e}")
-    finally:
-        client.close()
-
     print(
         f"完了: success={succeeded}, failed={failed}, "
-        f"repair_pending={len(repair_pending)}, total={len(pages)}"
+        f"repair_pending={len(repair_pending)}, total={scanned}"
     )
-    return 1 if failed else 0
+    if failed:
+        if checkpoint_path is not None:
+            print(f"失敗したページは次回 {checkpoint_path} から再試行します。")
+        return 1
+    if max_pages is None:
+        checkpoint.clear()
+    return 0
 
 
 def main() -> None:
@@ -111,12 +425,56 @@ def main() -> None:
     parser.add_argument("--max-pages", type=_positive_int)
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--repair-pending-output", type=Path)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="変更のないページも書き直し、本文チャンクの埋め込みを作り直す",
+    )
+    parser.add_argument(
+        "--batch-pages",
+        type=_positive_int,
+        help="1回の一括登録にまとめるページ数 (既定: VECTORIZER_BULK_MAX_PAGES)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_non_negative_int,
+        help="JSONの読み込み・検証・チャンク分割を行うプロセス数 "
+        "(既定: CPU数, 0 でこのプロセスのみ)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=2,
+        help="並行して一括登録するバッチ数 (既定: 2)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="進捗ファイル. 存在すれば続きから再開し、全件成功したら削除する",
+    )
     args = parser.parse_args()
     raise SystemExit(
-        asyncio.run(reindex(args.max_pages, args.dry_run, args.repair_pending_output))
+        asyncio.run(
+            reindex(
+                args.max_pages,
+                args.dry_run,
+                args.repair_pending_output,
+                args.full,
+                args.batch_pages,
+                args.workers,
+                args.concurrency,
+                args.checkpoint,
+            )
+        )
     )
 
 
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
 def _positive_int(value: str) -> int:
     parsed = int(value)
     if parsed < 1:
@@ -124,5 +482,12 @@ def _positive_int(value: str) -> int:
     return parsed
 
 
+def _non_negative_int(value: str) -> int:
+    parsed = int(value)
+    if parsed < 0:
+        raise argparse.ArgumentTypeError("0以上の整数を指定してください")
+    return parsed
+
+
 if __name__ == "__main__":
     main()
@@ -87,8 +87,9 @@ async def verify_migration(repair_report: Path | None = None) -> int:
         if page_count != expected_migration_pages:
             print("ERROR: migration targets and GrimoirePage counts do not match")
             return 1
-        if expected_migration_pages > 0 and chunk_count < page_count:
-            print("ERROR: GrimoireContentChunk count is smaller than page count")
+        # 同じ本文のページはチャンクを共有するため、ページ数より少なくてもよい
+        if expected_migration_pages > 0 and chunk_count == 0:
+            print("ERROR: GrimoireContentChunk is empty")
             return 1
         print("OK: rebuilt Weaviate collections passed count verification")
         return 0
@@ -20,27 +20,28 @@ class MigrationPageRepository(PageRepository):
         )
         return f"CASE WHEN {completed} THEN 'succeeded' ELSE 'failed' END", completed
 
-    async def count_completed_pages(self) -> int:
-        """現在または旧スキーマの成功済みページ数を返す."""
+    async def count_completed_pages(self, after_id: int = 0) -> int:
+        """現在または旧スキーマの成功済みページのうち after_id より後の件数を返す."""
         _, completed = await self._schema_expressions()
         result = await self.db.fetch_one(
-            f"SELECT COUNT(*) AS total FROM pages WHERE {completed}"
+            f"SELECT COUNT(*) AS total FROM pages WHERE ({completed}) AND id > ?",
+            (after_id,),
         )
         return int(result["total"]) if result else 0
 
-    async def get_completed_pages(self, limit: int) -> list[Page]:
-        """現在または旧スキーマの成功済みページをID順で返す."""
+    async def get_completed_pages(self, limit: int, after_id: int = 0) -> list[Page]:
+        """現在または旧スキーマの成功済みページを after_id より後からID順で返す."""
         status, completed = await self._schema_expressions()
         rows = await self.db.fetch_all(
             f"""
             SELECT id, url, title, memo, summary, keywords, weaviate_id,
                    last_success_step, {status} AS status, created_at, updated_at
             FROM pages
-            WHERE {completed}
+            WHERE ({completed}) AND id > ?
             ORDER BY id ASC
             LIMIT ?
             """,
-            (limit,),
+            (after_id, limit),
         )
         return [self._row_to_page(row) for row in rows]
 
@@ -10,6 +10,10 @@ from typing import Any
 
 from grimoire_api.models.database import Page
 from grimoire_api.models.external import FetchedDocument
+from grimoire_api.repositories.storage_format import (
+    find_stored_file,
+    read_stored_file,
+)
 from grimoire_api.services.chunking_service import ChunkingService
 from pydantic import ValidationError
 
@@ -31,29 +35,39 @@ def classify_stored_source(
     page: Page, json_root: Path, chunking_service: ChunkingService | None = None
 ) -> RepairPendingPage | None:
     """Return repair reasons for one completed page without changing its data."""
+    return prepare_stored_source(page, json_root, chunking_service)[0]
+
+
+def prepare_stored_source(
+    page: Page, json_root: Path, chunking_service: ChunkingService | None = None
+) -> tuple[RepairPendingPage | None, list[str]]:
+    """Classify one completed page and return the chunks it would be indexed with.
+
+    The chunks are empty when the page needs repair or no chunking service is given.
+    """
     if page.id is None:
         return RepairPendingPage(
             0, page.url, (RepairReason("invalid_page_id", "page ID is missing"),)
-        )
+        ), []
 
     reasons: list[RepairReason] = []
     if page.url.rstrip().lower().endswith((">", "%3e")):
         reasons.append(RepairReason("malformed_url_suffix", "URL ends with > or %3E"))
 
-    source_path = json_root / f"{page.id}.json"
+    source_path = find_stored_file(json_root, page.id)
+    if source_path is None:
+        reasons.append(RepairReason("missing_json", f"missing {page.id}.json"))
+        return RepairPendingPage(page.id, page.url, tuple(reasons)), []
     try:
-        source = json.loads(source_path.read_text(encoding="utf-8"))
-    except FileNotFoundError:
-        reasons.append(RepairReason("missing_json", f"missing {source_path.name}"))
-        return RepairPendingPage(page.id, page.url, tuple(reasons))
-    except (OSError, json.JSONDecodeError, UnicodeDecodeError) as exc:
+        source = read_stored_file(source_path, json_root)
+    except (OSError, ValueError) as exc:
         reasons.append(RepairReason("invalid_json", type(exc).__name__))
-        return RepairPendingPage(page.id, page.url, tuple(reasons))
+        return RepairPendingPage(page.id, page.url, tuple(reasons)), []
 
     data = source.get("data") if isinstance(source, dict) else None
     if not isinstance(data, dict):
         reasons.append(RepairReason("invalid_jina_data", "data is not an object"))
-        return RepairPendingPage(page.id, page.url, tuple(reasons))
+        return RepairPendingPage(page.id, page.url, tuple(reasons)), []
 
     http_errors = [
         (name, value)
@@ -77,17 +91,21 @@ def classify_stored_source(
             RepairReason("missing_content", "data.content is empty or invalid")
         )
 
+    chunks: list[str] = []
     if not reasons and chunking_service is not None:
         try:
             document = FetchedDocument.from_jina_response(source, source_url=page.url)
-            if not chunking_service.chunk_document(document):
+            chunks = chunking_service.chunk_document(document)
+            if not chunks:
                 reasons.append(RepairReason("no_chunks", "no chunks were generated"))
         except (ValidationError, ValueError, TypeError):
             reasons.append(
                 RepairReason("invalid_jina_data", "stored response validation failed")
             )
 
-    return RepairPendingPage(page.id, page.url, tuple(reasons)) if reasons else None
+    if reasons:
+        return RepairPendingPage(page.id, page.url, tuple(reasons)), []
+    return None, chunks
 
 
 def write_repair_report(